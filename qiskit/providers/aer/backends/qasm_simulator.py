@@ -138,6 +138,33 @@ class QasmSimulator(AerBackend):
       Passes include gate fusion and truncation of unused qubits
       (Default: 12).
 
+    * ``"fold_classical_enable"`` (bool): Evaluate conditionals and
+      boolean functions on classical bits whose values are known before
+      the circuit is run, such as bits that are never measured. Folded
+      conditional gates become unconditional or are removed, so that more
+      circuits can use measure sampling (Default: True).
+
+    * ``"light_cone_enable"`` (bool): Remove the gates outside the
+      backward light cone of the measurements and snapshots of a circuit
+      before truncating unused qubits, so that qubits which cannot change
+      the results are not simulated. Qubits that the noise model errors
+      of a gate act on are part of its light cone (Default: True).
+
+    * ``"truncate_enable"`` (bool): Remove the qubits that are not used
+      by a circuit, or by the noise model errors of its gates, from the
+      simulation. Noise model errors on the removed qubits are dropped,
+      and the number of simulated qubits is reported in the
+      ``num_qubits`` result metadata (Default: True).
+
+    * ``"gate_cancellation_enable"`` (bool): Cancel adjacent inverse pairs
+      of gates, also across gates they commute with, and merge runs of
+      single-qubit gates into a single gate before simulation. Gates with
+      errors in the noise model are not changed (Default: True).
+
+    * ``"gate_cancellation_threshold"`` (double): Sets the threshold for a
+      merged single-qubit gate to be removed as the identity
+      (Default: 1e-14).
+
     These backend options only apply when using the ``"statevector"``
     simulation method:
 
@@ -146,14 +173,23 @@ class QasmSimulator(AerBackend):
       parallelization for matrix multiplication during execution of
       an experiment. If parallel circuit or shot execution is enabled
       this will only use unallocated CPU cores up to
-      max_parallel_threads. Note that setting this too low can reduce
-      performance (Default: 14).
+      max_parallel_threads. The ``"matrix_product_state"`` method applies
+      gates on disjoint qubits in parallel above this threshold. Note that
+      setting this too low can reduce performance (Default: 14).
 
     * ``"statevector_sample_measure_opt"`` (int): Sets the threshold that
       the number of qubits must be greater than to enable a large
       qubit optimized implementation of measurement sampling. Note
       that setting this two low can reduce performance (Default: 10)
 
+    * ``"statevector_sample_measure_method"`` (str): Sets the algorithm
+      used for measurement sampling. ``"index"`` scans a cumulative
+      block index for each shot, ``"alias"`` builds a Walker alias
+      table for constant time draws, and ``"sorted"`` sweeps the
+      statevector once over the sorted random numbers. ``"automatic"``
+      chooses between them based on the number of shots and qubits
+      (Default: "automatic").
+
     These backend options only apply when using the ``"stabilizer"``
     simulation method:
 
@@ -162,6 +198,14 @@ class QasmSimulator(AerBackend):
       `~qiskit.providers.aer.extensions.SnapshotProbabilities`
       instruction (Default: 32).
 
+    * ``"stabilizer_pauli_frame_sampling"`` (bool): Sample all shots of a
+      noisy circuit by propagating a Pauli frame for each shot through a
+      single noise-free reference simulation. This applies to circuits
+      without conditionals or snapshots whose noise model only contains
+      Pauli errors, readout errors, and reset errors on qubits that are
+      in a Z-basis state of the reference simulation. Other noisy circuits
+      sample a new noisy circuit for each shot (Default: True).
+
     These backend options only apply when using the ``"extended_stabilizer"``
     simulation method:
 
@@ -178,6 +222,24 @@ class QasmSimulator(AerBackend):
       alongside setting extended_stabilizer_disable_measurement_opt
       to True (Default: 5000).
 
+    * ``"extended_stabilizer_metropolis_chains"`` (int): Number of
+      independent monte-carlo chains used to sample the shots of the
+      measure sampling optimization. Each chain runs the full mixing
+      time, and the chains run in parallel if there are at least as
+      many chains as threads (Default: 1).
+
+    * ``"extended_stabilizer_metropolis_diagnostics"`` (bool): Compute
+      the split R-hat and effective sample size of the samples of the
+      monte-carlo chains, and report them in the
+      ``"metropolis_diagnostics"`` result metadata (Default: False).
+
+    * ``"extended_stabilizer_cache_decomposition"`` (bool): Reuse the
+      stabilizer rank decomposition of the gates before the first
+      measurement or reset for every shot, and for later experiments
+      with the same gates, instead of sampling a new decomposition each
+      time. Experiments only share a decomposition if they are not run
+      in parallel (Default: True).
+
     * ``"extended_stabilizer_approximation_error"`` (double): Set the error
       in the approximation for the extended_stabilizer method. A
       smaller error needs more memory and computational time
@@ -192,6 +254,36 @@ class QasmSimulator(AerBackend):
       OpenMP parallelization. If parallel circuit or shot execution
       is enabled this will only use unallocated CPU cores up to
       max_parallel_threads (Default: 100).
+
+    These backend options only apply when using the ``"matrix_product_state"``
+    simulation method:
+
+    * ``"mps_max_bond_dimension"`` (int): Maximum number of singular
+      values kept in each bond of the matrix product state after a
+      gate, an initialization or a measurement. Smaller values reduce
+      memory and computational time at the cost of accuracy. Set to 0
+      for no limit (Default: 0).
+
+    * ``"mps_truncation_threshold"`` (double): Discard the smallest
+      singular values of a bond while the sum of their squares is at
+      most this threshold. The accumulated discarded weight, which
+      bounds the loss of fidelity, is reported in the
+      ``"mps_discarded_weight"`` result metadata. Set to 0 to only discard
+      the numerically zero singular values (Default: 0).
+
+    * ``"mps_svd_method"`` (str): Algorithm used for the singular value
+      decompositions: ``"golub_kahan"``, the LAPACK ``"gesvd"`` or
+      ``"gesdd"`` (divide and conquer), or ``"randomized"``, which only
+      computes the singular values kept by ``"mps_max_bond_dimension"``.
+      ``"automatic"`` uses ``"golub_kahan"`` for small matrices,
+      ``"randomized"`` if the bond dimension limit is much smaller than
+      the matrix, and ``"gesdd"`` otherwise (Default: "automatic").
+
+    * ``"mps_swap_lookahead"`` (int): Number of following two-qubit gates
+      considered when choosing where to move the qubits of a gate on
+      non-adjacent qubits. The qubits are not moved back after the gate.
+      Set to 0 to always move the second qubit next to the first
+      (Default: 20).
     """
 
     MAX_QUBIT_MEMORY = int(
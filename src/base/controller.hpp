@@ -44,6 +44,8 @@
 #include "framework/results/experiment_data.hpp"
 #include "noise/noise_model.hpp"
 #include "transpile/circuitopt.hpp"
+#include "transpile/fold_classical.hpp"
+#include "transpile/prune_light_cone.hpp"
 #include "transpile/truncate_qubits.hpp"
 
 
@@ -191,6 +193,15 @@ protected:
                         state_t& state,
                         ExperimentData &data) const;
 
+  // Apply each circuit optimization pass with the operations allowed by
+  // the state, by calling optimize(pass, allowed_opset)
+  template <class state_t, class optimize_t>
+  void apply_optimizations(const state_t& state, optimize_t &&optimize) const;
+
+  // Return the operations, gates and snapshots supported by the state
+  template <class state_t>
+  static Operations::OpSet allowed_opset(const state_t& state);
+
   //-----------------------------------------------------------------------
   // Config
   //-----------------------------------------------------------------------
@@ -213,15 +224,19 @@ protected:
 
   // Set parallelization for experiments
   virtual void set_parallelization_experiments(const std::vector<Circuit>& circuits,
-                                               const Noise::NoiseModel& noise);
+                                               const Noise::NoiseModel& noise,
+                                               const json_t &config);
 
   // Set parallelization for a circuit
   virtual void set_parallelization_circuit(const Circuit& circuit,
-                                           const Noise::NoiseModel& noise);
+                                           const Noise::NoiseModel& noise,
+                                           const json_t &config);
 
-  // Return an estimate of the required memory for a circuit.
+  // Return an estimate of the required memory for a circuit run with
+  // the given config.
   virtual size_t required_memory_mb(const Circuit& circuit,
-                                    const Noise::NoiseModel& noise) const = 0;
+                                    const Noise::NoiseModel& noise,
+                                    const json_t &config) const = 0;
 
   // Get system memory size
   size_t get_system_memory_mb();
@@ -244,6 +259,12 @@ protected:
 
   // Truncate qubits
   bool truncate_qubits_ = true;
+
+  // Fold classical operations on known classical bits
+  bool fold_classical_ = false;
+
+  // Remove operations outside the light cone of measurements and snapshots
+  bool prune_light_cone_ = false;
 };
 
 
@@ -263,6 +284,12 @@ void Controller::set_config(const json_t &config) {
   // Load qubit truncation
   JSON::get_value(truncate_qubits_, "truncate_enable", config);
 
+  // Load classical folding
+  JSON::get_value(fold_classical_, "fold_classical_enable", config);
+
+  // Load light cone pruning
+  JSON::get_value(prune_light_cone_, "light_cone_enable", config);
+
   #ifdef _OPENMP
   // Load OpenMP maximum thread settings
   if (JSON::check_key("max_parallel_threads", config))
@@ -336,7 +363,8 @@ void Controller::clear_parallelization() {
 }
 
 void Controller::set_parallelization_experiments(const std::vector<Circuit>& circuits,
-                                                 const Noise::NoiseModel& noise) {
+                                                 const Noise::NoiseModel& noise,
+                                                 const json_t &config) {
   // Use a local variable to not override stored maximum based
   // on currently executed circuits
   const auto max_experiments = (max_parallel_experiments_ > 0)
@@ -352,7 +380,7 @@ void Controller::set_parallelization_experiments(const std::vector<Circuit>& cir
   // If memory allows, execute experiments in parallel
   std::vector<size_t> required_memory_mb_list(circuits.size());
   for (size_t j=0; j<circuits.size(); j++) {
-    required_memory_mb_list[j] = required_memory_mb(circuits[j], noise);
+    required_memory_mb_list[j] = required_memory_mb(circuits[j], noise, config);
   }
   std::sort(required_memory_mb_list.begin(), required_memory_mb_list.end(), std::greater<>());
   size_t total_memory = 0;
@@ -373,7 +401,8 @@ void Controller::set_parallelization_experiments(const std::vector<Circuit>& cir
 }
 
 void Controller::set_parallelization_circuit(const Circuit& circ,
-                                             const Noise::NoiseModel& noise) {
+                                             const Noise::NoiseModel& noise,
+                                             const json_t &config) {
 
   // Use a local variable to not override stored maximum based
   // on currently executed circuits
@@ -389,11 +418,11 @@ void Controller::set_parallelization_circuit(const Circuit& circ,
     // Parallel shots is > 1
     // Limit parallel shots by available memory and number of shots
     // And assign the remaining threads to state update
-    int circ_memory_mb = required_memory_mb(circ, noise);
+    size_t circ_memory_mb = required_memory_mb(circ, noise, config);
     if (max_memory_mb_ < circ_memory_mb)
       throw std::runtime_error("a circuit requires more memory than max_memory_mb.");
     // If circ memory is 0, set it to 1 so that we don't divide by zero
-    circ_memory_mb = std::max<int>({1, circ_memory_mb});
+    circ_memory_mb = std::max<size_t>({1, circ_memory_mb});
 
     parallel_shots_ = std::min<int>({static_cast<int>(max_memory_mb_ / circ_memory_mb),
                                      max_shots,
@@ -485,17 +514,30 @@ void Controller::optimize_circuit(Circuit &circ,
                                   Noise::NoiseModel& noise,
                                   state_t& state,
                                   ExperimentData &data) const {
+  apply_optimizations(state, [&](Transpile::CircuitOptimization &opt,
+                                 const Operations::OpSet &allowed_opset) {
+    opt.optimize_circuit(circ, noise, allowed_opset, data);
+  });
+}
 
-  Operations::OpSet allowed_opset;
-  allowed_opset.optypes = state.allowed_ops();
-  allowed_opset.gates = state.allowed_gates();
-  allowed_opset.snapshots = state.allowed_snapshots();
-
+template <class state_t, class optimize_t>
+void Controller::apply_optimizations(const state_t& state,
+                                     optimize_t &&optimize) const {
+  const Operations::OpSet opset = allowed_opset(state);
   for (std::shared_ptr<Transpile::CircuitOptimization> opt: optimizations_) {
-    opt->optimize_circuit(circ, noise, allowed_opset, data);
+    optimize(*opt, opset);
   }
 }
 
+template <class state_t>
+Operations::OpSet Controller::allowed_opset(const state_t& state) {
+  Operations::OpSet opset;
+  opset.optypes = state.allowed_ops();
+  opset.gates = state.allowed_gates();
+  opset.snapshots = state.allowed_snapshots();
+  return opset;
+}
+
 //-------------------------------------------------------------------------
 // Qobj execution
 //-------------------------------------------------------------------------
@@ -553,7 +595,7 @@ Result Controller::execute(std::vector<Circuit> &circuits,
   try {
     if (!explicit_parallelization_) {
       // set parallelization for experiments
-      set_parallelization_experiments(circuits, noise_model);
+      set_parallelization_experiments(circuits, noise_model, config);
     }
 
   #ifdef _OPENMP
@@ -628,6 +670,20 @@ ExperimentResult Controller::execute_circuit(Circuit &circ,
   // Execute in try block so we can catch errors and return the error message
   // for individual circuit failures.
   try {
+    // Remove conditional operations and boolean functions on known
+    // classical bits
+    if (fold_classical_) {
+      Transpile::FoldClassical fold_pass;
+      fold_pass.set_config(config);
+      fold_pass.optimize_circuit(circ, noise, Operations::OpSet(), data);
+    }
+    // Remove operations that cannot change the circuit outputs, so that
+    // the qubits they act on can be truncated
+    if (prune_light_cone_) {
+      Transpile::PruneLightCone light_cone_pass;
+      light_cone_pass.set_config(config);
+      light_cone_pass.optimize_circuit(circ, noise, Operations::OpSet(), data);
+    }
     // Truncate unused qubits from circuit and noise model
     if (truncate_qubits_) {
       Transpile::TruncateQubits truncate_pass;
@@ -636,7 +692,7 @@ ExperimentResult Controller::execute_circuit(Circuit &circ,
     }
     // set parallelization for this circuit
     if (!explicit_parallelization_) {
-      set_parallelization_circuit(circ, noise);
+      set_parallelization_circuit(circ, noise, config);
     }
     // Single shot thread execution
     if (parallel_shots_ <= 1) {
@@ -693,6 +749,7 @@ ExperimentResult Controller::execute_circuit(Circuit &circ,
     exp_result.data.metadata().clear();
     exp_result.metadata["parallel_shots"] = parallel_shots_;
     exp_result.metadata["parallel_state_update"] = parallel_state_update_;
+    exp_result.metadata["num_qubits"] = circ.num_qubits;
     // Add timer data
     auto timer_stop = myclock_t::now(); // stop timer
     double time_taken = std::chrono::duration<double>(timer_stop - timer_start).count();
@@ -120,6 +120,10 @@ public:
                                             uint_t shots,
                                             RngEngine &rng);
 
+  // Add metadata about the last call to sample_measure to an
+  // ExperimentData container
+  virtual void add_sample_measure_metadata(ExperimentData &data) const;
+
   //=======================================================================
   // Standard Methods
   //
@@ -229,6 +233,12 @@ std::vector<reg_t> State<state_t>::sample_measure(const reg_t &qubits,
 }
 
 
+template <class state_t>
+void State<state_t>::add_sample_measure_metadata(ExperimentData &data) const {
+  (ignore_argument)data;
+}
+
+
 
 template <class state_t>
 bool State<state_t>::validate_opset(const Operations::OpSet &opset) const {
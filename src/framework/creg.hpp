@@ -244,7 +244,12 @@ void ClassicalRegister::apply_roerror(const Operations::Op &op, RngEngine &rng)
     mem_str.push_back(creg_memory_[creg_memory_.size() - 1 - bit]);
   }
   auto mem_val = std::stoull(mem_str, nullptr, 2);
-  auto outcome = rng.rand_int(op.probs[mem_val]);
+  // Sampled readout errors assign their outcome with probability 1
+  const auto &probs = op.probs[mem_val];
+  const auto certain = std::find(probs.begin(), probs.end(), 1.);
+  const uint_t outcome = (certain != probs.end())
+    ? static_cast<uint_t>(certain - probs.begin())
+    : rng.rand_int(probs);
   auto noise_str = Utils::int2string(outcome, 2, op.memory.size());
   for (size_t pos = 0; pos < op.memory.size(); ++pos) {
     auto bit = op.memory[pos];
@@ -120,6 +120,9 @@ struct Op {
   // Readout error
   std::vector<rvector_t> probs;
 
+  // Noise sampling
+  bool sampled_noise = false; // op was inserted or modified by sampling a noise model
+
   // Snapshots
   using pauli_component_t = std::pair<complex_t, std::string>; // Pair (coeff, label_string)
   using matrix_component_t = std::pair<complex_t, std::vector<std::pair<reg_t, cmatrix_t>>>; // vector of Pair(qubits, matrix), combined with coefficient
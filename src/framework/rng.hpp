@@ -15,8 +15,10 @@
 #ifndef _aer_framework_rng_hpp_
 #define _aer_framework_rng_hpp_
 
+#include <algorithm>
 #include <cstdint>
 #include <random>
+#include <vector>
 
 #include "framework/types.hpp"
 
@@ -129,6 +131,92 @@ uint_t RngEngine::rand_int(const std::vector<double> &probs) {
   return n;
 }
 
+/*******************************************************************************
+ *
+ * AliasTable Class
+ *
+ * Walker alias table for sampling a fixed discrete distribution in constant
+ * time. The table is built once from a vector of probabilities for
+ * [0,..,n-1], and each sample uses a single uniform random number, instead
+ * of constructing a discrete_distribution for every sample.
+ *
+ ******************************************************************************/
+
+class AliasTable {
+public:
+  AliasTable() = default;
+
+  /**
+   * Build the table for a vector of probabilities. If the vector is not
+   * normalized it will be scaled.
+   * @param probs the vector of probabilities
+   */
+  explicit AliasTable(const std::vector<double> &probs);
+
+  /**
+   * Return the outcome for a uniformly distributed random real in [0,1)
+   * @param rnd the random number
+   * @return the sampled integer
+   */
+  inline uint_t sample(double rnd) const {
+    const double scaled = rnd * probs_.size();
+    const uint_t index = std::min<uint_t>(static_cast<uint_t>(scaled),
+                                          probs_.size() - 1);
+    return (scaled - index < probs_[index]) ? index : aliases_[index];
+  }
+
+  /**
+   * Generate a pseudo random integer from the distribution of the table
+   * @param rng the random number generator
+   * @return the generated integer
+   */
+  inline uint_t sample(RngEngine &rng) const { return sample(rng.rand()); }
+
+  // Return the number of outcomes of the table
+  inline uint_t size() const { return probs_.size(); }
+
+private:
+  // Entry k is kept with probability probs_[k] and otherwise
+  // replaced by aliases_[k]
+  std::vector<double> probs_;
+  std::vector<uint_t> aliases_;
+};
+
+AliasTable::AliasTable(const std::vector<double> &probs)
+  : probs_(probs.size()), aliases_(probs.size()) {
+  const uint_t size = probs.size();
+  double total = 0.;
+  for (const auto p : probs)
+    total += p;
+  std::vector<uint_t> small, large;
+  small.reserve(size);
+  large.reserve(size);
+  for (uint_t k = 0; k < size; ++k) {
+    probs_[k] = (total > 0.) ? probs[k] * size / total : 1.;
+    aliases_[k] = k;
+    if (probs_[k] < 1.)
+      small.push_back(k);
+    else
+      large.push_back(k);
+  }
+  while (!small.empty() && !large.empty()) {
+    const uint_t s = small.back();
+    const uint_t l = large.back();
+    small.pop_back();
+    aliases_[s] = l;
+    probs_[l] -= 1. - probs_[s];
+    if (probs_[l] < 1.) {
+      large.pop_back();
+      small.push_back(l);
+    }
+  }
+  // Remaining entries are only off from 1 by rounding error
+  for (const auto k : small)
+    probs_[k] = 1.;
+  for (const auto k : large)
+    probs_[k] = 1.;
+}
+
 //------------------------------------------------------------------------------
 } // End namespace QISKIT
 #endif
@@ -56,6 +56,35 @@ public:
   Circuit sample_noise(const Circuit &circ,
                        RngEngine &rng) const;
 
+  // Errors of each operation of a circuit, resolved once from the error
+  // tables so that noisy circuits can be sampled for many shots without
+  // looking up the tables for every operation of every shot.
+  struct OpErrors;
+  struct CircuitErrors;
+
+  // Resolve the errors of each operation of a circuit
+  CircuitErrors compile_errors(const Circuit &circ) const;
+
+  // Sample a noisy implementation of a full circuit from the errors
+  // returned by compile_errors for the same circuit
+  Circuit sample_noise(const Circuit &circ,
+                       const CircuitErrors &errors,
+                       RngEngine &rng) const;
+
+  // Sample the errors of a circuit for a batch of shots in one pass, from
+  // the errors returned by compile_errors. The error choices of shot j
+  // start at position j * errors.num_choices() of the returned vector
+  reg_t sample_errors(const CircuitErrors &errors,
+                      uint_t shots,
+                      RngEngine &rng) const;
+
+  // Return the noisy implementation of a circuit for the error choices of
+  // a shot returned by sample_errors. Readout errors are inserted with
+  // their sampled outcomes.
+  Circuit sample_noise(const Circuit &circ,
+                       const CircuitErrors &errors,
+                       reg_t::const_iterator choices) const;
+
   // Set sample mode to superoperator
   // This will cause all QuantumErrors stored in the noise model
   // to calculate their superoperator representations and raise
@@ -123,9 +152,14 @@ public:
   // Hence the sets of all keys and all values of the map must be equal.
   void remap_qubits(const std::unordered_map<uint_t, uint_t> &mapping);
 
-  // Return vector of noise qubits for non local error on specified label and qubits
+  // Restrict the noise model to the qubits of a mapping {old: new}.
+  // Errors on any qubits not in the mapping are removed from the noise
+  // model, and the qubits of the remaining errors are remapped.
+  void restrict_qubits(const std::unordered_map<uint_t, uint_t> &mapping);
+
+  // Return the noise qubits of the nonlocal errors applied to an operation.
   // If no nonlocal error exists an empty set is returned.
-  std::set<uint_t> nonlocal_noise_qubits(const std::string label, const reg_t &qubits) const;
+  std::set<uint_t> nonlocal_noise_qubits(const Operations::Op &op) const;
 
   // Set threshold for applying u1 rotation angles.
   // an Op for u1(theta) will only be added if |theta| > 0 and |theta - 2*pi| > 0
@@ -136,39 +170,85 @@ public:
   // Return the opset for the noise model
   inline const Operations::OpSet& opset() const {return opset_;}
 
-private:
+  // Return true if any single qubit gates use the X90 waltz error model
+  inline bool has_x90_gates() const {return !x90_gates_.empty();}
 
-  // Sample noise for the current operation.
-  NoiseOps sample_noise(const Operations::Op &op,
-                        RngEngine &rng) const;
+  //-----------------------------------------------------------------------
+  // Error lookup
+  //-----------------------------------------------------------------------
+
+  // Return the quantum errors applied to an operation together with the
+  // qubits each error acts on, in the order they are sampled by
+  // sample_noise. This ignores the X90 waltz error model.
+  std::vector<std::pair<const QuantumError*, reg_t>>
+  quantum_errors(const Operations::Op &op) const;
+
+  // Return True if quantum errors are applied to an operation, including
+  // the errors of the X90 waltz error model
+  bool has_quantum_errors(const Operations::Op &op) const;
 
   // Sample noise for the current operation
   void sample_readout_noise(const Operations::Op &op,
                             NoiseOps &noise_after,
                             RngEngine &rng)  const;
 
-  void sample_local_quantum_noise(const Operations::Op &op,
-                                  NoiseOps &noise_before,
-                                  NoiseOps &noise_after,
-                                  RngEngine &rng)  const;
+private:
 
-  void sample_nonlocal_quantum_noise(const Operations::Op &op,
-                                     NoiseOps &noise_ops,
-                                     NoiseOps &noise_after,
-                                     RngEngine &rng) const;
+  // Error choices of a shot, consumed in the order the errors are sampled.
+  // If the readout outcomes are not sampled, readout errors are inserted
+  // with their assignment probabilities instead.
+  struct Choices {
+    reg_t::const_iterator quantum;
+    reg_t::const_iterator readout;
+    bool readout_sampled;
+  };
+
+  // Draw the error choices of a circuit for a batch of shots
+  reg_t draw_errors(const CircuitErrors &errors,
+                    uint_t shots,
+                    bool readout,
+                    RngEngine &rng) const;
+
+  // Sample a noisy implementation of a full circuit for error choices
+  Circuit sample_noise(const Circuit &circ,
+                       const CircuitErrors &errors,
+                       Choices &choices) const;
+
+  // Sample noise for the current operation.
+  NoiseOps sample_noise(const Operations::Op &op,
+                        const OpErrors &errors,
+                        Choices &choices) const;
+
+  // Resolve the errors of an operation
+  OpErrors compile_errors(const Operations::Op &op) const;
+
+  // Return the positions in quantum_errors_ of the local and nonlocal
+  // quantum errors applied to an operation, with the qubits they act on
+  std::vector<std::pair<size_t, reg_t>>
+  local_quantum_errors(const Operations::Op &op) const;
+
+  std::vector<std::pair<size_t, reg_t>>
+  nonlocal_quantum_errors(const Operations::Op &op) const;
+
+  // Return the positions in readout_errors_ of the readout errors applied
+  // after a measurement, with their readout error operations
+  std::vector<std::pair<size_t, Operations::Op>>
+  readout_errors(const Operations::Op &op) const;
 
   // Sample noise for the current operation
   NoiseOps sample_noise_helper(const Operations::Op &op,
-                               RngEngine &rng) const;
+                               const std::vector<std::pair<size_t, reg_t>> &quantum,
+                               const std::vector<std::pair<size_t, Operations::Op>> &readout,
+                               Choices &choices) const;
 
   // Sample a noisy implementation of a two-X90 pulse u3 gate
-  NoiseOps sample_noise_x90_u3(uint_t qubit, complex_t theta,
+  NoiseOps sample_noise_x90_u3(const OpErrors &errors, complex_t theta,
                                complex_t phi, complex_t lamba,
-                               RngEngine &rng) const;
+                               Choices &choices) const;
   
   // Sample a noisy implementation of a single-X90 pulse u2 gate
-  NoiseOps sample_noise_x90_u2(uint_t qubit, complex_t phi, complex_t lambda,
-                               RngEngine &rng) const;
+  NoiseOps sample_noise_x90_u2(const OpErrors &errors, complex_t phi, complex_t lambda,
+                               Choices &choices) const;
 
   // Add a local quantum error to the noise model for specific qubits
   void add_local_quantum_error(const QuantumError &error,
@@ -213,6 +293,12 @@ private:
   std::string remap_string(const std::string key,
                            const std::unordered_map<uint_t, uint_t> &mapping) const;
 
+  // Remap a table key and return true, or return false if the key
+  // contains qubits not in the mapping
+  bool restrict_string(const std::string &key,
+                       const std::unordered_map<uint_t, uint_t> &mapping,
+                       std::string &result) const;
+
   // Helper function to try and convert an instruction to superop matrix
   // If conversion isn't possible this returns an empty matrix
   cmatrix_t op2superop(const Operations::Op &op) const;
@@ -228,6 +314,9 @@ private:
   enum class WaltzGate {id, x, y, z, h, s, sdg, t, tdg, u0, u1, u2, u3};
   const static stringmap_t<WaltzGate> waltz_gate_table_;
 
+  // Return the number of X90 pulses of a waltz gate
+  static uint_t num_x90_pulses(WaltzGate gate);
+
   // waltz threshold for applying u1 rotations if |theta - 2n*pi | > threshold
   double u1_threshold_ = 1e-10;
 
@@ -239,56 +328,252 @@ private:
 };
 
 
+struct NoiseModel::OpErrors {
+  // Positions in quantum_errors_ of the errors applied to the operation,
+  // and the qubits each error acts on, in the order they are sampled
+  std::vector<std::pair<size_t, reg_t>> quantum;
+
+  // Positions in readout_errors_ of the readout errors applied after a
+  // measurement, and their readout error operations
+  std::vector<std::pair<size_t, Operations::Op>> readout;
+
+  // The operation is a gate of the X90 waltz error model
+  bool waltz = false;
+  WaltzGate waltz_gate = WaltzGate::id;
+
+  // The X90 pulse of a waltz gate and its errors
+  Operations::Op x90;
+  std::vector<std::pair<size_t, reg_t>> x90_quantum;
+};
+
+
+struct NoiseModel::CircuitErrors {
+  // Errors of each operation of the circuit
+  std::vector<OpErrors> ops;
+
+  // Positions in quantum_errors_ of the quantum errors sampled for each
+  // shot, in the order they are sampled
+  reg_t quantum_draws;
+
+  // Positions in readout_errors_ and measured values of the readout
+  // outcomes sampled for each shot, in the order they are sampled
+  std::vector<std::pair<size_t, uint_t>> readout_draws;
+
+  // Number of error choices sampled for each shot
+  uint_t num_choices() const {return quantum_draws.size() + readout_draws.size();}
+};
+
+
 //=========================================================================
 // Noise sampling
 //=========================================================================
 
 NoiseModel::NoiseOps NoiseModel::sample_noise(const Operations::Op &op,
-                                              RngEngine &rng) const {
-  // Look to see if gate is a waltz gate for this error model
-  auto it = x90_gates_.find(op.name);
-  if (it == x90_gates_.end()) {
-    // Non-X90 based gate, run according to base model
-    return sample_noise_helper(op, rng);
-  }
+                                              const OpErrors &errors,
+                                              Choices &choices) const {
+  // Non-X90 based gate, run according to base model
+  if (!errors.waltz)
+    return sample_noise_helper(op, errors.quantum, errors.readout, choices);
+
   // Decompose ops in terms of their waltz implementation
-  auto gate = waltz_gate_table_.find(op.name);
-  if (gate != waltz_gate_table_.end()) {
-    switch (gate->second) {
+  switch (errors.waltz_gate) {
+    case WaltzGate::u3:
+      return sample_noise_x90_u3(errors,
+                                 op.params[0], op.params[1], op.params[2],
+                                 choices);
+    case WaltzGate::u2:
+      return sample_noise_x90_u2(errors,
+                                 op.params[0], op.params[1],
+                                 choices);
+    case WaltzGate::x:
+      return sample_noise_x90_u3(errors, M_PI, 0., M_PI, choices);
+    case WaltzGate::y:
+      return sample_noise_x90_u3(errors,  M_PI, 0.5 * M_PI, 0.5 * M_PI, choices);
+    case WaltzGate::h:
+      return sample_noise_x90_u2(errors, 0., M_PI, choices);
+    default:
+      // The rest of the Waltz operations are noise free (u1 only)
+      return {op};
+  }
+}
+
+
+NoiseModel::OpErrors NoiseModel::compile_errors(const Operations::Op &op) const {
+  OpErrors errors;
+
+  // Look to see if gate is a waltz gate for this error model
+  if (x90_gates_.find(op.name) != x90_gates_.end()) {
+    auto gate = waltz_gate_table_.find(op.name);
+    if (gate == waltz_gate_table_.end()) {
+      // something went wrong if we end up here
+      throw std::invalid_argument("Invalid waltz gate.");
+    }
+    errors.waltz = true;
+    errors.waltz_gate = gate->second;
+    switch (errors.waltz_gate) {
       case WaltzGate::u3:
-        return sample_noise_x90_u3(op.qubits[0],
-                                   op.params[0], op.params[1], op.params[2],
-                                   rng);
       case WaltzGate::u2:
-        return sample_noise_x90_u2(op.qubits[0],
-                                   op.params[0], op.params[1],
-                                   rng);
       case WaltzGate::x:
-        return sample_noise_x90_u3(op.qubits[0], M_PI, 0., M_PI, rng);
       case WaltzGate::y:
-        return sample_noise_x90_u3(op.qubits[0],  M_PI, 0.5 * M_PI, 0.5 * M_PI, rng);
       case WaltzGate::h:
-        return sample_noise_x90_u2(op.qubits[0], 0., M_PI, rng);
+        errors.x90 = Operations::make_unitary({op.qubits[0]}, Utils::Matrix::X90, "x90");
+        errors.x90_quantum = local_quantum_errors(errors.x90);
+        for (auto &error : nonlocal_quantum_errors(errors.x90))
+          errors.x90_quantum.push_back(std::move(error));
+        break;
       default:
-        // The rest of the Waltz operations are noise free (u1 only)
-        return {op};
+        break;
+    }
+    return errors;
+  }
+
+  // Gates and matrices without a label have no errors
+  if ((op.type == Operations::OpType::matrix ||
+       op.type == Operations::OpType::gate) && op.string_params.empty())
+    return errors;
+
+  // Local errors are sampled before nonlocal errors
+  if (local_quantum_errors_)
+    errors.quantum = local_quantum_errors(op);
+  if (nonlocal_quantum_errors_) {
+    for (auto &error : nonlocal_quantum_errors(op))
+      errors.quantum.push_back(std::move(error));
+  }
+  // Apply readout error to measure ops
+  if (op.type == Operations::OpType::measure)
+    errors.readout = readout_errors(op);
+  return errors;
+}
+
+
+NoiseModel::CircuitErrors NoiseModel::compile_errors(const Circuit &circ) const {
+  CircuitErrors errors;
+  errors.ops.reserve(circ.ops.size());
+  bool noise_active = true;
+  for (const auto &op: circ.ops) {
+    switch (op.type) {
+      // Operations that cannot have noise
+      case Operations::OpType::barrier:
+      case Operations::OpType::snapshot:
+      case Operations::OpType::kraus:
+      case Operations::OpType::superop:
+      case Operations::OpType::roerror:
+      case Operations::OpType::bfunc:
+        errors.ops.emplace_back();
+        break;
+      case Operations::OpType::noise_switch:
+        noise_active = static_cast<int>(std::real(op.params[0]));
+        errors.ops.emplace_back();
+        break;
+      default: {
+        errors.ops.push_back(compile_errors(op));
+        if (!noise_active)
+          break;
+        // Record the errors sampled for the operation in the same order
+        // as sample_noise
+        const auto &op_errors = errors.ops.back();
+        if (method_ == Method::standard) {
+          if (op_errors.waltz) {
+            const auto pulses = num_x90_pulses(op_errors.waltz_gate);
+            for (uint_t pulse = 0; pulse < pulses; ++pulse)
+              for (const auto &error : op_errors.x90_quantum)
+                errors.quantum_draws.push_back(error.first);
+          } else {
+            for (const auto &error : op_errors.quantum)
+              errors.quantum_draws.push_back(error.first);
+          }
+        }
+        for (const auto &error : op_errors.readout) {
+          const auto values = readout_errors_[error.first].num_values();
+          for (uint_t value = 0; value < values; ++value)
+            errors.readout_draws.emplace_back(error.first, value);
+        }
+        break;
+      }
     }
-  } else {
-    // something went wrong if we end up here
-    throw std::invalid_argument("Invalid waltz gate.");
   }
+  return errors;
+}
+
+
+reg_t NoiseModel::sample_errors(const CircuitErrors &errors,
+                                uint_t shots,
+                                RngEngine &rng) const {
+  return draw_errors(errors, shots, true, rng);
+}
+
+
+reg_t NoiseModel::draw_errors(const CircuitErrors &errors,
+                              uint_t shots,
+                              bool readout,
+                              RngEngine &rng) const {
+  const uint_t num_quantum = errors.quantum_draws.size();
+  const uint_t num_readout = (readout) ? errors.readout_draws.size() : 0;
+  const uint_t stride = num_quantum + num_readout;
+
+  // Draw the random numbers of all shots first, then map them through the
+  // alias table of each error
+  std::vector<double> rnds(shots * stride);
+  for (auto &rnd : rnds)
+    rnd = rng.rand();
+
+  reg_t choices(shots * stride);
+  for (uint_t j = 0; j < num_quantum; ++j) {
+    const auto &table = quantum_errors_[errors.quantum_draws[j]].alias_table();
+    for (uint_t shot = 0; shot < shots; ++shot)
+      choices[shot * stride + j] = table.sample(rnds[shot * stride + j]);
+  }
+  for (uint_t j = 0; j < num_readout; ++j) {
+    const auto &draw = errors.readout_draws[j];
+    const auto &table = readout_errors_[draw.first].alias_table(draw.second);
+    for (uint_t shot = 0; shot < shots; ++shot) {
+      const uint_t pos = shot * stride + num_quantum + j;
+      choices[pos] = table.sample(rnds[pos]);
+    }
+  }
+  return choices;
 }
 
 
 Circuit NoiseModel::sample_noise(const Circuit &circ,
                                  RngEngine &rng) const {
+  return sample_noise(circ, compile_errors(circ), rng);
+}
+
+
+Circuit NoiseModel::sample_noise(const Circuit &circ,
+                                 const CircuitErrors &errors,
+                                 RngEngine &rng) const {
+  // The sampled circuit may be run for many shots, so readout errors keep
+  // their assignment probabilities
+  const auto sampled = draw_errors(errors, 1, false, rng);
+  Choices choices({sampled.cbegin(), sampled.cend(), false});
+  return sample_noise(circ, errors, choices);
+}
+
+
+Circuit NoiseModel::sample_noise(const Circuit &circ,
+                                 const CircuitErrors &errors,
+                                 reg_t::const_iterator sampled) const {
+  Choices choices({sampled, sampled + errors.quantum_draws.size(), true});
+  return sample_noise(circ, errors, choices);
+}
+
+
+Circuit NoiseModel::sample_noise(const Circuit &circ,
+                                 const CircuitErrors &errors,
+                                 Choices &choices) const {
+    if (errors.ops.size() != circ.ops.size()) {
+      throw std::invalid_argument("NoiseModel: compiled errors do not match the circuit.");
+    }
     bool noise_active = true; // set noise active to on-state
     Circuit noisy_circ = circ; // copy input circuit
     noisy_circ.measure_sampling_flag = false; // disable measurement opt flag
     noisy_circ.ops.clear(); // delete ops
     noisy_circ.ops.reserve(2 * circ.ops.size()); // just to be safe?
     // Sample a noisy realization of the circuit
-    for (const auto &op: circ.ops) {
+    for (size_t i = 0; i < circ.ops.size(); ++i) {
+      const auto &op = circ.ops[i];
       switch (op.type) {
         // Operations that cannot have noise
         case Operations::OpType::barrier:
@@ -315,7 +600,7 @@ Circuit NoiseModel::sample_noise(const Circuit &circ,
           break;
         default:
           if (noise_active) {
-            NoiseOps noisy_op = sample_noise(op, rng);
+            NoiseOps noisy_op = sample_noise(op, errors.ops[i], choices);
             noisy_circ.ops.insert(noisy_circ.ops.end(), noisy_op.begin(), noisy_op.end());
           }
           break;
@@ -426,19 +711,46 @@ void NoiseModel::add_nonlocal_quantum_error(const QuantumError &error,
 }
 
 
-NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
-                                                     RngEngine &rng) const {                                                
+NoiseModel::NoiseOps
+NoiseModel::sample_noise_helper(const Operations::Op &op,
+                                const std::vector<std::pair<size_t, reg_t>> &quantum,
+                                const std::vector<std::pair<size_t, Operations::Op>> &readout,
+                                Choices &choices) const {
   // Return operator set
   NoiseOps noise_before;
   NoiseOps noise_after;
-  // Apply local errors first
-  sample_local_quantum_noise(op, noise_before, noise_after, rng);
-  // Apply nonlocal errors second
-  sample_nonlocal_quantum_noise(op, noise_before, noise_after, rng);
+  // Apply local errors first and nonlocal errors second
+  for (const auto &error : quantum) {
+    const auto &qerror = quantum_errors_[error.first];
+    auto noise_ops = (method_ == Method::superop)
+      ? qerror.superop_circuit(error.second)
+      : qerror.error_circuit(error.second, *(choices.quantum++));
+    if (qerror.errors_after())
+      noise_after.insert(noise_after.end(), noise_ops.begin(), noise_ops.end());
+    else
+      noise_before.insert(noise_before.end(), noise_ops.begin(), noise_ops.end());
+  }
   // Apply readout error to measure ops
-  if (op.type == Operations::OpType::measure) {
-    sample_readout_noise(op, noise_after, rng);
+  for (const auto &error : readout) {
+    const auto &roerror = error.second;
+    if (!choices.readout_sampled) {
+      noise_after.push_back(roerror);
+      continue;
+    }
+    const auto &rerror = readout_errors_[error.first];
+    reg_t outcomes(rerror.num_values());
+    for (auto &outcome : outcomes)
+      outcome = *(choices.readout++);
+    auto noise_ops = rerror.noise_ops(roerror.memory, outcomes);
+    for (auto &noise_op : noise_ops)
+      noise_op.registers = roerror.registers;
+    noise_after.insert(noise_after.end(), noise_ops.begin(), noise_ops.end());
   }
+  // Mark the sampled errors, except the identity of the no-error outcome
+  for (auto &noise_op : noise_before)
+    noise_op.sampled_noise = (noise_op.name != "id");
+  for (auto &noise_op : noise_after)
+    noise_op.sampled_noise = (noise_op.name != "id");
 
   // Combine errors
   noise_before.reserve(noise_before.size() + noise_after.size() + 1);
@@ -453,12 +765,14 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
       // otherwise return the full list
       auto& first_op = noise_before[0];
       auto& second_op = noise_before[1];
+      const bool sampled_noise = first_op.sampled_noise || second_op.sampled_noise;
 
       if (second_op.type == Operations::OpType::superop) {
         auto& current = second_op;
         const auto mat = op2superop(first_op);
         if (!mat.empty()) {
           current.mats[0] = current.mats[0] * mat;
+          current.sampled_noise = sampled_noise;
           return NoiseOps({current});
         }
       } else if (first_op.type == Operations::OpType::superop) {
@@ -466,6 +780,7 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
         const auto mat = op2superop(second_op);
         if (!mat.empty()) {
           current.mats[0] = mat * current.mats[0];
+          current.sampled_noise = sampled_noise;
           return NoiseOps({current});
         }
       } else if (second_op.type == Operations::OpType::matrix) { 
@@ -473,6 +788,7 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
         const auto mat = op2unitary(first_op);
         if (!mat.empty()) {
           current.mats[0] = current.mats[0] * mat;
+          current.sampled_noise = sampled_noise;
           return NoiseOps({current});
         }
       } else if (first_op.type == Operations::OpType::matrix) {
@@ -480,6 +796,7 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
         const auto mat = op2unitary(second_op);
         if (!mat.empty()) {
           current.mats[0] = mat * current.mats[0];
+          current.sampled_noise = sampled_noise;
           return NoiseOps({current});
         }
       }
@@ -492,9 +809,18 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_helper(const Operations::Op &op,
 void NoiseModel::sample_readout_noise(const Operations::Op &op,
                                       NoiseOps &noise_after,
                                       RngEngine &rng) const {
+  (void)rng; // Readout errors are sampled when the roerror ops are applied
+  for (const auto &error : readout_errors(op))
+    noise_after.push_back(error.second);
+}
+
+
+std::vector<std::pair<size_t, Operations::Op>>
+NoiseModel::readout_errors(const Operations::Op &op) const {
+  std::vector<std::pair<size_t, Operations::Op>> noise_ops;
   // If no readout errors are defined pass
   if (readout_errors_.empty()) {
-    return;
+    return noise_ops;
   }
   // Check if measure op writes only to memory, or also to registers
   // We will use the same error model for both memory and registers
@@ -515,7 +841,7 @@ void NoiseModel::sample_readout_noise(const Operations::Op &op,
     // each one separately. If a multi-qubit model is found for specified
     // qubits however, that will be used instead.
     for (const auto &q : op.qubits) {
-      qubit_keys.push_back(std::to_string(q));
+      qubit_keys.push_back(reg2string({q}));
     }
     // Add the classical register sets for measure ops
     for (const auto &q : op.memory) {
@@ -542,29 +868,24 @@ void NoiseModel::sample_readout_noise(const Operations::Op &op,
         ? iter_qubits->second
         : iter_default->second;
       for (auto &pos : error_positions) {
-        // Sample Readout error
-        auto noise_ops = readout_errors_[pos].sample_noise(memory_sets[qs], rng);
-        if (has_registers) {
-          for (auto& noise_op: noise_ops) {
+        // Readout errors do not depend on the RNG
+        auto ops = readout_errors_[pos].noise_ops(memory_sets[qs]);
+        for (auto& noise_op: ops) {
+          if (has_registers)
             noise_op.registers = registers_sets[qs];
-          }
+          // Add noise after the error
+          noise_ops.emplace_back(pos, std::move(noise_op));
         }
-        // Add noise after the error 
-        noise_after.insert(noise_after.end(), noise_ops.begin(), noise_ops.end());
       }
     }
   }
+  return noise_ops;
 }
 
 
-void NoiseModel::sample_local_quantum_noise(const Operations::Op &op,
-                                            NoiseOps &noise_before,
-                                            NoiseOps &noise_after,
-                                            RngEngine &rng) const {
-  
-  // If no errors are defined pass
-  if (local_quantum_errors_ == false)
-    return;
+std::vector<std::pair<size_t, reg_t>>
+NoiseModel::local_quantum_errors(const Operations::Op &op) const {
+  std::vector<std::pair<size_t, reg_t>> errors;
 
   // Get op name, or label if it is a gate or unitary matrix
   std::string name = (op.type == Operations::OpType::matrix ||
@@ -583,7 +904,7 @@ void NoiseModel::sample_local_quantum_noise(const Operations::Op &op,
   auto iter = local_quantum_error_table_.find(name);
   if (iter != local_quantum_error_table_.end()) {
     // Check if the qubits are listed in the inner model
-    const auto qubit_map = iter->second;
+    const auto &qubit_map = iter->second;
     // Get the default qubit model in case a specific qubit model is not found
     // The default model is stored under the empty key string ""
     auto iter_default = qubit_map.find(std::string());
@@ -609,28 +930,19 @@ void NoiseModel::sample_local_quantum_noise(const Operations::Op &op,
           ? iter_qubits->second
           : iter_default->second;
         for (auto &pos : error_positions) {
-          auto noise_ops = quantum_errors_[pos].sample_noise(string2reg(qubit_key), rng, method_);
-          // Duplicate same sampled error operations
-          if (quantum_errors_[pos].errors_after())
-            noise_after.insert(noise_after.end(), noise_ops.begin(), noise_ops.end());
-          else
-            noise_before.insert(noise_before.end(), noise_ops.begin(), noise_ops.end());
+          errors.push_back(std::make_pair(pos, string2reg(qubit_key)));
         }
       }
     }
   }
+  return errors;
 }
 
 
-void NoiseModel::sample_nonlocal_quantum_noise(const Operations::Op &op,
-                                               NoiseOps &noise_before,
-                                               NoiseOps &noise_after,
-                                               RngEngine &rng) const {
-  
-  // If no errors are defined pass
-  if (nonlocal_quantum_errors_ == false)
-    return;
-  
+std::vector<std::pair<size_t, reg_t>>
+NoiseModel::nonlocal_quantum_errors(const Operations::Op &op) const {
+  std::vector<std::pair<size_t, reg_t>> errors;
+
   // Get op name, or label if it is a gate or unitary matrix
   std::string name = (op.type == Operations::OpType::matrix ||
                       op.type == Operations::OpType::gate)
@@ -642,7 +954,7 @@ void NoiseModel::sample_nonlocal_quantum_noise(const Operations::Op &op,
   // Get the inner error map for  gate name
   auto iter = nonlocal_quantum_error_table_.find(name);
   if (iter != nonlocal_quantum_error_table_.end()) {
-    const auto qubit_map = iter->second;
+    const auto &qubit_map = iter->second;
     // Format qubit sets
     std::vector<std::string> qubit_keys;
 
@@ -653,7 +965,7 @@ void NoiseModel::sample_nonlocal_quantum_noise(const Operations::Op &op,
       // each one separately. If a multi-qubit model is found for specified
       // qubits however, that will be used instead.
       for (const auto &q : op.qubits)
-        qubit_keys.push_back(std::to_string(q));
+        qubit_keys.push_back(reg2string({q}));
     } else {
       // for gate operations we use the qubits as specified
       qubit_keys.push_back(reg2string(op.qubits));
@@ -666,17 +978,38 @@ void NoiseModel::sample_nonlocal_quantum_noise(const Operations::Op &op,
           auto &target_qubits = target_pair.first;
           auto &error_positions = target_pair.second;
           for (auto &pos : error_positions) {
-            auto ops = quantum_errors_[pos].sample_noise(string2reg(target_qubits), rng,
-                                                         method_);
-            if (quantum_errors_[pos].errors_after())
-              noise_after.insert(noise_after.end(), ops.begin(), ops.end());
-            else
-              noise_before.insert(noise_before.end(), ops.begin(), ops.end());
+            errors.push_back(std::make_pair(pos, string2reg(target_qubits)));
           }
         }
       }
     }
   }
+  return errors;
+}
+
+
+std::vector<std::pair<const QuantumError*, reg_t>>
+NoiseModel::quantum_errors(const Operations::Op &op) const {
+  std::vector<std::pair<const QuantumError*, reg_t>> errors;
+  if (local_quantum_errors_) {
+    for (const auto &error : local_quantum_errors(op))
+      errors.push_back(std::make_pair(&quantum_errors_[error.first], error.second));
+  }
+  if (nonlocal_quantum_errors_) {
+    for (const auto &error : nonlocal_quantum_errors(op))
+      errors.push_back(std::make_pair(&quantum_errors_[error.first], error.second));
+  }
+  return errors;
+}
+
+
+bool NoiseModel::has_quantum_errors(const Operations::Op &op) const {
+  if (x90_gates_.find(op.name) != x90_gates_.end())
+    return true;
+  if ((op.type == Operations::OpType::matrix ||
+       op.type == Operations::OpType::gate) && op.string_params.empty())
+    return false;
+  return !quantum_errors(op).empty();
 }
 
 
@@ -689,17 +1022,34 @@ NoiseModel::waltz_gate_table_ = {
 };
 
 
-NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u3(uint_t qubit,
+uint_t NoiseModel::num_x90_pulses(WaltzGate gate) {
+  switch (gate) {
+    case WaltzGate::u3:
+    case WaltzGate::x:
+    case WaltzGate::y:
+      return 2;
+    case WaltzGate::u2:
+    case WaltzGate::h:
+      return 1;
+    default:
+      // The rest of the Waltz operations are noise free (u1 only)
+      return 0;
+  }
+}
+
+
+NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u3(const OpErrors &errors,
                                                      complex_t theta,
                                                      complex_t phi,
                                                      complex_t lambda,
-                                                     RngEngine &rng) const {
+                                                     Choices &choices) const {
   // sample noise for single X90
-  const auto x90 = Operations::make_unitary({qubit}, Utils::Matrix::X90, "x90");
+  const auto &x90 = errors.x90;
+  const uint_t qubit = x90.qubits[0];
   switch (method_) {
     case Method::superop: {
       // The first element of the sample should be the superoperator to combine
-      auto sample = sample_noise_helper(x90, rng);
+      auto sample = sample_noise_helper(x90, errors.x90_quantum, {}, choices);
       // The first element of the sample should be the superoperator to combine
       if (sample[0].type != Operations::OpType::superop) {
         throw std::runtime_error("Sampling superoperator noise failed.");
@@ -728,13 +1078,13 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u3(uint_t qubit,
           && std::abs(lambda + 2 * M_PI) > u1_threshold_) {
         ret.push_back(Operations::make_u1(qubit, lambda)); // add 1st U1
       }
-      auto sample = sample_noise_helper(x90, rng); // sample noise for 1st X90
+      auto sample = sample_noise_helper(x90, errors.x90_quantum, {}, choices); // sample noise for 1st X90
       ret.insert(ret.end(), sample.begin(), sample.end()); // add 1st noisy X90
       if (std::abs(theta + M_PI) > u1_threshold_
           && std::abs(theta - M_PI) > u1_threshold_) {
         ret.push_back(Operations::make_u1(qubit, theta + M_PI)); // add 2nd U1
       }
-      sample = sample_noise_helper(x90, rng); // sample noise for 2nd X90
+      sample = sample_noise_helper(x90, errors.x90_quantum, {}, choices); // sample noise for 2nd X90
       ret.insert(ret.end(), sample.begin(), sample.end()); // add 2nd noisy X90
       if (std::abs(phi + M_PI) > u1_threshold_
           && std::abs(phi - M_PI) > u1_threshold_) {
@@ -746,13 +1096,14 @@ NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u3(uint_t qubit,
 }
 
 
-NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u2(uint_t qubit,
+NoiseModel::NoiseOps NoiseModel::sample_noise_x90_u2(const OpErrors &errors,
                                                      complex_t phi,
                                                      complex_t lambda,
-                                                     RngEngine &rng) const {
+                                                     Choices &choices) const {
   // sample noise for single X90
-  const auto x90 = Operations::make_unitary({qubit}, Utils::Matrix::X90, "x90");
-  auto sample = sample_noise_helper(x90, rng); 
+  const auto &x90 = errors.x90;
+  const uint_t qubit = x90.qubits[0];
+  auto sample = sample_noise_helper(x90, errors.x90_quantum, {}, choices); 
   switch (method_) {
     case Method::superop: {
       // The first element of the sample should be the superoperator to combine
@@ -876,26 +1227,17 @@ reg_t NoiseModel::string2reg(std::string s) const {
 // Qubit Remapping
 //=========================================================================
 
-std::set<uint_t> NoiseModel::nonlocal_noise_qubits(const std::string label,
-                                                   const reg_t& qubits) const {
+std::set<uint_t> NoiseModel::nonlocal_noise_qubits(const Operations::Op &op) const {
   std::set<uint_t> all_noise_qubits;
-  // Check if label has noise
-  const auto outer_it = nonlocal_quantum_error_table_.find(label);
-  if (outer_it != nonlocal_quantum_error_table_.end()) {
-    const auto outer_table = outer_it->second;
-    const auto it = outer_table.find(reg2string(qubits));
-    // Check if label on specified qubits has noise
-    if (it != outer_table.end()) {
-      // Add all noise qubit errors to the return value
-      const auto inner_table = it->second;
-      for (const auto &pair : inner_table) {
-        auto noise_qubits = string2reg(pair.first);
-        for (const auto& qubit : noise_qubits) {
-          all_noise_qubits.insert(qubit);
-        }
-      }
-    }
-  }
+  // Gates and matrices without a label have no errors
+  if (!nonlocal_quantum_errors_ ||
+      ((op.type == Operations::OpType::matrix ||
+        op.type == Operations::OpType::gate) && op.string_params.empty()))
+    return all_noise_qubits;
+  // Use the same lookup as sampling, which adds the errors of each qubit
+  // of a measure or reset
+  for (const auto &error : nonlocal_quantum_errors(op))
+    all_noise_qubits.insert(error.second.begin(), error.second.end());
   return all_noise_qubits;
 }
 
@@ -987,6 +1329,93 @@ void NoiseModel::remap_qubits(const std::unordered_map<uint_t, uint_t> &mapping)
 }
 
 
+bool NoiseModel::restrict_string(const std::string &key,
+                                 const std::unordered_map<uint_t, uint_t> &mapping,
+                                 std::string &result) const {
+  reg_t qubits = string2reg(key);
+  for (size_t j=0; j<qubits.size(); j++) {
+    const auto it = mapping.find(qubits[j]);
+    if (it == mapping.end())
+      return false;
+    qubits[j] = it->second;
+  }
+  result = reg2string(qubits);
+  return true;
+}
+
+
+void NoiseModel::restrict_qubits(const std::unordered_map<uint_t, uint_t> &mapping) {
+
+  // If noise model is ideal we have no need to remap
+  if (is_ideal())
+    return;
+
+  std::string key;
+
+  // Restrict readout error
+  if (has_readout_errors()) {
+    inner_table_t new_readout_error_table;
+    for (const auto& pair : readout_error_table_) {
+      if (restrict_string(pair.first, mapping, key))
+        new_readout_error_table[key] = pair.second;
+    }
+    readout_error_table_ = new_readout_error_table;
+    // Readout errors are only sampled if the list is not empty
+    if (readout_error_table_.empty())
+      readout_errors_.clear();
+  }
+
+  // Restrict local quantum error
+  if (has_local_quantum_errors()) {
+    outer_table_t new_table;
+    for (const auto& outer_pair : local_quantum_error_table_) {
+      inner_table_t new_inner_table;
+      for (const auto& inner_pair : outer_pair.second) {
+        if (restrict_string(inner_pair.first, mapping, key))
+          new_inner_table[key] = inner_pair.second;
+      }
+      if (!new_inner_table.empty())
+        new_table[outer_pair.first] = new_inner_table;
+    }
+    local_quantum_error_table_ = new_table;
+    local_quantum_errors_ = !local_quantum_error_table_.empty();
+  }
+
+  // Restrict nonlocal quantum error
+  if (has_nonlocal_quantum_errors()) {
+    stringmap_t<outer_table_t> new_table;
+    for (const auto& pair : nonlocal_quantum_error_table_) {
+      outer_table_t new_outer_table;
+      for (const auto& outer_pair : pair.second) {
+        std::string gate_key;
+        if (!restrict_string(outer_pair.first, mapping, gate_key))
+          continue;
+        inner_table_t new_inner_table;
+        for (const auto& inner_pair : outer_pair.second) {
+          if (restrict_string(inner_pair.first, mapping, key))
+            new_inner_table[key] = inner_pair.second;
+        }
+        if (!new_inner_table.empty())
+          new_outer_table[gate_key] = new_inner_table;
+      }
+      if (!new_outer_table.empty())
+        new_table[pair.first] = new_outer_table;
+    }
+    nonlocal_quantum_error_table_ = new_table;
+    nonlocal_quantum_errors_ = !nonlocal_quantum_error_table_.empty();
+  }
+
+  // Update the set of noise qubits
+  std::set<uint_t> new_noise_qubits;
+  for (const auto &qubit : noise_qubits_) {
+    const auto it = mapping.find(qubit);
+    if (it != mapping.end())
+      new_noise_qubits.insert(it->second);
+  }
+  noise_qubits_ = new_noise_qubits;
+}
+
+
 //=========================================================================
 // JSON Conversion
 //=========================================================================
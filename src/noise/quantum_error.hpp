@@ -45,9 +45,25 @@ public:
                         RngEngine &rng,
                         Method method = Method::standard) const;
 
+  // Return the error circuit at position pos applied to qubits.
+  // The position is sampled from the alias table of the error.
+  NoiseOps error_circuit(const reg_t &qubits, uint_t pos) const;
+
+  // Return the superoperator of the error applied to qubits
+  NoiseOps superop_circuit(const reg_t &qubits) const;
+
+  // Return the alias table for sampling the error circuits
+  const AliasTable& alias_table() const {return alias_table_;}
+
   // Return the opset for the quantum error
   const Operations::OpSet& opset() const {return opset_;}
 
+  // Return the probabilities of the error circuits
+  const rvector_t& probabilities() const {return probabilities_;}
+
+  // Return the error circuits
+  const std::vector<NoiseOps>& circuits() const {return circuits_;}
+
   // Return the superoperator matrix representation of the error.
   // If the error cannot be converted to a superoperator and error
   // will be raised.
@@ -96,6 +112,9 @@ public:
   void set_threshold(double);
 
 protected:
+  // Throw an exception if there are fewer qubits than the error acts on
+  void check_qubits(const reg_t &qubits) const;
+
   // Number of qubits sthe error applies to
   uint_t num_qubits_ = 0;
 
@@ -105,6 +124,9 @@ protected:
   // List of unitary error matrices
   std::vector<NoiseOps> circuits_;
 
+  // Alias table of probabilities_
+  AliasTable alias_table_;
+
   // List of OpTypes contained in error circuits
   Operations::OpSet opset_;
 
@@ -126,40 +148,51 @@ protected:
 QuantumError::NoiseOps QuantumError::sample_noise(const reg_t &qubits,
                                                   RngEngine &rng,
                                                   Method method) const {
+  switch (method) {
+    case Method::superop:
+      return superop_circuit(qubits);
+    default:
+      return error_circuit(qubits, alias_table_.sample(rng));
+  }
+}
+
+QuantumError::NoiseOps QuantumError::error_circuit(const reg_t &qubits,
+                                                   uint_t pos) const {
+  // Check for invalid arguments
+  check_qubits(qubits);
+  if (pos + 1 > circuits_.size()) {
+    throw std::invalid_argument(
+      "QuantumError: probability outcome (" + std::to_string(pos) + ")"
+      " is greater than number of circuits (" + std::to_string(circuits_.size()) + ")."
+    );
+  }
+  NoiseOps noise_ops = circuits_[pos];
+  // Add qubits to noise op commands;
+  for (auto &op : noise_ops) {
+    // Update qubits based on position in qubits list
+    for (auto &qubit: op.qubits) {
+      qubit = qubits[qubit];
+    }
+  }
+  return noise_ops;
+}
+
+QuantumError::NoiseOps QuantumError::superop_circuit(const reg_t &qubits) const {
+  check_qubits(qubits);
+  // Truncate qubits to size of the actual error
+  reg_t op_qubits = qubits;
+  op_qubits.resize(get_num_qubits());
+  auto op = Operations::make_superop(op_qubits, superoperator());
+  return NoiseOps({op});
+}
+
+void QuantumError::check_qubits(const reg_t &qubits) const {
   if (qubits.size() < get_num_qubits()) {
     std::stringstream msg;
     msg << "QuantumError: qubits size (" << qubits.size() << ")";
     msg << " < error qubits (" << get_num_qubits() << ").";
     throw std::invalid_argument(msg.str());
   }
-  switch (method) {
-    case Method::superop: {
-      // Truncate qubits to size of the actual error
-      reg_t op_qubits = qubits;
-      op_qubits.resize(get_num_qubits());
-      auto op = Operations::make_superop(op_qubits, superoperator());
-      return NoiseOps({op});
-    }
-    default: {
-      auto r = rng.rand_int(probabilities_);
-      // Check for invalid arguments
-      if (r + 1 > circuits_.size()) {
-        throw std::invalid_argument(
-          "QuantumError: probability outcome (" + std::to_string(r) + ")"
-          " is greater than number of circuits (" + std::to_string(circuits_.size()) + ")."
-        );
-      }
-      NoiseOps noise_ops = circuits_[r];
-      // Add qubits to noise op commands;
-      for (auto &op : noise_ops) {
-        // Update qubits based on position in qubits list
-        for (auto &qubit: op.qubits) {
-          qubit = qubits[qubit];
-        }
-      }
-      return noise_ops;
-    }
-  }
 }
 
 void QuantumError::set_threshold(double threshold) {
@@ -205,6 +238,7 @@ void QuantumError::set_circuits(const std::vector<NoiseOps> &circuits,
     }
   }
   set_num_qubits(num_qubits);
+  alias_table_ = AliasTable(probabilities_);
 }
 
 
@@ -38,6 +38,21 @@ public:
   NoiseOps sample_noise(const reg_t &memory,
                         RngEngine &rng) const;
 
+  // Return the roerror ops of the error on the memory bits. These do not
+  // depend on the RNG, so they can be computed once and reused
+  NoiseOps noise_ops(const reg_t &memory) const;
+
+  // Return the roerror ops of a sampled realization of the error, which
+  // assigns outcomes[v] to the memory bits when their measured value is v
+  NoiseOps noise_ops(const reg_t &memory, const reg_t &outcomes) const;
+
+  // Return the alias table of the assignment probabilities of the
+  // measured value
+  const AliasTable& alias_table(uint_t value) const {return alias_tables_[value];}
+
+  // Return the number of measured values of the assignment probabilities
+  uint_t num_values() const {return assignment_probabilities_.size();}
+
   //-----------------------------------------------------------------------
   // Initialization
   //-----------------------------------------------------------------------
@@ -69,6 +84,9 @@ protected:
   // Vector of assignment probability vectors
   std::vector<rvector_t> assignment_probabilities_; 
 
+  // Alias tables of the assignment probability vectors
+  std::vector<AliasTable> alias_tables_;
+
   // threshold for checking probabilities
   double threshold_ = 1e-10;
 };
@@ -80,6 +98,11 @@ protected:
 ReadoutError::NoiseOps ReadoutError::sample_noise(const reg_t &memory,
                                                   RngEngine &rng) const {
   (void)rng; // RNG is unused for readout error since it is handled by engine
+  return noise_ops(memory);
+}
+
+
+ReadoutError::NoiseOps ReadoutError::noise_ops(const reg_t &memory) const {
   // Check assignment fidelity matrix is correct size
   if (memory.size() > get_num_qubits())
     throw std::invalid_argument("ReadoutError: number of qubits don't match assignment probability matrix.");
@@ -88,6 +111,23 @@ ReadoutError::NoiseOps ReadoutError::sample_noise(const reg_t &memory,
 }
 
 
+ReadoutError::NoiseOps ReadoutError::noise_ops(const reg_t &memory,
+                                               const reg_t &outcomes) const {
+  // Check assignment fidelity matrix is correct size
+  if (memory.size() > get_num_qubits())
+    throw std::invalid_argument("ReadoutError: number of qubits don't match assignment probability matrix.");
+  if (outcomes.size() != assignment_probabilities_.size())
+    throw std::invalid_argument("ReadoutError: number of outcomes don't match assignment probability matrix.");
+  // Each measured value is assigned its sampled outcome with probability 1
+  std::vector<rvector_t> probs(outcomes.size());
+  for (size_t j = 0; j < outcomes.size(); ++j) {
+    probs[j].resize(assignment_probabilities_[j].size(), 0.);
+    probs[j][outcomes[j]] = 1.;
+  }
+  return {Operations::make_roerror(memory, probs)};
+}
+
+
 void ReadoutError::set_probabilities(const std::vector<rvector_t> &probs) {
   assignment_probabilities_ = probs;
   set_num_qubits(assignment_probabilities_.size());
@@ -102,6 +142,9 @@ void ReadoutError::set_probabilities(const std::vector<rvector_t> &probs) {
     if (std::abs(total - 1) > threshold_)
       throw std::invalid_argument("ReadoutError probability vector is not normalized.");
   }
+  alias_tables_.clear();
+  for (const auto &ps : assignment_probabilities_)
+    alias_tables_.emplace_back(ps);
 }
 
 
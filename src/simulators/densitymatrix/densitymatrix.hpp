@@ -117,6 +117,19 @@ public:
   // outcome in [0, 2^num_qubits - 1]
   virtual double probability(const uint_t outcome) const override;
 
+  //-----------------------------------------------------------------------
+  // Expectation Values
+  //-----------------------------------------------------------------------
+
+  // Return the expectation values Tr[M.rho] of a list of operators where
+  // each operator is a product of matrices applied in order to subsets of
+  // qubits. Each matrix is input as a (qubits, vectorized matrix or
+  // diagonal) pair. Only the blocks of rho that are diagonal on the qubits
+  // outside each operator are read, and all operators are evaluated in a
+  // single pass.
+  std::vector<std::complex<double>>
+  expval_matrix(const std::vector<std::vector<std::pair<reg_t, cvector_t<double>>>> &ops) const;
+
 protected:
 
   // Convert qubit indicies to vectorized-density matrix qubitvector indices
@@ -346,6 +359,61 @@ double DensityMatrix<data_t>::probability(const uint_t outcome) const {
   return std::real(BaseVector::data_[outcome * shift]);
 }
 
+//-----------------------------------------------------------------------
+// Expectation Values
+//-----------------------------------------------------------------------
+
+template <typename data_t>
+std::vector<std::complex<double>>
+DensityMatrix<data_t>::expval_matrix(const std::vector<std::vector<std::pair<reg_t, cvector_t<double>>>> &ops) const {
+
+  const uint_t NUM_OPS = ops.size();
+  std::vector<typename BaseVector::BlockOperator> block_ops;
+  block_ops.reserve(NUM_OPS);
+  for (const auto &op : ops)
+    block_ops.push_back(BaseVector::block_operator(op));
+
+  // The density matrix is column-stacked so that rho[row, col] is stored at
+  // index row + col * 2^N. For each row block base k we need
+  // sum_a (M.rho)[k|a, k|a] where M acts on the block rows of column k|a.
+  const uint_t nq = num_qubits();
+  const int_t END = BITS[nq];
+  std::vector<std::complex<double>> expvals(NUM_OPS, 0.);
+  #pragma omp parallel if (BaseVector::num_qubits_ > BaseVector::omp_threshold_ && BaseVector::omp_threads_ > 1) num_threads(BaseVector::omp_threads_)
+  {
+    std::vector<std::complex<double>> local(NUM_OPS, 0.);
+    cvector_t<double> block, tmp;
+    #pragma omp for
+    for (int_t k = 0; k < END; ++k) {
+      for (uint_t n = 0; n < NUM_OPS; ++n) {
+        const auto &op = block_ops[n];
+        if (k & op.mask)
+          continue;
+        const uint_t DIM = op.offsets.size();
+        if (op.diagonal) {
+          for (uint_t i = 0; i < DIM; ++i) {
+            const uint_t row = k | op.offsets[i];
+            local[n] += op.diag[i] * std::complex<double>(BaseVector::data_[row | (row << nq)]);
+          }
+          continue;
+        }
+        block.resize(DIM);
+        for (uint_t a = 0; a < DIM; ++a) {
+          const uint_t col = (k | op.offsets[a]) << nq;
+          for (uint_t b = 0; b < DIM; ++b)
+            block[b] = BaseVector::data_[(k | op.offsets[b]) | col];
+          BaseVector::apply_block_operator(op, block, tmp);
+          local[n] += block[a];
+        }
+      }
+    }
+    #pragma omp critical
+    for (uint_t n = 0; n < NUM_OPS; ++n)
+      expvals[n] += local[n];
+  } // end omp parallel
+  return expvals;
+}
+
 //------------------------------------------------------------------------------
 } // end namespace QV
 //------------------------------------------------------------------------------
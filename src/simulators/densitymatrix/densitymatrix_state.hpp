@@ -38,10 +38,10 @@ enum class Gates {
 // Allowed snapshots enum class
 enum class Snapshots {
   cmemory, cregister, densitymatrix,
-  probs, probs_var
+  probs, probs_var,
+  expval_matrix, expval_matrix_var
   /* TODO: The following expectation value snapshots still need to be implemented */
-  //,expval_pauli, expval_pauli_var,
-  //expval_matrix, expval_matrix_var
+  //,expval_pauli, expval_pauli_var
 };
 
 //=========================================================================
@@ -88,7 +88,9 @@ public:
   // Return the set of qobj snapshot types supported by the State
   virtual stringset_t allowed_snapshots() const override {
     return {"density_matrix", "memory", "register",
-            "probabilities", "probabilities_with_variance"};
+            "probabilities", "probabilities_with_variance",
+            "expectation_value_matrix",
+            "expectation_value_matrix_with_variance"};
   }
 
   // Apply a sequence of operations by looping over list
@@ -288,6 +290,8 @@ const stringmap_t<Snapshots> State<densmat_t>::snapshotset_({
   {"density_matrix", Snapshots::densitymatrix},
   {"probabilities", Snapshots::probs},
   {"probabilities_with_variance", Snapshots::probs_var},
+  {"expectation_value_matrix", Snapshots::expval_matrix},
+  {"expectation_value_matrix_with_variance", Snapshots::expval_matrix_var},
   {"memory", Snapshots::cmemory},
   {"register", Snapshots::cregister}
 });
@@ -374,6 +378,23 @@ void State<densmat_t>::set_config(const json_t &config) {
 
   // Set OMP threshold for state update functions
   JSON::get_value(omp_qubit_threshold_, "statevector_parallel_threshold", config);
+
+  // Set the sample measure algorithm
+  std::string sample_method;
+  if (JSON::get_value(sample_method, "statevector_sample_measure_method", config)) {
+    if (sample_method == "automatic") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::automatic);
+    } else if (sample_method == "index") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::index);
+    } else if (sample_method == "alias") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::alias);
+    } else if (sample_method == "sorted") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::sorted);
+    } else {
+      throw std::invalid_argument("DensityMatrix::State: invalid sample measure method \'" +
+                                  sample_method + "\'.");
+    }
+  }
 }
 
 
@@ -463,20 +484,19 @@ void State<densmat_t>::apply_snapshot(const Operations::Op &op,
       // get probs as hexadecimal
       snapshot_probabilities(op, data, true);
       break;
+    case Snapshots::expval_matrix: {
+      snapshot_matrix_expval(op, data, false);
+    }  break;
+    case Snapshots::expval_matrix_var: {
+      snapshot_matrix_expval(op, data, true);
+    }  break;
     /* TODO
     case Snapshots::expval_pauli: {
       snapshot_pauli_expval(op, data, false);
     } break;
-    case Snapshots::expval_matrix: {
-      snapshot_matrix_expval(op, data, false);
-    }  break;
-    
     case Snapshots::expval_pauli_var: {
       snapshot_pauli_expval(op, data, true);
     } break;
-    case Snapshots::expval_matrix_var: {
-      snapshot_matrix_expval(op, data, true);
-    }  break;
     */
     default:
       // We shouldn't get here unless there is a bug in the snapshotset
@@ -500,6 +520,47 @@ void State<densmat_t>::snapshot_probabilities(const Operations::Op &op,
 }
 
 
+template <class densmat_t>
+void State<densmat_t>::snapshot_matrix_expval(const Operations::Op &op,
+                                              ExperimentData &data,
+                                              bool variance) {
+  // Check empty edge case
+  if (op.params_expval_matrix.empty()) {
+    throw std::invalid_argument("Invalid matrix snapshot (components are empty).");
+  }
+  // Convert each component to a list of (qubits, vectorized matrix) pairs
+  // Diagonal matrices are stored as 1 x M row-matrices and projector vectors
+  // as M x 1 column-matrices
+  std::vector<std::vector<std::pair<reg_t, cvector_t>>> components;
+  components.reserve(op.params_expval_matrix.size());
+  for (const auto &param : op.params_expval_matrix) {
+    std::vector<std::pair<reg_t, cvector_t>> mats;
+    for (const auto &pair: param.second) {
+      reg_t sub_qubits;
+      for (const auto pos : pair.first) {
+        sub_qubits.push_back(op.qubits[pos]);
+      }
+      const cmatrix_t &mat = pair.second;
+      cvector_t vmat = (mat.GetColumns() == 1)
+        ? Utils::vectorize_matrix(Utils::projector(Utils::vectorize_matrix(mat))) // projector case
+        : Utils::vectorize_matrix(mat); // diagonal or square matrix case
+      mats.emplace_back(sub_qubits, vmat);
+    }
+    components.push_back(mats);
+  }
+
+  // Compute Tr[M.rho] for all components in a single pass
+  const auto matrix_expvals = BaseState::qreg_.expval_matrix(components);
+  complex_t expval(0., 0.);
+  for (size_t i = 0; i < components.size(); ++i)
+    expval += op.params_expval_matrix[i].first * matrix_expvals[i];
+
+  // add to snapshot
+  Utils::chop_inplace(expval, json_chop_threshold_);
+  data.add_average_snapshot("expectation_value", op.string_params[0],
+                            BaseState::creg_.memory_hex(), expval, variance);
+}
+
 //=========================================================================
 // Implementation: Matrix multiplication
 //=========================================================================
@@ -630,15 +691,14 @@ std::vector<reg_t> State<densmat_t>::sample_measure(const reg_t &qubits,
 
   auto allbit_samples = BaseState::qreg_.sample_measure(rnds);
 
-  // Convert to reg_t format
+  // Convert packed outcomes to reg_t format for the measured qubits
   std::vector<reg_t> all_samples;
   all_samples.reserve(shots);
-  for (int_t val : allbit_samples) {
-    reg_t allbit_sample = Utils::int2reg(val, 2, BaseState::qreg_.num_qubits());
+  for (uint_t val : allbit_samples) {
     reg_t sample;
     sample.reserve(qubits.size());
     for (uint_t qubit : qubits) {
-      sample.push_back(allbit_sample[qubit]);
+      sample.push_back((val >> qubit) & 1ULL);
     }
     all_samples.push_back(sample);
   }
@@ -17,6 +17,7 @@
 
 #include "chlib/core.hpp"
 #include "chlib/chstabilizer.hpp"
+#include "chlib/chstabilizer_batch.hpp"
 #include "gates.hpp"
 
 #include "framework/json.hpp"
@@ -28,8 +29,10 @@
 #define _USE_MATH_DEFINES
 #include <math.h>
 
+#include <algorithm>
 #include <cstdint>
 #include <complex>
+#include <limits>
 #include <vector>
 
 #ifdef _OPENMP
@@ -47,26 +50,59 @@ const U1Sample t_sample(T_ANGLE);
 const U1Sample tdg_sample(TDG_ANGLE);
 
 const uint_t ZERO = 0ULL;
+const uint_t ONE = 1ULL;
 
 thread_local std::unordered_map<double, U1Sample> Z_ROTATIONS;
 
+//Maximum lag of the autocorrelations used to estimate the effective sample
+//size of the Metropolis samples
+const uint_t MAX_AUTOCORRELATION_LAG = 1000;
+
+//State of a Markov chain for the Metropolis sampler. P and Q hold the
+//auxiliary Pauli operators of each term for the current and proposed
+//basis states.
+struct MetropolisChain
+{
+  bool accept = false;
+  complex_t old_ampsum;
+  uint_t x_string = 0;
+  uint_t last_proposal = 0;
+  std::vector<pauli_t> P;
+  std::vector<pauli_t> Q;
+};
+
 class Runner
 {
 private:
   uint_t n_qubits_;
   uint_t num_states_;
-  std::vector<chstabilizer_t> states_;
+  StabilizerStateBatch states_;
   std::vector<complex_t> coefficients_;
   uint_t num_threads_;
   uint_t omp_threshold_;
 
-  bool accept_;
-  complex_t old_ampsum_;
-  uint_t x_string_;
-  uint_t last_proposal_;
-
-  void init_metropolis(AER::RngEngine &rng);
-  void metropolis_step(AER::RngEngine &rng);
+  // Mask of the terms that a sampled Clifford branch is applied to, and the
+  // sampled branch of each term for CCX and CCZ gates
+  std::vector<word> branch_mask_;
+  std::vector<uint_t> toffoli_branches_;
+
+  MetropolisChain chain_;
+  uint_t metropolis_chains_ = 1;
+  bool compute_diagnostics_ = false;
+  json_t metropolis_diagnostics_;
+
+  void sample_toffoli_branches(AER::RngEngine &rng);
+  const word* toffoli_mask(uint_t branches);
+
+  //If parallel_terms is false the terms are not parallelised over, which
+  //is used when running several chains in parallel
+  void init_metropolis(MetropolisChain &chain, AER::RngEngine &rng, bool parallel_terms = true);
+  void metropolis_step(MetropolisChain &chain, AER::RngEngine &rng, bool parallel_terms = true);
+  std::vector<uint_t> metropolis_chain(MetropolisChain &chain, uint_t n_steps, uint_t n_samples,
+                                       AER::RngEngine &rng, bool parallel_terms);
+  //Compute the split R-hat and effective sample size of the Metropolis
+  //samples of each chain
+  void compute_metropolis_diagnostics(const std::vector<std::vector<uint_t>> &samples);
   //
 
   json_t serialize_state(uint_t rank) const;
@@ -78,6 +114,11 @@ public:
 
   void initialize(uint_t n_qubits);
   void initialize_omp(uint_t n_threads, uint_t threshold_rank);
+  //Set the number of independent Markov chains used to draw many samples
+  //with the Metropolis method
+  //If diagnostics is true, compute the convergence diagnostics of the
+  //samples of the chains
+  void set_metropolis_chains(uint_t n_chains, bool diagnostics = false);
 
   bool empty() const
   {
@@ -99,26 +140,26 @@ public:
   //Check if the coefficient omega is 0
   bool check_eps(uint_t rank);
 
-  //Methods for applying gates
-  void apply_cx(uint_t control, uint_t target, uint_t rank);
-  void apply_cz(uint_t control, uint_t target, uint_t rank);
-  void apply_swap(uint_t qubit_1, uint_t qubit_2, uint_t rank);
-  void apply_h(uint_t qubit, uint_t rank);
-  void apply_s(uint_t qubit, uint_t rank);
-  void apply_sdag(uint_t qubit, uint_t rank);
-  void apply_x(uint_t qubit, uint_t rank);
-  void apply_y(uint_t qubit, uint_t rank);
-  void apply_z(uint_t qubit, uint_t rank);
-  //Methods for non-clifford gates, including parameters for the Sampling
-  void apply_t(uint_t qubit, double r, int rank);
-  void apply_tdag(uint_t qubit, double r, int rank);
-  void apply_u1(uint_t qubit, complex_t lambda, double r, int rank);
-  void apply_ccx(uint_t control_1, uint_t control_2, uint_t target, uint_t branch, int rank);
-  void apply_ccz(uint_t control_1, uint_t control_2, uint_t target, uint_t branch, int rank);
+  //Methods for applying gates to every term of the decomposition
+  void apply_cx(uint_t control, uint_t target);
+  void apply_cz(uint_t control, uint_t target);
+  void apply_swap(uint_t qubit_1, uint_t qubit_2);
+  void apply_h(uint_t qubit);
+  void apply_s(uint_t qubit);
+  void apply_sdag(uint_t qubit);
+  void apply_x(uint_t qubit);
+  void apply_y(uint_t qubit);
+  void apply_z(uint_t qubit);
+  //Methods for non-clifford gates. A Clifford branch is sampled independently
+  //for each term with a non-zero coefficient omega.
+  void apply_t(uint_t qubit, AER::RngEngine &rng);
+  void apply_tdag(uint_t qubit, AER::RngEngine &rng);
+  void apply_u1(uint_t qubit, complex_t lambda, AER::RngEngine &rng);
+  void apply_ccx(uint_t control_1, uint_t control_2, uint_t target, AER::RngEngine &rng);
+  void apply_ccz(uint_t control_1, uint_t control_2, uint_t target, AER::RngEngine &rng);
   //Measure a Pauli projector on each term in the decomposition and update their coefficients
   // omega.
   void apply_pauli_projector(const std::vector<pauli_t> &generators);
-  void apply_pauli_projector(const std::vector<pauli_t> &generators, uint_t rank);
   //Routine for Norm Estimation, thin wrapper for the CHSimulator method that uses AER::RngEngine
   //to set up the estimation routine.
   double norm_estimation(uint_t n_samples, AER::RngEngine &rng);
@@ -126,7 +167,16 @@ public:
 
   //Metropolis Estimation for sampling from the output distribution
   uint_t metropolis_estimation(uint_t n_steps, AER::RngEngine &rng);
+  //Draw n_shots samples from independent Markov chains, each with n_steps of
+  //burn-in. Consecutive shots are taken from different chains.
   std::vector<uint_t> metropolis_estimation(uint_t n_steps, uint_t n_shots, AER::RngEngine &rng);
+  //Convergence diagnostics of the last call to metropolis_estimation for
+  //many shots. This is null if the diagnostics are not enabled or there
+  //were not enough samples.
+  const json_t& metropolis_diagnostics() const
+  {
+    return metropolis_diagnostics_;
+  }
   //Efficient Sampler for the output distribution of a stabilizer state
   uint_t stabilizer_sampler(AER::RngEngine &rng);
   std::vector<uint_t> stabilizer_sampler(uint_t n_shots, AER::RngEngine &rng);
@@ -147,39 +197,44 @@ Runner::Runner(uint_t num_qubits)
 
 void Runner::initialize(uint_t num_qubits)
 {
-  states_.clear();
   coefficients_.clear();
   n_qubits_ = num_qubits;
   num_states_ = 1;
   num_threads_ = 1;
-  states_ = std::vector<chstabilizer_t>(1, chstabilizer_t(num_qubits));
+  omp_threshold_ = 0;
+  states_ = StabilizerStateBatch(num_qubits, 1);
   coefficients_.push_back(complex_t(1.,0.));
+  branch_mask_.assign(1, zer);
+  toffoli_branches_.assign(1, 0);
+  metropolis_diagnostics_ = json_t();
 }
 
 void Runner::initialize_decomposition(uint_t n_states)
 {
-  num_states_ = n_states;
-  states_.reserve(num_states_);
-  coefficients_.reserve(num_states_);
-  if(states_.size() > 1 || coefficients_.size() > 1)
+  if(states_.NStates() > 1 || coefficients_.size() > 1)
   {
     throw std::runtime_error(std::string("CHSimulator::Runner was initialized without") + 
                              std::string("being properly cleared since the last ") +
                              std::string("experiment."));
   }
-  chstabilizer_t base_sate(states_[0]);
-  complex_t coeff(coefficients_[0]);
-  for(uint_t i=1; i<num_states_; i++)
-  {
-    states_.push_back(base_sate);
-    coefficients_.push_back(coeff);
-  }
+  num_states_ = n_states;
+  states_.Initialize(states_.GetState(0), num_states_);
+  coefficients_.assign(num_states_, coefficients_[0]);
+  branch_mask_.assign(num_states_, zer);
+  toffoli_branches_.assign(num_states_, 0);
 }
 
 void Runner::initialize_omp(uint_t n_threads, uint_t threshold_rank)
 {
   num_threads_ = (n_threads == 0 ? 1: n_threads);
   omp_threshold_ = threshold_rank;
+  states_.SetParallelization(num_threads_, omp_threshold_);
+}
+
+void Runner::set_metropolis_chains(uint_t n_chains, bool diagnostics)
+{
+  metropolis_chains_ = (n_chains == 0 ? 1: n_chains);
+  compute_diagnostics_ = diagnostics;
 }
 
 uint_t Runner::get_num_states() const
@@ -203,207 +258,192 @@ bool Runner::check_omp_threshold()
 
 void Runner::apply_pauli_projector(const std::vector<pauli_t> &generators)
 {
-  const int_t END = num_states_;
-  #pragma omp parallel for if(num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_)
-  for(int_t i=0; i<END; i++)
-  {
-    apply_pauli_projector(generators, i);
-  }
-}
-
-void Runner::apply_pauli_projector(const std::vector<pauli_t> &generators, uint_t rank)
-{
-  states_[rank].MeasurePauliProjector(generators);
+  states_.MeasurePauliProjector(generators);
 }
 
 bool Runner::check_eps(uint_t rank)
 {
-  return (states_[rank].Omega().eps == 1);
+  return (states_.Omega(rank).eps == 1);
 }
 
-void Runner::apply_cx(uint_t control, uint_t target, uint_t rank)
+void Runner::apply_cx(uint_t control, uint_t target)
 {
-  states_[rank].CX(control, target);
+  states_.CX(control, target);
 }
 
-void Runner::apply_cz(uint_t control, uint_t target, uint_t rank)
+void Runner::apply_cz(uint_t control, uint_t target)
 {
-  states_[rank].CZ(control, target);
+  states_.CZ(control, target);
 }
 
-void Runner::apply_swap(uint_t qubit_1, uint_t qubit_2, uint_t rank)
+void Runner::apply_swap(uint_t qubit_1, uint_t qubit_2)
 {
-  states_[rank].CX(qubit_1, qubit_2);
-  states_[rank].CX(qubit_2, qubit_1);
-  states_[rank].CX(qubit_1, qubit_2);
+  states_.CX(qubit_1, qubit_2);
+  states_.CX(qubit_2, qubit_1);
+  states_.CX(qubit_1, qubit_2);
 }
 
 
-void Runner::apply_h(uint_t qubit, uint_t rank)
+void Runner::apply_h(uint_t qubit)
 {
-  states_[rank].H(qubit);
+  states_.H(qubit);
 }
 
-void Runner::apply_s(uint_t qubit, uint_t rank)
+void Runner::apply_s(uint_t qubit)
 {
-  states_[rank].S(qubit);
+  states_.S(qubit);
 }
 
-void Runner::apply_sdag(uint_t qubit, uint_t rank)
+void Runner::apply_sdag(uint_t qubit)
 {
-  states_[rank].Sdag(qubit);
+  states_.Sdag(qubit);
 }
 
-void Runner::apply_x(uint_t qubit, uint_t rank)
+void Runner::apply_x(uint_t qubit)
 {
-  states_[rank].X(qubit);
+  states_.X(qubit);
 }
 
-void Runner::apply_y(uint_t qubit, uint_t rank)
+void Runner::apply_y(uint_t qubit)
 {
-  states_[rank].Y(qubit);
+  states_.Y(qubit);
 }
 
-void Runner::apply_z(uint_t qubit, uint_t rank)
+void Runner::apply_z(uint_t qubit)
 {
-  states_[rank].Z(qubit);
+  states_.Z(qubit);
 }
 
-void Runner::apply_t(uint_t qubit, double r, int rank)
+void Runner::apply_t(uint_t qubit, AER::RngEngine &rng)
 {
-  sample_branch_t branch = t_sample.sample(r);
-  coefficients_[rank] *= branch.first;
-  if (branch.second == Gates::s)
+  for (uint_t i=0; i<num_states_; i++)
   {
-    states_[rank].S(qubit);
+    branch_mask_[i] = zer;
+    if(check_eps(i))
+    {
+      sample_branch_t branch = t_sample.sample(rng.rand());
+      coefficients_[i] *= branch.first;
+      branch_mask_[i] = (branch.second == Gates::s) ? ~zer : zer;
+    }
   }
+  states_.S(qubit, branch_mask_.data());
 }
-void Runner::apply_tdag(uint_t qubit, double r, int rank)
+
+void Runner::apply_tdag(uint_t qubit, AER::RngEngine &rng)
 {
-  sample_branch_t branch = tdg_sample.sample(r);
-  coefficients_[rank] *= branch.first;
-  if (branch.second == Gates::sdg)
+  for (uint_t i=0; i<num_states_; i++)
   {
-    states_[rank].Sdag(qubit);
+    branch_mask_[i] = zer;
+    if(check_eps(i))
+    {
+      sample_branch_t branch = tdg_sample.sample(rng.rand());
+      coefficients_[i] *= branch.first;
+      branch_mask_[i] = (branch.second == Gates::sdg) ? ~zer : zer;
+    }
   }
+  states_.Sdag(qubit, branch_mask_.data());
 }
 
-void Runner::apply_u1(uint_t qubit, complex_t param, double r, int rank)
+void Runner::apply_u1(uint_t qubit, complex_t param, AER::RngEngine &rng)
 {
   double lambda = std::real(param);
   auto it = Z_ROTATIONS.find(lambda); //Look for cached z_rotations
-  sample_branch_t branch;
   if (it == Z_ROTATIONS.end())
   {
-    U1Sample rotation(lambda);
-    Z_ROTATIONS.insert({lambda, rotation});
-    branch = rotation.sample(r);
+    it = Z_ROTATIONS.insert({lambda, U1Sample(lambda)}).first;
   }
-  else
+  const U1Sample &rotation = it->second;
+  //Sample a branch for each term and record it in the mask, then apply
+  //each of the S, Sdag and Z branches to the terms that sampled it.
+  std::vector<Gates> branches(num_states_, Gates::id);
+  for (uint_t i=0; i<num_states_; i++)
   {
-    branch = it->second.sample(r);
-  }
-  coefficients_[rank] *= branch.first;
-  switch(branch.second)
-  {
-    case Gates::s:
-      states_[rank].S(qubit);
-      break;
-    case Gates::sdg:
-      states_[rank].Sdag(qubit);
-      break;
-    case Gates::z:
-      states_[rank].Z(qubit);
-      break;
-    default:
-      break;
-  }
-}
-
-void Runner::apply_ccx(uint_t control_1, uint_t control_2, uint_t target, uint_t branch, int rank)
-{
-  switch(branch) //Decomposition of the CCX gate into Cliffords
-  {
-    case 1:
-      states_[rank].CZ(control_1, control_2);
-      break;
-    case 2:
-      states_[rank].CX(control_1, target);
-      break;
-    case 3:
-      states_[rank].CX(control_2, target);
-      break;
-    case 4:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CX(control_1, target);
-      states_[rank].Z(control_1);
-      break;
-    case 5:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CX(control_2, target);
-      states_[rank].Z(control_2);
-      break;
-    case 6:
-      states_[rank].CX(control_1, target);
-      states_[rank].CX(control_2, target);
-      states_[rank].X(target);
-      break;
-    case 7:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CX(control_1, target);
-      states_[rank].CX(control_2, target);
-      states_[rank].Z(control_1);
-      states_[rank].Z(control_2);
-      states_[rank].X(target);
-      coefficients_[rank] *= -1; //Additional phase
-      break;
-    default: //Identity
-      break;
-  }
-}
-
-void Runner::apply_ccz(uint_t control_1, uint_t control_2, uint_t target, uint_t branch, int rank)
-{
-  switch(branch) //Decomposition of the CCZ gate into Cliffords
-  {
-    case 1:
-      states_[rank].CZ(control_1, control_2);
-      break;
-    case 2:
-      states_[rank].CZ(control_1, target);
-      break;
-    case 3:
-      states_[rank].CZ(control_2, target);
-      break;
-    case 4:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CZ(control_1, target);
-      states_[rank].Z(control_1);
-      break;
-    case 5:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CZ(control_2, target);
-      states_[rank].Z(control_2);
-      break;
-    case 6:
-      states_[rank].CZ(control_1, target);
-      states_[rank].CZ(control_2, target);
-      states_[rank].Z(target);
-      break;
-    case 7:
-      states_[rank].CZ(control_1, control_2);
-      states_[rank].CZ(control_1, target);
-      states_[rank].CZ(control_2, target);
-      states_[rank].Z(control_1);
-      states_[rank].Z(control_2);
-      states_[rank].Z(target);
-      coefficients_[rank] *= -1; //Additional phase
-      break;
-    default: //Identity
-      break;
+    if(check_eps(i))
+    {
+      sample_branch_t branch = rotation.sample(rng.rand());
+      coefficients_[i] *= branch.first;
+      branches[i] = branch.second;
+    }
+  }
+  for (Gates gate : {Gates::s, Gates::sdg, Gates::z})
+  {
+    for (uint_t i=0; i<num_states_; i++)
+    {
+      branch_mask_[i] = (branches[i] == gate) ? ~zer : zer;
+    }
+    switch(gate)
+    {
+      case Gates::s:
+        states_.S(qubit, branch_mask_.data());
+        break;
+      case Gates::sdg:
+        states_.Sdag(qubit, branch_mask_.data());
+        break;
+      default:
+        states_.Z(qubit, branch_mask_.data());
+        break;
+    }
   }
 }
 
+//Decomposition of the CCX and CCZ gates into Cliffords. Each Clifford gate
+//of the decomposition is applied to the terms that sampled one of the
+//branches set in its bitmask below. Branch 0 is the identity, and branch 7
+//has an additional phase of -1.
+const uint_t TOFF_CZ_C1_C2 = 0b10110010; //branches 1,4,5,7
+const uint_t TOFF_C1_T = 0b11010100; //branches 2,4,6,7
+const uint_t TOFF_C2_T = 0b11101000; //branches 3,5,6,7
+const uint_t TOFF_Z_C1 = 0b10010000; //branches 4,7
+const uint_t TOFF_Z_C2 = 0b10100000; //branches 5,7
+const uint_t TOFF_T = 0b11000000; //branches 6,7
+
+void Runner::sample_toffoli_branches(AER::RngEngine &rng)
+{
+  for (uint_t i=0; i<num_states_; i++)
+  {
+    toffoli_branches_[i] = 0;
+    if(check_eps(i))
+    {
+      toffoli_branches_[i] = rng.rand_int(ZERO, uint_t(7));
+      if(toffoli_branches_[i] == 7)
+      {
+        coefficients_[i] *= -1; //Additional phase
+      }
+    }
+  }
+}
+
+const word* Runner::toffoli_mask(uint_t branches)
+{
+  for (uint_t i=0; i<num_states_; i++)
+  {
+    branch_mask_[i] = ((branches >> toffoli_branches_[i]) & 1ULL) ? ~zer : zer;
+  }
+  return branch_mask_.data();
+}
+
+void Runner::apply_ccx(uint_t control_1, uint_t control_2, uint_t target, AER::RngEngine &rng)
+{
+  sample_toffoli_branches(rng);
+  states_.CZ(control_1, control_2, toffoli_mask(TOFF_CZ_C1_C2));
+  states_.CX(control_1, target, toffoli_mask(TOFF_C1_T));
+  states_.CX(control_2, target, toffoli_mask(TOFF_C2_T));
+  states_.Z(control_1, toffoli_mask(TOFF_Z_C1));
+  states_.Z(control_2, toffoli_mask(TOFF_Z_C2));
+  states_.X(target, toffoli_mask(TOFF_T));
+}
+
+void Runner::apply_ccz(uint_t control_1, uint_t control_2, uint_t target, AER::RngEngine &rng)
+{
+  sample_toffoli_branches(rng);
+  states_.CZ(control_1, control_2, toffoli_mask(TOFF_CZ_C1_C2));
+  states_.CZ(control_1, target, toffoli_mask(TOFF_C1_T));
+  states_.CZ(control_2, target, toffoli_mask(TOFF_C2_T));
+  states_.Z(control_1, toffoli_mask(TOFF_Z_C1));
+  states_.Z(control_2, toffoli_mask(TOFF_Z_C2));
+  states_.Z(target, toffoli_mask(TOFF_T));
+}
+
 //-------------------------------------------------------------------------
 //Measurement
 //-------------------------------------------------------------------------
@@ -442,7 +482,13 @@ double Runner::norm_estimation(uint_t n_samples, AER::RngEngine &rng)
     }
   }
   } // end omp parallel
-  return ParallelNormEstimate(states_, coefficients_, adiag_1, adiag_2, a, num_threads_);
+  std::vector<chstabilizer_t> states;
+  states.reserve(num_states_);
+  for (uint_t i=0; i<num_states_; i++)
+  {
+    states.push_back(states_.GetState(i));
+  }
+  return ParallelNormEstimate(states, coefficients_, adiag_1, adiag_2, a, num_threads_);
 }
 
 double Runner::norm_estimation(uint_t n_samples, std::vector<pauli_t> generators, AER::RngEngine &rng)
@@ -453,39 +499,94 @@ double Runner::norm_estimation(uint_t n_samples, std::vector<pauli_t> generators
 
 uint_t Runner::metropolis_estimation(uint_t n_steps, AER::RngEngine &rng)
 {
-  init_metropolis(rng);
+  init_metropolis(chain_, rng);
   for (uint_t i=0; i<n_steps; i++)
   {
-    metropolis_step(rng);
+    metropolis_step(chain_, rng);
   }
-  return x_string_;
+  return chain_.x_string;
 }
 
 std::vector<uint_t> Runner::metropolis_estimation(uint_t n_steps, uint_t n_shots, AER::RngEngine &rng)
 {
+  const uint_t n_chains = std::max(ONE, std::min(metropolis_chains_, n_shots));
+  std::vector<std::vector<uint_t>> samples(n_chains);
+  if (n_chains == 1)
+  {
+    samples[0] = metropolis_chain(chain_, n_steps, n_shots, rng, true);
+  }
+  else
+  {
+    //Each chain has its own random number stream, seeded from rng
+    std::vector<AER::RngEngine> chain_rngs(n_chains);
+    for (auto &chain_rng: chain_rngs)
+    {
+      chain_rng.set_seed(rng.rand_int(ZERO, std::numeric_limits<uint_t>::max()));
+    }
+    std::vector<MetropolisChain> chains(n_chains);
+    //Run the chains in parallel if there are enough of them to use all
+    //threads, otherwise parallelise each chain over the terms.
+    const bool parallel_chains = (num_threads_ > 1 && n_chains >= num_threads_);
+    states_.Transpose();
+    const int_t NCHAINS = n_chains;
+    #pragma omp parallel for if(parallel_chains) num_threads(num_threads_)
+    for (int_t c=0; c<NCHAINS; c++)
+    {
+      //Shot i is taken from chain i % n_chains
+      const uint_t n_samples = (n_shots - c + n_chains - 1) / n_chains;
+      samples[c] = metropolis_chain(chains[c], n_steps, n_samples, chain_rngs[c], !parallel_chains);
+    }
+  }
+  metropolis_diagnostics_ = json_t();
+  if (compute_diagnostics_)
+  {
+    compute_metropolis_diagnostics(samples);
+  }
   std::vector<uint_t> shots(n_shots, zer);
-  shots[0] = metropolis_estimation(n_steps, rng);
-  for (uint_t i=1; i<n_shots; i++)
+  for (uint_t i=0; i<n_shots; i++)
   {
-    metropolis_step(rng);
-    shots[i] = x_string_;
+    shots[i] = samples[i % n_chains][i / n_chains];
   }
   return shots;
 }
 
-void Runner::init_metropolis(AER::RngEngine &rng)
+std::vector<uint_t> Runner::metropolis_chain(MetropolisChain &chain, uint_t n_steps, uint_t n_samples,
+                                             AER::RngEngine &rng, bool parallel_terms)
+{
+  std::vector<uint_t> samples(n_samples, zer);
+  init_metropolis(chain, rng, parallel_terms);
+  for (uint_t i=0; i<n_steps; i++)
+  {
+    metropolis_step(chain, rng, parallel_terms);
+  }
+  samples[0] = chain.x_string;
+  for (uint_t i=1; i<n_samples; i++)
+  {
+    metropolis_step(chain, rng, parallel_terms);
+    samples[i] = chain.x_string;
+  }
+  return samples;
+}
+
+void Runner::init_metropolis(MetropolisChain &chain, AER::RngEngine &rng, bool parallel_terms)
 {
-  accept_ = 0;
+  chain.accept = 0;
   //Random initial x_string from RngEngine
   uint_t max = (1ULL<<n_qubits_) - 1;
-  x_string_ = rng.rand_int(ZERO, max);
-  last_proposal_=0;
+  chain.x_string = rng.rand_int(ZERO, max);
+  chain.last_proposal=0;
+  chain.P.resize(num_states_);
+  chain.Q.resize(num_states_);
   double local_real=0., local_imag=0.;
+  if (parallel_terms)
+  {
+    states_.Transpose();
+  }
   const int_t END = num_states_;
-  #pragma omp parallel for if(num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:local_real) reduction(+:local_imag)
+  #pragma omp parallel for if(parallel_terms && num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:local_real) reduction(+:local_imag)
   for (int_t i=0; i<END; i++)
   {
-    scalar_t amp = states_[i].Amplitude(x_string_);
+    scalar_t amp = states_.Amplitude(chain.x_string, i, chain.P[i]);
     if(amp.eps == 1)
     {
       complex_t local = (amp.to_complex() * coefficients_[i]);
@@ -493,80 +594,159 @@ void Runner::init_metropolis(AER::RngEngine &rng)
       local_imag += local.imag();
     }
   }
-  old_ampsum_ = complex_t(local_real, local_imag);
+  chain.old_ampsum = complex_t(local_real, local_imag);
 }
 
-void Runner::metropolis_step(AER::RngEngine &rng)
+void Runner::metropolis_step(MetropolisChain &chain, AER::RngEngine &rng, bool parallel_terms)
 {
   uint_t proposal = rng.rand(0ULL, n_qubits_);
-  if(accept_)
+  if(chain.accept)
   {
-    x_string_ ^= (one << last_proposal_);
+    chain.x_string ^= (one << chain.last_proposal);
+    //The proposed Paulis of the accepted flip become the current ones
+    chain.P.swap(chain.Q);
   }
   double real_part = 0.,imag_part =0.;
-  if (accept_ == 0)
-  {
-    const int_t END = num_states_;
-    #pragma omp parallel for if(num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:real_part) reduction(+:imag_part)
-    for (int_t i=0; i<END; i++)
-    {
-      scalar_t amp = states_[i].ProposeFlip(proposal);
-      if(amp.eps == 1)
-      {
-        complex_t local = (amp.to_complex() * coefficients_[i]);
-        real_part += local.real();
-        imag_part += local.imag();
-      }
-    }
-  }
-  else
+  const int_t END = num_states_;
+  #pragma omp parallel for if(parallel_terms && num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:real_part) reduction(+:imag_part)
+  for (int_t i=0; i<END; i++)
   {
-    const int_t END = num_states_;
-    #pragma omp parallel for if(num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:real_part) reduction(+:imag_part)
-    for (int_t i=0; i<END; i++)
+    scalar_t amp = states_.ProposeFlip(proposal, i, chain.P[i], chain.Q[i]);
+    if(amp.eps == 1)
     {
-      states_[i].AcceptFlip();
-      scalar_t amp = states_[i].ProposeFlip(proposal);
-      if(amp.eps == 1)
-      {
-        complex_t local = (amp.to_complex() * coefficients_[i]);
-        real_part += local.real();
-        imag_part += local.imag();
-      }
+      complex_t local = (amp.to_complex() * coefficients_[i]);
+      real_part += local.real();
+      imag_part += local.imag();
     }
   }
   complex_t ampsum(real_part, imag_part);
-  double p_threshold = std::norm(ampsum)/std::norm(old_ampsum_);
+  double p_threshold = std::norm(ampsum)/std::norm(chain.old_ampsum);
   #ifdef  __FAST_MATH__ //isnan doesn't behave well under fastmath, so use absolute tolerance check instead
-  if(std::isinf(p_threshold) || std::abs(std::norm(old_ampsum_)-0.) < 1e-8)
+  if(std::isinf(p_threshold) || std::abs(std::norm(chain.old_ampsum)-0.) < 1e-8)
   #else
   if(std::isinf(p_threshold) || std::isnan(p_threshold))
   #endif
   {
-    accept_ = 1;
-    old_ampsum_ = ampsum;
-    last_proposal_ = proposal; //We try to move away from node with 0 probability.
+    chain.accept = 1;
+    chain.old_ampsum = ampsum;
+    chain.last_proposal = proposal; //We try to move away from node with 0 probability.
   }
   else
   {
     double rand = rng.rand();
     if (rand < p_threshold)
     {
-      accept_ = 1;
-      old_ampsum_ = ampsum;
-      last_proposal_ = proposal;
+      chain.accept = 1;
+      chain.old_ampsum = ampsum;
+      chain.last_proposal = proposal;
     }
     else
     {
-      accept_ = 0;
+      chain.accept = 0;
+    }
+  }
+}
+
+void Runner::compute_metropolis_diagnostics(const std::vector<std::vector<uint_t>> &samples)
+{
+  //Split each chain in two halves of equal length, and compute the
+  //diagnostics of Gelman et al., Bayesian Data Analysis (3rd ed.), on the
+  //value of each qubit. We report the largest R-hat and the smallest
+  //effective sample size over all qubits that are not constant.
+  metropolis_diagnostics_ = json_t();
+  uint_t length = samples[0].size();
+  for (const auto &chain_samples: samples)
+  {
+    length = std::min(length, uint_t(chain_samples.size()));
+  }
+  const uint_t n = length / 2; //samples per split chain
+  const uint_t m = 2 * samples.size(); //number of split chains
+  if (n < 2)
+  {
+    return;
+  }
+  const uint_t max_lag = std::min(n - 1, MAX_AUTOCORRELATION_LAG);
+  double rhat = 1.;
+  double ess = double(m * n);
+  std::vector<double> means(m);
+  std::vector<double> variances(m);
+  std::vector<double> autocov(m);
+  for (uint_t q=0; q<n_qubits_; q++)
+  {
+    auto value = [&](uint_t j, uint_t k)
+    {
+      return double((samples[j / 2][(j % 2) * n + k] >> q) & 1ULL);
+    };
+    double mean = 0.;
+    for (uint_t j=0; j<m; j++)
+    {
+      means[j] = 0.;
+      for (uint_t k=0; k<n; k++)
+        means[j] += value(j, k);
+      means[j] /= n;
+      variances[j] = 0.;
+      for (uint_t k=0; k<n; k++)
+        variances[j] += std::pow(value(j, k) - means[j], 2);
+      variances[j] /= (n - 1);
+      mean += means[j] / m;
+    }
+    double W = 0., B = 0.;
+    for (uint_t j=0; j<m; j++)
+    {
+      W += variances[j] / m;
+      B += std::pow(means[j] - mean, 2) * n / (m - 1);
+    }
+    if (W == 0. && B == 0.)
+    {
+      //The value is the same in every sample
+      continue;
+    }
+    //If the value is constant within each split chain but not across them
+    //the chains have not mixed. Bound W by the variance of a single flip
+    //to keep R-hat finite.
+    W = std::max(W, (n - 1.) / (n * n));
+    const double var_plus = (n - 1.) * W / n + B / n;
+    rhat = std::max(rhat, std::sqrt(var_plus / W));
+    //Sum the autocorrelations in pairs until a pair is negative (Geyer)
+    double tau = -1.;
+    double last_pair = 2.;
+    for (uint_t lag=0; lag + 1<=max_lag; lag += 2)
+    {
+      double rho[2];
+      for (uint_t l=0; l<2; l++)
+      {
+        if (lag + l == 0)
+        {
+          rho[l] = 1.;
+          continue;
+        }
+        double mean_autocov = 0.;
+        for (uint_t j=0; j<m; j++)
+        {
+          autocov[j] = 0.;
+          for (uint_t k=0; k + lag + l<n; k++)
+            autocov[j] += (value(j, k) - means[j]) * (value(j, k + lag + l) - means[j]);
+          mean_autocov += autocov[j] / (n * m);
+        }
+        rho[l] = 1. - (W - mean_autocov) / var_plus;
+      }
+      double pair = std::min(rho[0] + rho[1], last_pair);
+      if (pair < 0.)
+        break;
+      tau += 2. * pair;
+      last_pair = pair;
     }
+    ess = std::min(ess, m * n / std::max(tau, 1. / std::log10(double(m * n))));
   }
+  metropolis_diagnostics_["chains"] = samples.size();
+  metropolis_diagnostics_["effective_sample_size"] = ess;
+  metropolis_diagnostics_["rhat"] = rhat;
 }
 
 uint_t Runner::stabilizer_sampler(AER::RngEngine &rng)
 {
   uint_t max = (1ULL << n_qubits_) -1;
-  return states_[0].Sample(rng.rand_int(ZERO, max));
+  return states_.GetState(0).Sample(rng.rand_int(ZERO, max));
 }
 
 std::vector<uint_t> Runner::stabilizer_sampler(uint_t n_shots, AER::RngEngine &rng)
@@ -587,12 +767,14 @@ std::vector<uint_t> Runner::stabilizer_sampler(uint_t n_shots, AER::RngEngine &r
 complex_t Runner::amplitude(uint_t x_measure)
 {
   double real_part=0., imag_part=0.;
+  states_.Transpose();
   //Splitting the reduction guarantees support on more OMP versions.
   const int_t END = num_states_;
   #pragma omp parallel for if(num_states_ > omp_threshold_ && num_threads_ > 1) num_threads(num_threads_) reduction(+:real_part) reduction(+:imag_part)
   for(int_t i=0; i<END; i++)
   {
-    complex_t amplitude = states_[i].Amplitude(x_measure).to_complex();
+    pauli_t P;
+    complex_t amplitude = states_.Amplitude(x_measure, i, P).to_complex();
     amplitude *= coefficients_[i];
     real_part += amplitude.real();
     imag_part += amplitude.imag();
@@ -651,11 +833,12 @@ json_t Runner::serialize_state(uint_t rank) const
   std::vector<uint_t> F;
   std::vector<uint_t> G;
   gamma.reserve(n_qubits_);
-  M = states_[rank].MMatrix();
-  F = states_[rank].FMatrix();
-  G = states_[rank].GMatrix();
-  uint_t gamma1 = states_[rank].Gamma1();
-  uint_t gamma2 = states_[rank].Gamma2();
+  const chstabilizer_t state = states_.GetState(rank);
+  M = state.MMatrix();
+  F = state.FMatrix();
+  G = state.GMatrix();
+  uint_t gamma1 = state.Gamma1();
+  uint_t gamma2 = state.Gamma2();
   for(uint_t i=0; i<n_qubits_; i++)
   {
     gamma.push_back(((gamma1 >> i) & 1ULL) + 2*((gamma2 >> i) & 1ULL));
@@ -664,7 +847,7 @@ json_t Runner::serialize_state(uint_t rank) const
   js["M"] = M;
   js["F"] = F;
   js["G"] = G;
-  js["internal_cofficient"] = states_[rank].Omega().to_complex();
+  js["internal_cofficient"] = state.Omega().to_complex();
   js["coefficient"] = coefficients_[rank];
   return js;
 }
@@ -26,6 +26,8 @@
 
 namespace CHSimulator
 {
+class StabilizerStateBatch;
+
 // Clifford simulator based on the CH-form 
 class StabilizerState
 {
@@ -119,6 +121,8 @@ public:
                         int n_threads);
   #endif
 
+  friend class StabilizerStateBatch;
+
 private:
 
   unsigned n; 
@@ -0,0 +1,680 @@
+/**
+ * This code is part of Qiskit.
+ *
+ * (C) Copyright IBM 2018, 2019.
+ *
+ * This code is licensed under the Apache License, Version 2.0. You may
+ * obtain a copy of this license in the LICENSE.txt file in the root directory
+ * of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+ *
+ * Any modifications or derivative works of this code must retain this
+ * copyright notice, and modified files need to carry a notice indicating
+ * that they have been altered from the originals.
+ */
+
+#ifndef CH_STABILIZER_BATCH_HPP
+#define CH_STABILIZER_BATCH_HPP
+
+#include <algorithm>
+#include <atomic>
+#include <vector>
+
+#include "core.hpp"
+#include "chstabilizer.hpp"
+
+namespace CHSimulator
+{
+// CH-forms of all terms of a stabilizer rank decomposition, stored as a
+// structure of arrays. Every column of F, G and M and every bit string of
+// the CH-data is stored contiguously over the terms, i.e. column j of F for
+// term i is F[j*chi + i]. A Clifford gate is then applied to all terms with
+// loops of word operations over the terms, instead of updating chi separate
+// StabilizerState objects.
+//
+// Gates take an optional mask with one word per term (0 or all ones). If
+// given, the gate is only applied to terms with a non-zero mask. This is
+// used for the sampled Clifford branches of non-Clifford gates.
+class StabilizerStateBatch
+{
+public:
+  StabilizerStateBatch(): n(0), chi(0) {};
+  // chi copies of the basis state |00...0>
+  StabilizerStateBatch(const unsigned n_qubits, const uint_t n_states);
+
+  // Replace all terms by n_states copies of a single stabilizer state
+  void Initialize(const StabilizerState &state, const uint_t n_states);
+
+  uint_fast64_t NQubits() const
+  {
+    return n;
+  }
+  uint_fast64_t NStates() const
+  {
+    return chi;
+  }
+  scalar_t Omega(uint_t i) const
+  {
+    return omega[i];
+  }
+
+  // Copy a single term to or from a StabilizerState. This is used for
+  // operations that are rare or already cost O(n^2) per term, such as
+  // Pauli projections, inner products and serialization.
+  StabilizerState GetState(uint_t i) const;
+  void SetState(uint_t i, const StabilizerState &state);
+
+  // Project every term onto the +1 eigenspace of the generators
+  void MeasurePauliProjector(const std::vector<pauli_t>& generators);
+
+  // Clifford gates
+  void CX(unsigned q, unsigned r, const word *mask = nullptr); // q=control, r=target
+  void CZ(unsigned q, unsigned r, const word *mask = nullptr);
+  void H(unsigned q);
+  void S(unsigned q, const word *mask = nullptr);
+  void Sdag(unsigned q, const word *mask = nullptr);
+  void Z(unsigned q, const word *mask = nullptr);
+  void X(unsigned q, const word *mask = nullptr);
+  void Y(unsigned q, const word *mask = nullptr);
+
+  // Compute the transposed F and M matrices of all terms, if they have
+  // changed. This must be called before Amplitude and ProposeFlip, which
+  // only read the batch and may run in parallel.
+  void Transpose();
+
+  // Metropolis updates for a single term, see StabilizerState. The
+  // auxiliary Pauli operators are stored by the caller, so that several
+  // Markov chains can run on the same batch. Amplitude sets P for the
+  // state x, and ProposeFlip sets Q for the state x with flip_pos flipped.
+  // Accepting a flip replaces P by Q.
+  scalar_t Amplitude(uint_fast64_t x, uint_t i, pauli_t &P) const;
+  scalar_t ProposeFlip(unsigned flip_pos, uint_t i, const pauli_t &P, pauli_t &Q) const;
+
+  // Set the OpenMP threads and the minimum number of terms for
+  // parallelizing gates over terms
+  void SetParallelization(uint_t n_threads, uint_t threshold)
+  {
+    omp_threads = (n_threads == 0) ? 1 : n_threads;
+    omp_threshold = threshold;
+  }
+
+private:
+
+  unsigned n;
+  uint_t chi; // number of terms
+
+  // CH-data of each term, see StabilizerState
+  std::vector<uint_fast64_t> gamma1;
+  std::vector<uint_fast64_t> gamma2;
+  std::vector<uint_fast64_t> v;
+  std::vector<uint_fast64_t> s;
+  std::vector<scalar_t> omega;
+  std::vector<uint_fast64_t> F; // F[j*chi + i] = j-th column of F of term i
+  std::vector<uint_fast64_t> G;
+  std::vector<uint_fast64_t> M;
+
+  // F-transposed and M-transposed of each term, FT[p*chi + i] = p-th row of F
+  std::vector<uint_fast64_t> FT;
+  std::vector<uint_fast64_t> MT;
+  bool isReadyFT;
+  bool isReadyMT;
+
+  uint_t omp_threads = 1;
+  uint_t omp_threshold = 0;
+
+  // Number of terms updated together in the inner loops of a gate
+  static const uint_t BLOCK_SIZE = 256;
+
+  void StoreState(uint_t i, const StabilizerState &state);
+
+  static inline word Select(const word *mask, uint_t i)
+  {
+    return mask ? mask[i] : ~zer;
+  }
+
+  // Run func(start, end) over blocks of terms, in parallel if the batch
+  // is large enough
+  template <typename Lambda>
+  void ForBlocks(Lambda &&func);
+
+  // Single term versions of the C-layer updates and the update of the
+  // initial state used by H, see StabilizerState
+  void RightCX(unsigned q, unsigned r, uint_t i);
+  void RightCZ(unsigned q, unsigned r, uint_t i);
+  void RightS(unsigned q, uint_t i);
+  void UpdateSvector(uint_fast64_t t, uint_fast64_t u, unsigned b, uint_t i);
+
+  // Amplitude <s|U_H R|0^n> of a term for the Pauli R = U_C^{-1} X(x) U_C
+  scalar_t PauliAmplitude(const pauli_t &R, uint_t i) const;
+};
+
+//-------------------------------//
+// Implementation                //
+//-------------------------------//
+
+StabilizerStateBatch::StabilizerStateBatch(const unsigned n_qubits, const uint_t n_states):
+n(n_qubits),
+chi(0)
+{
+  Initialize(StabilizerState(n_qubits), n_states);
+}
+
+void StabilizerStateBatch::Initialize(const StabilizerState &state, const uint_t n_states)
+{
+  n = state.n;
+  chi = n_states;
+  gamma1.assign(chi, state.gamma1);
+  gamma2.assign(chi, state.gamma2);
+  v.assign(chi, state.v);
+  s.assign(chi, state.s);
+  omega.assign(chi, state.omega);
+  F.resize(n*chi);
+  G.resize(n*chi);
+  M.resize(n*chi);
+  for (unsigned j=0; j<n; j++)
+  {
+    std::fill(F.begin() + j*chi, F.begin() + (j+1)*chi, state.F[j]);
+    std::fill(G.begin() + j*chi, G.begin() + (j+1)*chi, state.G[j]);
+    std::fill(M.begin() + j*chi, M.begin() + (j+1)*chi, state.M[j]);
+  }
+  FT.assign(n*chi, zer);
+  MT.assign(n*chi, zer);
+  isReadyFT = false;
+  isReadyMT = false;
+}
+
+StabilizerState StabilizerStateBatch::GetState(uint_t i) const
+{
+  StabilizerState state(n);
+  state.gamma1 = gamma1[i];
+  state.gamma2 = gamma2[i];
+  state.v = v[i];
+  state.s = s[i];
+  state.omega = omega[i];
+  for (unsigned j=0; j<n; j++)
+  {
+    state.F[j] = F[j*chi + i];
+    state.G[j] = G[j*chi + i];
+    state.M[j] = M[j*chi + i];
+  }
+  state.isReadyFT = false;
+  state.isReadyMT = false;
+  return state;
+}
+
+void StabilizerStateBatch::SetState(uint_t i, const StabilizerState &state)
+{
+  StoreState(i, state);
+  isReadyFT = false;
+  isReadyMT = false;
+}
+
+void StabilizerStateBatch::StoreState(uint_t i, const StabilizerState &state)
+{
+  gamma1[i] = state.gamma1;
+  gamma2[i] = state.gamma2;
+  v[i] = state.v;
+  s[i] = state.s;
+  omega[i] = state.omega;
+  for (unsigned j=0; j<n; j++)
+  {
+    F[j*chi + i] = state.F[j];
+    G[j*chi + i] = state.G[j];
+    M[j*chi + i] = state.M[j];
+  }
+}
+
+void StabilizerStateBatch::MeasurePauliProjector(const std::vector<pauli_t>& generators)
+{
+  isReadyMT=false;
+  isReadyFT=false;
+  const int_t END = chi;
+  #pragma omp parallel for if(chi > omp_threshold && omp_threads > 1) num_threads(omp_threads)
+  for (int_t i=0; i<END; i++)
+  {
+    StabilizerState state = GetState(i);
+    state.MeasurePauliProjector(generators);
+    StoreState(i, state);
+  }
+}
+
+template <typename Lambda>
+void StabilizerStateBatch::ForBlocks(Lambda &&func)
+{
+  const int_t n_blocks = (chi + BLOCK_SIZE - 1) / BLOCK_SIZE;
+  #pragma omp parallel for if(chi > omp_threshold && omp_threads > 1 && n_blocks > 1) num_threads(omp_threads)
+  for (int_t block=0; block<n_blocks; block++)
+  {
+    const uint_t start = block * BLOCK_SIZE;
+    func(start, std::min(chi, start + BLOCK_SIZE));
+  }
+}
+
+void StabilizerStateBatch::S(unsigned q, const word *mask)
+{
+  isReadyMT=false;// we are going to change M
+  const uint_fast64_t C=(one<<q);
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    for (unsigned p=0; p<n; p++)
+    {
+      const uint_fast64_t *Gp = G.data() + p*chi;
+      uint_fast64_t *Mp = M.data() + p*chi;
+      for (uint_t i=start; i<end; i++)
+        Mp[i]^=((Gp[i]>>q) & one)*C & Select(mask, i);
+    }
+    // update phase vector:  gamma[q] gets gamma[q] - 1
+    for (uint_t i=start; i<end; i++)
+    {
+      const uint_fast64_t sel = C & Select(mask, i);
+      gamma1[i]^=sel;
+      gamma2[i]^=((gamma1[i] >> q) & one)*sel;
+    }
+  });
+}
+
+void StabilizerStateBatch::Sdag(unsigned q, const word *mask)
+{
+  isReadyMT=false;// we are going to change M
+  const uint_fast64_t C=(one<<q);
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    for (unsigned p=0; p<n; p++)
+    {
+      const uint_fast64_t *Gp = G.data() + p*chi;
+      uint_fast64_t *Mp = M.data() + p*chi;
+      for (uint_t i=start; i<end; i++)
+        Mp[i]^=((Gp[i]>>q) & one)*C & Select(mask, i);
+    }
+    // update phase vector:  gamma[q] gets gamma[q] + 1
+    for (uint_t i=start; i<end; i++)
+    {
+      const uint_fast64_t sel = C & Select(mask, i);
+      gamma2[i]^=((gamma1[i] >> q) & one)*sel;
+      gamma1[i]^=sel;
+    }
+  });
+}
+
+void StabilizerStateBatch::Z(unsigned q, const word *mask)
+{
+  // update phase vector:  gamma[q] gets gamma[q] + 2
+  const uint_fast64_t C=(one<<q);
+  for (uint_t i=0; i<chi; i++)
+    gamma2[i]^=C & Select(mask, i);
+}
+
+void StabilizerStateBatch::X(unsigned q, const word *mask)
+{
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    // The q-th rows of F and M of each term give the Pauli U_C^{-1} X_q U_C
+    uint_fast64_t rowF[BLOCK_SIZE];
+    uint_fast64_t rowM[BLOCK_SIZE];
+    const uint_t size = end - start;
+    if (isReadyFT && isReadyMT)
+    {
+      std::copy(FT.begin() + q*chi + start, FT.begin() + q*chi + end, rowF);
+      std::copy(MT.begin() + q*chi + start, MT.begin() + q*chi + end, rowM);
+    }
+    else
+    {
+      std::fill(rowF, rowF + size, zer);
+      std::fill(rowM, rowM + size, zer);
+      for (unsigned j=0; j<n; j++)
+      {
+        const uint_fast64_t *Fj = F.data() + j*chi + start;
+        const uint_fast64_t *Mj = M.data() + j*chi + start;
+        for (uint_t k=0; k<size; k++)
+        {
+          rowF[k]^=((Fj[k]>>q) & one)<<j;
+          rowM[k]^=((Mj[k]>>q) & one)<<j;
+        }
+      }
+    }
+    for (uint_t i=start; i<end; i++)
+    {
+      if (!Select(mask, i))
+        continue;
+      const uint_fast64_t x_string = rowF[i - start];
+      const uint_fast64_t z_string = rowM[i - start];
+      //Initial phase correction
+      int phase = 2*((gamma1[i] >> q)&one) + 4*((gamma2[i]>>q) & one);
+      //Commute the z_string through the hadamard layer
+      // Each z that hits a hadamard becomes a Pauli X
+      s[i] ^= (z_string & v[i]);
+      //Remaining Z gates add a global phase from their action on the s string
+      phase += 4*(hamming_parity((z_string & ~(v[i])) & s[i]));
+      //Commute the x_string through the hadamard layer
+      // Any remaining X gates update s
+      s[i] ^= (x_string & ~(v[i]));
+      //New z gates add a global phase from their action on the s string
+      phase += 4*(hamming_parity((x_string & v[i]) & s[i]));
+      //Update the global phase
+      omega[i].e = (omega[i].e + phase)%8;
+    }
+  });
+}
+
+void StabilizerStateBatch::Y(unsigned q, const word *mask)
+{
+  Z(q, mask);
+  X(q, mask);
+  //Add a global phase of -i
+  for (uint_t i=0; i<chi; i++)
+  {
+    if (Select(mask, i))
+      omega[i].e = (omega[i].e + 2)%8;
+  }
+}
+
+void StabilizerStateBatch::CX(unsigned q, unsigned r, const word *mask)
+{
+  isReadyMT=false;// we are going to change M and F
+  isReadyFT=false;
+  const uint_fast64_t C=(one<<q);
+  const uint_fast64_t T=(one<<r);
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    uint_fast64_t b[BLOCK_SIZE];
+    std::fill(b, b + (end - start), zer);
+    for (unsigned p=0; p<n; p++)
+    {
+      uint_fast64_t *Gp = G.data() + p*chi;
+      uint_fast64_t *Fp = F.data() + p*chi;
+      uint_fast64_t *Mp = M.data() + p*chi;
+      for (uint_t i=start; i<end; i++)
+      {
+        const uint_fast64_t sel = Select(mask, i);
+        b[i - start]^=(Mp[i]>>q) & (Fp[i]>>r) & one;
+        Gp[i]^=((Gp[i]>>q) & one)*T & sel;
+        Fp[i]^=((Fp[i]>>r) & one)*C & sel;
+        Mp[i]^=((Mp[i]>>r) & one)*C & sel;
+      }
+    }
+    // update phase vector as
+    // gamma[q] gets gamma[q] + gamma[r] + 2*b (mod 4)
+    for (uint_t i=start; i<end; i++)
+    {
+      const uint_fast64_t sel = C & Select(mask, i);
+      gamma2[i]^=b[i - start]*sel;
+      const uint_fast64_t b2 = (gamma1[i]>>q) & (gamma1[i]>>r) & one;
+      gamma1[i]^=((gamma1[i] >> r) & one)*sel;
+      gamma2[i]^=((gamma2[i] >> r) & one)*sel;
+      gamma2[i]^=b2*sel;
+    }
+  });
+}
+
+void StabilizerStateBatch::CZ(unsigned q, unsigned r, const word *mask)
+{
+  isReadyMT=false;// we are going to change M
+  const uint_fast64_t C=(one<<q);
+  const uint_fast64_t T=(one<<r);
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    for (unsigned p=0; p<n; p++)
+    {
+      const uint_fast64_t *Gp = G.data() + p*chi;
+      uint_fast64_t *Mp = M.data() + p*chi;
+      for (uint_t i=start; i<end; i++)
+      {
+        const uint_fast64_t sel = Select(mask, i);
+        Mp[i]^=((Gp[i]>>r) & one)*C & sel;
+        Mp[i]^=((Gp[i]>>q) & one)*T & sel;
+      }
+    }
+  });
+}
+
+void StabilizerStateBatch::H(unsigned q)
+{
+  isReadyMT=false;// we are going to change M and F
+  isReadyFT=false;
+  std::atomic<bool> normalised(true);
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    // extract the q-th row of F,G,M of each term
+    uint_fast64_t rowF[BLOCK_SIZE];
+    uint_fast64_t rowG[BLOCK_SIZE];
+    uint_fast64_t rowM[BLOCK_SIZE];
+    const uint_t size = end - start;
+    std::fill(rowF, rowF + size, zer);
+    std::fill(rowG, rowG + size, zer);
+    std::fill(rowM, rowM + size, zer);
+    for (unsigned j=0; j<n; j++)
+    {
+      const uint_fast64_t *Fj = F.data() + j*chi + start;
+      const uint_fast64_t *Gj = G.data() + j*chi + start;
+      const uint_fast64_t *Mj = M.data() + j*chi + start;
+      for (uint_t k=0; k<size; k++)
+      {
+        rowF[k]^=((Fj[k]>>q) & one)<<j;
+        rowG[k]^=((Gj[k]>>q) & one)<<j;
+        rowM[k]^=((Mj[k]>>q) & one)<<j;
+      }
+    }
+
+    for (uint_t i=start; i<end; i++)
+    {
+      const uint_t k = i - start;
+      // after commuting H through the C and H laters it maps |s> to a state
+      // sqrt(0.5)*[  (-1)^alpha |t> + i^{gamma[p]} (-1)^beta |u>  ]
+      //
+      // compute t,s,alpha,beta
+      uint_fast64_t t = s[i] ^ (rowG[k] & v[i]);
+      uint_fast64_t u = s[i] ^ (rowF[k] & (~v[i])) ^ (rowM[k] & v[i]);
+
+      unsigned alpha =  hamming_weight( rowG[k] & (~v[i]) & s[i] );
+      unsigned beta =  hamming_weight( (rowM[k] & (~v[i]) & s[i]) ^ (rowF[k] & v[i] & (rowM[k] ^ s[i])) );
+
+      if (alpha % 2) omega[i].e=(omega[i].e+4) % 8;
+      // get the phase gamma[q]
+      unsigned phase = ((gamma1[i]>>q) & one) + 2*((gamma2[i]>>q) & one);
+      unsigned b=(phase + 2*alpha + 2*beta) % 4;
+
+      // now the initial state is sqrt(0.5)*(|t> + i^b |u>)
+
+      // take care of the trivial case
+      if (t==u)
+      {
+        s[i]=t;
+        if(!((b==1) || (b==3))) // otherwise the state is not normalized
+          normalised = false;
+        if (b==1)
+          omega[i].e=(omega[i].e + 1) % 8;
+        else
+          omega[i].e=(omega[i].e + 7) % 8;
+      }
+      else
+        UpdateSvector(t,u,b,i);
+    }
+  });
+  if (!normalised)
+  {
+    throw std::logic_error("State is not properly normalised, b should be 1 or 3.\n");
+  }
+}
+
+void StabilizerStateBatch::RightCX(unsigned q, unsigned r, uint_t i)
+{
+  G[q*chi + i]^=G[r*chi + i];
+  F[r*chi + i]^=F[q*chi + i];
+  M[q*chi + i]^=M[r*chi + i];
+}
+
+void StabilizerStateBatch::RightCZ(unsigned q, unsigned r, uint_t i)
+{
+  M[q*chi + i]^=F[r*chi + i];
+  M[r*chi + i]^=F[q*chi + i];
+  gamma2[i]^=(F[q*chi + i] & F[r*chi + i]);
+}
+
+void StabilizerStateBatch::RightS(unsigned q, uint_t i)
+{
+  const uint_fast64_t Fq = F[q*chi + i];
+  M[q*chi + i]^=Fq;
+  // update phase vector: gamma[p] gets gamma[p] - F_{p,q} (mod 4)   for all p
+  gamma2[i]^=Fq^(gamma1[i] & Fq);
+  gamma1[i]^=Fq;
+}
+
+void StabilizerStateBatch::UpdateSvector(uint_fast64_t t, uint_fast64_t u, unsigned b, uint_t i)
+{
+  // Same as StabilizerState::UpdateSvector for distinct t and u
+  uint_fast64_t ut=u^t;
+  uint_fast64_t nu0 = (~v[i]) & ut;
+  uint_fast64_t nu1 = v[i] & ut;
+  b%=4;
+  unsigned q=0;
+  uint_fast64_t qpos=zer;
+  if (nu0)
+  {
+    // find the first element of nu0
+    while (!(nu0 & (one<<q))) q++;
+    qpos=(one<<q);
+    // if nu0 has size >1 then multiply U_C on the right by the first half of the circuit VC
+    nu0^=qpos; // set q-th bit to zero
+    if (nu0)
+      for (unsigned q1=q+1; q1<n; q1++)
+        if (nu0 & (one<<q1))
+          RightCX(q,q1,i);
+    // if nu1 has size >0 then apply the second half of the circuit VC
+    if (nu1)
+      for (unsigned q1=0; q1<n; q1++)
+        if (nu1 & (one<<q1))
+          RightCZ(q,q1,i);
+  }
+  else
+  {
+    // find the first element of nu1
+    while (!(nu1 & (one<<q))) q++;
+    qpos=(one<<q);
+    // if nu1 has size >1 then apply the circuit VC
+    nu1^=qpos;
+    if (nu1)
+      for (unsigned q1=q+1; q1<n; q1++)
+        if (nu1 & (one<<q1))
+          RightCX(q1,q,i);
+  }
+
+  // update the initial state
+  // if t_q=1 then switch t_q and u_q
+  if (t & qpos)
+  {
+    s[i]=u;
+    omega[i].e=(omega[i].e + 2*b) % 8;
+    b=(4-b) % 4;
+  }
+  else
+    s[i]=t;
+
+  // change the order of H and S gates, see StabilizerState::UpdateSvector
+  bool a=((v[i] & qpos)>0);
+  unsigned e1=a*(b % 2)*( 3*b -2);
+  unsigned e2 = b % 2;
+  bool e3 = ( (!a) != (a && ((b % 2)>0) ) );
+  bool e4 = ( ( (!a) && (b>=2) ) != (a && ((b==1) || (b==2)))  );
+
+  // set q-th bit of s to e4
+  s[i]&=~qpos;
+  s[i]^=e4*qpos;
+  // set q-th bit of v to e3
+  v[i]&=~qpos;
+  v[i]^=e3*qpos;
+  // update the scalar factor omega
+  omega[i].e=(omega[i].e  + e1) % 8;
+  // multiply the C-layer on the right by S^{e2} on the q-th qubit
+  if (e2) RightS(q,i);
+}
+
+void StabilizerStateBatch::Transpose()
+{
+  if (isReadyFT && isReadyMT)
+    return;
+  ForBlocks([&](uint_t start, uint_t end)
+  {
+    for (unsigned p=0; p<n; p++)
+    {
+      std::fill(FT.begin() + p*chi + start, FT.begin() + p*chi + end, zer);
+      std::fill(MT.begin() + p*chi + start, MT.begin() + p*chi + end, zer);
+    }
+    for (unsigned j=0; j<n; j++) // look at j-th column of F and M
+    {
+      const uint_fast64_t *Fj = F.data() + j*chi;
+      const uint_fast64_t *Mj = M.data() + j*chi;
+      for (unsigned p=0; p<n; p++) // set j-th bit of the p-th row
+      {
+        uint_fast64_t *FTp = FT.data() + p*chi;
+        uint_fast64_t *MTp = MT.data() + p*chi;
+        for (uint_t i=start; i<end; i++)
+        {
+          FTp[i]^=((Fj[i]>>p) & one)<<j;
+          MTp[i]^=((Mj[i]>>p) & one)<<j;
+        }
+      }
+    }
+  });
+  isReadyFT = true;
+  isReadyMT = true;
+}
+
+scalar_t StabilizerStateBatch::PauliAmplitude(const pauli_t &R, uint_t i) const
+{
+  // the amplitude = complex conjugate of <s|U_H R |0^n>
+  // Z-part of R is absorbed into 0^n
+  scalar_t amp;
+  amp.e=2*R.e;
+  amp.p=-1*(hamming_weight(v[i]));// each Hadamard gate contributes 1/sqrt(2)
+  // qubits without a Hadamard must match s, and each qubit with a Hadamard
+  // contributes a minus sign that comes from <1|H|1>
+  if ((R.X ^ s[i]) & ~v[i])
+  {
+    amp.eps=0;
+    return amp;
+  }
+  amp.e+=4*hamming_parity(v[i] & s[i] & R.X);
+  amp.e%=8;
+  amp.conjugate();
+  // multiply amp by omega
+  amp.p+=omega[i].p;
+  amp.e=(amp.e + omega[i].e) % 8;
+  return amp;
+}
+
+scalar_t StabilizerStateBatch::Amplitude(uint_fast64_t x, uint_t i, pauli_t &P) const
+{
+  // compute Pauli U_C^{-1} X(x) U_C
+  pauli_t R;
+  for (unsigned pos=0; pos<n; pos++)
+  {
+    if (x & (one<<pos))
+    {
+      pauli_t P1; // make P1=U_C^{-1} X_{pos} U_C
+      P1.e=1*((gamma1[i]>>pos) & one);
+      P1.e+=2*((gamma2[i]>>pos) & one);
+      P1.X=FT[pos*chi + i];
+      P1.Z=MT[pos*chi + i];
+      R*=P1;
+    }
+  }
+  P=R;
+  if (!omega[i].eps) return omega[i]; // the state is zero
+  return PauliAmplitude(R, i);
+}
+
+scalar_t StabilizerStateBatch::ProposeFlip(unsigned flip_pos, uint_t i, const pauli_t &P, pauli_t &Q) const
+{
+  // Q gets Pauli operator U_C^{-1} X_{flip_pos} U_C
+  pauli_t R;
+  R.e=1*((gamma1[i]>>flip_pos) & one);
+  R.e+=2*((gamma2[i]>>flip_pos) & one);
+  R.X=FT[flip_pos*chi + i];
+  R.Z=MT[flip_pos*chi + i];
+  R*=P;
+  Q=R;
+  if (!omega[i].eps) return omega[i]; // the state is zero
+  return PauliAmplitude(R, i);
+}
+
+}
+#endif
@@ -16,6 +16,7 @@
 #define _aer_chsimulator_state_hpp
 
 #include <complex>
+#include <memory>
 #include <vector>
 
 #include "base/state.hpp"
@@ -34,8 +35,6 @@ using chpauli_t = CHSimulator::pauli_t;
 using chstate_t = CHSimulator::Runner;
 using Gates = CHSimulator::Gates;
 
-uint_t zero = 0ULL;
-uint_t toff_branch_max = 7ULL;
 
 enum class Snapshots {
   state, 
@@ -46,6 +45,15 @@ enum class Snapshots {
   probs
 };
 
+//Stabilizer rank decomposition of the state after a prefix of a circuit
+//that only contains gates. The key identifies the prefix ops, the number of
+//qubits and the number of terms of the decomposition.
+struct DecompositionCache
+{
+  json_t key;
+  chstate_t decomposition;
+};
+
 class State: public Base::State<chstate_t>
 {
 public:
@@ -96,11 +104,21 @@ public:
                                             uint_t shots,
                                             RngEngine &rng) override;
 
+  // Add the convergence diagnostics of the metropolis sampler
+  virtual void add_sample_measure_metadata(ExperimentData &data) const override;
+
+  // Set the cache used to reuse the decomposition of a circuit prefix. This
+  // can be shared by the states of several experiments, as long as they are
+  // not run in parallel.
+  void set_decomposition_cache(const std::shared_ptr<DecompositionCache> &cache)
+  {
+    decomposition_cache_ = cache;
+  }
+
 protected:
 
-  //Alongside the sample measure optimisaiton, we can parallelise
-  //circuit applicaiton over the states. This reduces the threading overhead
-  //as we only have to fork once per circuit.
+  //Apply the gates of a circuit that uses the sample measure optimisation.
+  //Each gate is applied to all terms of the decomposition at once.
   void apply_ops_parallel(const std::vector<Operations::Op> &ops,
                                   RngEngine &rng);
 
@@ -110,12 +128,9 @@ protected:
   void apply_stabilizer_circuit(const std::vector<Operations::Op> &ops,
                                       ExperimentData &data,
                                       RngEngine &rng);
-  // Applies a sypported Gate operation to the state class.
+  // Applies a sypported Gate operation to every term in the decomposition.
   // If the input is not in allowed_gates an exeption will be raised.
-  // TODO: Investigate OMP synchronisation over stattes to remove these different versions
-  // One option would be tasks, but the memory overhead isn't clear
   void apply_gate(const Operations::Op &op, RngEngine &rng);
-  void apply_gate(const Operations::Op &op, RngEngine &rng, uint_t rank);
 
   // Measure qubits and return a list of outcomes [q0, q1, ...]
   // If a state subclass supports this function then "measure" 
@@ -157,6 +172,14 @@ protected:
   // output distribution
   uint_t metropolis_mixing_steps_ = 5000;
 
+  // Number of independent chains used by the metropolis algorithm to
+  // sample many shots at once
+  uint_t metropolis_chains_ = 1;
+
+  // Whether to compute the convergence diagnostics of the samples of the
+  // metropolis chains
+  bool metropolis_diagnostics_ = false;
+
   //Minimum number of states before we try to parallelise
   uint_t omp_threshold_rank_ = 100;
 
@@ -177,6 +200,23 @@ protected:
 
   //Check if we can use the sample_measure optimisation
   bool check_measurement_opt(const std::vector<Operations::Op> &ops) const;
+
+  //Return the number of leading ops that are unconditional gates or
+  //barriers. The decomposition after these ops only depends on the random
+  //branches sampled for the non-Clifford gates.
+  size_t deterministic_prefix(const std::vector<Operations::Op> &ops) const;
+
+  //Apply ops to the decomposition one at a time
+  void apply_decomposition_ops(const std::vector<Operations::Op> &ops,
+                               ExperimentData &data,
+                               RngEngine &rng);
+
+  //Reuse the decomposition after the gates before the first measurement or
+  //reset for every shot, instead of sampling a new decomposition
+  bool cache_decomposition_ = true;
+  //Set if the state was initialized to a custom initial state
+  bool custom_initial_state_ = false;
+  std::shared_ptr<DecompositionCache> decomposition_cache_ = std::make_shared<DecompositionCache>();
 };
 
 //=========================================================================
@@ -223,6 +263,8 @@ void State::initialize_qreg(uint_t num_qubits)
 {
   BaseState::qreg_.initialize(num_qubits);
   BaseState::qreg_.initialize_omp(BaseState::threads_, omp_threshold_rank_);
+  BaseState::qreg_.set_metropolis_chains(metropolis_chains_, metropolis_diagnostics_);
+  custom_initial_state_ = false;
 }
 
 void State::initialize_qreg(uint_t num_qubits, const chstate_t &state)
@@ -233,6 +275,8 @@ void State::initialize_qreg(uint_t num_qubits, const chstate_t &state)
   }
   BaseState::qreg_ = state;
   BaseState::qreg_.initialize_omp(BaseState::threads_, omp_threshold_rank_);
+  BaseState::qreg_.set_metropolis_chains(metropolis_chains_, metropolis_diagnostics_);
+  custom_initial_state_ = true;
 }
 
 void State::set_config(const json_t &config)
@@ -244,6 +288,13 @@ void State::set_config(const json_t &config)
   // Set the number of steps used in the metropolis sampler before we
   // consider the distribution as approximating the output
   JSON::get_value(metropolis_mixing_steps_, "extended_stabilizer_mixing_time", config);
+  // Set the number of independent metropolis chains used for sampling
+  JSON::get_value(metropolis_chains_, "extended_stabilizer_metropolis_chains", config);
+  // Set whether the convergence diagnostics of the chains are reported
+  JSON::get_value(metropolis_diagnostics_, "extended_stabilizer_metropolis_diagnostics", config);
+  // Set whether the decomposition of the circuit before the first
+  // measurement is reused for each shot
+  JSON::get_value(cache_decomposition_, "extended_stabilizer_cache_decomposition", config);
   //Set the threshold of the decomposition before we use omp
   JSON::get_value(omp_threshold_rank_, "extended_stabilizer_parallel_threshold", config);
   //Set the truncation threshold for the probabilities snapshot.
@@ -316,6 +367,21 @@ bool State::check_measurement_opt(const std::vector<Operations::Op> &ops) const
   return true;
 }
 
+size_t State::deterministic_prefix(const std::vector<Operations::Op> &ops) const
+{
+  size_t pos = 0;
+  for (const auto &op: ops)
+  {
+    if (op.conditional || op.old_conditional ||
+        (op.type != Operations::OpType::gate && op.type != Operations::OpType::barrier))
+    {
+      break;
+    }
+    pos++;
+  }
+  return pos;
+}
+
 //-------------------------------------------------------------------------
 // Implementation: Operations
 //-------------------------------------------------------------------------
@@ -333,6 +399,48 @@ void State::apply_ops(const std::vector<Operations::Op> &ops, ExperimentData &da
   {
     //Split the circuit into stabilizer and non-stabilizer fractions
     size_t first_non_clifford = stabilizer_opts.second;
+    std::vector<Operations::Op> non_stabilizer_circuit(ops.cbegin()+first_non_clifford, ops.cend());
+    uint_t chi = compute_chi(non_stabilizer_circuit);
+    //Check for measurement optimisaitons
+    bool measurement_opt = check_measurement_opt(ops);
+    size_t prefix_end = 0;
+    if(cache_decomposition_ && !measurement_opt && !custom_initial_state_)
+    {
+      prefix_end = deterministic_prefix(ops);
+    }
+    if(prefix_end > first_non_clifford)
+    {
+      //The gates before the first measurement or reset are the same for
+      //every shot, so we decompose the state after them once and reuse it.
+      std::vector<Operations::Op> prefix(ops.cbegin(), ops.cbegin()+prefix_end);
+      json_t key;
+      key["ops"] = prefix;
+      key["num_qubits"] = BaseState::qreg_.get_n_qubits();
+      key["num_states"] = chi;
+      if(decomposition_cache_->key == key)
+      {
+        BaseState::qreg_ = decomposition_cache_->decomposition;
+        BaseState::qreg_.initialize_omp(BaseState::threads_, omp_threshold_rank_);
+        BaseState::qreg_.set_metropolis_chains(metropolis_chains_, metropolis_diagnostics_);
+      }
+      else
+      {
+        if (first_non_clifford > 0)
+        {
+          std::vector<Operations::Op> stabilizer_circuit(ops.cbegin(), ops.cbegin()+first_non_clifford);
+          apply_stabilizer_circuit(stabilizer_circuit, data, rng);
+        }
+        BaseState::qreg_.initialize_decomposition(chi);
+        apply_decomposition_ops(std::vector<Operations::Op>(ops.cbegin()+first_non_clifford,
+                                                            ops.cbegin()+prefix_end), data, rng);
+        decomposition_cache_->key = key;
+        decomposition_cache_->decomposition = BaseState::qreg_;
+      }
+      data.add_metadata("extended_stabilizer_num_terms", chi);
+      apply_decomposition_ops(std::vector<Operations::Op>(ops.cbegin()+prefix_end, ops.cend()),
+                              data, rng);
+      return;
+    }
     if (first_non_clifford > 0)
     {
       //Apply the stabilizer circuit first. This optimisaiton avoids duplicating the application
@@ -340,51 +448,17 @@ void State::apply_ops(const std::vector<Operations::Op> &ops, ExperimentData &da
       std::vector<Operations::Op> stabilizer_circuit(ops.cbegin(), ops.cbegin()+first_non_clifford);
       apply_stabilizer_circuit(stabilizer_circuit, data, rng);
     }
-    std::vector<Operations::Op> non_stabilizer_circuit(ops.cbegin()+first_non_clifford, ops.cend());
-    uint_t chi = compute_chi(non_stabilizer_circuit);
     BaseState::qreg_.initialize_decomposition(chi);
-    //Check for measurement optimisaitons
-    bool measurement_opt = check_measurement_opt(ops);
+    data.add_metadata("extended_stabilizer_num_terms", chi);
     if(measurement_opt)
     {
       apply_ops_parallel(non_stabilizer_circuit, rng);
     }
     else
     {
-      for (const auto op: non_stabilizer_circuit)
-      {
-        if(BaseState::creg_.check_conditional(op)) {
-          switch (op.type) {
-            case Operations::OpType::gate:
-              apply_gate(op, rng);
-              break;
-            case Operations::OpType::reset:
-              apply_reset(op.qubits, rng);
-              break;
-            case Operations::OpType::barrier:
-              break;
-            case Operations::OpType::measure:
-              apply_measure(op.qubits, op.memory, op.registers, rng);
-              break;
-            case Operations::OpType::roerror:
-              BaseState::creg_.apply_roerror(op, rng);
-              break;
-            case Operations::OpType::bfunc:
-              BaseState::creg_.apply_bfunc(op);
-              break;
-            case Operations::OpType::snapshot:
-              apply_snapshot(op, data, rng);
-              break;
-            default:
-              throw std::invalid_argument("CH::State::apply_ops does not support operations of the type \'" + 
-                                          op.name + "\'.");
-              break;
-          }
-        }
-      }
+      apply_decomposition_ops(non_stabilizer_circuit, data, rng);
     }
   }
-  
 }
 
 std::vector<reg_t> State::sample_measure(const reg_t& qubits,
@@ -418,6 +492,14 @@ std::vector<reg_t> State::sample_measure(const reg_t& qubits,
 }
 
 
+void State::add_sample_measure_metadata(ExperimentData &data) const
+{
+  if(BaseState::qreg_.get_num_states() > 1 && !BaseState::qreg_.metropolis_diagnostics().is_null())
+  {
+    data.add_metadata("metropolis_diagnostics", BaseState::qreg_.metropolis_diagnostics());
+  }
+}
+
 //-------------------------------------------------------------------------
 // Implemenation: Protected Methods
 //-------------------------------------------------------------------------
@@ -425,26 +507,53 @@ std::vector<reg_t> State::sample_measure(const reg_t& qubits,
 //Method with slighty optimized parallelisation for the case of a sample_measure circuit
 void State::apply_ops_parallel(const std::vector<Operations::Op> &ops, RngEngine &rng)
 {
-  const int_t NUM_STATES = BaseState::qreg_.get_num_states();
-  #pragma omp parallel for if(BaseState::qreg_.check_omp_threshold() && BaseState::threads_>1) num_threads(BaseState::threads_)
-  for(int_t i=0; i < NUM_STATES; i++)
+  for(const auto op: ops)
   {
-    if(!BaseState::qreg_.check_eps(i))
+    switch (op.type)
     {
-      continue;
+      case Operations::OpType::gate:
+        apply_gate(op, rng);
+        break;
+      case Operations::OpType::barrier:
+        break;
+      default:
+        throw std::invalid_argument("CH::State::apply_ops_parallel does not support operations of the type \'" + 
+                                     op.name + "\'.");
+        break;
     }
-    for(const auto op: ops)
-    {
-      switch (op.type)
-      {
+  }
+}
+
+void State::apply_decomposition_ops(const std::vector<Operations::Op> &ops,
+                                    ExperimentData &data, RngEngine &rng)
+{
+  for (const auto op: ops)
+  {
+    if(BaseState::creg_.check_conditional(op)) {
+      switch (op.type) {
         case Operations::OpType::gate:
-          apply_gate(op, rng, i);
+          apply_gate(op, rng);
+          break;
+        case Operations::OpType::reset:
+          apply_reset(op.qubits, rng);
           break;
         case Operations::OpType::barrier:
           break;
+        case Operations::OpType::measure:
+          apply_measure(op.qubits, op.memory, op.registers, rng);
+          break;
+        case Operations::OpType::roerror:
+          BaseState::creg_.apply_roerror(op, rng);
+          break;
+        case Operations::OpType::bfunc:
+          BaseState::creg_.apply_bfunc(op);
+          break;
+        case Operations::OpType::snapshot:
+          apply_snapshot(op, data, rng);
+          break;
         default:
-          throw std::invalid_argument("CH::State::apply_ops_parallel does not support operations of the type \'" + 
-                                       op.name + "\'.");
+          throw std::invalid_argument("CH::State::apply_ops does not support operations of the type \'" + 
+                                      op.name + "\'.");
           break;
       }
     }
@@ -461,7 +570,7 @@ void State::apply_stabilizer_circuit(const std::vector<Operations::Op> &ops,
       case Operations::OpType::gate:
         if(BaseState::creg_.check_conditional(op))
         {
-          apply_gate(op, rng, 0);
+          apply_gate(op, rng);
         }
         break;
       case Operations::OpType::reset:
@@ -526,7 +635,6 @@ void State::apply_measure(const reg_t &qubits, const reg_t &cmemory, const reg_t
 void State::apply_reset(const reg_t &qubits, AER::RngEngine &rng)
 {
   uint_t measure_string;
-  const int_t NUM_STATES = BaseState::qreg_.get_num_states();
   if(BaseState::qreg_.get_num_states() == 1)
   {
     measure_string = BaseState::qreg_.stabilizer_sampler(rng);
@@ -548,33 +656,16 @@ void State::apply_reset(const reg_t &qubits, AER::RngEngine &rng)
     }
   }
   BaseState::qreg_.apply_pauli_projector(paulis);
-  #pragma omp parallel for if(BaseState::threads_ > 1 && BaseState::qreg_.check_omp_threshold()) num_threads(BaseState::threads_)
-  for(int_t i=0; i< NUM_STATES; i++)
+  for (auto qubit: qubits)
   {
-    for (auto qubit: qubits)
+    if ((measure_string>>qubit) & 1ULL)
     {
-      if ((measure_string>>qubit) & 1ULL)
-      {
-        BaseState::qreg_.apply_x(qubit, i);
-      }
+      BaseState::qreg_.apply_x(qubit);
     }
   }
 }
 
 void State::apply_gate(const Operations::Op &op, RngEngine &rng)
-{
-  const int_t NUM_STATES = BaseState::qreg_.get_num_states();
-  #pragma omp parallel for if (BaseState::threads_ > 1 && BaseState::qreg_.check_omp_threshold()) num_threads(BaseState::threads_)
-  for(int_t i=0; i < NUM_STATES; i++)
-  {
-    if(BaseState::qreg_.check_eps(i))
-    {
-      apply_gate(op, rng, i);
-    }
-  }
-}
-
-void State::apply_gate(const Operations::Op &op, RngEngine &rng, uint_t rank)
 {
   auto it = gateset_.find(op.name);
   if (it == gateset_.end())
@@ -585,46 +676,46 @@ void State::apply_gate(const Operations::Op &op, RngEngine &rng, uint_t rank)
   switch(it->second)
   {
     case Gates::x:
-      BaseState::qreg_.apply_x(op.qubits[0], rank);
+      BaseState::qreg_.apply_x(op.qubits[0]);
       break;
     case Gates::y:
-      BaseState::qreg_.apply_y(op.qubits[0], rank);
+      BaseState::qreg_.apply_y(op.qubits[0]);
       break;
     case Gates::z:
-      BaseState::qreg_.apply_z(op.qubits[0], rank);
+      BaseState::qreg_.apply_z(op.qubits[0]);
       break;
     case Gates::s:
-      BaseState::qreg_.apply_s(op.qubits[0], rank);
+      BaseState::qreg_.apply_s(op.qubits[0]);
       break;
     case Gates::sdg:
-      BaseState::qreg_.apply_sdag(op.qubits[0], rank);
+      BaseState::qreg_.apply_sdag(op.qubits[0]);
       break;
     case Gates::h:
-      BaseState::qreg_.apply_h(op.qubits[0], rank);
+      BaseState::qreg_.apply_h(op.qubits[0]);
       break;
     case Gates::cx:
-      BaseState::qreg_.apply_cx(op.qubits[0], op.qubits[1], rank);
+      BaseState::qreg_.apply_cx(op.qubits[0], op.qubits[1]);
       break;
     case Gates::cz:
-      BaseState::qreg_.apply_cz(op.qubits[0], op.qubits[1], rank);
+      BaseState::qreg_.apply_cz(op.qubits[0], op.qubits[1]);
       break;
     case Gates::swap:
-      BaseState::qreg_.apply_swap(op.qubits[0], op.qubits[1], rank);
+      BaseState::qreg_.apply_swap(op.qubits[0], op.qubits[1]);
       break;
     case Gates::t:
-      BaseState::qreg_.apply_t(op.qubits[0], rng.rand(), rank);
+      BaseState::qreg_.apply_t(op.qubits[0], rng);
       break;
     case Gates::tdg:
-      BaseState::qreg_.apply_tdag(op.qubits[0], rng.rand(), rank);
+      BaseState::qreg_.apply_tdag(op.qubits[0], rng);
       break;
     case Gates::ccx:
-      BaseState::qreg_.apply_ccx(op.qubits[0], op.qubits[1], op.qubits[2], rng.rand_int(zero, toff_branch_max), rank);
+      BaseState::qreg_.apply_ccx(op.qubits[0], op.qubits[1], op.qubits[2], rng);
       break;
     case Gates::ccz:
-      BaseState::qreg_.apply_ccz(op.qubits[0], op.qubits[1], op.qubits[2], rng.rand_int(zero, toff_branch_max), rank);
+      BaseState::qreg_.apply_ccz(op.qubits[0], op.qubits[1], op.qubits[2], rng);
       break;
     case Gates::u1:
-      BaseState::qreg_.apply_u1(op.qubits[0], op.params[0], rng.rand(), rank);
+      BaseState::qreg_.apply_u1(op.qubits[0], op.params[0], rng);
       break;
     default: //u0 or Identity
       break;
@@ -28,6 +28,8 @@
 #define _matrix_product_state_hpp
 
 #include <algorithm>
+#include <exception>
+#include <limits>
 #define _USE_MATH_DEFINES
 #include <math.h>
 
@@ -133,8 +135,9 @@ public:
   void initialize_qreg(uint_t num_qubits, const cvector_t &statevector);
 
   // Returns the required memory for storing an n-qubit state in megabytes.
-  // For this state the memory is indepdentent of the number of ops
-  // and is approximately 16 * 1 << num_qubits bytes
+  // For this state the memory is estimated from the largest bond dimensions
+  // that the multi-qubit operations can create, limited by the configured
+  // maximum bond dimension
     virtual size_t required_memory_mb(uint_t num_qubits,
                                     const std::vector<Operations::Op> &ops)
                                     const override;
@@ -166,6 +169,26 @@ protected:
   // If the input is not in allowed_gates an exeption will be raised.
   void apply_gate(const Operations::Op &op);
 
+  // Applies the gate and matrix operations ops[begin], ..., ops[end-1].
+  // Every operation only changes the MPS between its first and last qubit,
+  // so the operations are scheduled as soon as possible into layers of
+  // operations on disjoint ranges of qubits, and the operations of each
+  // layer are applied in parallel.
+  void apply_gate_layers(const std::vector<Operations::Op> &ops,
+                         uint_t begin, uint_t end);
+
+  // Returns the position to which the qubit of the two-qubit operation
+  // ops[index] that is to the left moves, when the qubits are at the given
+  // locations. The other qubit moves to the next position. Every choice
+  // takes the same number of swaps, so the position is chosen to minimize
+  // the distances between the qubits of the following two-qubit operations.
+  uint_t plan_qubit_moves(const std::vector<Operations::Op> &ops,
+                          uint_t index, const reg_t &locations) const;
+
+  // Moves the qubits of the two-qubit operation op to the positions
+  // position and position+1 of the MPS
+  void move_qubits(const Operations::Op &op, uint_t position);
+
   // Initialize the specified qubits to a given state |psi>
   // by creating the MPS state with the new state |psi>.
   // |psi> is given in params
@@ -274,6 +297,9 @@ protected:
   // OpenMP qubit threshold
   int omp_qubit_threshold_ = 14;
 
+  // Number of following two-qubit operations considered when moving qubits
+  uint_t swap_lookahead_ = 20;
+
   // QubitVector sample measure index size
   int sample_measure_index_size_ = 10;
 
@@ -286,6 +312,9 @@ protected:
   // Table of allowed snapshot types to enum class members
   const static stringmap_t<Snapshots> snapshotset_;
 
+  // Table of SVD algorithm names to enum class members
+  const static stringmap_t<SVD_Method> svd_methods_;
+
 };
 
 
@@ -331,6 +360,14 @@ const stringmap_t<Snapshots> State::snapshotset_({
   {"register", Snapshots::cregister}
 });
 
+const stringmap_t<SVD_Method> State::svd_methods_({
+  {"automatic", SVD_Method::automatic},
+  {"golub_kahan", SVD_Method::golub_kahan},
+  {"gesvd", SVD_Method::gesvd},
+  {"gesdd", SVD_Method::gesdd},
+  {"randomized", SVD_Method::randomized}
+});
+
 
 //=========================================================================
 // Implementation: Base class method overrides
@@ -379,14 +416,59 @@ void State::initialize_omp() {
 
 size_t State::required_memory_mb(uint_t num_qubits,
 			      const std::vector<Operations::Op> &ops) const {
-    // for each qubit we have a tensor structure.
-    // Initially, each tensor contains 2 matrices with a single complex double
-    // Depending on the number of 2-qubit gates,
-    // these matrices may double their size
-    // for now - compute only initial size
-    // later - FIXME
-    size_t mem_mb = 16 * 2 * num_qubits;
-    return mem_mb;
+  // Each qubit has a tensor of 2 matrices whose dimensions are the bond
+  // dimensions on either side of the qubit. The bond dimension between
+  // qubits i and i+1 is at most 2^min(i+1, num_qubits-i-1), and every
+  // operation across the bond multiplies it by at most 2 for controlled
+  // gates and by 4 for other two-qubit operations. It is also at most the
+  // configured maximum bond dimension.
+  if (num_qubits == 0)
+    return 0;
+  const stringset_t controlled_gates({"CX", "cx", "cz", "cu1", "ccx"});
+  std::vector<double> log_bond(num_qubits - 1, 0.);
+  for (const auto &op : ops) {
+    switch (op.type) {
+      case Operations::OpType::gate:
+      case Operations::OpType::matrix:
+      case Operations::OpType::multiplexer:
+      case Operations::OpType::kraus:
+      case Operations::OpType::initialize: {
+        if (op.qubits.size() < 2)
+          break;
+        const uint_t min_qubit = *std::min_element(op.qubits.begin(), op.qubits.end());
+        const uint_t max_qubit = *std::max_element(op.qubits.begin(), op.qubits.end());
+        const double factor = (op.type == Operations::OpType::gate &&
+          controlled_gates.find(op.name) != controlled_gates.end()) ? 1. : 2.;
+        for (uint_t bond = min_qubit; bond < max_qubit && bond + 1 < num_qubits; ++bond)
+          log_bond[bond] += factor;
+        break;
+      }
+      default:
+        break;
+    }
+  }
+  const uint_t max_bond_dimension = qreg_.max_bond_dimension();
+  for (uint_t bond = 0; bond + 1 < num_qubits; ++bond) {
+    log_bond[bond] = std::min<double>(log_bond[bond],
+                                      std::min(bond + 1, num_qubits - bond - 1));
+    if (max_bond_dimension > 0)
+      log_bond[bond] = std::min(log_bond[bond], std::log2(max_bond_dimension));
+  }
+
+  // 2 complex doubles for each pair of left and right bond indices
+  double mem_bytes = 0.;
+  for (uint_t qubit = 0; qubit < num_qubits; ++qubit) {
+    const double left = (qubit > 0) ? log_bond[qubit - 1] : 0.;
+    const double right = (qubit + 1 < num_qubits) ? log_bond[qubit] : 0.;
+    mem_bytes += 2. * 16. * std::exp2(left + right);
+  }
+  // The estimate is limited so that the estimates of several circuits
+  // can still be added together
+  const size_t max_mb = std::numeric_limits<size_t>::max() >> 16;
+  const double mem_mb = mem_bytes / (1ULL << 20);
+  if (mem_mb >= static_cast<double>(max_mb))
+    return max_mb;
+  return static_cast<size_t>(mem_mb);
 }
 
 void State::set_config(const json_t &config) {
@@ -409,18 +491,103 @@ void State::set_config(const json_t &config) {
   JSON::get_value(gate_opt, "statevector_gate_opt", config);
   if (gate_opt)
     qreg_.enable_gate_opt();
+
+  // Set the truncation of the singular values
+  uint_t max_bond_dimension = 0;
+  JSON::get_value(max_bond_dimension, "mps_max_bond_dimension", config);
+  qreg_.set_max_bond_dimension(max_bond_dimension);
+
+  double truncation_threshold = 0.;
+  JSON::get_value(truncation_threshold, "mps_truncation_threshold", config);
+  if (truncation_threshold < 0 || truncation_threshold >= 1)
+    throw std::invalid_argument("MatrixProductState::State::set_config: "
+                                "mps_truncation_threshold must be in [0, 1).");
+  qreg_.set_truncation_threshold(truncation_threshold);
+
+  // Set the SVD algorithm
+  std::string svd_method = "automatic";
+  JSON::get_value(svd_method, "mps_svd_method", config);
+  auto it = svd_methods_.find(svd_method);
+  if (it == svd_methods_.end())
+    throw std::invalid_argument("MatrixProductState::State::set_config: "
+                                "invalid mps_svd_method \'" + svd_method + "\'.");
+  qreg_.set_svd_method(it->second);
+
+  // Set the lookahead for moving qubits of non-adjacent gates
+  JSON::get_value(swap_lookahead_, "mps_swap_lookahead", config);
 }
 
 //=========================================================================
 // Implementation: apply operations
 //=========================================================================
 
+// Operations on at most two qubits, that change the MPS only between the
+// positions of their qubits, and can be applied in parallel with operations
+// on other qubits. Swap gates only change the layout and are excluded.
+inline bool is_layer_op(const Operations::Op &op) {
+  switch (op.type) {
+    case Operations::OpType::gate:
+      return op.qubits.size() <= 2 && op.name != "swap";
+    case Operations::OpType::matrix:
+      return op.qubits.size() <= 2;
+    case Operations::OpType::barrier:
+      return true;
+    default:
+      return false;
+  }
+}
+
+// Operations that move one of their qubits next to the other
+inline bool is_two_qubit_op(const Operations::Op &op) {
+  return (op.type == Operations::OpType::gate ||
+          op.type == Operations::OpType::matrix) &&
+         op.qubits.size() == 2 && op.name != "swap";
+}
+
+// The position of the qubit at position pos, after the qubits at positions
+// left and right are moved to positions dst and dst+1
+inline uint_t moved_position(uint_t pos, uint_t left, uint_t right, uint_t dst) {
+  if (pos == left)
+    return dst;
+  if (pos == right)
+    return dst + 1;
+  if (pos > left && pos <= dst)
+    return pos - 1;
+  if (pos > dst && pos < right)
+    return pos + 1;
+  return pos;
+}
+
 void State::apply_ops(const std::vector<Operations::Op> &ops,
                       ExperimentData &data,
                       RngEngine &rng) {
 
+  // Runs of gates are applied in parallel layers
+  const bool parallel_layers = (BaseState::threads_ > 1 &&
+    qreg_.num_qubits() > static_cast<uint_t>(omp_qubit_threshold_));
+
   // Simple loop over vector of input operations
-  for (const auto op: ops) {
+  for (uint_t i=0; i<ops.size(); i++) {
+    if (parallel_layers && is_layer_op(ops[i])) {
+      uint_t end = i + 1;
+      while (end < ops.size() && is_layer_op(ops[end]))
+        end++;
+      if (end > i + 1) {
+        apply_gate_layers(ops, i, end);
+        i = end - 1;
+        continue;
+      }
+    }
+    const auto &op = ops[i];
+    // Non-adjacent qubits are moved next to each other and are not moved
+    // back. The move does not change the state, so it is done even if the
+    // operation is conditional.
+    if (is_two_qubit_op(op)) {
+      const auto &locations = qreg_.qubit_locations();
+      const uint_t pos0 = locations[op.qubits[0]], pos1 = locations[op.qubits[1]];
+      if (std::max(pos0, pos1) - std::min(pos0, pos1) > 1)
+        move_qubits(op, plan_qubit_moves(ops, i, locations));
+    }
     if(BaseState::creg_.check_conditional(op)) {
       switch (op.type) {
         case Operations::OpType::barrier:
@@ -455,6 +622,111 @@ void State::apply_ops(const std::vector<Operations::Op> &ops,
       }
     }
   }
+  data.add_metadata("mps_discarded_weight", qreg_.discarded_weight());
+}
+
+void State::apply_gate_layers(const std::vector<Operations::Op> &ops,
+                              uint_t begin, uint_t end) {
+  // The layer of each operation is one more than the last layer of an
+  // operation on an overlapping range of positions. The moves of the
+  // non-adjacent qubits are planned here, on a copy of the layout, and only
+  // change the positions in the range of their operation.
+  std::vector<std::vector<uint_t>> layers;
+  std::vector<uint_t> qubit_layer(qreg_.num_qubits(), 0);
+  reg_t locations = qreg_.qubit_locations();
+  std::vector<int_t> moves(end - begin, -1);
+  for (uint_t i=begin; i<end; i++) {
+    const auto &qubits = ops[i].qubits;
+    if (ops[i].type == Operations::OpType::barrier || qubits.empty())
+      continue;
+    uint_t first = locations[qubits[0]], last = first;
+    if (qubits.size() == 2) {
+      first = std::min(locations[qubits[0]], locations[qubits[1]]);
+      last = std::max(locations[qubits[0]], locations[qubits[1]]);
+      if (last - first > 1) {
+        const uint_t dst = plan_qubit_moves(ops, i, locations);
+        moves[i - begin] = dst;
+        for (auto &pos : locations)
+          pos = moved_position(pos, first, last, dst);
+      }
+    }
+    uint_t layer = 0;
+    for (uint_t q=first; q<=last; q++)
+      layer = std::max(layer, qubit_layer[q]);
+    for (uint_t q=first; q<=last; q++)
+      qubit_layer[q] = layer + 1;
+    if (layer == layers.size())
+      layers.push_back({});
+    layers[layer].push_back(i);
+  }
+
+  for (const auto &layer : layers) {
+    std::exception_ptr error = nullptr;
+    #pragma omp parallel for if (layer.size() > 1) num_threads(BaseState::threads_) schedule(dynamic, 1)
+    for (int_t j=0; j<static_cast<int_t>(layer.size()); j++) {
+      const auto &op = ops[layer[j]];
+      try {
+        if (moves[layer[j] - begin] >= 0)
+          move_qubits(op, moves[layer[j] - begin]);
+        if (!BaseState::creg_.check_conditional(op))
+          continue;
+        if (op.type == Operations::OpType::gate)
+          apply_gate(op);
+        else
+          apply_matrix(op.qubits, op.mats[0]);
+      } catch (...) {
+        #pragma omp critical (mps_layer_error)
+        error = std::current_exception();
+      }
+    }
+    if (error)
+      std::rethrow_exception(error);
+  }
+}
+
+uint_t State::plan_qubit_moves(const std::vector<Operations::Op> &ops,
+                               uint_t index, const reg_t &locations) const {
+  const auto &qubits = ops[index].qubits;
+  const uint_t left = std::min(locations[qubits[0]], locations[qubits[1]]);
+  const uint_t right = std::max(locations[qubits[0]], locations[qubits[1]]);
+
+  // By default the first qubit stays in place
+  uint_t best = (locations[qubits[0]] == left) ? left : right - 1;
+  std::vector<const reg_t*> upcoming;
+  for (uint_t i=index+1; i<ops.size() && upcoming.size()<swap_lookahead_; i++)
+    if (is_two_qubit_op(ops[i]))
+      upcoming.push_back(&ops[i].qubits);
+  if (upcoming.empty())
+    return best;
+
+  // The distances of the nearer operations have larger weights
+  auto cost = [&](uint_t dst) {
+    double total = 0., weight = 1.;
+    for (const auto op_qubits : upcoming) {
+      const uint_t pos0 = moved_position(locations[(*op_qubits)[0]], left, right, dst);
+      const uint_t pos1 = moved_position(locations[(*op_qubits)[1]], left, right, dst);
+      total += weight * (std::max(pos0, pos1) - std::min(pos0, pos1) - 1);
+      weight *= 0.9;
+    }
+    return total;
+  };
+  double best_cost = cost(best);
+  for (uint_t dst=left; dst<right; dst++) {
+    const double dst_cost = cost(dst);
+    if (dst_cost < best_cost) {
+      best = dst;
+      best_cost = dst_cost;
+    }
+  }
+  return best;
+}
+
+void State::move_qubits(const Operations::Op &op, uint_t position) {
+  uint_t left = op.qubits[0], right = op.qubits[1];
+  if (qreg_.get_qubit_index(left) > qreg_.get_qubit_index(right))
+    std::swap(left, right);
+  qreg_.move_qubit(left, position);
+  qreg_.move_qubit(right, position + 1);
 }
 
 //=========================================================================
@@ -468,16 +740,15 @@ void State::snapshot_pauli_expval(const Operations::Op &op,
     throw std::invalid_argument("Invalid expval snapshot (Pauli components are empty).");
   }
 
-  //Compute expval components
-  complex_t expval(0., 0.);
+  //Compute all expval components in a single sweep over the MPS
+  std::vector<std::string> pauli_matrices;
+  for (const auto &param : op.params_expval_pauli)
+    pauli_matrices.push_back(param.second);
+  const auto pauli_expvals = qreg_.expectation_value_pauli(op.qubits, pauli_matrices);
 
-  for (const auto &param : op.params_expval_pauli) {
-    complex_t coeff = param.first;
-    std::string pauli_matrices = param.second;
-    complex_t pauli_expval = qreg_.expectation_value_pauli(op.qubits, pauli_matrices);
-
-    expval += coeff * pauli_expval;
-  }
+  complex_t expval(0., 0.);
+  for (uint_t i=0; i<pauli_expvals.size(); i++)
+    expval += op.params_expval_pauli[i].first * pauli_expvals[i];
   data.add_pershot_snapshot("expectation_value", op.string_params[0], expval);
 }
 
@@ -488,25 +759,38 @@ void State::snapshot_matrix_expval(const Operations::Op &op,
     throw std::invalid_argument("Invalid matrix snapshot (components are empty).");
   }
   complex_t expval(0., 0.);
-  double one_expval = 0;
 
   for (const auto &param : op.params_expval_matrix) {
-    complex_t coeff = param.first;
-
-    for (const auto &pair: param.second) {
-      const reg_t &qubits = pair.first;
+    // The qubits of each matrix are positions in the snapshot qubits.
+    // Diagonal matrices are stored as row-matrices and projector vectors
+    // as column-matrices.
+    std::vector<std::pair<reg_t, cmatrix_t>> mats;
+    for (const auto &pair : param.second) {
+      reg_t qubits;
+      for (const auto pos : pair.first)
+	qubits.push_back(op.qubits[pos]);
       const cmatrix_t &mat = pair.second;
-      one_expval = qreg_.expectation_value(qubits, mat);
-      expval += coeff * one_expval;
-      data.add_pershot_snapshot("expectation_value", op.string_params[0], expval);
+      if (mat.GetColumns() == 1) {
+	mats.emplace_back(qubits, Utils::projector(Utils::vectorize_matrix(mat)));
+      } else if (mat.GetRows() == 1) {
+	cmatrix_t diag_mat(mat.GetColumns(), mat.GetColumns());
+	for (uint_t i=0; i<mat.GetColumns(); i++)
+	  diag_mat(i, i) = mat(0, i);
+	mats.emplace_back(qubits, diag_mat);
+      } else {
+	mats.emplace_back(qubits, mat);
+      }
     }
+    expval += param.first * qreg_.expectation_value(mats);
   }
+  data.add_pershot_snapshot("expectation_value", op.string_params[0], expval);
 }
 
 void State::snapshot_state(const Operations::Op &op,
 			   ExperimentData &data,
 			   std::string name) {
   cvector_t statevector;
+  qreg_.move_all_qubits_to_sorted_ordering();
   qreg_.full_state_vector(statevector);
   data.add_pershot_snapshot("statevector", op.string_params[0], statevector);
 }
@@ -515,6 +799,7 @@ void State::snapshot_probabilities(const Operations::Op &op,
 				   ExperimentData &data,
 				   SnapshotDataType type) {
   rvector_t prob_vector;
+  qreg_.move_all_qubits_to_sorted_ordering();
   qreg_.get_probabilities_vector(prob_vector, op.qubits);
   auto probs = Utils::vec2ket(prob_vector, json_chop_threshold_, 16);
   bool variance = type == SnapshotDataType::average_var;
@@ -659,19 +944,7 @@ rvector_t State::measure_probs(const reg_t &qubits) const {
 std::vector<reg_t> State::sample_measure(const reg_t &qubits,
                                          uint_t shots,
                                          RngEngine &rng) {
-
-  MPS temp;
-  std::vector<reg_t> all_samples;
-  all_samples.resize(shots);
-  reg_t single_result;
-
-  for (int_t i=0; i<static_cast<int_t>(shots);  i++) {
-    temp.initialize(qreg_);
-    single_result = temp.apply_measure(qubits, rng);
-    all_samples[i] = single_result;
-  }
-
-  return all_samples;
+  return qreg_.sample_measure(qubits, shots, rng);
 }
 
 void State::apply_snapshot(const Operations::Op &op, ExperimentData &data) {
@@ -21,6 +21,8 @@
 #include "string.h"
 #include <utility>
 #include <iostream>
+#include <algorithm>
+#include <numeric>
 
 #include "framework/utils.hpp"
 #include "framework/matrix.hpp"
@@ -38,6 +40,14 @@ static const cmatrix_t one_measure =
       AER::Utils::make_matrix<complex_t>({{{0, 0}, {0, 0}},
 			                 {{0, 0}, {1, 0}}});
 
+// Number of shots sampled together by sample_measure
+static const uint_t MEASURE_SAMPLING_BATCH_SIZE = 1024;
+// Largest matrix size that multiply_batch multiplies without BLAS
+static const uint_t MULTIPLY_BATCH_BLAS_SIZE = 64;
+// Tolerance (on the squared Frobenius distance) for treating a right
+// environment as the identity in sample_measure
+static const double ENVIRONMENT_IDENTITY_THRESHOLD = 1e-20;
+
 //------------------------------------------------------------------------
 // local function declarations
 //------------------------------------------------------------------------
@@ -91,6 +101,27 @@ std::vector<T> reverse_all_bits(const std::vector<T>& statevector, uint_t num_qu
 uint_t reverse_bits(uint_t num, uint_t len);
 std::vector<uint_t> calc_new_indices(const reg_t &indices);
 
+// Returns the product of a batch of row vectors (the rows of v) and a matrix.
+// Small matrices are multiplied directly instead of through BLAS.
+cmatrix_t multiply_batch(const cmatrix_t &v, const cmatrix_t &mat);
+
+// Contract the left (right) environment env with the matrices M of the next
+// qubit to its right (left) and their conjugates
+cmatrix_t contract_left(const cmatrix_t &env, const std::vector<cmatrix_t> &M);
+cmatrix_t contract_right(const cmatrix_t &env, const std::vector<cmatrix_t> &M);
+
+// Same as contract_left, with a Pauli matrix from {I, X, Y, Z} applied to the qubit
+cmatrix_t contract_pauli_left(const cmatrix_t &env, const std::vector<cmatrix_t> &M,
+			      char pauli);
+
+// Returns Trace(A * B)
+complex_t trace_of_product(const cmatrix_t &A, const cmatrix_t &B);
+
+// Returns the matrix mat, acting on mat_qubits, as a matrix acting on qubits,
+// which contains all of mat_qubits
+cmatrix_t expand_matrix(const reg_t &qubits, const reg_t &mat_qubits,
+			const cmatrix_t &mat);
+
 // The following two functions are helper functions used by 
 // initialize_from_statevector
 cmatrix_t reshape_matrix(cmatrix_t input_matrix);
@@ -101,6 +132,86 @@ cmatrix_t mul_matrix_by_lambda(const cmatrix_t &mat,
 //------------------------------------------------------------------------
 // local function implementations
 //------------------------------------------------------------------------
+cmatrix_t multiply_batch(const cmatrix_t &v, const cmatrix_t &mat) {
+  if (mat.size() > MULTIPLY_BATCH_BLAS_SIZE)
+    return v * mat;
+  const uint_t rows = v.GetRows(), inner = mat.GetRows(), columns = mat.GetColumns();
+  cmatrix_t result(rows, columns);
+  for (uint_t col=0; col<columns; col++)
+    for (uint_t k=0; k<inner; k++) {
+      const complex_t coeff = mat(k, col);
+      for (uint_t row=0; row<rows; row++)
+	result(row, col) += v(row, k) * coeff;
+    }
+  return result;
+}
+
+cmatrix_t contract_left(const cmatrix_t &env, const std::vector<cmatrix_t> &M) {
+  cmatrix_t result = multiply_batch(AER::Utils::dagger(M[0]), multiply_batch(env, M[0]));
+  result += multiply_batch(AER::Utils::dagger(M[1]), multiply_batch(env, M[1]));
+  return result;
+}
+
+cmatrix_t contract_right(const cmatrix_t &env, const std::vector<cmatrix_t> &M) {
+  cmatrix_t result = multiply_batch(M[0], multiply_batch(env, AER::Utils::dagger(M[0])));
+  result += multiply_batch(M[1], multiply_batch(env, AER::Utils::dagger(M[1])));
+  return result;
+}
+
+cmatrix_t contract_pauli_left(const cmatrix_t &env, const std::vector<cmatrix_t> &M,
+			      char pauli) {
+  if (pauli == 'I')
+    return contract_left(env, M);
+  const cmatrix_t env_M0 = multiply_batch(env, M[0]);
+  const cmatrix_t env_M1 = multiply_batch(env, M[1]);
+  const cmatrix_t M0_dagger = AER::Utils::dagger(M[0]);
+  const cmatrix_t M1_dagger = AER::Utils::dagger(M[1]);
+  switch (pauli) {
+  case 'X':
+    return multiply_batch(M0_dagger, env_M1) + multiply_batch(M1_dagger, env_M0);
+  case 'Y':
+    return complex_t(0., 1.) * (multiply_batch(M1_dagger, env_M0) -
+				multiply_batch(M0_dagger, env_M1));
+  case 'Z':
+    return multiply_batch(M0_dagger, env_M0) - multiply_batch(M1_dagger, env_M1);
+  default:
+    throw std::invalid_argument("Invalid Pauli \"" + std::string(1, pauli) + "\".");
+  }
+}
+
+complex_t trace_of_product(const cmatrix_t &A, const cmatrix_t &B) {
+  complex_t result = 0.;
+  for (uint_t i=0; i<A.GetRows(); i++)
+    for (uint_t j=0; j<A.GetColumns(); j++)
+      result += A(i, j) * B(j, i);
+  return result;
+}
+
+cmatrix_t expand_matrix(const reg_t &qubits, const reg_t &mat_qubits,
+			const cmatrix_t &mat) {
+  reg_t positions;
+  uint_t mask = 0;
+  for (const auto qubit : mat_qubits) {
+    positions.push_back(std::distance(qubits.begin(),
+				      std::find(qubits.begin(), qubits.end(), qubit)));
+    mask |= 1ULL << positions.back();
+  }
+  const uint_t dim = 1ULL << qubits.size();
+  cmatrix_t result(dim, dim);
+  for (uint_t row=0; row<dim; row++)
+    for (uint_t col=0; col<dim; col++) {
+      if ((row ^ col) & ~mask)
+	continue;
+      uint_t mat_row = 0, mat_col = 0;
+      for (uint_t k=0; k<positions.size(); k++) {
+	mat_row |= ((row >> positions[k]) & 1ULL) << k;
+	mat_col |= ((col >> positions[k]) & 1ULL) << k;
+      }
+      result(row, col) = mat(mat_row, mat_col);
+    }
+  return result;
+}
+
 void squeeze_qubits(const reg_t &original_qubits, reg_t &squeezed_qubits) {
   std::vector<uint_t> sorted_qubits;
   for (uint_t index : original_qubits) {
@@ -233,6 +344,9 @@ void MPS::initialize(uint_t num_qubits)
   num_qubits_ = num_qubits;
   q_reg_.clear();
   lambda_reg_.clear();
+  left_env_.clear();
+  right_env_.clear();
+  discarded_weight_ = 0.0;
   complex_t alpha = 1.0f;
   complex_t beta = 0.0f;
   for(uint_t i = 0; i < num_qubits_-1; i++) {
@@ -241,6 +355,9 @@ void MPS::initialize(uint_t num_qubits)
   }
   // need to add one more Gamma tensor, because above loop only initialized up to n-1 
   q_reg_.push_back(MPS_Tensor(alpha,beta));
+  qubit_order_.resize(num_qubits_);
+  std::iota(qubit_order_.begin(), qubit_order_.end(), 0);
+  qubit_location_ = qubit_order_;
 }
 
 void MPS::initialize(const MPS &other){
@@ -248,31 +365,47 @@ void MPS::initialize(const MPS &other){
       num_qubits_ = other.num_qubits_;
       q_reg_ = other.q_reg_;
       lambda_reg_ = other.lambda_reg_;
+      qubit_order_ = other.qubit_order_;
+      qubit_location_ = other.qubit_location_;
+      max_bond_dimension_ = other.max_bond_dimension_;
+      truncation_threshold_ = other.truncation_threshold_;
+      svd_method_ = other.svd_method_;
+      discarded_weight_ = other.discarded_weight_;
+      left_env_ = other.left_env_;
+      right_env_ = other.right_env_;
     }     
 }
 
 void MPS::apply_h(uint_t index) 
 {
     cmatrix_t h_matrix = AER::Utils::Matrix::H;
-    q_reg_[index].apply_matrix(h_matrix);
+    const uint_t position = get_qubit_index(index);
+    q_reg_[position].apply_matrix(h_matrix);
+    invalidate_environments(position, position);
 }
 
 void MPS::apply_u1(uint_t index, double lambda)
 {
   cmatrix_t u1_matrix = AER::Utils::Matrix::u1(lambda);
-  q_reg_[index].apply_matrix(u1_matrix);
+  const uint_t position = get_qubit_index(index);
+  q_reg_[position].apply_matrix(u1_matrix);
+  invalidate_environments(position, position);
 }
 
 void MPS::apply_u2(uint_t index, double phi, double lambda)
 {
   cmatrix_t u2_matrix = AER::Utils::Matrix::u2(phi, lambda);
-  q_reg_[index].apply_matrix(u2_matrix);
+  const uint_t position = get_qubit_index(index);
+  q_reg_[position].apply_matrix(u2_matrix);
+  invalidate_environments(position, position);
 }
 
 void MPS::apply_u3(uint_t index, double theta, double phi, double lambda)
 {
   cmatrix_t u3_matrix = AER::Utils::Matrix::u3(theta, phi, lambda);
-  q_reg_[index].apply_matrix(u3_matrix);
+  const uint_t position = get_qubit_index(index);
+  q_reg_[position].apply_matrix(u3_matrix);
+  invalidate_environments(position, position);
 }
 
 void MPS::apply_cnot(uint_t index_A, uint_t index_B)
@@ -296,6 +429,15 @@ void MPS::apply_ccx(const reg_t &qubits)
 }
 
 void MPS::apply_swap(uint_t index_A, uint_t index_B)
+{
+  // Exchanging the states of the qubits is the same as exchanging their
+  // positions in the layout, so no tensor changes
+  std::swap(qubit_location_[index_A], qubit_location_[index_B]);
+  qubit_order_[qubit_location_[index_A]] = index_A;
+  qubit_order_[qubit_location_[index_B]] = index_B;
+}
+
+void MPS::swap_positions(uint_t index_A, uint_t index_B)
 {
 	if(index_A > index_B)
 	{
@@ -307,11 +449,11 @@ void MPS::apply_swap(uint_t index_A, uint_t index_B)
 		uint_t i;
 		for(i = index_A; i < index_B; i++)
 		{
-			apply_swap(i,i+1);
+			swap_positions(i,i+1);
 		}
 		for(i = index_B-1; i > index_A; i--)
 		{
-			apply_swap(i,i-1);
+			swap_positions(i,i-1);
 		}
 		return;
 	}
@@ -329,17 +471,25 @@ void MPS::apply_swap(uint_t index_A, uint_t index_B)
 	temp.apply_swap();
 	MPS_Tensor left_gamma,right_gamma;
 	rvector_t lambda;
-	MPS_Tensor::Decompose(temp, left_gamma, lambda, right_gamma);
+	add_discarded_weight(MPS_Tensor::Decompose(temp, left_gamma, lambda, right_gamma,
+						   max_bond_dimension_, truncation_threshold_,
+						   svd_method_));
 	left_gamma.div_Gamma_by_left_Lambda(left_lambda);
 	right_gamma.div_Gamma_by_right_Lambda(right_lambda);
 	q_reg_[index_A] = left_gamma;
 	lambda_reg_[index_A] = lambda;
 	q_reg_[index_B] = right_gamma;
+	invalidate_environments(index_A, index_B);
+
+	std::swap(qubit_order_[index_A], qubit_order_[index_B]);
+	qubit_location_[qubit_order_[index_A]] = index_A;
+	qubit_location_[qubit_order_[index_B]] = index_B;
 }
 
 //-------------------------------------------------------------------------
 // MPS::apply_2_qubit_gate - outline of the algorithm
-// 1. Swap qubits A and B until they are consecutive
+// 1. Swap qubits A and B until they are consecutive. B is left next to A
+//    after the gate, and the layout is updated accordingly
 // 2. Contract MPS_Tensor[A] and MPS_Tensor[B], yielding a temporary four-matrix MPS_Tensor 
 //    that represents the entangled states of A and B.
 // 3. Apply the gate
@@ -352,25 +502,25 @@ void MPS::apply_swap(uint_t index_A, uint_t index_B)
 void MPS::apply_2_qubit_gate(uint_t index_A, uint_t index_B, Gates gate_type, const cmatrix_t &mat)
 {
   // We first move the two qubits to be in consecutive positions
-  // If index_B > index_A, we move the qubit at index_B to index_A+1
-  // If index_B < index_A, we move the qubit at index_B to index_A-1, and then
+  // If B is to the right of A, we move B to the position right after A
+  // If B is to the left of A, we move B to the position right before A, and then
   // swap between the qubits
-  uint_t A = index_A;
-  bool swapped = false, greater = false, smaller = false;
-
-  if (index_B > index_A+1) {
-    greater = true;
-    change_position(index_B, index_A+1);  // Move B to be right after A
-  } else if (index_A > 0 && index_B < index_A-1) {
-    smaller = true;
-    change_position(index_B, index_A-1);  // Move B to be right before A
-  }
-  if (index_B < index_A) {
-    A = index_A - 1;
-    swapped = true;
-  }
-  // After we moved the qubits as necessary, 
-  // the operation is always between qubits A and A+1
+  const uint_t position_A = get_qubit_index(index_A);
+  uint_t position_B = get_qubit_index(index_B);
+  if (position_B > position_A+1)
+    change_position(position_B, position_A+1);
+  else if (position_B+1 < position_A)
+    change_position(position_B, position_A-1);
+  position_B = get_qubit_index(index_B);
+
+  apply_2_qubit_gate_internal(std::min(position_A, position_B),
+			      position_B < position_A, gate_type, mat);
+}
+
+void MPS::apply_2_qubit_gate_internal(uint_t A, bool swapped, Gates gate_type,
+				      const cmatrix_t &mat)
+{
+  // The operation is always between qubits A and A+1
   rvector_t left_lambda, right_lambda;
   //There is no lambda on the edges of the MPS
   left_lambda  = (A != 0) 	    ? lambda_reg_[A-1] : rvector_t {1.0};
@@ -409,18 +559,15 @@ void MPS::apply_2_qubit_gate(uint_t index_A, uint_t index_B, Gates gate_type, co
   }
   MPS_Tensor left_gamma,right_gamma;
   rvector_t lambda;
-  MPS_Tensor::Decompose(temp, left_gamma, lambda, right_gamma);
+  add_discarded_weight(MPS_Tensor::Decompose(temp, left_gamma, lambda, right_gamma,
+					     max_bond_dimension_, truncation_threshold_,
+					     svd_method_));
   left_gamma.div_Gamma_by_left_Lambda(left_lambda);
   right_gamma.div_Gamma_by_right_Lambda(right_lambda);
   q_reg_[A] = left_gamma;
   lambda_reg_[A] = lambda;
   q_reg_[A+1] = right_gamma;
-
-  if (greater) {
-    change_position(index_A+1, index_B);  // Move B back to its original position
-  } else if (smaller) {
-    change_position(index_A-1, index_B);
-  }
+  invalidate_environments(A, A+1);
 }
 
 void MPS::apply_3_qubit_gate(const reg_t &qubits,
@@ -432,24 +579,18 @@ void MPS::apply_3_qubit_gate(const reg_t &qubits,
     throw std::runtime_error(ss.str());
   }
   bool ordered = true;
-  reg_t new_qubits(qubits.size());
-  reg_t sorted_qubits(qubits.size());
+  reg_t new_qubits;
 
-  centralize_and_sort_qubits(qubits, sorted_qubits, new_qubits, ordered);
+  // The qubits are moved to consecutive positions, and are left there
+  centralize_qubits(get_qubit_indices(qubits), new_qubits, ordered);
 
   // The controlled (or target) qubit, is qubit[2]. Since in new_qubits the qubits are sorted,
   // the relative position of the controlled qubit will be 0, 1, or 2 depending on
   // where qubit[2] was moved to in new_qubits
-  uint_t target=0;
-  if (qubits[2] > qubits[0] && qubits[2] > qubits[1])
-    target = 2;
-  else if (qubits[2] < qubits[0] && qubits[2] < qubits[1])
-    target = 0;
-  else
-    target = 1;
+  uint_t first = new_qubits.front();
+  uint_t target = get_qubit_index(qubits[2]) - first;
 
   // extract the tensor containing only the 3 qubits on which we apply the gate
-  uint_t first = new_qubits.front();
   MPS_Tensor sub_tensor(state_vec_as_MPS(first, first+2));
 
   // apply the gate to sub_tensor
@@ -471,7 +612,11 @@ void MPS::apply_3_qubit_gate(const reg_t &qubits,
 
   // We convert the matrix back into a 3-qubit MPS structure
   MPS sub_MPS;
+  sub_MPS.set_max_bond_dimension(max_bond_dimension_);
+  sub_MPS.set_truncation_threshold(truncation_threshold_);
+  sub_MPS.set_svd_method(svd_method_);
   sub_MPS.initialize_from_matrix(qubits.size(), state_mat);
+  add_discarded_weight(sub_MPS.discarded_weight());
 
   // copy the 3-qubit MPS back to the corresponding positions in the original MPS
   for (uint_t i=0; i<sub_MPS.num_qubits(); i++) {
@@ -483,18 +628,18 @@ void MPS::apply_3_qubit_gate(const reg_t &qubits,
     q_reg_[first].div_Gamma_by_left_Lambda(lambda_reg_[first-1]);
   if (first+2 < num_qubits_-1)
     q_reg_[first+2].div_Gamma_by_right_Lambda(lambda_reg_[first+2]);
-
-  // This is the reverse of centralize_qubits which we did at the beginning
-  if (!ordered)
-    move_qubits_to_original_location(first, qubits, sorted_qubits);
+  invalidate_environments(first, first+2);
 }
 
 void MPS::apply_matrix(const reg_t & qubits, const cmatrix_t &mat) 
 {
   switch (qubits.size()) {
-  case 1: 
-    q_reg_[qubits[0]].apply_matrix(mat);
+  case 1: {
+    const uint_t position = get_qubit_index(qubits[0]);
+    q_reg_[position].apply_matrix(mat);
+    invalidate_environments(position, position);
     break;
+  }
   case 2:
     apply_2_qubit_gate(qubits[0], qubits[1], su4, mat);
     break;
@@ -555,39 +700,47 @@ void MPS::centralize_and_sort_qubits(const reg_t &qubits, reg_t &sorted_indices,
   }
 }
 
-void MPS::move_qubits_to_original_location(uint_t first, const reg_t &original_qubits,
-					   const reg_t &sorted_qubits) {
-  uint_t num_qubits = original_qubits.size();
-  uint_t mid_index = (num_qubits-1)/2;
-
-  for(uint_t i = 0; i < mid_index; i++)
-  {
-    change_position(first+i, sorted_qubits[i]);
-  }
-
-  for(uint_t i = num_qubits-1; i > mid_index; i--)
-  {
-    change_position(first+i, sorted_qubits[i]);
-  }
-  // note that the qubit at mid_index does not need to move, because we didn't move it
-  // during centralize_qubits
-}
-
 void MPS::change_position(uint_t src, uint_t dst) {
   if(src == dst)
     return;
   else if(src < dst)
     for(uint_t i = src; i < dst; i++)
-      apply_swap(i,i+1);
+      swap_positions(i,i+1);
   else
     for(uint_t i = src; i > dst; i--)
-      apply_swap(i,i-1);
+      swap_positions(i,i-1);
+}
+
+reg_t MPS::get_qubit_indices(const reg_t &qubits) const
+{
+  reg_t positions(qubits.size());
+  for (uint_t i=0; i<qubits.size(); i++)
+    positions[i] = get_qubit_index(qubits[i]);
+  return positions;
+}
+
+bool MPS::is_ordered() const
+{
+  for (uint_t i=0; i<qubit_order_.size(); i++)
+    if (qubit_order_[i] != i)
+      return false;
+  return true;
+}
+
+void MPS::move_all_qubits_to_sorted_ordering()
+{
+  // Every qubit is moved to its position in turn; the qubits to its left
+  // are already in place, so the qubits only move to the left
+  for (uint_t i=0; i<num_qubits_; i++)
+    move_qubit(i, i);
 }
 
 cmatrix_t MPS::density_matrix(const reg_t &qubits) const
 {
   MPS temp_MPS;
   temp_MPS.initialize(*this);
+  // The qubits are centralized by their positions in the sorted layout
+  temp_MPS.move_all_qubits_to_sorted_ordering();
   reg_t new_qubits;
   bool ordered = true;
   
@@ -613,6 +766,7 @@ rvector_t MPS::trace_of_density_matrix(const reg_t &qubits) const
 {
   MPS temp_MPS;
   temp_MPS.initialize(*this);
+  temp_MPS.move_all_qubits_to_sorted_ordering();
   bool ordered = true;
   reg_t new_qubits;
   temp_MPS.centralize_qubits(qubits, new_qubits, ordered);
@@ -628,162 +782,267 @@ rvector_t MPS::trace_of_density_matrix(const reg_t &qubits) const
   return trace_rho;
 }
 
-void MPS::MPS_with_new_indices(const reg_t &qubits, 
-			      MPS& temp_MPS, 
-			      uint_t &front, uint_t &back) const {
-  // ***** Assuming ascending sorted qubits register *****
-  std::vector<uint_t> internalIndices;
-  for (uint_t index : qubits)
-    internalIndices.push_back(index);
+//-------------------------------------------------------------------------
+// Environments - outline
+// With M_i^s = Gamma_i^s * Lambda_i, the amplitude of a basis state s is
+// M_0^{s_0} * M_1^{s_1} * ... * M_{n-1}^{s_{n-1}}. The left environment of
+// qubit i is the contraction of the MPS with its conjugate over qubits 0..i-1,
+//     L_0 = 1,   L_{i+1} = sum_s M_i^s^dagger * L_i * M_i^s,
+// and the right environment of qubit i is the contraction over qubits i..n-1,
+//     R_n = 1,   R_i = sum_s M_i^s * R_{i+1} * M_i^s^dagger.
+// The expectation value of an operator acting on qubits first..last is
+// computed by contracting L_first with the operator over these qubits, and
+// closing the result with R_{last+1}. Dividing by the norm Trace(L_i * R_i)
+// accounts for the loss of canonical form when the bond dimension is
+// truncated.
+// The environments are computed lazily and cached. A gate on qubits
+// first..last changes only M_first..M_last, so L_0..L_first and
+// R_{last+1}..R_n remain valid.
+//-------------------------------------------------------------------------
 
-  temp_MPS.initialize(*this);
-  std::vector<uint_t> new_indices = calc_new_indices(internalIndices);
-  uint_t avg = new_indices[new_indices.size()/2];
-  std::vector<uint_t>::iterator it = lower_bound(internalIndices.begin(), internalIndices.end(), avg);
-  int mid = std::distance(internalIndices.begin(), it);
-  for(uint_t i = mid; i < internalIndices.size(); i++)
-  {
-    temp_MPS.change_position(internalIndices[i], new_indices[i]);
-  }
-  for(int i = mid-1; i >= 0; i--)
-  {
-    temp_MPS.change_position(internalIndices[i], new_indices[i]);
+std::vector<cmatrix_t> MPS::site_matrices(uint_t index) const
+{
+  MPS_Tensor tensor = q_reg_[index];
+  if (index < num_qubits_-1)
+    tensor.mul_Gamma_by_right_Lambda(lambda_reg_[index]);
+  return tensor.get_data();
+}
+
+const cmatrix_t& MPS::left_environment(uint_t index) const
+{
+  if (left_env_.empty())
+    left_env_.push_back(AER::Utils::Matrix::identity(1));
+  while (left_env_.size() <= index) {
+    const uint_t qubit = left_env_.size() - 1;
+    left_env_.push_back(contract_left(left_env_.back(), site_matrices(qubit)));
   }
-  front = internalIndices.front();
-  back = internalIndices.back();
+  return left_env_[index];
 }
 
-double MPS::expectation_value(const reg_t &qubits, const cmatrix_t &M) const
+const cmatrix_t& MPS::right_environment(uint_t index) const
 {
-  cmatrix_t rho = density_matrix(qubits);
+  // right_env_[k] is R_{n-k}
+  if (right_env_.empty())
+    right_env_.push_back(AER::Utils::Matrix::identity(1));
+  while (right_env_.size() <= num_qubits_ - index) {
+    const uint_t qubit = num_qubits_ - right_env_.size();
+    right_env_.push_back(contract_right(right_env_.back(), site_matrices(qubit)));
+  }
+  return right_env_[num_qubits_ - index];
+}
 
-  // Trace(rho*M). not using methods for efficiency
-  complex_t res = 0;
-  for (uint_t i = 0; i < M.GetRows(); i++)
-    for (uint_t j = 0; j < M.GetRows(); j++)
-      res += M(i,j)*rho(j,i);
-  return real(res);
+void MPS::invalidate_environments(uint_t first, uint_t last)
+{
+  // Gates on disjoint qubits may be applied in parallel
+  #pragma omp critical (mps_environments)
+  {
+    if (left_env_.size() > first + 1)
+      left_env_.resize(first + 1);
+    if (right_env_.size() > num_qubits_ - last)
+      right_env_.resize(num_qubits_ - last);
+  }
 }
 
-//---------------------------------------------------------------
-// Function: expectation_value_pauli
-// Algorithm: For more details, see "The density-matrix renormalization group in the age of matrix 
-//            product states" by Ulrich Schollwock.
-// For the illustration, assume computing the expectation 
-// value on qubits numbered q0, q1, q2, q3. There may be additional qubits
-// before q0 or after q3 
-// Initial state: 
-//      q0     q1     q2     q3                               
-//   -a0-o--a1--o--a2--o--a3--o---  
-//       |      |      |      |  
-//   -a0-o--a1--o--a2--o--a3--o---                                     
-//                       
-//                                 
-// We can actually think of this as       q0  q1  q2  q3
-//                                       --o---o---o---o--
-//                                      |  |   |   |   |  |
-//                                       --o---o---o---o--
-// because expectation value on the left and right are 1. 
-
-// After Step 4:
-//       q1     q2     q3
-//     a1/o--a2--o--a3--o--
-//      o |      |      |  |
-//     a1\o--a2--o--a3--o-- 
-//
-// After step 8:
-//       q1     q2     q3
-//        o--a2--o--a3--o--
-//     a1||i     |      |  |
-//        o--a2--o--a3--o-- 
-//
-// After step 9:
-//              q2     q3
-//            a2/o--a3--o--
-//             o |      |  |
-//            a2\o--a3--o-- 
-//---------------------------------------------------------------
+double MPS::norm_at(uint_t index) const
+{
+  return std::real(trace_of_product(left_environment(index),
+				    right_environment(index)));
+}
 
-complex_t MPS::expectation_value_pauli(const reg_t &qubits, const std::string &matrices) const
+cmatrix_t MPS::contract_operator_left(const cmatrix_t &left_env,
+				      const reg_t &qubits,
+				      const cmatrix_t &mat) const
 {
-  MPS temp_MPS;
-  uint_t first_index = 0, last_index = 0;
-  MPS_with_new_indices(qubits, temp_MPS, first_index, last_index);
+  const uint_t first = *std::min_element(qubits.begin(), qubits.end());
+  const uint_t last = *std::max_element(qubits.begin(), qubits.end());
+
+  // The partial contractions are indexed by the ket and bra values of the
+  // qubits of the operator contracted so far. Bit k of the index is the
+  // value of qubits[k].
+  reg_t kets = {0}, bras = {0};
+  std::vector<cmatrix_t> envs = {left_env};
+  for (uint_t qubit=first; qubit<=last; qubit++) {
+    const std::vector<cmatrix_t> M = site_matrices(qubit);
+    const auto it = std::find(qubits.begin(), qubits.end(), qubit);
+    if (it == qubits.end()) {
+      for (auto &env : envs)
+	env = contract_left(env, M);
+      continue;
+    }
+    const uint_t bit = 1ULL << std::distance(qubits.begin(), it);
+    const cmatrix_t M_dagger[2] = {AER::Utils::dagger(M[0]), AER::Utils::dagger(M[1])};
+    reg_t next_kets, next_bras;
+    std::vector<cmatrix_t> next_envs;
+    for (uint_t i=0; i<envs.size(); i++) {
+      for (uint_t s=0; s<2; s++) {
+	const cmatrix_t env_M = multiply_batch(envs[i], M[s]);
+	for (uint_t t=0; t<2; t++) {
+	  next_kets.push_back(kets[i] | (s ? bit : 0));
+	  next_bras.push_back(bras[i] | (t ? bit : 0));
+	  next_envs.push_back(multiply_batch(M_dagger[t], env_M));
+	}
+      }
+    }
+    kets.swap(next_kets);
+    bras.swap(next_bras);
+    envs.swap(next_envs);
+  }
 
-  // Preliminary step - reverse the order of the matrices because 
-  // they are ordered in reverse to that of the qubits (in the interface)
-  std::string reversed_matrices = matrices;
-  reverse(reversed_matrices.begin(), reversed_matrices.end());
-  char gate = reversed_matrices[0];
+  // Contract the ket and bra indices with the matrix
+  cmatrix_t result(envs[0].GetRows(), envs[0].GetColumns());
+  for (uint_t i=0; i<envs.size(); i++) {
+    const complex_t coeff = mat(bras[i], kets[i]);
+    if (coeff != 0.)
+      result += coeff * envs[i];
+  }
+  return result;
+}
 
-  // Step 1 - multiply tensor of q0 by its left lambda
-  MPS_Tensor left_tensor = temp_MPS.q_reg_[first_index];
-  if (first_index > 0) {
-    left_tensor.mul_Gamma_by_left_Lambda(temp_MPS.lambda_reg_[first_index-1]);
+double MPS::expectation_value(const reg_t &qubits, const cmatrix_t &M) const
+{
+  return std::real(expectation_value({std::make_pair(qubits, M)}));
+}
+
+complex_t MPS::expectation_value(const std::vector<std::pair<reg_t, cmatrix_t>> &qubit_mats) const
+{
+  if (qubit_mats.empty())
+    return 1.;
+  // The matrices act on the positions of the qubits in the MPS
+  std::vector<std::pair<reg_t, cmatrix_t>> mats;
+  for (const auto &pair : qubit_mats)
+    mats.emplace_back(get_qubit_indices(pair.first), pair.second);
+  for (const auto &pair : mats) {
+    const uint_t dim = 1ULL << pair.first.size();
+    if (pair.first.empty() || pair.second.GetRows() != dim ||
+	pair.second.GetColumns() != dim)
+      throw std::invalid_argument("MPS::expectation_value: matrix does not match the number of qubits");
   }
 
-  // The last gamma must be multiplied also by its right lambda.
-  // Here we handle the special case that we are calculating exp val 
-  // on a single qubit
-  // we need to mul every gamma by its right lambda
-  if (first_index==last_index && first_index < num_qubits_-1) {
-      left_tensor.mul_Gamma_by_right_Lambda(temp_MPS.lambda_reg_[first_index]);
+  // Merge the matrices acting on overlapping ranges of qubits into blocks,
+  // so that the blocks act on disjoint ranges and can be contracted in turn
+  std::vector<uint_t> order(mats.size());
+  std::iota(order.begin(), order.end(), 0);
+  auto first_qubit = [&mats](uint_t i) {
+    return *std::min_element(mats[i].first.begin(), mats[i].first.end());
+  };
+  auto last_qubit = [&mats](uint_t i) {
+    return *std::max_element(mats[i].first.begin(), mats[i].first.end());
+  };
+  std::sort(order.begin(), order.end(), [&first_qubit](uint_t i, uint_t j) {
+    return first_qubit(i) < first_qubit(j);
+  });
+  std::vector<reg_t> blocks;
+  reg_t block_first, block_last;
+  for (const auto i : order) {
+    if (!blocks.empty() && first_qubit(i) <= block_last.back()) {
+      blocks.back().push_back(i);
+      block_last.back() = std::max(block_last.back(), last_qubit(i));
+    } else {
+      blocks.push_back({i});
+      block_first.push_back(first_qubit(i));
+      block_last.push_back(last_qubit(i));
+    }
   }
 
-  // Step 2 - prepare the dagger of left_tensor
-  MPS_Tensor left_tensor_dagger(AER::Utils::dagger(left_tensor.get_data(0)), 
-				AER::Utils::dagger(left_tensor.get_data(1)));
-  
-  // Step 3 - Apply the gate to q0
-  left_tensor.apply_pauli(gate);
-
-  // Step 4 - contract Gamma0' with Gamma0 over dimensions a0 and i
-  // Before contraction, Gamma0' has size a1 x a0 x i, Gamma0 has size i x a0 x a1
-  // result = left_contract is a matrix of size a1 x a1
-  cmatrix_t final_contract;
-  MPS_Tensor::contract_2_dimensions(left_tensor_dagger, left_tensor, 
-				    final_contract);
-
-  for (uint_t qubit_num=first_index+1; qubit_num<=last_index; qubit_num++) {
-
-    // Step 5 - multiply next Gamma by its left lambda (same as Step 1)
-    // next gamma has dimensions a0 x a1 x i 
-    MPS_Tensor next_gamma = temp_MPS.q_reg_[qubit_num];
-    next_gamma.mul_Gamma_by_left_Lambda(temp_MPS.lambda_reg_[qubit_num-1]);
-
-    // Last qubit must be multiplied by rightmost lambda
-    if (qubit_num==last_index && qubit_num < num_qubits_-1)
-      next_gamma.mul_Gamma_by_right_Lambda(temp_MPS.lambda_reg_[qubit_num]);
-
-    // Step 6 - prepare the dagger of the next gamma (same as Step 2)
-    // next_gamma_dagger has dimensions a1' x a0' x i
-    MPS_Tensor next_gamma_dagger(AER::Utils::dagger(next_gamma.get_data(0)), 
-				 AER::Utils::dagger(next_gamma.get_data(1)));
-    
-    // Step 7 - apply gate (same as Step 3)
-    gate = reversed_matrices[qubit_num - first_index];
-    next_gamma.apply_pauli(gate);
-    
-    // Step 8 - contract final_contract from previous stage with next gamma over a1
-    // final_contract has dimensions a1 x a1, Gamma1 has dimensions a1 x a2 x i (where i=2)
-    // result is a tensor of size a1 x a2 x i
-    MPS_Tensor next_contract(final_contract * next_gamma.get_data(0), 
-			     final_contract * next_gamma.get_data(1));
-
-    // Step 9 - contract next_contract (a1 x a2 x i) 
-    // with next_gamma_dagger (i x a2 x a1) (same as Step 4)
-    // here we need to contract across two dimensions: a1 and i
-    // result is a matrix of size a2 x a2
-    MPS_Tensor::contract_2_dimensions(next_gamma_dagger, next_contract, 
-				      final_contract);      
+  const uint_t first = block_first.front();
+  cmatrix_t env = left_environment(first);
+  uint_t qubit = first;
+  for (uint_t b=0; b<blocks.size(); b++) {
+    for (; qubit<block_first[b]; qubit++)
+      env = contract_left(env, site_matrices(qubit));
+    if (blocks[b].size() == 1) {
+      const auto &pair = mats[blocks[b][0]];
+      env = contract_operator_left(env, pair.first, pair.second);
+    } else {
+      // The matrices of the block are applied in their original order
+      std::sort(blocks[b].begin(), blocks[b].end());
+      reg_t block_qubits;
+      for (const auto i : blocks[b])
+	for (const auto q : mats[i].first)
+	  if (std::find(block_qubits.begin(), block_qubits.end(), q) == block_qubits.end())
+	    block_qubits.push_back(q);
+      cmatrix_t block_mat = AER::Utils::Matrix::identity(1ULL << block_qubits.size());
+      for (const auto i : blocks[b])
+	block_mat = expand_matrix(block_qubits, mats[i].first, mats[i].second) * block_mat;
+      env = contract_operator_left(env, block_qubits, block_mat);
+    }
+    qubit = block_last[b] + 1;
   }
- 
-  // Step 10 - contract over final matrix of size aN x aN
-  // We need to contract the final matrix with itself
-  // Compute this by taking the trace of final_contract
-  complex_t result = AER::Utils::trace(final_contract);
+  return trace_of_product(env, right_environment(qubit)) / norm_at(first);
+}
 
-  return result;
+complex_t MPS::expectation_value_pauli(const reg_t &qubits, const std::string &matrices) const
+{
+  return expectation_value_pauli(qubits, std::vector<std::string>({matrices}))[0];
+}
+
+//---------------------------------------------------------------
+// Function: expectation_value_pauli
+// Algorithm: Every Pauli string is evaluated by contracting the left
+// environment of its first non-identity qubit with the Pauli matrices up to
+// its last non-identity qubit, and closing with the right environment of
+// that qubit. The strings are sorted, so that strings with a common prefix
+// are adjacent, and the partial contraction of the common prefix is reused
+// from the previous string.
+//---------------------------------------------------------------
+std::vector<complex_t> MPS::expectation_value_pauli(const reg_t &qubit_indices,
+						    const std::vector<std::string> &matrices) const
+{
+  std::vector<complex_t> expvals(matrices.size(), 1.);
+  if (qubit_indices.empty() || matrices.empty())
+    return expvals;
+  const reg_t qubits = get_qubit_indices(qubit_indices);
+
+  // The Pauli matrix on each qubit between first and last. The matrices
+  // are given in reverse order relative to the qubits.
+  const uint_t first = *std::min_element(qubits.begin(), qubits.end());
+  const uint_t last = *std::max_element(qubits.begin(), qubits.end());
+  const uint_t size = last - first + 1;
+  std::vector<std::string> paulis(matrices.size(), std::string(size, 'I'));
+  for (uint_t j=0; j<matrices.size(); j++) {
+    if (matrices[j].size() != qubits.size())
+      throw std::invalid_argument("MPS::expectation_value_pauli: Pauli string does not match the number of qubits");
+    for (uint_t k=0; k<qubits.size(); k++)
+      paulis[j][qubits[k] - first] = matrices[j][qubits.size() - 1 - k];
+  }
+  std::vector<uint_t> order(matrices.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::sort(order.begin(), order.end(), [&paulis](uint_t i, uint_t j) {
+    return paulis[i] < paulis[j];
+  });
+
+  const double norm = norm_at(first);
+  // partial[p] is the contraction of qubits first..first+p-1 for the
+  // previous string, valid from its first non-identity position up to
+  // partial_end
+  std::vector<cmatrix_t> partial(size + 1);
+  uint_t partial_end = 0;
+  const std::string *previous = nullptr;
+  for (const auto j : order) {
+    const std::string &pauli = paulis[j];
+    const size_t begin = pauli.find_first_not_of('I');
+    if (begin == std::string::npos)
+      continue;
+    const size_t end = pauli.find_last_not_of('I') + 1;
+
+    uint_t p = begin;
+    if (previous != nullptr) {
+      uint_t common = 0;
+      while (common < size && pauli[common] == (*previous)[common])
+	common++;
+      if (common > begin)
+	p = std::min<uint_t>(common, partial_end);
+    }
+    if (p == begin)
+      partial[p] = left_environment(first + p);
+    for (; p<end; p++)
+      partial[p+1] = contract_pauli_left(partial[p], site_matrices(first + p), pauli[p]);
+    partial_end = end;
+    previous = &pauli;
+
+    expvals[j] = trace_of_product(partial[end], right_environment(first + end)) / norm;
+  }
+  return expvals;
 }
 
 std::ostream& MPS::print(std::ostream& out) const
@@ -815,6 +1074,7 @@ std::vector<reg_t> MPS::get_matrices_sizes() const
 MPS_Tensor MPS::state_vec_as_MPS(const reg_t &qubits) const {
   MPS temp_MPS;
   temp_MPS.initialize(*this);
+  temp_MPS.move_all_qubits_to_sorted_ordering();
   bool ordered = true;
   reg_t new_qubits;
   temp_MPS.centralize_qubits(qubits, new_qubits, ordered);
@@ -846,6 +1106,13 @@ MPS_Tensor MPS::state_vec_as_MPS(uint_t first_index, uint_t last_index) const
 
 void MPS::full_state_vector(cvector_t& statevector) const
 {
+  if (!is_ordered()) {
+    MPS temp_MPS;
+    temp_MPS.initialize(*this);
+    temp_MPS.move_all_qubits_to_sorted_ordering();
+    temp_MPS.full_state_vector(statevector);
+    return;
+  }
   MPS_Tensor mps_vec = state_vec_as_MPS(0, num_qubits_-1);
   uint_t length = 1ULL << num_qubits_;   // length = pow(2, num_qubits_)
   statevector.resize(length);
@@ -890,6 +1157,7 @@ reg_t MPS::apply_measure(const reg_t &qubits,
 
 uint_t MPS::apply_measure(uint_t qubit, 
 			 RngEngine &rng) {
+  const uint_t position = get_qubit_index(qubit);
   reg_t qubits_to_update;
   qubits_to_update.push_back(qubit);
 
@@ -918,28 +1186,120 @@ uint_t MPS::apply_measure(uint_t qubit,
   apply_matrix(qubits_to_update, measurement_matrix);
 
   // step 4 - propagate the changes to all qubits to the right
-  for (uint_t i=qubit; i<num_qubits_-1; i++) {
+  for (uint_t i=position; i<num_qubits_-1; i++) {
     if (lambda_reg_[i].size() == 1) 
       break;   // no need to propagate if no entanglement
-    apply_2_qubit_gate(i, i+1, id, cmatrix_t(1));
+    apply_2_qubit_gate_internal(i, false, id, cmatrix_t(1));
   }
 
   // and propagate the changes to all qubits to the left
-  for (int_t i=qubit; i>0; i--) {
+  for (int_t i=position; i>0; i--) {
     if (lambda_reg_[i-1].size() == 1) 
       break;   // no need to propagate if no entanglement
-    apply_2_qubit_gate(i-1, i, id, cmatrix_t(1));
+    apply_2_qubit_gate_internal(i-1, false, id, cmatrix_t(1));
   }
     
   return measurement;
 }
 
+//-------------------------------------------------------------------------
+// MPS::sample_measure - outline of the algorithm
+// The amplitude of a basis state s is M_0^{s_0} * M_1^{s_1} * ... * M_{n-1}^{s_{n-1}},
+// where M_i^s = Gamma_i^s * Lambda_i. We draw the qubits from left to right, each
+// from its distribution conditioned on the outcomes of the qubits to its left:
+// 1. Compute the right environments R_i = sum_s M_i^s * R_{i+1} * M_i^s^dagger,
+//    starting from R_n = 1 (see the outline of the environments above). These
+//    do not depend on the outcomes and are shared by all the shots.
+// 2. Each shot keeps the row vector v = M_0^{s_0} * ... * M_{i-1}^{s_{i-1}}. The
+//    probability of outcome s for qubit i is proportional to
+//    (v * M_i^s) * R_{i+1} * (v * M_i^s)^dagger.
+// 3. After drawing s, v is replaced by v * M_i^s, normalized.
+// The vectors of a batch of shots are stored as the rows of a matrix, so every
+// step is a matrix product for all the shots of the batch. Unmeasured qubits to
+// the left of the last measured qubit are drawn as well and the outcome is
+// discarded, which samples from their marginal. The cost is O(n * chi^3) for
+// the environments and O(shots * n * chi^2) for the samples.
+//-------------------------------------------------------------------------
+std::vector<reg_t> MPS::sample_measure(const reg_t &qubit_indices, uint_t shots,
+				       RngEngine &rng) const
+{
+  std::vector<reg_t> samples(shots, reg_t(qubit_indices.size(), 0));
+  if (qubit_indices.empty() || shots == 0)
+    return samples;
+  const reg_t qubits = get_qubit_indices(qubit_indices);
+
+  // Position of each qubit in the outcomes, or -1 if it is not measured
+  std::vector<int_t> outcome_index(num_qubits_, -1);
+  uint_t last = 0;
+  for (uint_t i=0; i<qubits.size(); i++) {
+    outcome_index[qubits[i]] = i;
+    last = std::max(last, qubits[i]);
+  }
+
+  // M_i^s = Gamma_i^s * Lambda_i
+  std::vector<std::vector<cmatrix_t>> M(last+1);
+  for (uint_t i=0; i<=last; i++)
+    M[i] = site_matrices(i);
+
+  // right_env[i] = R_{i+1}, the right environment of qubit i. If the MPS is in
+  // canonical form it is the identity, and it is not applied.
+  std::vector<cmatrix_t> right_env(last+1);
+  std::vector<bool> is_identity(last+1, false);
+  for (uint_t i=0; i<=last; i++) {
+    right_env[i] = right_environment(i+1);
+    is_identity[i] = AER::Utils::is_identity(right_env[i], ENVIRONMENT_IDENTITY_THRESHOLD);
+  }
+
+  for (uint_t start=0; start<shots; start+=MEASURE_SAMPLING_BATCH_SIZE) {
+    const uint_t batch = std::min(MEASURE_SAMPLING_BATCH_SIZE, shots-start);
+    cmatrix_t v(batch, 1);
+    for (uint_t row=0; row<batch; row++)
+      v(row, 0) = 1.0;
+
+    reg_t outcomes(batch);
+    rvector_t factors(batch);
+    for (uint_t i=0; i<=last; i++) {
+      const cmatrix_t w[2] = {multiply_batch(v, M[i][0]), multiply_batch(v, M[i][1])};
+      const uint_t columns = w[0].GetColumns();
+      rvector_t probs[2] = {rvector_t(batch, 0.), rvector_t(batch, 0.)};
+      for (uint_t s=0; s<2; s++) {
+	cmatrix_t w_env;
+	if (!is_identity[i])
+	  w_env = multiply_batch(w[s], right_env[i]);
+	const cmatrix_t &x = is_identity[i] ? w[s] : w_env;
+	for (uint_t col=0; col<columns; col++)
+	  for (uint_t row=0; row<batch; row++)
+	    probs[s][row] += std::real(x(row, col) * std::conj(w[s](row, col)));
+      }
+
+      for (uint_t row=0; row<batch; row++) {
+	const double prob0 = std::max(probs[0][row], 0.);
+	const double prob1 = std::max(probs[1][row], 0.);
+	outcomes[row] = (rng.rand(0, 1) * (prob0 + prob1) < prob0) ? 0 : 1;
+	factors[row] = 1. / std::sqrt(outcomes[row] ? prob1 : prob0);
+	if (outcome_index[i] >= 0)
+	  samples[start+row][outcome_index[i]] = outcomes[row];
+      }
+      v.initialize(batch, columns);
+      for (uint_t col=0; col<columns; col++)
+	for (uint_t row=0; row<batch; row++)
+	  v(row, col) = w[outcomes[row]](row, col) * factors[row];
+    }
+  }
+  return samples;
+}
+
 void MPS::initialize_from_matrix(uint_t num_qubits, const cmatrix_t mat) {
   if (!q_reg_.empty())
     q_reg_.clear();
   if (!lambda_reg_.empty())
     lambda_reg_.clear();
+  left_env_.clear();
+  right_env_.clear();
   num_qubits_ = 0;
+  qubit_order_.resize(num_qubits);
+  std::iota(qubit_order_.begin(), qubit_order_.end(), 0);
+  qubit_location_ = qubit_order_;
 
   // remaining_matrix is the matrix that remains after each iteration
   // It is initialized to the input statevector after reshaping
@@ -964,8 +1324,8 @@ void MPS::initialize_from_matrix(uint_t num_qubits, const cmatrix_t mat) {
     // step 2 - SVD
     S.clear();
     S.resize(std::min(reshaped_matrix.GetRows(), reshaped_matrix.GetColumns()));
-    csvd_wrapper(reshaped_matrix, U, S, V);
-    reduce_zeros(U, S, V);
+    discarded_weight_ += svd_decompose(reshaped_matrix, U, S, V, svd_method_,
+				       max_bond_dimension_, truncation_threshold_);
 
     // step 3 - update q_reg_ with new gamma and new lambda
     //          increment number of qubits in the MPS structure
@@ -43,6 +43,10 @@ enum class Direction {RIGHT, LEFT};
 // where n is the number of qubits in the circuit.
 // Qubit i is controlled by Gamma-tensor i and Lambda-tensors i and i+1,
 // for 0<=i<=n-1.
+// The qubits are stored in the MPS according to a dynamic layout: a gate on
+// non-adjacent qubits moves one qubit next to the other and leaves it there,
+// and the layout keeps track of the position of every qubit. All the public
+// methods receive qubits and map them to their positions in the MPS.
 // -------------------------------------------------------------------------
 
 class MPS{
@@ -87,6 +91,43 @@ public:
     return(num_qubits_ == 0);
   }
 
+  //----------------------------------------------------------------
+  // function name: get_qubit_index, qubit_locations
+  // Description: Return the current position of a qubit in the MPS, or
+  //      the positions of all the qubits.
+  //----------------------------------------------------------------
+  uint_t get_qubit_index(uint_t qubit) const {
+    return qubit_location_[qubit];
+  }
+
+  const reg_t& qubit_locations() const {
+    return qubit_location_;
+  }
+
+  //----------------------------------------------------------------
+  // function name: is_ordered
+  // Description: Returns true if every qubit i is at position i.
+  //----------------------------------------------------------------
+  bool is_ordered() const;
+
+  //----------------------------------------------------------------
+  // function name: move_qubit
+  // Description: Moves a qubit to the given position by swapping it with
+  //      its neighbours, and updates the layout. The qubits in between
+  //      shift by one position towards the qubit's original position.
+  // Parameters: qubit to move, position to move it to.
+  //----------------------------------------------------------------
+  void move_qubit(uint_t qubit, uint_t position) {
+    change_position(get_qubit_index(qubit), position);
+  }
+
+  //----------------------------------------------------------------
+  // function name: move_all_qubits_to_sorted_ordering
+  // Description: Restores the layout in which every qubit i is at
+  //      position i.
+  //----------------------------------------------------------------
+  void move_all_qubits_to_sorted_ordering();
+
   //----------------------------------------------------------------
   // function name: apply_x,y,z,...
   // Description: Apply a gate on some qubits by their indexes.
@@ -94,17 +135,18 @@ public:
   // Returns: none.
   //----------------------------------------------------------------
   void apply_h(uint_t index);
-  void apply_x(uint_t index){q_reg_[index].apply_x();}
-  void apply_y(uint_t index){q_reg_[index].apply_y();}
-  void apply_z(uint_t index){q_reg_[index].apply_z();}
-  void apply_s(uint_t index){q_reg_[index].apply_s();}
-  void apply_sdg(uint_t index){q_reg_[index].apply_sdg();}
-  void apply_t(uint_t index){q_reg_[index].apply_t();}
-  void apply_tdg(uint_t index){q_reg_[index].apply_tdg();}
+  void apply_x(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_x(); invalidate_environments(i, i);}
+  void apply_y(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_y(); invalidate_environments(i, i);}
+  void apply_z(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_z(); invalidate_environments(i, i);}
+  void apply_s(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_s(); invalidate_environments(i, i);}
+  void apply_sdg(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_sdg(); invalidate_environments(i, i);}
+  void apply_t(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_t(); invalidate_environments(i, i);}
+  void apply_tdg(uint_t index){const uint_t i = get_qubit_index(index); q_reg_[i].apply_tdg(); invalidate_environments(i, i);}
   void apply_u1(uint_t index, double lambda);
   void apply_u2(uint_t index, double phi, double lambda);
   void apply_u3(uint_t index, double theta, double phi, double lambda);
   void apply_cnot(uint_t index_A, uint_t index_B);
+  // A swap gate only exchanges the positions of the qubits in the layout
   void apply_swap(uint_t index_A, uint_t index_B);
   void apply_cz(uint_t index_A, uint_t index_B);
   void apply_cu1(uint_t index_A, uint_t index_B, double lambda);
@@ -134,6 +176,15 @@ public:
   //------------------------------------------------------------------
   double expectation_value(const reg_t &qubits, const cmatrix_t &M) const;
 
+  //---------------------------------------------------------------
+  // Function: expectation_value
+  // Description: Computes expectation value of a product of matrices, applied
+  //              in order to subsets of the qubits.
+  // Parameters: mats - (qubits, matrix) pairs.
+  // Returns: The expectation value.
+  //------------------------------------------------------------------
+  complex_t expectation_value(const std::vector<std::pair<reg_t, cmatrix_t>> &mats) const;
+
   //---------------------------------------------------------------
   // Function: expectation_value_pauli
   // Description: Computes expectation value of the given qubits on a string of Pauli matrices.
@@ -145,16 +196,17 @@ public:
   //------------------------------------------------------------------
   complex_t expectation_value_pauli(const reg_t &qubits, const std::string &matrices) const;
 
-  //------------------------------------------------------------------
-  // function name: MPS_with_new_indices
-  // Description: Creates a copy of *this where the indices of the
-  //   selected qubits have been moved for more efficient computation
-  //   of the expectation value
+  //---------------------------------------------------------------
+  // Function: expectation_value_pauli
+  // Description: Computes the expectation values of several strings of Pauli
+  //              matrices on the same qubits, sharing the contraction of
+  //              common prefixes between the strings.
   // Parameters: The qubits for which we compute expectation value.
-  // Returns: new MPS.
-  //----------------------------------------------------------------
-  void MPS_with_new_indices(const reg_t &qubits, MPS& temp_MPS,
-			    uint_t &front, uint_t &back) const;
+  //             The strings of matrices, each as in expectation_value_pauli above.
+  // Returns: The expectation values, ordered as matrices.
+  //------------------------------------------------------------------
+  std::vector<complex_t> expectation_value_pauli(const reg_t &qubits,
+						 const std::vector<std::string> &matrices) const;
 
   //----------------------------------------------------------------
   // function name: print
@@ -206,6 +258,40 @@ public:
     sample_measure_index_size_ = index_size;
   }
 
+  //----------------------------------------------------------------
+  // function name: set_max_bond_dimension, set_truncation_threshold
+  // Description: Configure the truncation of the singular values after
+  //      every SVD, in gates, in initialize_from_statevector and in
+  //      measurement. At most max_bond_dimension singular values are
+  //      kept (0 for no limit), and the smallest singular values are
+  //      discarded as long as the sum of their squares is at most
+  //      truncation_threshold.
+  //----------------------------------------------------------------
+  void set_max_bond_dimension(uint_t max_bond_dimension) {
+    max_bond_dimension_ = max_bond_dimension;
+  }
+
+  uint_t max_bond_dimension() const {
+    return max_bond_dimension_;
+  }
+
+  void set_truncation_threshold(double truncation_threshold) {
+    truncation_threshold_ = truncation_threshold;
+  }
+
+  void set_svd_method(SVD_Method svd_method) {
+    svd_method_ = svd_method;
+  }
+
+  //----------------------------------------------------------------
+  // function name: discarded_weight
+  // Description: Returns the sum of the discarded weights of all the
+  //      truncations since the MPS was initialized.
+  //----------------------------------------------------------------
+  double discarded_weight() const {
+    return discarded_weight_;
+  }
+
   void enable_gate_opt() {
     std::cout << "enable_gate_opt not supported yet" <<std::endl;
   }
@@ -230,6 +316,17 @@ public:
   uint_t apply_measure(uint_t qubit,
 		       RngEngine &rng);
 
+  //----------------------------------------------------------------
+  // function name: sample_measure
+  // Description: Samples measurement outcomes of the given qubits
+  //      without changing the state, by drawing each qubit from its
+  //      distribution conditioned on the qubits to its left.
+  // Parameters: qubits to measure, number of shots, rng
+  // Returns: the outcomes of each shot, ordered as qubits
+  //----------------------------------------------------------------
+  std::vector<reg_t> sample_measure(const reg_t &qubits, uint_t shots,
+				    RngEngine &rng) const;
+
   //----------------------------------------------------------------
   // function name: initialize_from_statevector
   // Description: This function receives as input a state_vector and
@@ -272,36 +369,99 @@ protected:
   void centralize_and_sort_qubits(const reg_t &qubits, reg_t &sorted_indexes,
 			 reg_t &new_qubits, bool &ordered);
 
-  //----------------------------------------------------------------
-  // function name: move_qubits_to_original_location
-  // Description: This function reverses the effect of centralize_qubits.
-  //      It returns the qubits that were previously centralized, to their original positions.
-  // Parameters: Input: first - the index of the first qubit that was moved
-  //                    original_qubits - the subset of qubits that were moved
-  //                    sorted_qubits - the original_qubits in sorted order
-  //             Returns: the MPS (this) where the qubits have been moved back to their original
-  //                 position.
-  // Returns: none.
-  //----------------------------------------------------------------
-  void move_qubits_to_original_location(uint_t first, const reg_t &original_qubits, 
-					const reg_t &sorted_qubits);
-
   //----------------------------------------------------------------
 
   // function name: change_position
-  // Description: Move qubit from src to dst in the MPS. Used only
-  //   for expectation value calculations. Similar to swap, but doesn't
-  //   move qubit in dst back to src, therefore being used only on the temp MPS
-  //   in Expectation_value function.
+  // Description: Move the qubit at position src to position dst in the MPS,
+  //   by swapping it with its neighbours, and update the layout.
   // Parameters: uint_t src, source of the qubit.
   //			 uint_t dst, destination of the qubit.
   // Returns: none.
   //----------------------------------------------------------------
   void change_position(uint_t src, uint_t dst);
 
+  //----------------------------------------------------------------
+  // function name: swap_positions
+  // Description: Swaps the qubits at positions index_A and index_B of the
+  //   MPS, and updates the layout.
+  //----------------------------------------------------------------
+  void swap_positions(uint_t index_A, uint_t index_B);
+
+  //----------------------------------------------------------------
+  // function name: apply_2_qubit_gate_internal
+  // Description: Applies a gate on the adjacent positions index and
+  //   index+1 of the MPS. swapped is true if the first qubit of the gate
+  //   is at index+1.
+  //----------------------------------------------------------------
+  void apply_2_qubit_gate_internal(uint_t index, bool swapped, Gates gate_type,
+				   const cmatrix_t &mat);
+
+  //----------------------------------------------------------------
+  // function name: get_qubit_indices
+  // Description: Returns the positions of the qubits in the MPS.
+  //----------------------------------------------------------------
+  reg_t get_qubit_indices(const reg_t &qubits) const;
+
+  //----------------------------------------------------------------
+  // function name: site_matrices
+  // Description: Returns the matrices Gamma^0 * Lambda, Gamma^1 * Lambda
+  //   of a qubit, where Lambda is the Lambda-tensor to its right.
+  //----------------------------------------------------------------
+  std::vector<cmatrix_t> site_matrices(uint_t index) const;
+
+  //----------------------------------------------------------------
+  // function name: left_environment, right_environment
+  // Description: Return the contraction of the MPS with its conjugate over
+  //   the qubits to the left of index, or over index and the qubits to
+  //   its right. The environments are cached until a gate changes the
+  //   qubits they contract.
+  //----------------------------------------------------------------
+  const cmatrix_t& left_environment(uint_t index) const;
+  const cmatrix_t& right_environment(uint_t index) const;
+
+  //----------------------------------------------------------------
+  // function name: invalidate_environments
+  // Description: Drops the cached environments that depend on the
+  //   qubits first..last. Must be called whenever these qubits change.
+  //----------------------------------------------------------------
+  void invalidate_environments(uint_t first, uint_t last);
+
+  //----------------------------------------------------------------
+  // function name: add_discarded_weight
+  // Description: Adds the discarded weight of a truncation. Gates on
+  //   disjoint qubits may be applied in parallel, so the sum is atomic.
+  //----------------------------------------------------------------
+  void add_discarded_weight(double weight) {
+    #pragma omp atomic
+    discarded_weight_ += weight;
+  }
+
+  //----------------------------------------------------------------
+  // function name: norm_at
+  // Description: Returns the squared norm of the MPS, contracted at index.
+  //----------------------------------------------------------------
+  double norm_at(uint_t index) const;
+
+  //----------------------------------------------------------------
+  // function name: contract_operator_left
+  // Description: Contracts the left environment of the first of the qubits
+  //   with the matrix mat acting on the qubits.
+  // Returns: the left environment of the qubit following the last of the
+  //   qubits.
+  //----------------------------------------------------------------
+  cmatrix_t contract_operator_left(const cmatrix_t &left_env, const reg_t &qubits,
+				   const cmatrix_t &mat) const;
+
   uint_t num_qubits_;
   std::vector<MPS_Tensor> q_reg_;
   std::vector<rvector_t> lambda_reg_;
+  // The layout: qubit_order_[i] is the qubit at position i, and
+  // qubit_location_[q] is the position of qubit q
+  reg_t qubit_order_;
+  reg_t qubit_location_;
+  // Cached left and right environments, see left_environment and right_environment
+  mutable std::vector<cmatrix_t> left_env_;
+  mutable std::vector<cmatrix_t> right_env_;
   //-----------------------------------------------------------------------
   // Config settings
   //-----------------------------------------------------------------------
@@ -310,6 +470,10 @@ protected:
   int sample_measure_index_size_ = 10; // Sample measure indexing qubit size
   double json_chop_threshold_ = 1E-8;  // Threshold for choping small values
                                     // in JSON serialization
+  uint_t max_bond_dimension_ = 0;      // Maximal bond dimension, 0 for no limit
+  double truncation_threshold_ = 0.;    // Maximal discarded weight of an SVD
+  SVD_Method svd_method_ = SVD_Method::automatic; // SVD algorithm
+  double discarded_weight_ = 0.0;      // Accumulated weight discarded in SVDs
 };
 
 inline std::ostream &operator<<(std::ostream &out, const rvector_t &vec) {
@@ -138,7 +138,9 @@ public:
   void div_Gamma_by_left_Lambda(const rvector_t &Lambda);
   void div_Gamma_by_right_Lambda(const rvector_t &Lambda);
   static MPS_Tensor contract(const MPS_Tensor &left_gamma, const rvector_t &lambda, const MPS_Tensor &right_gamma, bool mul_by_lambda);
-  static void Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &lambda, MPS_Tensor &right_gamma);
+  static double Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &lambda, MPS_Tensor &right_gamma,
+			  uint_t max_bond_dimension = 0, double truncation_threshold = 0.0,
+			  SVD_Method svd_method = SVD_Method::automatic);
   static void reshape_for_3_qubits_before_SVD(const std::vector<cmatrix_t> data, MPS_Tensor &reshaped_tensor);
 static void contract_2_dimensions(const MPS_Tensor &left_gamma, 
 				  const MPS_Tensor &right_gamma,
@@ -491,9 +493,14 @@ void MPS_Tensor::contract_2_dimensions(const MPS_Tensor &left_gamma,
 // Parameters: MPS_Tensor &temp - the tensor to decompose.
 //			   MPS_Tensor &left_gamma, &right_gamma , rvector_t &lambda -
 // 			   tensors for the result.
-// Returns: none.
+//			   uint_t max_bond_dimension, double truncation_threshold -
+//			   truncation of the singular values (see reduce_zeros).
+//			   SVD_Method svd_method - the SVD algorithm (see svd_decompose).
+// Returns: the discarded weight of the truncation.
 //---------------------------------------------------------------
-void MPS_Tensor::Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &lambda, MPS_Tensor &right_gamma)
+double MPS_Tensor::Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &lambda, MPS_Tensor &right_gamma,
+			     uint_t max_bond_dimension, double truncation_threshold,
+			     SVD_Method svd_method)
 {
   matrix<complex_t> C;
   C = reshape_before_SVD(temp.data_);
@@ -504,8 +511,8 @@ void MPS_Tensor::Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &
   std::cout << "Input matrix before SVD =" << std::endl << C ;
 #endif
 
-  csvd_wrapper(C, U, S, V);
-  reduce_zeros(U, S, V);
+  double discarded_weight = svd_decompose(C, U, S, V, svd_method,
+					  max_bond_dimension, truncation_threshold);
 
 #ifdef DEBUG
   std::cout << "matrices after SVD:" <<std::endl;
@@ -520,6 +527,7 @@ void MPS_Tensor::Decompose(MPS_Tensor &temp, MPS_Tensor &left_gamma, rvector_t &
   left_gamma.data_  = reshape_U_after_SVD(U);
   lambda            = S;
   right_gamma.data_ = reshape_V_after_SVD(V);
+  return discarded_weight;
 }
 
   void MPS_Tensor::reshape_for_3_qubits_before_SVD(const std::vector<cmatrix_t> data, 
@@ -24,6 +24,7 @@
 #include <cmath>
 #include <complex>
 #include <cassert>
+#include <random>
 #include "svd.hpp"
 #include "framework/utils.hpp"
 
@@ -32,6 +33,48 @@
 #define THRESHOLD 1e-9
 #define NUM_SVD_TRIES 15
 
+// Smallest dimension of a matrix for which the LAPACK SVD is used
+#define LAPACK_SVD_MIN_DIM 16
+// Number of extra columns and power iterations of the randomized SVD
+#define RANDOMIZED_SVD_OVERSAMPLING 8
+#define RANDOMIZED_SVD_POWER_ITERATIONS 2
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+//===========================================================================
+// Prototypes for LAPACK
+//===========================================================================
+
+// Complex SVD
+void zgesvd_(const char *jobu, const char *jobvt, const size_t *m,
+             const size_t *n, std::complex<double> *a, const size_t *lda,
+             double *s, std::complex<double> *u, const size_t *ldu,
+             std::complex<double> *vt, const size_t *ldvt,
+             std::complex<double> *work, const size_t *lwork, double *rwork,
+             size_t *info);
+// Complex divide and conquer SVD
+void zgesdd_(const char *jobz, const size_t *m, const size_t *n,
+             std::complex<double> *a, const size_t *lda, double *s,
+             std::complex<double> *u, const size_t *ldu,
+             std::complex<double> *vt, const size_t *ldvt,
+             std::complex<double> *work, const size_t *lwork, double *rwork,
+             size_t *iwork, size_t *info);
+// Complex QR decomposition
+void zgeqrf_(const size_t *m, const size_t *n, std::complex<double> *a,
+             const size_t *lda, std::complex<double> *tau,
+             std::complex<double> *work, const size_t *lwork, size_t *info);
+// Q of a complex QR decomposition
+void zungqr_(const size_t *m, const size_t *n, const size_t *k,
+             std::complex<double> *a, const size_t *lda,
+             const std::complex<double> *tau, std::complex<double> *work,
+             const size_t *lwork, size_t *info);
+
+#ifdef __cplusplus
+}
+#endif
+
 namespace AER {
 
 cmatrix_t diag(rvector_t S, uint_t m, uint_t n);
@@ -94,11 +137,66 @@ uint_t num_of_SV(rvector_t S, double threshold)
 	return sum;
 }
 
-void reduce_zeros(cmatrix_t &U, rvector_t &S, cmatrix_t &V) {
+//-------------------------------------------------------------
+// function name: reduce_zeros
+// Description: Removes the zero singular values from the SVD, and
+//				truncates the remaining ones. The smallest singular
+//				values are discarded as long as the sum of their
+//				squares is at most truncation_threshold (relative to
+//				the sum of all squares), and at most max_bond_dimension
+//				singular values are kept. If any non-zero singular
+//				value is discarded, the remaining ones are rescaled so
+//				the norm of the state is preserved.
+// Parameters: cmatrix_t U, rvector_t S, cmatrix_t V - the SVD, where
+//			   S is sorted in decreasing order
+//			   uint_t max_bond_dimension - maximal number of singular
+//			   values to keep, 0 for no limit
+//			   double truncation_threshold - maximal discarded weight
+// Returns: the discarded weight, i.e., the sum of squares of the
+//			discarded singular values relative to the sum of all squares
+//-------------------------------------------------------------
+double truncate_SV(cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		   uint_t max_bond_dimension, double truncation_threshold,
+		   double tail_weight);
+
+double reduce_zeros(cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		    uint_t max_bond_dimension, double truncation_threshold) {
+  return truncate_SV(U, S, V, max_bond_dimension, truncation_threshold, 0.0);
+}
+
+// As reduce_zeros, where tail_weight is the weight of singular values that
+// were already left out of S (by a randomized SVD)
+double truncate_SV(cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		   uint_t max_bond_dimension, double truncation_threshold,
+		   double tail_weight) {
   uint_t SV_num = num_of_SV(S, 1e-16);
-  U.resize(U.GetRows(), SV_num);
-  S.resize(SV_num);
-  V.resize(V.GetRows(), SV_num);
+
+  double total_weight = tail_weight;
+  for (uint_t i = 0; i < SV_num; i++)
+    total_weight += S[i] * S[i];
+
+  double discarded_weight = tail_weight;
+  uint_t new_SV_num = SV_num;
+  while (new_SV_num > 1 &&
+	 discarded_weight + S[new_SV_num-1] * S[new_SV_num-1] <= truncation_threshold * total_weight) {
+    new_SV_num--;
+    discarded_weight += S[new_SV_num] * S[new_SV_num];
+  }
+  if (max_bond_dimension > 0) {
+    for (; new_SV_num > max_bond_dimension; new_SV_num--)
+      discarded_weight += S[new_SV_num-1] * S[new_SV_num-1];
+  }
+
+  U.resize(U.GetRows(), new_SV_num);
+  S.resize(new_SV_num);
+  V.resize(V.GetRows(), new_SV_num);
+
+  if (discarded_weight == 0.0)
+    return 0.0;
+  const double factor = std::sqrt(total_weight / (total_weight - discarded_weight));
+  for (uint_t i = 0; i < new_SV_num; i++)
+    S[i] *= factor;
+  return discarded_weight / total_weight;
 }
 
 // added cut-off at the end
@@ -560,5 +658,181 @@ void csvd_wrapper (cmatrix_t &A, cmatrix_t &U,rvector_t &S,cmatrix_t &V)
 
 }
 
+//-------------------------------------------------------------
+// function name: lapack_csvd
+// Description: Computes the thin SVD A = U*S*V^dagger with LAPACK, using
+//				zgesdd (divide and conquer) or zgesvd (QR iteration).
+//				A is overwritten.
+// Returns: FAILURE if LAPACK did not converge
+//-------------------------------------------------------------
+status lapack_csvd(cmatrix_t &A, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		   bool divide_and_conquer)
+{
+  const size_t m = A.GetRows(), n = A.GetColumns(), k = std::min(m, n);
+  cmatrix_t VT(k, n);
+  U.initialize(m, k);
+  S.resize(k);
+  size_t info = 0, lwork = 0;
+  complex_t work_size = 0;
+  const char job = 'S';
+  if (divide_and_conquer) {
+    rvector_t rwork(std::max(5 * k * k + 5 * k, 2 * std::max(m, n) * k + 2 * k * k + k));
+    std::vector<size_t> iwork(8 * k);
+    lwork = -1;
+    zgesdd_(&job, &m, &n, A.GetMat(), &m, S.data(), U.GetMat(), &m,
+	    VT.GetMat(), &k, &work_size, &lwork, rwork.data(), iwork.data(), &info);
+    lwork = static_cast<size_t>(work_size.real());
+    cvector_t work(lwork);
+    info = 0;
+    zgesdd_(&job, &m, &n, A.GetMat(), &m, S.data(), U.GetMat(), &m,
+	    VT.GetMat(), &k, work.data(), &lwork, rwork.data(), iwork.data(), &info);
+  } else {
+    rvector_t rwork(5 * k);
+    lwork = -1;
+    zgesvd_(&job, &job, &m, &n, A.GetMat(), &m, S.data(), U.GetMat(), &m,
+	    VT.GetMat(), &k, &work_size, &lwork, rwork.data(), &info);
+    lwork = static_cast<size_t>(work_size.real());
+    cvector_t work(lwork);
+    info = 0;
+    zgesvd_(&job, &job, &m, &n, A.GetMat(), &m, S.data(), U.GetMat(), &m,
+	    VT.GetMat(), &k, work.data(), &lwork, rwork.data(), &info);
+  }
+  if (info != 0)
+    return FAILURE;
+  V = AER::Utils::dagger(VT);
+  return SUCCESS;
+}
+
+// Replaces the columns of A by an orthonormal basis of their span
+status orthonormalize_columns(cmatrix_t &A)
+{
+  const size_t m = A.GetRows(), n = A.GetColumns();
+  cvector_t tau(n);
+  size_t info = 0, lwork = -1;
+  complex_t work_size = 0;
+  zgeqrf_(&m, &n, A.GetMat(), &m, tau.data(), &work_size, &lwork, &info);
+  lwork = std::max(static_cast<size_t>(work_size.real()), n);
+  cvector_t work(lwork);
+  info = 0;
+  zgeqrf_(&m, &n, A.GetMat(), &m, tau.data(), work.data(), &lwork, &info);
+  if (info != 0)
+    return FAILURE;
+  zungqr_(&m, &n, &n, A.GetMat(), &m, tau.data(), work.data(), &lwork, &info);
+  return (info == 0) ? SUCCESS : FAILURE;
+}
+
+//-------------------------------------------------------------
+// function name: randomized_csvd
+// Description: Computes the largest singular values of A and their
+//				singular vectors with a randomized range finder
+//				(Halko, Martinsson and Tropp, SIAM Review 53, 217 (2011)).
+//				The range of A is sampled with rank+oversampling random
+//				vectors, refined by power iterations, and the SVD of A
+//				projected on it is computed with LAPACK. The random
+//				vectors use a fixed seed, so the result is deterministic.
+// Returns: FAILURE if LAPACK did not converge
+//-------------------------------------------------------------
+status randomized_csvd(const cmatrix_t &A, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		       uint_t rank)
+{
+  const uint_t m = A.GetRows(), n = A.GetColumns();
+  const uint_t samples = std::min(rank + RANDOMIZED_SVD_OVERSAMPLING, std::min(m, n));
+
+  std::mt19937_64 rng(m * n);
+  std::normal_distribution<double> normal;
+  cmatrix_t omega(n, samples);
+  for (uint_t i = 0; i < omega.size(); i++)
+    omega[i] = complex_t(normal(rng), normal(rng));
+
+  cmatrix_t A_dagger = AER::Utils::dagger(A);
+  cmatrix_t Q = A * omega;
+  if (orthonormalize_columns(Q) == FAILURE)
+    return FAILURE;
+  for (uint_t i = 0; i < RANDOMIZED_SVD_POWER_ITERATIONS; i++) {
+    cmatrix_t Z = A_dagger * Q;
+    if (orthonormalize_columns(Z) == FAILURE)
+      return FAILURE;
+    Q = A * Z;
+    if (orthonormalize_columns(Q) == FAILURE)
+      return FAILURE;
+  }
+
+  // B = Q^dagger A, computed as (A^dagger Q)^dagger
+  cmatrix_t B = AER::Utils::dagger(A_dagger * Q);
+  cmatrix_t U_B;
+  if (lapack_csvd(B, U_B, S, V, false) == FAILURE)
+    return FAILURE;
+  U = Q * U_B;
+  return SUCCESS;
+}
+
+//-------------------------------------------------------------
+// function name: select_svd_method
+// Description: Chooses the SVD algorithm for a matrix. Small matrices use
+//				the Golub-Kahan csvd, larger ones the LAPACK divide and
+//				conquer SVD, which is the fastest from LAPACK_SVD_MIN_DIM
+//				on. If the bond dimension is limited to a small fraction of
+//				the matrix dimension, the randomized SVD computes only the
+//				singular values that are kept.
+//-------------------------------------------------------------
+SVD_Method select_svd_method(uint_t rows, uint_t columns, uint_t max_bond_dimension)
+{
+  const uint_t dim = std::min(rows, columns);
+  if (dim < LAPACK_SVD_MIN_DIM)
+    return SVD_Method::golub_kahan;
+  if (max_bond_dimension > 0 &&
+      4 * (max_bond_dimension + RANDOMIZED_SVD_OVERSAMPLING) <= dim)
+    return SVD_Method::randomized;
+  return SVD_Method::gesdd;
+}
+
+//-------------------------------------------------------------
+// function name: svd_decompose
+// Description: Computes the SVD of C with the given method and truncates
+//				it as in reduce_zeros. C may be overwritten. If a LAPACK
+//				method fails, csvd is used instead.
+// Returns: the discarded weight of the truncation
+//-------------------------------------------------------------
+double svd_decompose(cmatrix_t &C, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		     SVD_Method method, uint_t max_bond_dimension,
+		     double truncation_threshold)
+{
+  if (method == SVD_Method::automatic)
+    method = select_svd_method(C.GetRows(), C.GetColumns(), max_bond_dimension);
+  if (method == SVD_Method::randomized && max_bond_dimension == 0)
+    method = SVD_Method::gesdd;
+
+  status result = FAILURE;
+  double tail_weight = 0.0;
+  switch (method) {
+  case SVD_Method::randomized: {
+    result = randomized_csvd(C, U, S, V, max_bond_dimension);
+    if (result == SUCCESS) {
+      double kept_weight = 0.0;
+      for (const auto &s : S)
+	kept_weight += s * s;
+      for (uint_t i = 0; i < C.size(); i++)
+	tail_weight += std::norm(C[i]);
+      tail_weight = std::max(tail_weight - kept_weight, 0.0);
+    }
+    break;
+  }
+  case SVD_Method::gesvd:
+  case SVD_Method::gesdd: {
+    cmatrix_t copied_C = C;
+    result = lapack_csvd(copied_C, U, S, V, method == SVD_Method::gesdd);
+    break;
+  }
+  default:
+    break;
+  }
+  if (result == FAILURE) {
+    S.resize(std::min(C.GetRows(), C.GetColumns()));
+    csvd_wrapper(C, U, S, V);
+    tail_weight = 0.0;
+  }
+  return truncate_SV(U, S, V, max_bond_dimension, truncation_threshold, tail_weight);
+}
+
 } // namespace AER
 
@@ -27,14 +27,27 @@ using long_complex_t = std::complex<long double>;
 
 enum status {SUCCESS, FAILURE};
 
+// Algorithms for the SVD of the MPS tensors. automatic selects one of the
+// others by the size of the matrix and the bond dimension limit.
+enum class SVD_Method {automatic, golub_kahan, gesvd, gesdd, randomized};
+
   cmatrix_t reshape_before_SVD(std::vector<cmatrix_t> data);
 std::vector<cmatrix_t> reshape_U_after_SVD(cmatrix_t U);
 rvector_t reshape_S_after_SVD(rvector_t S);
 std::vector<cmatrix_t> reshape_V_after_SVD(const cmatrix_t V);
 uint_t num_of_SV(rvector_t S, double threshold);
-void reduce_zeros(cmatrix_t &U, rvector_t &S, cmatrix_t &V);
+double reduce_zeros(cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		    uint_t max_bond_dimension = 0, double truncation_threshold = 0.0);
 status csvd(cmatrix_t &C, cmatrix_t &U,rvector_t &S,cmatrix_t &V);
 void csvd_wrapper(cmatrix_t &C, cmatrix_t &U,rvector_t &S,cmatrix_t &V);
+status lapack_csvd(cmatrix_t &C, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		   bool divide_and_conquer);
+status randomized_csvd(const cmatrix_t &C, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		       uint_t rank);
+SVD_Method select_svd_method(uint_t rows, uint_t columns, uint_t max_bond_dimension);
+double svd_decompose(cmatrix_t &C, cmatrix_t &U, rvector_t &S, cmatrix_t &V,
+		     SVD_Method method, uint_t max_bond_dimension,
+		     double truncation_threshold);
 
 } //namespace AER
 
@@ -15,13 +15,19 @@
 #ifndef _aer_qasm_controller_hpp_
 #define _aer_qasm_controller_hpp_
 
+#include <chrono>
+#include <fstream>
+#include <numeric>
+
 #include "base/controller.hpp"
 #include "transpile/basic_opts.hpp"
 #include "transpile/fusion.hpp"
+#include "transpile/gate_cancellation.hpp"
 #include "transpile/delay_measure.hpp"
 #include "simulators/extended_stabilizer/extended_stabilizer_state.hpp"
 #include "simulators/statevector/statevector_state.hpp"
 #include "simulators/stabilizer/stabilizer_state.hpp"
+#include "simulators/stabilizer/pauli_frames.hpp"
 #include "simulators/matrix_product_state/matrix_product_state.hpp"
 #include "simulators/densitymatrix/densitymatrix_state.hpp"
 #include "simulators/superoperator/superoperator_state.hpp"
@@ -40,6 +46,34 @@ namespace Simulator {
  *   optimizations passes for an ideal circuit [Default: 0].
  * - "optimize_noise_threshold" (int): Qubit threshold for running circuit
  *   optimizations passes for a noisy circuit [Default: 12].
+ * - "stabilizer_pauli_frame_sampling" (bool): Sample all shots of a
+ *   Clifford circuit with Pauli, reset and readout noise from a single
+ *   reference simulation using Pauli frames when using the stabilizer
+ *   method [Default: True].
+ * - "fold_classical_enable" (bool): Remove the conditional operations and
+ *   boolean functions whose classical bits have known values before the
+ *   circuit is run, so these circuits can use measure sampling
+ *   [Default: True].
+ * - "light_cone_enable" (bool): Remove the operations that cannot change
+ *   the measurement outcomes or snapshots of a circuit, taking the qubits
+ *   of the noise model errors into account, before truncating unused
+ *   qubits [Default: True].
+ * - "truncate_enable" (bool): Remove the qubits that are not used by a
+ *   circuit or by the noise model errors of its operations, and remove the
+ *   noise model errors on them. The number of simulated qubits is reported
+ *   in the "num_qubits" result metadata [Default: True].
+ * - "gate_cancellation_enable" (bool): Cancel inverse pairs of gates and
+ *   merge runs of single-qubit gates without errors in the noise model
+ *   before the circuit is simulated [Default: True].
+ * - "gate_cancellation_threshold" (double): Threshold for a merged
+ *   single-qubit matrix to be removed as the identity [Default: 1e-14].
+ * - "fusion_calibrate" (bool): Measure the costs of dense and diagonal
+ *   matrices on this host and use them instead of fusion_cost_factor
+ *   to estimate the costs of fused operations [Default: False].
+ * - "fusion_cost_file" (str): File storing the measured fusion costs of this
+ *   host for each precision and number of threads. Costs found in the file
+ *   are used without calibration, and new calibrations are added to it
+ *   [Default: ""].
  * 
  * From Statevector::State class
  *
@@ -49,10 +83,14 @@ namespace Simulator {
  *      zero in result data [Default: 1e-10]
  * - "statevector_parallel_threshold" (int): Threshold that number of qubits
  *      must be greater than to enable OpenMP parallelization at State
- *      level [Default: 13]
+ *      level. The matrix product state method applies gates on disjoint
+ *      qubits in parallel above this threshold [Default: 13]
  * - "statevector_sample_measure_opt" (int): Threshold that number of qubits
  *      must be greater than to enable indexing optimization during
  *      measure sampling [Default: 10]
+ * - "statevector_sample_measure_method" (str): Algorithm used for measure
+ *      sampling. One of "automatic", "index", "alias" or "sorted"
+ *      [Default: "automatic"]
  * - "statevector_hpc_gate_opt" (bool): Enable large qubit gate optimizations.
  *      [Default: False]
  *
@@ -73,6 +111,23 @@ namespace Simulator {
  *      decreased alongside setting extended_stabilizer_disable_measurement_opt
  *      to True. [Default: 5000]
  *
+ * - "extended_stabilizer_metropolis_chains" (int): Number of independent
+ *      monte-carlo chains used to sample the shots of the measure
+ *      sampling optimization. Each chain runs the full mixing time,
+ *      and the chains run in parallel if there are at least as many
+ *      chains as threads. [Default: 1]
+ *
+ * - "extended_stabilizer_metropolis_diagnostics" (bool): Compute the split
+ *      R-hat and effective sample size of the samples of the monte-carlo
+ *      chains, and report them in the "metropolis_diagnostics" result
+ *      metadata. [Default: False]
+ *
+ * - "extended_stabilizer_cache_decomposition" (bool): Reuse the stabilizer
+ *      rank decomposition of the gates before the first measurement or
+ *      reset for every shot, and for later experiments with the same
+ *      gates, instead of sampling a new decomposition each time.
+ *      [Default: True]
+ *
  * - "extended_stabilizer_norm_estimation_samples" (int): Number of samples used to
  *      compute the correct normalisation for a statevector snapshot.
  *      [Default: 100]
@@ -82,6 +137,25 @@ namespace Simulator {
  *      parallel circuit or shot execution is enabled this will only
  *      use unallocated CPU cores up to max_parallel_threads. [Default: 100]
  *
+ * MPS-specific config options:
+ * - "mps_max_bond_dimension" (int): Maximum number of singular values kept
+ *      in each bond of the matrix product state. Set to 0 for no limit.
+ *      [Default: 0]
+ * - "mps_truncation_threshold" (double): Discard the smallest singular
+ *      values of a bond while the sum of their squares is at most this
+ *      threshold. The accumulated discarded weight is reported in the
+ *      "mps_discarded_weight" metadata. Set to 0 to only discard the
+ *      numerically zero singular values. [Default: 0]
+ * - "mps_svd_method" (str): Algorithm for the SVDs of the matrix product
+ *      state: "golub_kahan", "gesvd" or "gesdd" (LAPACK), "randomized"
+ *      (only computes the singular values kept by mps_max_bond_dimension),
+ *      or "automatic" to choose by the size of each matrix.
+ *      [Default: "automatic"]
+ * - "mps_swap_lookahead" (int): Number of following two-qubit gates
+ *      considered when choosing where to move the qubits of a gate on
+ *      non-adjacent qubits. Set to 0 to always move the second qubit next
+ *      to the first. [Default: 20]
+ *
  * From BaseController Class
  *
  * - "noise_model" (json): A noise model to use for simulation [Default: null]
@@ -177,9 +251,20 @@ protected:
                         State_t &state,
                         const Initstate_t &initial_state) const;
 
+  // Set the costs of the fusion optimization from the fusion_cost_file,
+  // or measure them on this host if fusion_calibrate is set
+  void set_fusion_costs(const json_t &config);
+
+  // Measure the costs of dense and diagonal matrices on 1 to max_qubit
+  // qubits of a statevector relative to the cost of a dense single-qubit
+  // matrix
+  template <typename data_t>
+  static json_t measure_fusion_costs(const uint_t max_qubit, const int threads);
+
   // Set parallelization for qasm simulator
   virtual void set_parallelization_circuit(const Circuit& circ,
-                                           const Noise::NoiseModel& noise) override;
+                                           const Noise::NoiseModel& noise,
+                                           const json_t &config) override;
 
   //----------------------------------------------------------------
   // Run circuit helpers
@@ -195,6 +280,13 @@ protected:
                                 const Initstate_t &initial_state,
                                 const Method method) const;
 
+  // Share the controller's decomposition cache with an extended stabilizer
+  // state, so that experiments with the same circuit prefix reuse the same
+  // stabilizer rank decomposition. This does nothing for other states.
+  template <class State_t>
+  void share_decomposition_cache(State_t &state) const;
+  void share_decomposition_cache(ExtendedStabilizer::State &state) const;
+
   // Execute a single shot a circuit by initializing the state vector
   // to initial_state, running all ops in circ, and updating data with
   // simulation output.
@@ -218,6 +310,14 @@ protected:
                                  ExperimentData &data,
                                  RngEngine &rng) const;
 
+  // Optimize a noisy instance of a circuit sampled for a shot. Fusion
+  // reuses the fused segments of the instances sampled for earlier shots.
+  template <class State_t>
+  void optimize_noise_circuit(Circuit &circ,
+                              State_t &state,
+                              Transpile::FusionCache &fusion_cache,
+                              ExperimentData &data) const;
+
   // Execute n-shots of a circuit with noise by sampling a new noisy
   // instance of the circuit for each shot.
   template <class State_t, class Initstate_t>
@@ -229,6 +329,16 @@ protected:
                               ExperimentData &data,
                               RngEngine &rng) const;
 
+  // Execute n-shots of a Clifford circuit with Pauli noise by propagating
+  // a Pauli frame for each shot relative to a single noise-free reference
+  // simulation. Returns false without running any shots if the circuit or
+  // noise model is not supported.
+  bool run_circuit_with_pauli_frames(const Circuit &circ,
+                                     const Noise::NoiseModel& noise,
+                                     uint_t shots,
+                                     ExperimentData &data,
+                                     RngEngine &rng) const;
+
   //----------------------------------------------------------------
   // Measure sampling optimization
   //----------------------------------------------------------------
@@ -252,7 +362,8 @@ protected:
   // Config
   //-----------------------------------------------------------------------
   size_t required_memory_mb(const Circuit& circ,
-                            const Noise::NoiseModel& noise) const override;
+                            const Noise::NoiseModel& noise,
+                            const json_t &config) const override;
 
   // Simulation method
   Method simulation_method_ = Method::automatic;
@@ -271,6 +382,13 @@ protected:
 
   // Controller-level parameter for CH method
   bool extended_stabilizer_measure_sampling_ = false;
+
+  // Decomposition of the last circuit prefix run with the CH method
+  std::shared_ptr<ExtendedStabilizer::DecompositionCache> extended_stabilizer_cache_ =
+    std::make_shared<ExtendedStabilizer::DecompositionCache>();
+
+  // Controller-level parameter for stabilizer method
+  bool stabilizer_pauli_frame_sampling_ = true;
 };
 
 //=========================================================================
@@ -281,6 +399,9 @@ protected:
 // Constructor
 //-------------------------------------------------------------------------
 QasmController::QasmController() {
+  // Enable classical folding and light cone pruning by default
+  Base::Controller::fold_classical_ = true;
+  Base::Controller::prune_light_cone_ = true;
   add_circuit_optimization(Transpile::ReduceBarrier());
   add_circuit_optimization(Transpile::DelayMeasure());
   add_circuit_optimization(Transpile::Fusion());
@@ -340,6 +461,13 @@ void QasmController::set_config(const json_t &config) {
   JSON::get_value(extended_stabilizer_measure_sampling_,
                   "extended_stabilizer_measure_sampling", config);
 
+  // Check for stabilizer Pauli frame sampling
+  JSON::get_value(stabilizer_pauli_frame_sampling_,
+                  "stabilizer_pauli_frame_sampling", config);
+
+  // Set the measured costs of the fusion optimization
+  set_fusion_costs(config);
+
   // DEPRECATED: Add custom initial state
   if (JSON::get_value(initial_statevector_, "initial_statevector", config)) {
     // Raise error if method is set to stabilizer or ch
@@ -367,6 +495,130 @@ void QasmController::clear_config() {
   Base::Controller::clear_config();
   simulation_method_ = Method::automatic;
   initial_statevector_ = cvector_t();
+  stabilizer_pauli_frame_sampling_ = true;
+}
+
+//-------------------------------------------------------------------------
+// Fusion costs
+//-------------------------------------------------------------------------
+
+void QasmController::set_fusion_costs(const json_t &config) {
+  std::shared_ptr<Transpile::Fusion> fusion;
+  for (std::shared_ptr<Transpile::CircuitOptimization> opt: optimizations_) {
+    fusion = std::dynamic_pointer_cast<Transpile::Fusion>(opt);
+    if (fusion)
+      break;
+  }
+  if (!fusion || !fusion->active())
+    return;
+
+  std::string cost_file;
+  bool calibrate = false;
+  JSON::get_value(cost_file, "fusion_cost_file", config);
+  JSON::get_value(calibrate, "fusion_calibrate", config);
+  if (cost_file.empty() && !calibrate)
+    return;
+
+  // The costs are stored for each precision and number of threads
+  const std::string precision =
+    (simulation_precision_ == Precision::single_precision) ? "single" : "double";
+  const std::string thread_key = std::to_string(max_parallel_threads_);
+  json_t table;
+  if (!cost_file.empty() && std::ifstream(cost_file).good())
+    table = JSON::load(cost_file);
+  json_t costs;
+  if (JSON::check_key(precision, table) && JSON::check_key(thread_key, table[precision]))
+    costs = table[precision][thread_key];
+
+  const auto num_costs = [](const json_t& js, const std::string& key) {
+    return JSON::check_key(key, js) ? js[key].size() : 0;
+  };
+  const uint_t max_qubit = fusion->max_qubit();
+  if (num_costs(costs, "dense") < max_qubit || num_costs(costs, "diagonal") < max_qubit) {
+    if (!calibrate)
+      return;
+    costs = (simulation_precision_ == Precision::single_precision)
+      ? measure_fusion_costs<float>(max_qubit, max_parallel_threads_)
+      : measure_fusion_costs<double>(max_qubit, max_parallel_threads_);
+    if (!cost_file.empty()) {
+      table[precision][thread_key] = costs;
+      std::ofstream ofile(cost_file);
+      if (!ofile)
+        throw std::invalid_argument("QasmController: cannot write fusion_cost_file \'" +
+                                    cost_file + "\'.");
+      ofile << table.dump(2) << std::endl;
+    }
+  }
+  fusion->set_costs(costs);
+}
+
+template <typename data_t>
+json_t QasmController::measure_fusion_costs(const uint_t max_qubit, const int threads) {
+  // The statevector is larger than the caches of a CPU, and the matrices
+  // are applied to the lowest and highest qubits of the statevector
+  const uint_t num_qubits = std::max<uint_t>(18, max_qubit);
+  const uint_t warmups = 2;
+  const uint_t repeats = 15;
+  QV::QubitVector<data_t> qv(num_qubits);
+  qv.set_omp_threads(threads);
+  qv.initialize();
+
+  auto measure = [&](const uint_t num_targets, const bool diagonal) {
+    // Hadamard transform or phases on the targets, so the state stays normalized
+    const uint_t dim = 1ULL << num_targets;
+    cvector_t mat(diagonal ? dim : dim * dim);
+    for (uint_t i = 0; i < mat.size(); ++i) {
+      if (diagonal) {
+        mat[i] = std::exp(complex_t(0., 0.1 * i));
+      } else {
+        uint_t bits = (i % dim) & (i / dim);
+        double sign = 1.;
+        for (; bits != 0; bits &= bits - 1)
+          sign = -sign;
+        mat[i] = sign / std::sqrt(dim);
+      }
+    }
+    // Median time of an application, which is robust to the outliers
+    // of a busy host
+    double total = 0.;
+    for (const uint_t offset: {uint_t(0), num_qubits - num_targets}) {
+      reg_t qubits(num_targets);
+      std::iota(qubits.begin(), qubits.end(), offset);
+      auto apply = [&]() {
+        if (diagonal)
+          qv.apply_diagonal_matrix(qubits, mat);
+        else
+          qv.apply_matrix(qubits, mat);
+      };
+      for (uint_t r = 0; r < warmups; ++r)
+        apply();
+      std::vector<double> times;
+      for (uint_t r = 0; r < repeats; ++r) {
+        const auto start = std::chrono::steady_clock::now();
+        apply();
+        times.push_back(std::chrono::duration<double>(
+          std::chrono::steady_clock::now() - start).count());
+      }
+      std::nth_element(times.begin(), times.begin() + repeats / 2, times.end());
+      total += times[repeats / 2];
+    }
+    return total;
+  };
+
+  std::vector<double> dense, diagonal;
+  for (uint_t n = 1; n <= max_qubit; ++n) {
+    dense.push_back(measure(n, false));
+    diagonal.push_back(measure(n, true));
+  }
+  const double unit = dense[0];
+  for (uint_t n = 0; n < max_qubit; ++n) {
+    dense[n] /= unit;
+    diagonal[n] /= unit;
+  }
+  json_t costs;
+  costs["dense"] = dense;
+  costs["diagonal"] = diagonal;
+  return costs;
 }
 
 //-------------------------------------------------------------------------
@@ -566,7 +818,8 @@ void QasmController::initialize_state(const Circuit &circ,
 }
 
 size_t QasmController::required_memory_mb(const Circuit& circ,
-                                          const Noise::NoiseModel& noise) const {
+                                          const Noise::NoiseModel& noise,
+                                          const json_t &config) const {
   switch (simulation_method(circ, noise, false)) {
     case Method::statevector: {
       if (simulation_precision_ == Precision::single_precision) {
@@ -590,7 +843,9 @@ size_t QasmController::required_memory_mb(const Circuit& circ,
       return state.required_memory_mb(circ.num_qubits, circ.ops);
     }
     case Method::matrix_product_state: {
+      // The estimate depends on the bond dimension limit
       MatrixProductState::State state;
+      state.set_config(config);
       return state.required_memory_mb(circ.num_qubits, circ.ops);
     }
     default:
@@ -600,7 +855,8 @@ size_t QasmController::required_memory_mb(const Circuit& circ,
 }
 
 void QasmController::set_parallelization_circuit(const Circuit& circ,
-                                                 const Noise::NoiseModel& noise_model) {
+                                                 const Noise::NoiseModel& noise_model,
+                                                 const json_t &config) {
   const auto method = simulation_method(circ, noise_model, false);
   switch (method) {
     case Method::statevector:
@@ -614,7 +870,7 @@ void QasmController::set_parallelization_circuit(const Circuit& circ,
         );
         return;
       }
-      Base::Controller::set_parallelization_circuit(circ, noise_model);
+      Base::Controller::set_parallelization_circuit(circ, noise_model, config);
       break;
     }
     case Method::density_matrix: {
@@ -625,11 +881,11 @@ void QasmController::set_parallelization_circuit(const Circuit& circ,
         );
         return;
       }
-      Base::Controller::set_parallelization_circuit(circ, noise_model);
+      Base::Controller::set_parallelization_circuit(circ, noise_model, config);
       break;
     }
     default: {
-      Base::Controller::set_parallelization_circuit(circ, noise_model);
+      Base::Controller::set_parallelization_circuit(circ, noise_model, config);
     }
   }
 }
@@ -649,12 +905,13 @@ ExperimentData QasmController::run_circuit_helper(const Circuit &circ,
   // Initialize new state object
   State_t state;
 
-  // Check memory requirements, raise exception if they're exceeded
-  validate_memory_requirements(state, circ, true);
-
   // Set state config
   state.set_config(config);
+
+  // Check memory requirements, raise exception if they're exceeded
+  validate_memory_requirements(state, circ, true);
   state.set_parallalization(parallel_state_update_);
+  share_decomposition_cache(state);
 
   // Rng engine
   RngEngine rng;
@@ -668,31 +925,51 @@ ExperimentData QasmController::run_circuit_helper(const Circuit &circ,
   // Note: this will set to `true` if sampling is enabled for the circuit
   data.add_metadata("measure_sampling", false);
 
+  // Simplify the gates of the ideal circuit once, before the noise is
+  // sampled, keeping the gates with errors and the gates of the state
+  Circuit opt_circ = circ;
+  Transpile::GateCancellation cancellation_pass;
+  cancellation_pass.set_config(config);
+  cancellation_pass.optimize_circuit(opt_circ, noise, allowed_opset(state), data);
+
   // Choose execution method based on noise and method
   if (noise.is_ideal()) {
-    run_circuit_without_noise(circ, shots, state, initial_state, method, data, rng);
+    run_circuit_without_noise(opt_circ, shots, state, initial_state, method, data, rng);
   }
   else if (method == Method::density_matrix && noise.has_quantum_errors()) {
     // We can sample the noise model using superoperator method
     // and then execute the resulting circuit containing superoperators
     Noise::NoiseModel noise_cpy = noise;
     noise_cpy.activate_superop_method();
-    Circuit noise_circ = noise_cpy.sample_noise(circ, rng);
+    Circuit noise_circ = noise_cpy.sample_noise(opt_circ, rng);
     run_circuit_without_noise(noise_circ, shots, state, initial_state, method, data, rng);
   }
   else if (noise.has_quantum_errors() == false) {
     // We can insert the readout errors from the noise model and then
     // execute the resulting circuit
-    Circuit noise_circ = noise.sample_noise(circ, rng);
+    Circuit noise_circ = noise.sample_noise(opt_circ, rng);
     run_circuit_without_noise(noise_circ, shots, state, initial_state, method, data, rng);
-  } else {
+  } else if (method != Method::stabilizer || !stabilizer_pauli_frame_sampling_ ||
+             !run_circuit_with_pauli_frames(opt_circ, noise, shots, data, rng)) {
     // Run sampling a noisy instance of the circuit for each shot
-    run_circuit_with_noise(circ, noise, shots, state, initial_state, data, rng);
+    run_circuit_with_noise(opt_circ, noise, shots, state, initial_state, data, rng);
   }
   return data;
 }
 
 
+template <class State_t>
+void QasmController::share_decomposition_cache(State_t &) const {}
+
+void QasmController::share_decomposition_cache(ExtendedStabilizer::State &state) const {
+  // The cached decomposition depends on the random numbers of the experiment
+  // that created it, so it is only shared if experiments and shots run
+  // one after another, to keep results reproducible for a fixed seed.
+  if (parallel_experiments_ == 1 && parallel_shots_ == 1) {
+    state.set_decomposition_cache(extended_stabilizer_cache_);
+  }
+}
+
 template <class State_t, class Initstate_t>
 void QasmController::run_single_shot(const Circuit &circ,
                                      State_t &state,
@@ -713,16 +990,67 @@ void QasmController::run_circuit_with_noise(const Circuit &circ,
                                             const Initstate_t &initial_state,
                                             ExperimentData &data,
                                             RngEngine &rng) const {
-  // Sample a new noise circuit and optimize for each shot
-  while(shots-- > 0) {
-    Circuit noise_circ = noise.sample_noise(circ, rng);
-    noise_circ.shots = 1;
-    if (noise_circ.num_qubits > circuit_opt_noise_threshold_) {
-      Noise::NoiseModel dummy;
-      optimize_circuit(noise_circ, dummy, state, data);
-    }
-    run_single_shot(noise_circ, state, initial_state, data, rng);
-  }     
+  // Look up the errors of each operation once, then sample a new noise
+  // circuit and optimize for each shot. The errors of a batch of shots
+  // are sampled together, with the batch size limited to bound the memory
+  // of the sampled error choices.
+  const auto errors = noise.compile_errors(circ);
+  const uint_t num_choices = errors.num_choices();
+  const uint_t batch_size = std::max<uint_t>(1, (1ULL << 20) / std::max<uint_t>(1, num_choices));
+  Transpile::FusionCache fusion_cache;
+  while (shots > 0) {
+    const uint_t batch_shots = std::min(shots, batch_size);
+    const auto choices = noise.sample_errors(errors, batch_shots, rng);
+    for (uint_t shot = 0; shot < batch_shots; ++shot) {
+      Circuit noise_circ = noise.sample_noise(circ, errors,
+                                              choices.cbegin() + shot * num_choices);
+      noise_circ.shots = 1;
+      if (noise_circ.num_qubits > circuit_opt_noise_threshold_) {
+        optimize_noise_circuit(noise_circ, state, fusion_cache, data);
+      }
+      run_single_shot(noise_circ, state, initial_state, data, rng);
+    }
+    shots -= batch_shots;
+  }
+  const uint_t lookups = fusion_cache.hits + fusion_cache.misses;
+  if (lookups > 0) {
+    json_t cache_data;
+    cache_data["hits"] = fusion_cache.hits;
+    cache_data["misses"] = fusion_cache.misses;
+    cache_data["hit_rate"] = double(fusion_cache.hits) / lookups;
+    data.add_metadata("fusion_cache", cache_data);
+  }
+}
+
+
+template <class State_t>
+void QasmController::optimize_noise_circuit(Circuit &circ,
+                                            State_t &state,
+                                            Transpile::FusionCache &fusion_cache,
+                                            ExperimentData &data) const {
+  Noise::NoiseModel dummy;
+  apply_optimizations(state, [&](Transpile::CircuitOptimization &opt,
+                                 const Operations::OpSet &allowed_opset) {
+    auto fusion = dynamic_cast<Transpile::Fusion*>(&opt);
+    if (fusion)
+      fusion->optimize_circuit(circ, dummy, allowed_opset, data, fusion_cache);
+    else
+      opt.optimize_circuit(circ, dummy, allowed_opset, data);
+  });
+}
+
+
+bool QasmController::run_circuit_with_pauli_frames(const Circuit &circ,
+                                                   const Noise::NoiseModel& noise,
+                                                   uint_t shots,
+                                                   ExperimentData &data,
+                                                   RngEngine &rng) const {
+  Stabilizer::PauliFrames frames;
+  if (!frames.initialize(circ, noise, rng))
+    return false;
+  frames.sample(shots, data, rng);
+  data.add_metadata("pauli_frame_sampling", true);
+  return true;
 }
 
 
@@ -762,6 +1090,7 @@ void QasmController::run_circuit_without_noise(const Circuit &circ,
     measure_sampler(ops, shots, state, data, rng);
     // Add measure sampling metadata
     data.add_metadata("measure_sampling", true);
+    state.add_sample_measure_metadata(data);
   }  
 }
 
@@ -867,13 +1196,12 @@ void QasmController::measure_sampler(const std::vector<Operations::Op> &meas_roe
   }
   
   // Process samples
-  // Convert opts to circuit so we can get the needed creg sizes
-  // NB: this function could probably be moved somewhere else like Utils or Ops
-  Circuit meas_circ(meas_roerror_ops);
+  // Start from the classical register of the state so that bits written
+  // before the first measurement are kept
   ClassicalRegister creg;
   while (!all_samples.empty()) {
     auto sample = all_samples.back();
-    creg.initialize(meas_circ.num_memory, meas_circ.num_registers);
+    creg = state.creg();
 
     // process memory bit measurements
     for (const auto &pair : memory_map) {
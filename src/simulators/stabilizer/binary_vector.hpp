@@ -90,6 +90,53 @@ inline bool operator==(const BinaryVector &lhs, const BinaryVector &rhs) {
   return lhs.isSame(rhs, true);
 }
 
+// Return the number of set bits in a 64-bit word
+inline uint64_t popcount(uint64_t x) {
+#if defined(__GNUC__) || defined(__clang__)
+  return __builtin_popcountll(x);
+#else
+  x = x - ((x >> 1) & 0x5555555555555555ULL);
+  x = (x & 0x3333333333333333ULL) + ((x >> 2) & 0x3333333333333333ULL);
+  x = (x + (x >> 4)) & 0x0F0F0F0F0F0F0F0FULL;
+  return (x * 0x0101010101010101ULL) >> 56;
+#endif
+}
+
+// Return the parity (popcount mod 2) of a 64-bit word
+inline uint64_t parity(uint64_t x) {
+#if defined(__GNUC__) || defined(__clang__)
+  return __builtin_parityll(x);
+#else
+  return popcount(x) & 1ULL;
+#endif
+}
+
+// Return the position of the lowest set bit of a non-zero 64-bit word
+inline uint64_t lowest_bit(uint64_t x) {
+#if defined(__GNUC__) || defined(__clang__)
+  return __builtin_ctzll(x);
+#else
+  uint64_t pos = 0;
+  while ((x & 1ULL) == 0) {
+    x >>= 1;
+    pos++;
+  }
+  return pos;
+#endif
+}
+
+// Return the inclusive prefix parity of a 64-bit word: bit j of the result is
+// the parity of bits 0, ..., j of the input
+inline uint64_t prefix_parity(uint64_t x) {
+  x ^= x << 1;
+  x ^= x << 2;
+  x ^= x << 4;
+  x ^= x << 8;
+  x ^= x << 16;
+  x ^= x << 32;
+  return x;
+}
+
 
 inline int64_t gauss_eliminate(std::vector<BinaryVector> &M,
                                const int64_t start_col = 0)
@@ -24,12 +24,17 @@ namespace Clifford {
  *
  * Clifford Class
  *
+ * The tableau is stored column-major and bit-packed: for each qubit q the
+ * X and Z bits of all 2n rows (n destabilizers followed by n stabilizers)
+ * are packed into 64-bit words, as are the row phases. A Clifford gate
+ * therefore updates 64 rows of the tableau with each word operation, and
+ * measurement row-sums are applied to all affected rows at once with the
+ * phases computed from bit-sliced counters and popcounts.
+ *
  ******************************************************************************/
 
 class Clifford {
 public:
-  using phase_t = int8_t;
-  using phasevec_t = std::vector<phase_t>;
 
   //-----------------------------------------------------------------------
   // Constructors and Destructor
@@ -50,26 +55,21 @@ public:
   // Return JSON serialization of QubitVector;
   json_t json() const;
 
-  // Access stabilizer table
-  Pauli::Pauli &operator[](uint64_t j) {return table_[j];}
-  const Pauli::Pauli& operator[](uint64_t j) const {return table_[j];}
+  // Return the j-th row of the table as a Pauli (rows 0, ..., n-1 are the
+  // destabilizers and rows n, ..., 2n-1 are the stabilizers)
+  Pauli::Pauli row(uint64_t j) const;
 
-  // Return reference to internal Stabilizer table
-  std::vector<Pauli::Pauli>& table() {return table_;}
-  const std::vector<Pauli::Pauli>& table() const {return table_;}
+  // Return the phase bit (0 for +1, 1 for -1) of the j-th row of the table
+  bool phase(uint64_t j) const {return get_bit(phases_.data(), j);}
 
-  // Return reference to internal phases vector
-  phasevec_t& phases() {return phases_;}
-  const phasevec_t& phases() const {return phases_;}
+  // Set the j-th row of the table and its phase bit
+  void set_row(uint64_t j, const Pauli::Pauli &pauli, bool phase);
 
   // Return n-th destabilizer from internal stabilizer table
-  Pauli::Pauli &destabilizer(uint64_t n) {return table_[n];}
-  const Pauli::Pauli& destabilizer(uint64_t n) const {return table_[n];}
+  Pauli::Pauli destabilizer(uint64_t n) const {return row(n);}
 
   // Return n-th stabilizer from internal stabilizer table
-  Pauli::Pauli &stabilizer(uint64_t n) {return table_[num_qubits_ + n];}
-  const Pauli::Pauli& stabilizer(uint64_t n) const {return table_[num_qubits_ + n];}
-
+  Pauli::Pauli stabilizer(uint64_t n) const {return row(num_qubits_ + n);}
 
   //-----------------------------------------------------------------------
   // Apply basic Clifford gates
@@ -106,10 +106,28 @@ public:
   // the outcome was random.
   bool measure_and_update(const uint64_t qubit, const uint64_t randint);
 
+  // Measure each qubit in `qubits` in order, choosing outcome 0 whenever
+  // the outcome is random, and return these reference outcomes. For each
+  // random outcome the list of measurement positions whose outcomes flip
+  // when outcome 1 is chosen instead is appended to `flips`. Every outcome
+  // of the measurement is the reference XOR a uniformly random subset of
+  // the flips. The table is left in the reference post-measurement state.
+  std::vector<uint64_t> measure_reference(const std::vector<uint64_t> &qubits,
+                                          std::vector<std::vector<uint64_t>> &flips);
+
   // Return 1 or -1: the expectation value of observable Z on all
-  // the qubits in the parameter `qubits`
+  // the qubits in the parameter `qubits`, or 0 if it is not
+  // in the stabilizer group (up to sign).
   int64_t expectation_value(const std::vector<uint64_t>& qubits);
 
+  // Return 1 or -1: the expectation value of a Pauli observable on all
+  // qubits, or 0 if it is not in the stabilizer group (up to sign).
+  int64_t expectation_value(const Pauli::Pauli &pauli) const;
+
+  // Return the expectation values of a list of Pauli observables on all
+  // qubits. The table is only read, so observables are evaluated in parallel.
+  std::vector<int64_t> expectation_values(const std::vector<Pauli::Pauli> &paulis) const;
+
   //-----------------------------------------------------------------------
   // Configuration settings
   //-----------------------------------------------------------------------
@@ -139,9 +157,11 @@ private:
   // Protected data members
   //-----------------------------------------------------------------------
 
-  std::vector<Pauli::Pauli> table_;
-  phasevec_t phases_;
   uint64_t num_qubits_ = 0;
+  uint64_t num_words_ = 0;        // Number of 64-bit words per table column
+  std::vector<uint64_t> x_;       // X bits: column q is x_[q * num_words_ + w]
+  std::vector<uint64_t> z_;       // Z bits: column q is z_[q * num_words_ + w]
+  std::vector<uint64_t> phases_;  // Packed row phase bits
 
   //-----------------------------------------------------------------------
   // Config settings
@@ -156,16 +176,44 @@ private:
   // Helper functions
   //-----------------------------------------------------------------------
 
-  // Check if there exists stabilizer or destabilizer row anticommuting
-  // with Z[qubit]. If so return pair (true, row), else return (false, 0)
+  // Return pointers to the packed X or Z column for a qubit
+  uint64_t* x_column(uint64_t qubit) {return x_.data() + qubit * num_words_;}
+  const uint64_t* x_column(uint64_t qubit) const {return x_.data() + qubit * num_words_;}
+  uint64_t* z_column(uint64_t qubit) {return z_.data() + qubit * num_words_;}
+  const uint64_t* z_column(uint64_t qubit) const {return z_.data() + qubit * num_words_;}
+
+  // Get and set a single row bit in a packed column
+  static bool get_bit(const uint64_t *column, uint64_t row) {
+    return (column[row >> 6] >> (row & 63)) & 1ULL;
+  }
+  static void set_bit(uint64_t *column, uint64_t row, bool value) {
+    const uint64_t mask = 1ULL << (row & 63);
+    if (value)
+      column[row >> 6] |= mask;
+    else
+      column[row >> 6] &= ~mask;
+  }
+
+  // Check if there exists stabilizer row anticommuting with Z[qubit].
+  // If so return pair (true, row), else return (false, 0)
   std::pair<bool, uint64_t> z_anticommuting(const uint64_t qubit) const;
 
-  // Check if there exists stabilizer or destabilizer row anticommuting
-  // with X[qubit]. If so return pair (true, row), else return (false, 0)
-  std::pair<bool, uint64_t> x_anticommuting(const uint64_t qubit) const;
+  // Return the packed selection of stabilizer rows n + j for every
+  // destabilizer row j < n set in the packed row selection `destabs`
+  std::vector<uint64_t> paired_stabilizers(const std::vector<uint64_t> &destabs) const;
 
-  void rowsum_helper(const Pauli::Pauli &row, const phase_t row_phase,
-                     Pauli::Pauli &accum, phase_t &accum_phase) const;
+  // Multiply row `row` into every row in the packed row selection `rows`,
+  // which must not contain `row` itself
+  void rowsum(const uint64_t row, const std::vector<uint64_t> &rows);
+
+  // Return the exponent g (mod 4) of the product of all rows in the packed
+  // row selection `rows` (including their phases), written as i^g P
+  int64_t product_phase_exponent(const std::vector<uint64_t> &rows) const;
+
+  // Return the exponent g (mod 4) of the product of stabilizer rows equal
+  // to i^g times the Pauli observable, or -1 if a stabilizer row
+  // anticommutes with it
+  int64_t pauli_phase_exponent(const Pauli::Pauli &pauli) const;
 };
 
 /*******************************************************************************
@@ -196,24 +244,45 @@ void Clifford::set_omp_threshold(int n) {
 // Constructors & Destructor
 //------------------------------------------------------------------------------
 
-Clifford::Clifford(uint64_t nq) : num_qubits_(nq) {
+Clifford::Clifford(uint64_t nq)
+  : num_qubits_(nq),
+    num_words_((2 * nq + 63) / 64),
+    x_(nq * num_words_, 0ULL),
+    z_(nq * num_words_, 0ULL),
+    phases_(num_words_, 0ULL) {
   // initial state = all zeros
-  // add destabilizers
-  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(nq); i++) {
-    Pauli::Pauli P(nq);
-    P.X.setValue(1, i);
-    table_.push_back(P);
+  for (uint64_t i = 0; i < nq; i++) {
+    // destabilizer X_i
+    set_bit(x_column(i), i, true);
+    // stabilizer Z_i
+    set_bit(z_column(i), nq + i, true);
   }
-  // add stabilizers
-  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(nq); i++) {
-    Pauli::Pauli P(nq);
-    P.Z.setValue(1, i);
-    table_.push_back(P);
+}
+
+//------------------------------------------------------------------------------
+// Rows
+//------------------------------------------------------------------------------
+
+Pauli::Pauli Clifford::row(uint64_t j) const {
+  Pauli::Pauli P(num_qubits_);
+  for (uint64_t q = 0; q < num_qubits_; q++) {
+    if (get_bit(x_column(q), j))
+      P.X.set1(q);
+    if (get_bit(z_column(q), j))
+      P.Z.set1(q);
   }
-  // Add phases
-  phases_.resize(2 * nq);
+  return P;
+}
+
+void Clifford::set_row(uint64_t j, const Pauli::Pauli &pauli, bool phase) {
+  if (pauli.X.getLength() != num_qubits_ || pauli.Z.getLength() != num_qubits_) {
+    throw std::invalid_argument("Clifford::set_row: Pauli does not match qubit number.");
+  }
+  for (uint64_t q = 0; q < num_qubits_; q++) {
+    set_bit(x_column(q), j, pauli.X[q]);
+    set_bit(z_column(q), j, pauli.Z[q]);
+  }
+  set_bit(phases_.data(), j, phase);
 }
 
 //------------------------------------------------------------------------------
@@ -221,50 +290,59 @@ Clifford::Clifford(uint64_t nq) : num_qubits_(nq) {
 //------------------------------------------------------------------------------
 
 void Clifford::append_cx(const uint64_t qcon, const uint64_t qtar) {
+  uint64_t *xc = x_column(qcon);
+  uint64_t *zc = z_column(qcon);
+  uint64_t *xt = x_column(qtar);
+  uint64_t *zt = z_column(qtar);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++) {
-    phases_[i] ^= (table_[i].X[qcon] && table_[i].Z[qtar] &&
-                  (table_[i].X[qtar] ^ table_[i].Z[qcon] ^ 1));
-    table_[i].X.setValue(table_[i].X[qtar] ^ table_[i].X[qcon], qtar);
-    table_[i].Z.setValue(table_[i].Z[qtar] ^ table_[i].Z[qcon], qcon);
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++) {
+    phases_[w] ^= xc[w] & zt[w] & ~(xt[w] ^ zc[w]);
+    xt[w] ^= xc[w];
+    zc[w] ^= zt[w];
   }
 }
 
 void Clifford::append_h(const uint64_t qubit) {
+  uint64_t *x = x_column(qubit);
+  uint64_t *z = z_column(qubit);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++) {
-    phases_[i] ^= (table_[i].X[qubit] && table_[i].Z[qubit]);
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++) {
+    phases_[w] ^= x[w] & z[w];
     // exchange X and Z
-    bool b = table_[i].X[qubit];
-    table_[i].X.setValue(table_[i].Z[qubit], qubit);
-    table_[i].Z.setValue(b, qubit);
+    std::swap(x[w], z[w]);
   }
 }
 
 void Clifford::append_s(const uint64_t qubit) {
+  const uint64_t *x = x_column(qubit);
+  uint64_t *z = z_column(qubit);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++) {
-    phases_[i] ^= (table_[i].X[qubit] && table_[i].Z[qubit]);
-    table_[i].Z.setValue(table_[i].Z[qubit] ^ table_[i].X[qubit], qubit);
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++) {
+    phases_[w] ^= x[w] & z[w];
+    z[w] ^= x[w];
   }
 }
 
 void Clifford::append_x(const uint64_t qubit) {
+  const uint64_t *z = z_column(qubit);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++)
-    phases_[i] ^= table_[i].Z[qubit];
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++)
+    phases_[w] ^= z[w];
 }
 
 void Clifford::append_y(const uint64_t qubit) {
+  const uint64_t *x = x_column(qubit);
+  const uint64_t *z = z_column(qubit);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++)
-    phases_[i] ^= (table_[i].Z[qubit] ^ table_[i].X[qubit]);
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++)
+    phases_[w] ^= x[w] ^ z[w];
 }
 
 void Clifford::append_z(const uint64_t qubit) {
+  const uint64_t *x = x_column(qubit);
   #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
-  for (int64_t i = 0; i < static_cast<int64_t>(2 * num_qubits_); i++)
-    phases_[i] ^= table_[i].X[qubit];
+  for (int64_t w = 0; w < static_cast<int64_t>(num_words_); w++)
+    phases_[w] ^= x[w];
 }
 
 
@@ -273,20 +351,174 @@ void Clifford::append_z(const uint64_t qubit) {
 //------------------------------------------------------------------------------
 
 std::pair<bool, uint64_t> Clifford::z_anticommuting(const uint64_t qubit) const {
-  for (uint64_t p = num_qubits_; p < 2 * num_qubits_; p++) {
-    if (table_[p].X[qubit])
-      return std::make_pair(true, p);
+  // Search the stabilizer rows n, ..., 2n-1 of the X column of the qubit
+  const uint64_t *x = x_column(qubit);
+  const uint64_t first = num_qubits_ >> 6;
+  for (uint64_t w = first; w < num_words_; w++) {
+    uint64_t word = x[w];
+    if (w == first)
+      word &= (~0ULL) << (num_qubits_ & 63);
+    if (word)
+      return std::make_pair(true, (w << 6) + BV::lowest_bit(word));
   }
   return std::make_pair(false, 0);
 }
 
+std::vector<uint64_t> Clifford::paired_stabilizers(const std::vector<uint64_t> &destabs) const {
+  // Shift the destabilizer rows 0, ..., n-1 of the selection by n rows
+  std::vector<uint64_t> stabs(num_words_, 0ULL);
+  const uint64_t word_shift = num_qubits_ >> 6;
+  const uint64_t bit_shift = num_qubits_ & 63;
+  const uint64_t destab_words = (num_qubits_ + 63) >> 6;
+  for (uint64_t w = 0; w < destab_words; w++) {
+    uint64_t word = destabs[w];
+    if (w == destab_words - 1 && (num_qubits_ & 63))
+      word &= (1ULL << (num_qubits_ & 63)) - 1;
+    if (word == 0)
+      continue;
+    stabs[w + word_shift] |= word << bit_shift;
+    if (bit_shift && w + word_shift + 1 < num_words_)
+      stabs[w + word_shift + 1] |= word >> (64 - bit_shift);
+  }
+  return stabs;
+}
 
-std::pair<bool, uint64_t> Clifford::x_anticommuting(const uint64_t qubit) const {
-  for (uint64_t p = num_qubits_; p < 2 * num_qubits_; p++) {
-    if (table_[p].Z[qubit])
-      return std::make_pair(true, p);
+void Clifford::rowsum(const uint64_t row, const std::vector<uint64_t> &rows) {
+  // Only the qubits on which the source row acts non-trivially contribute.
+  // For each such qubit the single-qubit product P_row P_r contributes a
+  // phase i^{+1}, i^{-1} or 1 for each target row r, which is accumulated
+  // for 64 rows at once in a bit-sliced 2-bit counter (lo, hi).
+  std::vector<uint64_t> qubits;
+  std::vector<uint8_t> types; // 1 = X, 2 = Z, 3 = Y
+  for (uint64_t q = 0; q < num_qubits_; q++) {
+    const uint8_t type = get_bit(x_column(q), row) | (get_bit(z_column(q), row) << 1);
+    if (type) {
+      qubits.push_back(q);
+      types.push_back(type);
+    }
+  }
+  // Packed words containing target rows
+  std::vector<uint64_t> words;
+  for (uint64_t w = 0; w < num_words_; w++) {
+    if (rows[w])
+      words.push_back(w);
+  }
+  const int64_t num_words = words.size();
+  std::vector<uint64_t> lo(num_words, 0ULL), hi(num_words, 0ULL);
+
+  for (size_t k = 0; k < qubits.size(); k++) {
+    uint64_t *xcol = x_column(qubits[k]);
+    uint64_t *zcol = z_column(qubits[k]);
+    const auto type = types[k];
+    #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+    for (int64_t j = 0; j < num_words; j++) {
+      const auto w = words[j];
+      const uint64_t sel = rows[w];
+      const uint64_t x = xcol[w] & sel;
+      const uint64_t z = zcol[w] & sel;
+      uint64_t plus, minus;
+      switch (type) {
+        case 1: // X P_r
+          plus = x & z;
+          minus = z & ~x;
+          xcol[w] ^= sel;
+          break;
+        case 2: // Z P_r
+          plus = x & ~z;
+          minus = x & z;
+          zcol[w] ^= sel;
+          break;
+        default: // Y P_r
+          plus = z & ~x;
+          minus = x & ~z;
+          xcol[w] ^= sel;
+          zcol[w] ^= sel;
+      }
+      // Add 1 (mod 4) on plus rows and subtract 1 (mod 4) on minus rows
+      hi[j] ^= lo[j] & plus;
+      lo[j] ^= plus;
+      hi[j] ^= ~lo[j] & minus;
+      lo[j] ^= minus;
+    }
+  }
+
+  // Since we are only using +1 and -1 phases in our Clifford phases
+  // the exponent must be 0 (for +1) or 2 (for -1)
+  const uint64_t row_phase = get_bit(phases_.data(), row) ? ~0ULL : 0ULL;
+  for (int64_t j = 0; j < num_words; j++) {
+    if (lo[j]) {
+      throw std::runtime_error("Clifford: rowsum error");
+    }
+    phases_[words[j]] ^= hi[j] ^ (row_phase & rows[words[j]]);
   }
-  return std::make_pair(false, 0);
+}
+
+int64_t Clifford::product_phase_exponent(const std::vector<uint64_t> &rows) const {
+  // Write each row as i^{x.z} X^x Z^z. On a single qubit the ordered product
+  // of rows r_1 < r_2 < ... is then
+  //   i^{sum_a x_a z_a} (-1)^{sum_{a<b} z_a x_b} i^{-x z} P(x, z)
+  // with x, z the parities of the X and Z bits, and the cross term is
+  // evaluated word by word from prefix parities of the Z bits.
+  int64_t exponent = 0;
+  for (uint64_t w = 0; w < num_words_; w++)
+    exponent += 2 * BV::popcount(phases_[w] & rows[w]);
+
+  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_) reduction(+:exponent)
+  for (int64_t q = 0; q < static_cast<int64_t>(num_qubits_); q++) {
+    const uint64_t *xcol = x_column(q);
+    const uint64_t *zcol = z_column(q);
+    uint64_t xz = 0, cross = 0, xpar = 0, zpar = 0;
+    for (uint64_t w = 0; w < num_words_; w++) {
+      const uint64_t sel = rows[w];
+      if (sel == 0)
+        continue;
+      const uint64_t x = xcol[w] & sel;
+      const uint64_t z = zcol[w] & sel;
+      if ((x | z) == 0)
+        continue;
+      xz += BV::popcount(x & z);
+      const uint64_t zprev = (BV::prefix_parity(z) << 1) ^ (zpar ? ~0ULL : 0ULL);
+      cross ^= BV::parity(x & zprev);
+      xpar ^= BV::parity(x);
+      zpar ^= BV::parity(z);
+    }
+    exponent += xz + 2 * cross + 3 * (xpar & zpar);
+  }
+  return exponent % 4;
+}
+
+int64_t Clifford::pauli_phase_exponent(const Pauli::Pauli &pauli) const {
+  // Compute the anticommutation of every row with the Pauli, which is the
+  // symplectic product of the row with (x, z): the sum of the X column of
+  // each qubit with z = 1 and the Z column of each qubit with x = 1
+  std::vector<uint64_t> anticom(num_words_, 0ULL);
+  for (uint64_t qubit = 0; qubit < num_qubits_; qubit++) {
+    if (pauli.Z[qubit]) {
+      const uint64_t *x = x_column(qubit);
+      for (uint64_t w = 0; w < num_words_; w++)
+        anticom[w] ^= x[w];
+    }
+    if (pauli.X[qubit]) {
+      const uint64_t *z = z_column(qubit);
+      for (uint64_t w = 0; w < num_words_; w++)
+        anticom[w] ^= z[w];
+    }
+  }
+
+  // Check if there is a stabilizer row that anti-commutes with the Pauli
+  const uint64_t first = num_qubits_ >> 6;
+  for (uint64_t w = first; w < num_words_; w++) {
+    uint64_t word = anticom[w];
+    if (w == first)
+      word &= (~0ULL) << (num_qubits_ & 63);
+    if (word)
+      return -1;
+  }
+
+  // Otherwise the Pauli is the product of the stabilizers paired with the
+  // destabilizers it anticommutes with, up to a phase. The product is
+  // written as i^g P(x, z) where P(1, 1) = Y, which matches the labels.
+  return product_phase_exponent(paired_stabilizers(anticom));
 }
 
 //------------------------------------------------------------------------------
@@ -307,78 +539,99 @@ bool Clifford::measure_and_update(const uint64_t qubit, const uint64_t randint)
   auto anticom = z_anticommuting(qubit);
   if (anticom.first) {
     bool outcome = (randint == 1);
-    auto row = anticom.second;
-    for (uint64_t i = 0; i < 2 * num_qubits_; i++) {
-      // the last condition is not in the AG paper but we seem to need it
-      if ((table_[i].X[qubit]) && (i != row) && (i != (row - num_qubits_))) {
-        rowsum_helper(table_[row], phases_[row], table_[i], phases_[i]);
-      }
-    }
+    const auto row = anticom.second;
+    const auto destab = row - num_qubits_;
+    // Multiply the anticommuting row into every other row anticommuting
+    // with Z[qubit] except its paired destabilizer
+    const uint64_t *xq = x_column(qubit);
+    std::vector<uint64_t> rows(xq, xq + num_words_);
+    set_bit(rows.data(), row, false);
+    set_bit(rows.data(), destab, false);
+    rowsum(row, rows);
     // Update state
-    table_[row - num_qubits_].X = table_[row].X;
-    table_[row - num_qubits_].Z = table_[row].Z;
-    phases_[row - num_qubits_] = phases_[row];
-    table_[row].X.makeZero();
-    table_[row].Z.makeZero();
-    table_[row].Z.setValue(1, qubit);
-    phases_[row] = outcome;
+    for (uint64_t q = 0; q < num_qubits_; q++) {
+      uint64_t *x = x_column(q);
+      uint64_t *z = z_column(q);
+      set_bit(x, destab, get_bit(x, row));
+      set_bit(z, destab, get_bit(z, row));
+      set_bit(x, row, false);
+      set_bit(z, row, (q == qubit));
+    }
+    set_bit(phases_.data(), destab, get_bit(phases_.data(), row));
+    set_bit(phases_.data(), row, outcome);
     return outcome;
   } else {
-    // Deterministic outcome
-    Pauli::Pauli accum(num_qubits_);
-    phase_t outcome = 0;
-    for (uint64_t i = 0; i < num_qubits_; i++) {
-      if (table_[i].X[qubit]) {
-        rowsum_helper(table_[i + num_qubits_], phases_[i + num_qubits_],
-                      accum, outcome);
-      }
+    // Deterministic outcome: Z[qubit] is (up to sign) the product of the
+    // stabilizers paired with the destabilizers anticommuting with it
+    const uint64_t *xq = x_column(qubit);
+    const auto exponent = product_phase_exponent(
+      paired_stabilizers(std::vector<uint64_t>(xq, xq + num_words_)));
+    if (exponent % 2) {
+      throw std::runtime_error("Clifford: rowsum error");
     }
-    return outcome;
+    return (exponent == 2);
   }
 }
 
-int64_t Clifford::expectation_value(const std::vector<uint64_t>& qubits) {
-  // Check if there is a row that anti-commutes with an odd number of qubits
-  // If so expectation value is 0
-  for (uint64_t p = num_qubits_; p < 2 * num_qubits_; p++) {
-    uint64_t num_of_x = 0;
-    for (auto qubit : qubits) {
-      if (table_[p].X[qubit])
-	num_of_x ++;
-    }
-    if(num_of_x % 2 == 1)
-      return 0;
-  }
-
-  // Otherwise the expectation value is +1 or -1
-  uint64_t sum_of_outcomes = 0;
-  for (auto qubit : qubits) {
-    Pauli::Pauli accum(num_qubits_);
-    phase_t outcome = 0;
-    for (uint64_t i = 0; i < num_qubits_; i++) {
-      if (table_[i].X[qubit]) {
-        rowsum_helper(table_[i + num_qubits_], phases_[i + num_qubits_],
-                      accum, outcome);
+std::vector<uint64_t> Clifford::measure_reference(const std::vector<uint64_t> &qubits,
+                                                  std::vector<std::vector<uint64_t>> &flips) {
+  std::vector<uint64_t> reference;
+  reference.reserve(qubits.size());
+  for (uint64_t i = 0; i < qubits.size(); i++) {
+    auto anticom = z_anticommuting(qubits[i]);
+    if (anticom.first) {
+      // Outcome 1 differs from outcome 0 by the anticommuting row, which
+      // becomes the destabilizer of Z[qubit]. As a Pauli frame it flips
+      // every later outcome whose qubit it has an X component on.
+      std::vector<uint64_t> flip;
+      for (uint64_t j = i; j < qubits.size(); j++) {
+        if (get_bit(x_column(qubits[j]), anticom.second))
+          flip.push_back(j);
       }
+      flips.push_back(flip);
     }
-    sum_of_outcomes += outcome;
+    reference.push_back(measure_and_update(qubits[i], 0));
   }
+  return reference;
+}
 
-  return (sum_of_outcomes % 2 == 0) ? 1 : -1;
+int64_t Clifford::expectation_value(const std::vector<uint64_t>& qubits) {
+  Pauli::Pauli pauli(num_qubits_);
+  for (const auto qubit : qubits)
+    pauli.Z.flipAt(qubit);
+  return expectation_value(pauli);
 }
 
-void Clifford::rowsum_helper(const Pauli::Pauli &row, const phase_t row_phase,
-                             Pauli::Pauli &accum, phase_t &accum_phase) const {
-  int8_t newr = ((2 * row_phase + 2 * accum_phase) +
-                 Pauli::Pauli::phase_exponent(row, accum)) % 4;
-  // Since we are only using +1 and -1 phases in our Clifford phases
-  // the exponent must be 0 (for +1) or 2 (for -1)
-  if ((newr != 0) && (newr != 2)) {
-    throw std::runtime_error("Clifford: rowsum error");
+int64_t Clifford::expectation_value(const Pauli::Pauli &pauli) const {
+  return expectation_values(std::vector<Pauli::Pauli>({pauli}))[0];
+}
+
+std::vector<int64_t> Clifford::expectation_values(const std::vector<Pauli::Pauli> &paulis) const {
+  for (const auto &pauli : paulis) {
+    if (pauli.X.getLength() != num_qubits_ || pauli.Z.getLength() != num_qubits_) {
+      throw std::invalid_argument("Clifford::expectation_values: Pauli length does not "
+                                  "match the number of qubits.");
+    }
+  }
+  const int64_t size = paulis.size();
+  std::vector<int64_t> exponents(size);
+  #pragma omp parallel for if (size > 1 && size * num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  for (int64_t j = 0; j < size; j++)
+    exponents[j] = pauli_phase_exponent(paulis[j]);
+
+  // The expectation value is 0 if a stabilizer anticommutes with the
+  // Pauli, otherwise the Pauli is +1 or -1 times a stabilizer
+  std::vector<int64_t> expvals(size);
+  for (int64_t j = 0; j < size; j++) {
+    if (exponents[j] < 0) {
+      expvals[j] = 0;
+    } else if (exponents[j] % 2) {
+      throw std::runtime_error("Clifford: rowsum error");
+    } else {
+      expvals[j] = (exponents[j] == 0) ? 1 : -1;
+    }
   }
-  accum_phase = (newr == 2);
-  accum.X += row.X;
-  accum.Z += row.Z;
+  return expvals;
 }
 
 //------------------------------------------------------------------------------
@@ -391,13 +644,13 @@ json_t Clifford::json() const {
   json_t stab;
   for (size_t i = 0; i < num_qubits_; i++) {
     // Destabilizer
-    std::string label = (phases_[i] == 0) ? "" : "-";
-    label += table_[i].str();
+    std::string label = phase(i) ? "-" : "";
+    label += destabilizer(i).str();
     js["destabilizers"].push_back(label);
 
     // Stabilizer
-    label = (phases_[num_qubits_ + i] == 0) ? "" : "-";
-    label += table_[num_qubits_ + i].str();
+    label = phase(num_qubits_ + i) ? "-" : "";
+    label += stabilizer(i).str();
     js["stabilizers"].push_back(label);
   }
   return js;
@@ -407,6 +660,27 @@ inline void to_json(json_t &js, const Clifford &clif) {
   js = clif.json();
 }
 
+inline void set_row_from_label(Clifford &clif, uint64_t row,
+                               const std::string &label) {
+  const auto nq = clif.num_qubits();
+  switch (label[0]) {
+    case '-':
+      clif.set_row(row, Pauli::Pauli(label.substr(1, nq)), true);
+      break;
+    case '+':
+      clif.set_row(row, Pauli::Pauli(label.substr(1, nq)), false);
+      break;
+    case 'I':
+    case 'X':
+    case 'Y':
+    case 'Z':
+      clif.set_row(row, Pauli::Pauli(label), false);
+      break;
+    default:
+      throw std::invalid_argument("Invalid Stabilizer JSON string.");
+  }
+}
+
 inline void from_json(const json_t &js, Clifford &clif) {
   bool has_keys = JSON::check_keys({"stabilizers", "destabilizers"}, js);
   if (!has_keys)
@@ -421,45 +695,10 @@ inline void from_json(const json_t &js, Clifford &clif) {
 
   clif = Clifford(nq);
   for (size_t i = 0; i < nq; i++) {
-    std::string label;
     // Get destabilizer
-    label = destab[i];
-    switch (label[0]) {
-      case '-':
-        clif.phases()[i] = 1;
-        clif.table()[i] = Pauli::Pauli(label.substr(1, nq));
-        break;
-      case '+':
-        clif.table()[i] = Pauli::Pauli(label.substr(1, nq));
-        break;
-      case 'I':
-      case 'X':
-      case 'Y':
-      case 'Z':
-        clif.table()[i] = Pauli::Pauli(label);
-        break;
-      default:
-        throw std::invalid_argument("Invalid Stabilizer JSON string.");
-    }
+    set_row_from_label(clif, i, destab[i]);
     // Get stabilizer
-    label = stab[i];
-    switch (label[0]) {
-      case '-':
-        clif.phases()[i + nq] = 1;
-        clif.table()[i + nq] = Pauli::Pauli(label.substr(1, nq));
-        break;
-      case '+':
-        clif.table()[i + nq] = Pauli::Pauli(label.substr(1, nq));
-        break;
-      case 'I':
-      case 'X':
-      case 'Y':
-      case 'Z':
-        clif.table()[i + nq] = Pauli::Pauli(label);
-        break;
-      default:
-        throw std::invalid_argument("Invalid Stabilizer JSON string.");
-    }
+    set_row_from_label(clif, i + nq, stab[i]);
   }
 }
 
@@ -0,0 +1,541 @@
+/**
+ * This code is part of Qiskit.
+ *
+ * (C) Copyright IBM 2018, 2019.
+ *
+ * This code is licensed under the Apache License, Version 2.0. You may
+ * obtain a copy of this license in the LICENSE.txt file in the root directory
+ * of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+ *
+ * Any modifications or derivative works of this code must retain this
+ * copyright notice, and modified files need to carry a notice indicating
+ * that they have been altered from the originals.
+ */
+
+#ifndef _aer_stabilizer_pauli_frames_hpp
+#define _aer_stabilizer_pauli_frames_hpp
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <unordered_map>
+
+#include "framework/circuit.hpp"
+#include "framework/creg.hpp"
+#include "framework/rng.hpp"
+#include "framework/results/experiment_data.hpp"
+#include "noise/noise_model.hpp"
+#include "simulators/stabilizer/stabilizer_state.hpp"
+
+namespace AER {
+namespace Stabilizer {
+
+//============================================================================
+// Pauli frame sampler
+//============================================================================
+
+/**************************************************************************
+ * Samples shots of a Clifford circuit with Pauli, reset and readout noise
+ * from a single noise-free reference simulation.
+ *
+ * Each shot is represented by a Pauli frame: the Pauli operator that maps
+ * the reference state to the state of the noisy shot. Frames are
+ * propagated through the circuit by Clifford conjugation (phases are
+ * irrelevant for measurement outcomes) and stored bit-packed with one
+ * bit per shot, so a gate updates 64 shots with a single word operation
+ * and Pauli errors only flip the bits of the shots they occur in.
+ * The outcome of a measurement in a shot is the reference outcome XOR
+ * the X part of its frame. The Z parts of the frames are randomized at
+ * the start of the circuit and after every measurement and reset, which
+ * resamples the outcomes of measurements that are random in the
+ * reference simulation.
+ *
+ * Reset errors are only supported if the reference state of the reset
+ * qubits is a Z-eigenstate at that point, since only then does a reset
+ * act on a single shot as a Pauli.
+ **************************************************************************/
+
+class PauliFrames {
+public:
+  using NoiseOps = std::vector<Operations::Op>;
+
+  //-----------------------------------------------------------------------
+  // Sampling
+  //-----------------------------------------------------------------------
+
+  // Compile the circuit and noise model and run the reference simulation.
+  // Returns false if they cannot be simulated with Pauli frames.
+  // The RNG is only used to sample readout error instructions from the
+  // noise model, which does not consume random numbers.
+  bool initialize(const Circuit &circ,
+                  const Noise::NoiseModel &noise,
+                  RngEngine &rng);
+
+  // Sample shots of the initialized circuit and add the resulting
+  // counts, memory and register values to the output data
+  void sample(uint_t shots, ExperimentData &data, RngEngine &rng) const;
+
+  // Set the maximum number of shots whose frames are stored at once
+  void set_batch_shots(uint_t shots) {batch_shots_ = std::max<uint_t>(shots, 1);}
+
+protected:
+
+  //-----------------------------------------------------------------------
+  // Compiled circuit
+  //-----------------------------------------------------------------------
+
+  enum class InstructionType {gate, measure, reset, error, roerror};
+
+  struct Instruction {
+    InstructionType type = InstructionType::gate;
+    Gates gate = Gates::id;
+    Operations::Op op = {};    // gate, measure, reset or roerror operation
+    size_t pos = 0;            // measure: row of the first outcome,
+                               // error: position in errors_
+    reg_t qubits = {};         // error: qubits the error acts on
+    reg_t reset_values = {};   // error: reference Z-values of the qubits
+  };
+
+  // Pauli or reset error compiled from a QuantumError. Only circuits that
+  // act non-trivially are stored.
+  struct Error {
+    double probability = 0.;      // total probability of a non-identity circuit
+    rvector_t probabilities;      // conditional probabilities of the circuits
+    std::vector<NoiseOps> circuits;
+    reg_t reset_qubits;           // positions of reset qubits in the error
+  };
+
+  // Append a gate, measure or reset operation and apply it to the reference
+  bool add_operation(const Operations::Op &op, Clifford::Clifford &reference);
+
+  // Append a quantum error acting on qubits
+  bool add_error(const Noise::QuantumError &error,
+                 const reg_t &qubits,
+                 const Clifford::Clifford &reference);
+
+  // Compile a quantum error, returns false if it is not a Pauli or reset error
+  static bool compile_error(const Noise::QuantumError &error, Error &compiled);
+
+  // Apply an instruction to the frames of a batch of shots
+  void apply_gate(const Instruction &inst,
+                  std::vector<uint_t> &x,
+                  std::vector<uint_t> &z,
+                  uint_t num_words) const;
+
+  void apply_error(const Instruction &inst,
+                   std::vector<uint_t> &x,
+                   std::vector<uint_t> &z,
+                   uint_t num_shots,
+                   uint_t num_words,
+                   RngEngine &rng) const;
+
+  uint_t num_qubits_ = 0;
+  uint_t num_memory_ = 0;
+  uint_t num_registers_ = 0;
+
+  std::vector<Instruction> instructions_;
+
+  // Positions of measure and roerror instructions
+  std::vector<size_t> classical_;
+
+  std::vector<Error> errors_;
+  std::unordered_map<const Noise::QuantumError*, size_t> error_positions_;
+
+  // Reference outcome of each measured qubit
+  reg_t reference_;
+
+  // Maximum number of shots sampled at once
+  uint_t batch_shots_ = 1ULL << 16;
+};
+
+
+//============================================================================
+// Implementation: Initialization
+//============================================================================
+
+bool PauliFrames::initialize(const Circuit &circ,
+                             const Noise::NoiseModel &noise,
+                             RngEngine &rng) {
+  instructions_.clear();
+  classical_.clear();
+  errors_.clear();
+  error_positions_.clear();
+  reference_.clear();
+  num_qubits_ = circ.num_qubits;
+  num_memory_ = circ.num_memory;
+  num_registers_ = circ.num_registers;
+
+  if (noise.has_x90_gates())
+    return false;
+
+  Clifford::Clifford reference(num_qubits_);
+  for (const auto &op : circ.ops) {
+    if (op.conditional)
+      return false;
+    switch (op.type) {
+      case Operations::OpType::barrier:
+        break;
+      case Operations::OpType::roerror: {
+        Instruction inst{InstructionType::roerror};
+        inst.op = op;
+        classical_.push_back(instructions_.size());
+        instructions_.push_back(std::move(inst));
+        break;
+      }
+      case Operations::OpType::gate:
+      case Operations::OpType::measure:
+      case Operations::OpType::reset: {
+        // Errors are inserted in the same order as NoiseModel::sample_noise
+        const auto errors = noise.quantum_errors(op);
+        for (const auto &error : errors) {
+          if (!error.first->errors_after() &&
+              !add_error(*error.first, error.second, reference))
+            return false;
+        }
+        if (!add_operation(op, reference))
+          return false;
+        for (const auto &error : errors) {
+          if (error.first->errors_after() &&
+              !add_error(*error.first, error.second, reference))
+            return false;
+        }
+        if (op.type == Operations::OpType::measure) {
+          NoiseOps readout;
+          noise.sample_readout_noise(op, readout, rng);
+          for (const auto &ro : readout) {
+            Instruction inst{InstructionType::roerror};
+            inst.op = ro;
+            classical_.push_back(instructions_.size());
+            instructions_.push_back(std::move(inst));
+          }
+        }
+        break;
+      }
+      default:
+        // Snapshots, conditionals, noise switches and non-Clifford
+        // instructions require simulating each shot
+        return false;
+    }
+  }
+  return true;
+}
+
+
+bool PauliFrames::add_operation(const Operations::Op &op,
+                                Clifford::Clifford &reference) {
+  Instruction inst{InstructionType::gate};
+  inst.op = op;
+  switch (op.type) {
+    case Operations::OpType::gate: {
+      // Only gates supported by the stabilizer State are valid here
+      static const stringmap_t<Gates> gateset({
+        {"id", Gates::id}, {"x", Gates::x}, {"y", Gates::y},
+        {"z", Gates::z}, {"s", Gates::s}, {"sdg", Gates::sdg},
+        {"h", Gates::h}, {"CX", Gates::cx}, {"cx", Gates::cx},
+        {"cz", Gates::cz}, {"swap", Gates::swap}
+      });
+      auto it = gateset.find(op.name);
+      if (it == gateset.end())
+        return false;
+      inst.gate = it->second;
+      const auto &qubits = op.qubits;
+      switch (inst.gate) {
+        case Gates::id:
+          break;
+        case Gates::x:
+          reference.append_x(qubits[0]);
+          break;
+        case Gates::y:
+          reference.append_y(qubits[0]);
+          break;
+        case Gates::z:
+          reference.append_z(qubits[0]);
+          break;
+        case Gates::h:
+          reference.append_h(qubits[0]);
+          break;
+        case Gates::s:
+          reference.append_s(qubits[0]);
+          break;
+        case Gates::sdg:
+          reference.append_z(qubits[0]);
+          reference.append_s(qubits[0]);
+          break;
+        case Gates::cx:
+          reference.append_cx(qubits[0], qubits[1]);
+          break;
+        case Gates::cz:
+          reference.append_h(qubits[1]);
+          reference.append_cx(qubits[0], qubits[1]);
+          reference.append_h(qubits[1]);
+          break;
+        case Gates::swap:
+          reference.append_cx(qubits[0], qubits[1]);
+          reference.append_cx(qubits[1], qubits[0]);
+          reference.append_cx(qubits[0], qubits[1]);
+          break;
+      }
+      break;
+    }
+    case Operations::OpType::measure:
+      // Random reference outcomes are fixed to 0, the frames resample them
+      inst.type = InstructionType::measure;
+      inst.pos = reference_.size();
+      for (const auto &qubit : op.qubits)
+        reference_.push_back(reference.measure_and_update(qubit, 0));
+      classical_.push_back(instructions_.size());
+      break;
+    case Operations::OpType::reset:
+      inst.type = InstructionType::reset;
+      for (const auto &qubit : op.qubits) {
+        if (reference.measure_and_update(qubit, 0))
+          reference.append_x(qubit);
+      }
+      break;
+    default:
+      return false;
+  }
+  instructions_.push_back(std::move(inst));
+  return true;
+}
+
+
+bool PauliFrames::add_error(const Noise::QuantumError &error,
+                            const reg_t &qubits,
+                            const Clifford::Clifford &reference) {
+  auto it = error_positions_.find(&error);
+  if (it == error_positions_.end()) {
+    Error compiled;
+    if (!compile_error(error, compiled))
+      return false;
+    it = error_positions_.insert({&error, errors_.size()}).first;
+    errors_.push_back(std::move(compiled));
+  }
+  const auto &compiled = errors_[it->second];
+  if (compiled.circuits.empty())
+    return true;
+
+  Instruction inst{InstructionType::error};
+  inst.pos = it->second;
+  inst.qubits = qubits;
+  if (!compiled.reset_qubits.empty()) {
+    inst.reset_values.resize(qubits.size(), 0);
+    for (const auto &pos : compiled.reset_qubits) {
+      const auto qubit = qubits[pos];
+      if (!reference.is_deterministic_outcome(qubit))
+        return false;
+      // Measuring a deterministic outcome leaves the table unchanged
+      Clifford::Clifford copy = reference;
+      inst.reset_values[pos] = copy.measure_and_update(qubit, 0);
+    }
+  }
+  instructions_.push_back(std::move(inst));
+  return true;
+}
+
+
+bool PauliFrames::compile_error(const Noise::QuantumError &error,
+                                Error &compiled) {
+  const auto &circuits = error.circuits();
+  const auto &probabilities = error.probabilities();
+  std::vector<bool> reset(error.get_num_qubits(), false);
+  for (size_t j = 0; j < circuits.size(); j++) {
+    bool identity = true;
+    for (const auto &op : circuits[j]) {
+      if (op.type == Operations::OpType::reset) {
+        identity = false;
+        for (const auto &qubit : op.qubits)
+          reset[qubit] = true;
+      } else if (op.type == Operations::OpType::gate &&
+                 (op.name == "x" || op.name == "y" || op.name == "z")) {
+        identity = false;
+      } else if (!(op.type == Operations::OpType::gate && op.name == "id")) {
+        return false;
+      }
+    }
+    if (!identity && probabilities[j] > 0) {
+      compiled.probability += probabilities[j];
+      compiled.probabilities.push_back(probabilities[j]);
+      compiled.circuits.push_back(circuits[j]);
+    }
+  }
+  for (auto &p : compiled.probabilities)
+    p /= compiled.probability;
+  for (size_t q = 0; q < reset.size(); q++) {
+    if (reset[q])
+      compiled.reset_qubits.push_back(q);
+  }
+  return true;
+}
+
+
+//============================================================================
+// Implementation: Sampling
+//============================================================================
+
+void PauliFrames::sample(uint_t shots,
+                         ExperimentData &data,
+                         RngEngine &rng) const {
+  const uint_t max_word = std::numeric_limits<uint_t>::max();
+  ClassicalRegister creg;
+  while (shots > 0) {
+    const uint_t num_shots = std::min(shots, batch_shots_);
+    const uint_t num_words = (num_shots + 63) / 64;
+
+    // Frames start with random Z parts, which stabilize the initial state
+    std::vector<uint_t> x(num_qubits_ * num_words, 0ULL);
+    std::vector<uint_t> z(num_qubits_ * num_words);
+    for (auto &word : z)
+      word = rng.rand_int(uint_t(0), max_word);
+    std::vector<uint_t> outcomes(reference_.size() * num_words);
+
+    for (const auto &inst : instructions_) {
+      switch (inst.type) {
+        case InstructionType::gate:
+          apply_gate(inst, x, z, num_words);
+          break;
+        case InstructionType::measure:
+          for (size_t i = 0; i < inst.op.qubits.size(); i++) {
+            const uint_t qubit = inst.op.qubits[i];
+            const uint_t row = inst.pos + i;
+            const uint_t ref = reference_[row] ? max_word : 0ULL;
+            for (uint_t w = 0; w < num_words; w++) {
+              outcomes[row * num_words + w] = x[qubit * num_words + w] ^ ref;
+              z[qubit * num_words + w] = rng.rand_int(uint_t(0), max_word);
+            }
+          }
+          break;
+        case InstructionType::reset:
+          for (const auto &qubit : inst.op.qubits) {
+            for (uint_t w = 0; w < num_words; w++) {
+              x[qubit * num_words + w] = 0ULL;
+              z[qubit * num_words + w] = rng.rand_int(uint_t(0), max_word);
+            }
+          }
+          break;
+        case InstructionType::error:
+          apply_error(inst, x, z, num_shots, num_words, rng);
+          break;
+        case InstructionType::roerror:
+          break;
+      }
+    }
+
+    // Replay the classical instructions of each shot
+    for (uint_t shot = 0; shot < num_shots; shot++) {
+      creg.initialize(num_memory_, num_registers_);
+      const uint_t word = shot >> 6;
+      const uint_t bit = shot & 63ULL;
+      for (const auto &pos : classical_) {
+        const auto &inst = instructions_[pos];
+        if (inst.type == InstructionType::measure) {
+          reg_t outcome(inst.op.qubits.size());
+          for (size_t i = 0; i < outcome.size(); i++)
+            outcome[i] = (outcomes[(inst.pos + i) * num_words + word] >> bit) & 1ULL;
+          creg.store_measure(outcome, inst.op.memory, inst.op.registers);
+        } else {
+          creg.apply_roerror(inst.op, rng);
+        }
+      }
+      auto memory = creg.memory_hex();
+      data.add_memory_count(memory);
+      data.add_pershot_memory(memory);
+      data.add_pershot_register(creg.register_hex());
+    }
+    shots -= num_shots;
+  }
+}
+
+
+void PauliFrames::apply_gate(const Instruction &inst,
+                             std::vector<uint_t> &x,
+                             std::vector<uint_t> &z,
+                             uint_t num_words) const {
+  // Conjugation of the frames ignores Pauli phases so Pauli gates act
+  // trivially and S and Sdg are the same map
+  const auto &qubits = inst.op.qubits;
+  const uint_t a = qubits[0] * num_words;
+  switch (inst.gate) {
+    case Gates::h:
+      std::swap_ranges(x.begin() + a, x.begin() + a + num_words, z.begin() + a);
+      break;
+    case Gates::s:
+    case Gates::sdg:
+      for (uint_t w = 0; w < num_words; w++)
+        z[a + w] ^= x[a + w];
+      break;
+    case Gates::cx: {
+      const uint_t b = qubits[1] * num_words;
+      for (uint_t w = 0; w < num_words; w++) {
+        x[b + w] ^= x[a + w];
+        z[a + w] ^= z[b + w];
+      }
+      break;
+    }
+    case Gates::cz: {
+      const uint_t b = qubits[1] * num_words;
+      for (uint_t w = 0; w < num_words; w++) {
+        z[a + w] ^= x[b + w];
+        z[b + w] ^= x[a + w];
+      }
+      break;
+    }
+    case Gates::swap: {
+      const uint_t b = qubits[1] * num_words;
+      std::swap_ranges(x.begin() + a, x.begin() + a + num_words, x.begin() + b);
+      std::swap_ranges(z.begin() + a, z.begin() + a + num_words, z.begin() + b);
+      break;
+    }
+    default:
+      break;
+  }
+}
+
+
+void PauliFrames::apply_error(const Instruction &inst,
+                              std::vector<uint_t> &x,
+                              std::vector<uint_t> &z,
+                              uint_t num_shots,
+                              uint_t num_words,
+                              RngEngine &rng) const {
+  const auto &error = errors_[inst.pos];
+  // Shots with a non-identity error are found by sampling the geometric
+  // distribution of the gaps between them
+  const bool always = (error.probability >= 1.);
+  const double log_q = always ? 0. : std::log1p(-error.probability);
+  double next = -1.;
+  while (true) {
+    next += always ? 1. : 1. + std::floor(std::log(1. - rng.rand()) / log_q);
+    if (next >= static_cast<double>(num_shots))
+      break;
+    const uint_t shot = static_cast<uint_t>(next);
+    const uint_t word = shot >> 6;
+    const uint_t mask = 1ULL << (shot & 63ULL);
+    const auto &circuit = (error.circuits.size() == 1)
+      ? error.circuits[0]
+      : error.circuits[rng.rand_int(error.probabilities)];
+    for (const auto &op : circuit) {
+      for (const auto &pos : op.qubits) {
+        const uint_t i = inst.qubits[pos] * num_words + word;
+        if (op.type == Operations::OpType::reset) {
+          // The shot value of a reset qubit is the reference value XOR
+          // its frame, so the frame is set to the reference value
+          x[i] = inst.reset_values[pos] ? (x[i] | mask) : (x[i] & ~mask);
+        } else if (op.name == "x") {
+          x[i] ^= mask;
+        } else if (op.name == "y") {
+          x[i] ^= mask;
+          z[i] ^= mask;
+        } else if (op.name == "z") {
+          z[i] ^= mask;
+        }
+      }
+    }
+  }
+}
+
+//------------------------------------------------------------------------------
+} // end namespace Stabilizer
+} // end namespace AER
+//------------------------------------------------------------------------------
+#endif
@@ -15,6 +15,8 @@
 #ifndef _aer_stabilizer_state_hpp
 #define _aer_stabilizer_state_hpp
 
+#include <limits>
+
 #include "framework/utils.hpp"
 #include "framework/json.hpp"
 #include "base/state.hpp"
@@ -238,6 +240,8 @@ const stringmap_t<Snapshots> State::snapshotset_({
 
 void State::initialize_qreg(uint_t num_qubits) {
   BaseState::qreg_ = Clifford::Clifford(num_qubits);
+  if (BaseState::threads_ > 0)
+    BaseState::qreg_.set_omp_threads(BaseState::threads_); // set allowed OMP threads in Clifford
 }
 
 void State::initialize_qreg(uint_t num_qubits,
@@ -247,6 +251,8 @@ void State::initialize_qreg(uint_t num_qubits,
     throw std::invalid_argument("Stabilizer::State::initialize: initial state does not match qubit number");
   }
   BaseState::qreg_ = state;
+  if (BaseState::threads_ > 0)
+    BaseState::qreg_.set_omp_threads(BaseState::threads_); // set allowed OMP threads in Clifford
 }
 
 //-------------------------------------------------------------------------
@@ -258,12 +264,10 @@ size_t State::required_memory_mb(uint_t num_qubits,
                                  const  {
   (void)ops; // avoid unused variable compiler warning
   // The Clifford object requires very little memory.
-  // A Pauli vector consists of 2 binary vectors each with
-  // Binary vector = (4 + n // 64) 64-bit ints
-  // Pauli = 2 * binary vector
-  size_t mem = 16 * (4 + num_qubits); // Pauli bytes
-  // Clifford = 2n * Pauli + 2n phase ints
-  mem = 2 * num_qubits * (mem + 16); // Clifford bytes
+  // Each of the n X and n Z columns of the table packs the bits of
+  // 2n rows into (2n + 63) // 64 64-bit ints, plus one column of phases.
+  size_t words = (2 * num_qubits + 63) / 64; // ints per column
+  size_t mem = 8 * words * (2 * num_qubits + 1); // Clifford bytes
   mem = mem >> 20; // Clifford mb
   return mem;
 }
@@ -414,13 +418,32 @@ reg_t State::apply_measure_and_update(const reg_t &qubits,
 std::vector<reg_t> State::sample_measure(const reg_t &qubits,
                                          uint_t shots,
                                          RngEngine &rng) {
-  // TODO: see if we can improve efficiency by directly sampling from Clifford table
-  auto qreg_cache = BaseState::qreg_;
-  std::vector<reg_t> samples;
-  samples.reserve(shots);
-  while (shots-- > 0) { // loop over shots
-    samples.push_back(apply_measure_and_update(qubits, rng));
-    BaseState::qreg_ = qreg_cache; // restore pre-measurement data from cache
+  // Measure once on a copy of the table to get the reference outcome and
+  // the outcome flips of each random measurement. Every shot is then the
+  // reference XOR a random combination of the flips, which we sample for
+  // 64 shots at once using one random 64-bit word per flip.
+  auto clifford = BaseState::qreg_;
+  std::vector<std::vector<uint64_t>> flips;
+  const reg_t reference = clifford.measure_reference(qubits, flips);
+  std::vector<reg_t> samples(shots, reference);
+  if (flips.empty())
+    return samples;
+
+  const uint_t max_word = std::numeric_limits<uint_t>::max();
+  std::vector<uint_t> words(qubits.size());
+  for (uint_t shot = 0; shot < shots; shot += 64) {
+    std::fill(words.begin(), words.end(), 0);
+    for (const auto &flip : flips) {
+      const uint_t rand_word = rng.rand_int(uint_t(0), max_word);
+      for (const auto pos : flip)
+        words[pos] ^= rand_word;
+    }
+    const uint_t block = std::min<uint_t>(64, shots - shot);
+    for (uint_t j = 0; j < block; j++) {
+      auto &sample = samples[shot + j];
+      for (size_t i = 0; i < words.size(); i++)
+        sample[i] ^= (words[i] >> j) & 1ULL;
+    }
   }
   return samples;
 }
@@ -561,40 +584,45 @@ void State::snapshot_pauli_expval(const Operations::Op &op,
     throw std::invalid_argument("Invalid expval snapshot (Pauli components are empty).");
   }
 
-  // Compute expval components
-  auto copy_of_qreg = BaseState::qreg_;
-  complex_t expval(0., 0.);
+  // Convert the Pauli components to Paulis on all qubits so that every
+  // component is evaluated in a single read-only pass over the table
+  const auto num_qubits = BaseState::qreg_.num_qubits();
+  std::vector<Pauli::Pauli> paulis;
+  paulis.reserve(op.params_expval_pauli.size());
   for (const auto &param : op.params_expval_pauli) {
-    const auto& coeff = param.first;
-    const auto& pauli = param.second;
-    std::vector<uint64_t> measured_qubits;
+    const auto& label = param.second;
+    Pauli::Pauli pauli(num_qubits);
     for (uint_t pos=0; pos < op.qubits.size(); ++pos) {
-      uint_t qubit = op.qubits[pos];
-      switch (pauli[pauli.size() - 1 - pos]) {
+      const uint_t qubit = op.qubits[pos];
+      const char c = label[label.size() - 1 - pos];
+      switch (c) {
         case 'I':
           break;
         case 'X':
-	  BaseState::qreg_.append_h(qubit);
-	  measured_qubits.push_back(qubit);
+          pauli.X.set1(qubit);
           break;
         case 'Y':
-	  BaseState::qreg_.append_s(qubit);
-	  BaseState::qreg_.append_z(qubit);
-	  measured_qubits.push_back(qubit);
+          pauli.X.set1(qubit);
+          pauli.Z.set1(qubit);
           break;
         case 'Z':
-	  measured_qubits.push_back(qubit);
+          pauli.Z.set1(qubit);
           break;
         default: {
           std::stringstream msg;
-          msg << "QubitVectorState::invalid Pauli string \'" << pauli[pos] << "\'.";
+          msg << "Stabilizer::State::invalid Pauli string \'" << c << "\'.";
           throw std::invalid_argument(msg.str());
         }
-      }      
+      }
     }
+    paulis.push_back(std::move(pauli));
+  }
 
-    expval += coeff * (double)BaseState::qreg_.expectation_value(measured_qubits);
-    BaseState::qreg_ = copy_of_qreg;
+  // Compute expval components
+  const auto expvals = BaseState::qreg_.expectation_values(paulis);
+  complex_t expval(0., 0.);
+  for (size_t j = 0; j < expvals.size(); j++) {
+    expval += op.params_expval_pauli[j].first * static_cast<double>(expvals[j]);
   }
 
   // add to snapshot
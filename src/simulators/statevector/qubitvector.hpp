@@ -96,6 +96,33 @@ const std::array<uint_t, 64> MASKS {{
 }};
 
 
+// Return the parity of the number of set bits of x
+inline uint_t popcount_parity(uint_t x) {
+#if defined(__GNUC__) || defined(__clang__)
+  return __builtin_parityll(x);
+#else
+  x ^= x >> 32;
+  x ^= x >> 16;
+  x ^= x >> 8;
+  x ^= x >> 4;
+  x ^= x >> 2;
+  x ^= x >> 1;
+  return x & 1ULL;
+#endif
+}
+
+//============================================================================
+// Measurement sampling methods
+//============================================================================
+
+// Algorithms available for QubitVector::sample_measure
+// - index: cumulative block index followed by a linear scan per shot
+// - alias: two-level Walker alias table with O(1) draws per shot
+// - sorted: shots bucketed by block and swept once in sorted order
+// - automatic: choose one of the above from the number of shots and the
+//   vector dimension (see QubitVector::sample_measure_method)
+enum class SampleMeasureMethod {automatic, index, alias, sorted};
+
 //============================================================================
 // QubitVector class
 //============================================================================
@@ -319,9 +346,31 @@ public:
 
   // Return M sampled outcomes for Z-basis measurement of all qubits
   // The input is a length M list of random reals between [0, 1) used for
-  // generating samples.
+  // generating samples. Each outcome is returned as the packed integer
+  // index of the sampled basis state.
   virtual reg_t sample_measure(const std::vector<double> &rnds) const;
 
+  // Return the sampling algorithm that sample_measure will use for the
+  // given number of shots. If the configured method is automatic this is
+  // chosen by comparing the estimated cost of each algorithm.
+  SampleMeasureMethod sample_measure_method(uint_t shots) const;
+
+  // Sample outcomes by first computing the total probability of each
+  // block of 2^sample_measure_index_size amplitudes and then linearly
+  // scanning the blocks and amplitudes for each random number.
+  reg_t sample_measure_index(const std::vector<double> &rnds) const;
+
+  // Sample outcomes from a two-level Walker alias table. The vector is
+  // split into blocks of 2^sample_measure_index_size amplitudes, an alias
+  // table is built for each block in parallel and a top-level table is
+  // built over the block totals. Each shot is then an O(1) lookup.
+  reg_t sample_measure_alias(const std::vector<double> &rnds) const;
+
+  // Sample outcomes by assigning each random number to a block using the
+  // cumulative block probabilities, and then sweeping each block once
+  // over its sorted random numbers. Blocks are processed in parallel.
+  reg_t sample_measure_sorted(const std::vector<double> &rnds) const;
+
   //-----------------------------------------------------------------------
   // Norms
   //-----------------------------------------------------------------------
@@ -354,6 +403,37 @@ public:
   // The matrix is input as vector of the matrix diagonal.
   double norm_diagonal(const reg_t &qubits, const cvector_t<double> &mat) const;
 
+  //-----------------------------------------------------------------------
+  // Expectation Values
+  //-----------------------------------------------------------------------
+
+  // Return the expectation value <psi|P|psi> of an N-qubit Pauli operator
+  // on the given qubits. The Pauli is given as a string label of I, X, Y, Z
+  // in little-endian ordering with respect to the qubits list.
+  double expval_pauli(const reg_t &qubits, const std::string &pauli) const;
+
+  // Return the expectation values of a list of N-qubit Pauli operators on
+  // the given qubits. All terms are evaluated in a single read-only pass
+  // over the vector, with terms sharing the same X-mask also sharing the
+  // amplitude products.
+  std::vector<double> expval_pauli(const reg_t &qubits,
+                                   const std::vector<std::string> &paulis) const;
+
+  // Return the expectation value <psi|M|psi> of an N-qubit matrix on the
+  // given qubits. The matrix is input as vector of the column-major
+  // vectorized N-qubit matrix, or as the matrix diagonal.
+  std::complex<double> expval_matrix(const reg_t &qubits,
+                                     const cvector_t<double> &mat) const;
+
+  // Return the expectation values of a list of operators where each operator
+  // is a product of matrices applied in order to subsets of qubits. Each
+  // matrix is input as a (qubits, vectorized matrix or diagonal) pair.
+  // All operators are evaluated in a single read-only pass over the vector
+  // by applying their matrices to blocks of amplitudes on the union of
+  // their qubits.
+  std::vector<std::complex<double>>
+  expval_matrix(const std::vector<std::vector<std::pair<reg_t, cvector_t<double>>>> &ops) const;
+
   //-----------------------------------------------------------------------
   // JSON configuration settings
   //-----------------------------------------------------------------------
@@ -391,6 +471,14 @@ public:
   // Get the sample_measure index size
   int get_sample_measure_index_size() {return sample_measure_index_size_;}
 
+  // Set the sample_measure algorithm
+  void set_sample_measure_method(SampleMeasureMethod method) {
+    sample_measure_method_ = method;
+  }
+
+  // Get the sample_measure algorithm
+  SampleMeasureMethod get_sample_measure_method() {return sample_measure_method_;}
+
 protected:
 
   //-----------------------------------------------------------------------
@@ -407,6 +495,7 @@ protected:
   uint_t omp_threads_ = 1;     // Disable multithreading by default
   uint_t omp_threshold_ = 14;  // Qubit threshold for multithreading when enabled
   int sample_measure_index_size_ = 10; // Sample measure indexing qubit size
+  SampleMeasureMethod sample_measure_method_ = SampleMeasureMethod::automatic;
   double json_chop_threshold_ = 0;  // Threshold for choping small values
                                     // in JSON serialization
 
@@ -420,6 +509,32 @@ protected:
   void check_dimension(const QubitVector &qv) const;
   void check_checkpoint() const;
 
+  //-----------------------------------------------------------------------
+  // Block operators for expectation values
+  //-----------------------------------------------------------------------
+
+  // A product of small matrices acting on a subset of qubits, stored so
+  // that it can be applied to a local block of amplitudes on the union of
+  // its qubits. Block element i corresponds to vector offset offsets[i].
+  struct BlockOperator {
+    uint_t mask = 0;                       // Bit mask of the union of qubits
+    reg_t offsets;                         // Vector offset of each block element
+    bool diagonal = true;                  // True if all matrices are diagonal
+    cvector_t<double> diag;                // Combined diagonal if diagonal
+    std::vector<reg_t> mat_offsets;        // Block offsets of each matrix
+    std::vector<reg_t> mat_bases;          // Block base indexes of each matrix
+    std::vector<cvector_t<double>> mats;   // Vectorized matrices or diagonals
+  };
+
+  // Build a block operator from a list of (qubits, matrix) pairs.
+  BlockOperator block_operator(const std::vector<std::pair<reg_t, cvector_t<double>>> &mats) const;
+
+  // Apply a non-diagonal block operator in place to a block of amplitudes.
+  // The tmp vector is used as scratch space.
+  void apply_block_operator(const BlockOperator &op,
+                            cvector_t<double> &block,
+                            cvector_t<double> &tmp) const;
+
   //-----------------------------------------------------------------------
   // Statevector update with Lambda function
   //-----------------------------------------------------------------------
@@ -1734,7 +1849,7 @@ void QubitVector<data_t>::apply_diagonal_matrix(const uint_t qubit,
       // [[-i, 0], [0, 1]]
       auto lambda = [&](const areg_t<2> &inds,
                         const cvector_t<data_t> &_mat)->void {
-        const auto k = inds[1];
+        const auto k = inds[0];
         double cache = data_[k].imag();
         data_[k].imag(data_[k].real() * -1.);
         data_[k].real(cache);
@@ -1746,7 +1861,7 @@ void QubitVector<data_t>::apply_diagonal_matrix(const uint_t qubit,
       // [[i, 0], [0, 1]]
       auto lambda = [&](const areg_t<2> &inds,
                         const cvector_t<data_t> &_mat)->void {
-        const auto k = inds[1];
+        const auto k = inds[0];
         double cache = data_[k].imag();
         data_[k].imag(data_[k].real());
         data_[k].real(cache * -1.);
@@ -1996,6 +2111,255 @@ double QubitVector<data_t>::norm_diagonal(const uint_t qubit, const cvector_t<do
 }
 
 
+/*******************************************************************************
+ *
+ * EXPECTATION VALUES
+ *
+ ******************************************************************************/
+
+template <typename data_t>
+double QubitVector<data_t>::expval_pauli(const reg_t &qubits,
+                                         const std::string &pauli) const {
+  return expval_pauli(qubits, std::vector<std::string>({pauli}))[0];
+}
+
+template <typename data_t>
+std::vector<double>
+QubitVector<data_t>::expval_pauli(const reg_t &qubits,
+                                  const std::vector<std::string> &paulis) const {
+
+  // A Pauli operator is stored as P = i^{num_y} X^{x_mask} Z^{z_mask} so that
+  // <psi|P|psi> = sum_k i^{num_y} (-1)^{|k & z_mask|} conj(psi[k ^ x_mask]) psi[k]
+  // Terms are grouped by X-mask so that each group only needs one amplitude
+  // product per vector index.
+  const uint_t NUM_TERMS = paulis.size();
+  std::vector<uint_t> z_masks(NUM_TERMS, 0);
+  std::vector<uint_t> phases(NUM_TERMS, 0);
+  std::vector<uint_t> x_group_masks;
+  std::vector<reg_t> x_groups;
+  for (uint_t term = 0; term < NUM_TERMS; ++term) {
+    const auto &pauli = paulis[term];
+    if (pauli.size() != qubits.size()) {
+      throw std::invalid_argument("QubitVector::expval_pauli: Pauli label does not match qubit number.");
+    }
+    uint_t x_mask = 0;
+    for (uint_t pos = 0; pos < qubits.size(); ++pos) {
+      const uint_t bit = BITS[qubits[pos]];
+      switch (pauli[pauli.size() - 1 - pos]) {
+        case 'I':
+          break;
+        case 'X':
+          x_mask |= bit;
+          break;
+        case 'Y':
+          x_mask |= bit;
+          z_masks[term] |= bit;
+          phases[term]++;
+          break;
+        case 'Z':
+          z_masks[term] |= bit;
+          break;
+        default: {
+          std::stringstream msg;
+          msg << "QubitVector::invalid Pauli string \'" << pauli[pauli.size() - 1 - pos] << "\'.";
+          throw std::invalid_argument(msg.str());
+        }
+      }
+    }
+    phases[term] &= 3;
+    const auto it = std::find(x_group_masks.begin(), x_group_masks.end(), x_mask);
+    if (it == x_group_masks.end()) {
+      x_group_masks.push_back(x_mask);
+      x_groups.push_back(reg_t({term}));
+    } else {
+      x_groups[std::distance(x_group_masks.begin(), it)].push_back(term);
+    }
+  }
+
+  const uint_t NUM_GROUPS = x_groups.size();
+  const int_t END = data_size_;
+  std::vector<double> expvals(NUM_TERMS, 0.);
+  #pragma omp parallel if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  {
+    std::vector<double> local(NUM_TERMS, 0.);
+    #pragma omp for
+    for (int_t k = 0; k < END; ++k) {
+      const std::complex<double> psi_k = data_[k];
+      for (uint_t g = 0; g < NUM_GROUPS; ++g) {
+        const std::complex<double> val = std::conj(std::complex<double>(data_[k ^ x_group_masks[g]])) * psi_k;
+        // Real parts of i^p * val for p = 0, 1, 2, 3
+        const double re[4] = {val.real(), -val.imag(), -val.real(), val.imag()};
+        for (const auto term : x_groups[g]) {
+          const double v = re[phases[term]];
+          local[term] += (popcount_parity(k & z_masks[term])) ? -v : v;
+        }
+      }
+    }
+    #pragma omp critical
+    for (uint_t term = 0; term < NUM_TERMS; ++term)
+      expvals[term] += local[term];
+  } // end omp parallel
+  return expvals;
+}
+
+template <typename data_t>
+std::complex<double>
+QubitVector<data_t>::expval_matrix(const reg_t &qubits,
+                                   const cvector_t<double> &mat) const {
+  return expval_matrix({{std::make_pair(qubits, mat)}})[0];
+}
+
+template <typename data_t>
+typename QubitVector<data_t>::BlockOperator
+QubitVector<data_t>::block_operator(const std::vector<std::pair<reg_t, cvector_t<double>>> &mats) const {
+  BlockOperator op;
+
+  // Union of qubits in order of first appearance
+  reg_t qubits;
+  for (const auto &pair : mats) {
+    for (const auto qubit : pair.first) {
+      if (std::find(qubits.begin(), qubits.end(), qubit) == qubits.end()) {
+        qubits.push_back(qubit);
+        op.mask |= BITS[qubit];
+      }
+    }
+  }
+  const uint_t DIM = BITS[qubits.size()];
+  op.offsets.assign(DIM, 0);
+  for (uint_t i = 0; i < DIM; ++i) {
+    for (uint_t j = 0; j < qubits.size(); ++j) {
+      if (i & BITS[j])
+        op.offsets[i] |= BITS[qubits[j]];
+    }
+  }
+
+  // Block offsets and base indexes for each matrix
+  for (const auto &pair : mats) {
+    const auto &mat_qubits = pair.first;
+    const uint_t MAT_DIM = BITS[mat_qubits.size()];
+    uint_t local_mask = 0;
+    reg_t positions;
+    for (const auto qubit : mat_qubits) {
+      const uint_t pos = std::distance(qubits.begin(),
+                                       std::find(qubits.begin(), qubits.end(), qubit));
+      positions.push_back(pos);
+      local_mask |= BITS[pos];
+    }
+    reg_t mat_offsets(MAT_DIM, 0);
+    for (uint_t i = 0; i < MAT_DIM; ++i) {
+      for (uint_t j = 0; j < positions.size(); ++j) {
+        if (i & BITS[j])
+          mat_offsets[i] |= BITS[positions[j]];
+      }
+    }
+    reg_t mat_bases;
+    for (uint_t i = 0; i < DIM; ++i) {
+      if ((i & local_mask) == 0)
+        mat_bases.push_back(i);
+    }
+    if (pair.second.size() != MAT_DIM) {
+      op.diagonal = false;
+      #ifdef DEBUG
+      check_vector(convert(pair.second), 2 * mat_qubits.size());
+      #endif
+    }
+    op.mat_offsets.push_back(mat_offsets);
+    op.mat_bases.push_back(mat_bases);
+    op.mats.push_back(pair.second);
+  }
+
+  // Combine diagonal matrices into a single diagonal on the union
+  if (op.diagonal) {
+    op.diag.assign(DIM, 1.);
+    for (uint_t m = 0; m < op.mats.size(); ++m) {
+      for (const auto base : op.mat_bases[m]) {
+        for (uint_t i = 0; i < op.mat_offsets[m].size(); ++i)
+          op.diag[base | op.mat_offsets[m][i]] *= op.mats[m][i];
+      }
+    }
+  }
+  return op;
+}
+
+template <typename data_t>
+void QubitVector<data_t>::apply_block_operator(const BlockOperator &op,
+                                               cvector_t<double> &block,
+                                               cvector_t<double> &tmp) const {
+  for (uint_t m = 0; m < op.mats.size(); ++m) {
+    const auto &mat = op.mats[m];
+    const auto &offsets = op.mat_offsets[m];
+    const uint_t MAT_DIM = offsets.size();
+    if (mat.size() == MAT_DIM) {
+      for (const auto base : op.mat_bases[m]) {
+        for (uint_t i = 0; i < MAT_DIM; ++i)
+          block[base | offsets[i]] *= mat[i];
+      }
+      continue;
+    }
+    tmp.resize(MAT_DIM);
+    for (const auto base : op.mat_bases[m]) {
+      for (uint_t i = 0; i < MAT_DIM; ++i) {
+        tmp[i] = 0.;
+        for (uint_t j = 0; j < MAT_DIM; ++j)
+          tmp[i] += mat[i + MAT_DIM * j] * block[base | offsets[j]];
+      }
+      for (uint_t i = 0; i < MAT_DIM; ++i)
+        block[base | offsets[i]] = tmp[i];
+    }
+  }
+}
+
+template <typename data_t>
+std::vector<std::complex<double>>
+QubitVector<data_t>::expval_matrix(const std::vector<std::vector<std::pair<reg_t, cvector_t<double>>>> &ops) const {
+
+  const uint_t NUM_OPS = ops.size();
+  std::vector<BlockOperator> block_ops;
+  block_ops.reserve(NUM_OPS);
+  for (const auto &op : ops) {
+    #ifdef DEBUG
+    for (const auto &pair : op)
+      for (const auto qubit : pair.first)
+        check_qubit(qubit);
+    #endif
+    block_ops.push_back(block_operator(op));
+  }
+
+  // Each operator is evaluated on the blocks whose base index k has zeros
+  // at the operator's qubits, so a single sweep over k covers all operators
+  const int_t END = data_size_;
+  std::vector<std::complex<double>> expvals(NUM_OPS, 0.);
+  #pragma omp parallel if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  {
+    std::vector<std::complex<double>> local(NUM_OPS, 0.);
+    cvector_t<double> block, tmp;
+    #pragma omp for
+    for (int_t k = 0; k < END; ++k) {
+      for (uint_t n = 0; n < NUM_OPS; ++n) {
+        const auto &op = block_ops[n];
+        if (k & op.mask)
+          continue;
+        const uint_t DIM = op.offsets.size();
+        if (op.diagonal) {
+          for (uint_t i = 0; i < DIM; ++i)
+            local[n] += op.diag[i] * std::norm(std::complex<double>(data_[k | op.offsets[i]]));
+          continue;
+        }
+        block.resize(DIM);
+        for (uint_t i = 0; i < DIM; ++i)
+          block[i] = data_[k | op.offsets[i]];
+        apply_block_operator(op, block, tmp);
+        for (uint_t i = 0; i < DIM; ++i)
+          local[n] += std::conj(std::complex<double>(data_[k | op.offsets[i]])) * block[i];
+      }
+    }
+    #pragma omp critical
+    for (uint_t n = 0; n < NUM_OPS; ++n)
+      expvals[n] += local[n];
+  } // end omp parallel
+  return expvals;
+}
+
 /*******************************************************************************
  *
  * Probabilities
@@ -2060,6 +2424,47 @@ std::vector<double> QubitVector<data_t>::probabilities(const reg_t &qubits) cons
 //------------------------------------------------------------------------------
 template <typename data_t>
 reg_t QubitVector<data_t>::sample_measure(const std::vector<double> &rnds) const {
+  switch (sample_measure_method(rnds.size())) {
+    case SampleMeasureMethod::alias:
+      return sample_measure_alias(rnds);
+    case SampleMeasureMethod::sorted:
+      return sample_measure_sorted(rnds);
+    default:
+      return sample_measure_index(rnds);
+  }
+}
+
+template <typename data_t>
+SampleMeasureMethod QubitVector<data_t>::sample_measure_method(uint_t shots) const {
+  if (sample_measure_method_ != SampleMeasureMethod::automatic)
+    return sample_measure_method_;
+  if (shots < 2)
+    return SampleMeasureMethod::index;
+
+  // Rough operation counts for each algorithm. The index method scans
+  // on average half of the block totals and half of a block per shot,
+  // the sorted method pays for bucketing and sorting the random numbers
+  // on top of a single sweep of the vector, and the alias method makes
+  // two passes over the vector to build the tables and does two random
+  // memory accesses per shot.
+  const double dim = static_cast<double>(1ULL << num_qubits());
+  const double nshots = static_cast<double>(shots);
+  const double index_end = static_cast<double>(BITS[sample_measure_index_size_]);
+  const double cost_index = (dim < index_end)
+    ? 0.5 * nshots * dim
+    : dim + 0.5 * nshots * (index_end + dim / index_end);
+  const double cost_sorted = dim + nshots * (std::log2(nshots) + std::log2(dim));
+  const double cost_alias = 3. * dim + 4. * nshots;
+
+  if (cost_index <= cost_sorted && cost_index <= cost_alias)
+    return SampleMeasureMethod::index;
+  if (cost_alias < cost_sorted)
+    return SampleMeasureMethod::alias;
+  return SampleMeasureMethod::sorted;
+}
+
+template <typename data_t>
+reg_t QubitVector<data_t>::sample_measure_index(const std::vector<double> &rnds) const {
 
   const int_t END = 1LL << num_qubits();
   const int_t SHOTS = rnds.size();
@@ -2136,6 +2541,172 @@ reg_t QubitVector<data_t>::sample_measure(const std::vector<double> &rnds) const
   return samples;
 }
 
+template <typename data_t>
+reg_t QubitVector<data_t>::sample_measure_alias(const std::vector<double> &rnds) const {
+
+  const int_t END = 1LL << num_qubits();
+  const int_t SHOTS = rnds.size();
+  const uint_t BLOCK_QUBITS = std::min<uint_t>(num_qubits(), sample_measure_index_size_);
+  const int_t BLOCK_SIZE = BITS[BLOCK_QUBITS];
+  const int_t NUM_BLOCKS = END >> BLOCK_QUBITS;
+
+  // Walker alias table for a list of weights. Entry k is kept with
+  // probability probs[k] and otherwise replaced by aliases[k].
+  auto build_alias = [](const double *weights, const uint_t size,
+                        double *table_probs, uint_t *table_aliases) {
+    double total = 0.;
+    for (uint_t k = 0; k < size; ++k)
+      total += weights[k];
+    reg_t small, large;
+    small.reserve(size);
+    large.reserve(size);
+    for (uint_t k = 0; k < size; ++k) {
+      table_probs[k] = (total > 0.) ? weights[k] * size / total : 1.;
+      table_aliases[k] = k;
+      if (table_probs[k] < 1.)
+        small.push_back(k);
+      else
+        large.push_back(k);
+    }
+    while (!small.empty() && !large.empty()) {
+      const uint_t s = small.back();
+      const uint_t l = large.back();
+      small.pop_back();
+      table_aliases[s] = l;
+      table_probs[l] -= 1. - table_probs[s];
+      if (table_probs[l] < 1.) {
+        large.pop_back();
+        small.push_back(l);
+      }
+    }
+    // Remaining entries are only off from 1 by rounding error
+    for (const auto k : small)
+      table_probs[k] = 1.;
+    for (const auto k : large)
+      table_probs[k] = 1.;
+    return total;
+  };
+
+  // Build an alias table for each block in parallel
+  std::vector<double> block_totals(NUM_BLOCKS, 0.);
+  std::vector<double> probs(END);
+  reg_t aliases(END);
+  #pragma omp parallel if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  {
+    std::vector<double> weights(BLOCK_SIZE);
+    #pragma omp for
+    for (int_t i = 0; i < NUM_BLOCKS; ++i) {
+      const uint_t base = i * BLOCK_SIZE;
+      for (int_t j = 0; j < BLOCK_SIZE; ++j)
+        weights[j] = probability(base + j);
+      block_totals[i] = build_alias(weights.data(), BLOCK_SIZE,
+                                    probs.data() + base, aliases.data() + base);
+    }
+  } // end omp parallel
+
+  // Build the top-level alias table over the block totals
+  std::vector<double> block_probs(NUM_BLOCKS);
+  reg_t block_aliases(NUM_BLOCKS);
+  build_alias(block_totals.data(), NUM_BLOCKS, block_probs.data(), block_aliases.data());
+
+  // Draw one sample per random number. The random number picks a column
+  // of the top-level table, and the leftover fraction is rescaled to
+  // [0, 1) and reused to pick a column of the block table.
+  const double below_one = std::nextafter(1., 0.);
+  auto draw = [below_one](double rnd, const uint_t size, const double *table_probs,
+                          const uint_t *table_aliases, uint_t &index) {
+    const double scaled = rnd * size;
+    index = std::min<uint_t>(static_cast<uint_t>(scaled), size - 1);
+    const double frac = std::min(scaled - index, below_one);
+    const double prob = table_probs[index];
+    if (frac < prob)
+      return frac / prob;
+    index = table_aliases[index];
+    return (frac - prob) / (1. - prob);
+  };
+
+  reg_t samples(SHOTS, 0);
+  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  for (int_t i = 0; i < SHOTS; ++i) {
+    uint_t block, pos;
+    double rnd = draw(rnds[i], NUM_BLOCKS, block_probs.data(),
+                      block_aliases.data(), block);
+    const uint_t base = block * BLOCK_SIZE;
+    draw(rnd, BLOCK_SIZE, probs.data() + base, aliases.data() + base, pos);
+    samples[i] = base + pos;
+  }
+  return samples;
+}
+
+template <typename data_t>
+reg_t QubitVector<data_t>::sample_measure_sorted(const std::vector<double> &rnds) const {
+
+  const int_t END = 1LL << num_qubits();
+  const int_t SHOTS = rnds.size();
+  const uint_t BLOCK_QUBITS = std::min<uint_t>(num_qubits(), sample_measure_index_size_);
+  const int_t BLOCK_SIZE = BITS[BLOCK_QUBITS];
+  const int_t NUM_BLOCKS = END >> BLOCK_QUBITS;
+
+  // Cumulative probability at the start of each block
+  std::vector<double> cumsum(NUM_BLOCKS + 1, 0.);
+  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  for (int_t i = 0; i < NUM_BLOCKS; ++i) {
+    const uint_t base = i * BLOCK_SIZE;
+    double total = 0.;
+    for (int_t j = 0; j < BLOCK_SIZE; ++j)
+      total += probability(base + j);
+    cumsum[i + 1] = total;
+  }
+  for (int_t i = 0; i < NUM_BLOCKS; ++i)
+    cumsum[i + 1] += cumsum[i];
+
+  // Assign each shot to a block. Random numbers above the accumulated
+  // norm due to rounding error are assigned to the final block.
+  reg_t shot_blocks(SHOTS);
+  #pragma omp parallel for if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  for (int_t i = 0; i < SHOTS; ++i) {
+    const auto it = std::upper_bound(cumsum.begin() + 1, cumsum.end(), rnds[i]);
+    shot_blocks[i] = std::min<uint_t>(std::distance(cumsum.begin() + 1, it),
+                                      NUM_BLOCKS - 1);
+  }
+
+  // Counting sort of the shot indices by block
+  reg_t offsets(NUM_BLOCKS + 1, 0);
+  for (int_t i = 0; i < SHOTS; ++i)
+    offsets[shot_blocks[i] + 1]++;
+  for (int_t i = 0; i < NUM_BLOCKS; ++i)
+    offsets[i + 1] += offsets[i];
+  reg_t order(SHOTS);
+  {
+    reg_t pos(offsets.begin(), offsets.end() - 1);
+    for (int_t i = 0; i < SHOTS; ++i)
+      order[pos[shot_blocks[i]]++] = i;
+  }
+
+  // Sweep each block once over its sorted random numbers
+  reg_t samples(SHOTS, 0);
+  #pragma omp parallel for schedule(dynamic) if (num_qubits_ > omp_threshold_ && omp_threads_ > 1) num_threads(omp_threads_)
+  for (int_t i = 0; i < NUM_BLOCKS; ++i) {
+    const auto first = order.begin() + offsets[i];
+    const auto last = order.begin() + offsets[i + 1];
+    if (first == last)
+      continue;
+    std::sort(first, last, [&rnds](uint_t a, uint_t b) {return rnds[a] < rnds[b];});
+    const uint_t block_end = (i + 1) * BLOCK_SIZE - 1;
+    uint_t sample = i * BLOCK_SIZE;
+    double p = cumsum[i];
+    double p_next = p + probability(sample);
+    for (auto it = first; it != last; ++it) {
+      while (rnds[*it] >= p_next && sample < block_end) {
+        p = p_next;
+        p_next += probability(++sample);
+      }
+      samples[*it] = sample;
+    }
+  }
+  return samples;
+}
+
 //------------------------------------------------------------------------------
 } // end namespace QV
 //------------------------------------------------------------------------------
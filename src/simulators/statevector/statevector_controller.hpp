@@ -78,7 +78,8 @@ public:
 protected:
 
   virtual size_t required_memory_mb(const Circuit& circuit,
-                                    const Noise::NoiseModel& noise) const override;
+                                    const Noise::NoiseModel& noise,
+                                    const json_t &config) const override;
 
 private:
 
@@ -131,7 +132,8 @@ void StatevectorController::clear_config() {
 }
 
 size_t StatevectorController::required_memory_mb(const Circuit& circ,
-                                                 const Noise::NoiseModel& noise) const {
+                                                 const Noise::NoiseModel& noise,
+                                                 const json_t &config) const {
   Statevector::State<> state;
   return state.required_memory_mb(circ.num_qubits, circ.ops);
 }
@@ -424,6 +424,23 @@ void State<statevec_t>::set_config(const json_t &config) {
   if (JSON::get_value(index_size, "statevector_sample_measure_opt", config)) {
     BaseState::qreg_.set_sample_measure_index_size(index_size);
   };
+
+  // Set the sample measure algorithm
+  std::string sample_method;
+  if (JSON::get_value(sample_method, "statevector_sample_measure_method", config)) {
+    if (sample_method == "automatic") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::automatic);
+    } else if (sample_method == "index") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::index);
+    } else if (sample_method == "alias") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::alias);
+    } else if (sample_method == "sorted") {
+      BaseState::qreg_.set_sample_measure_method(QV::SampleMeasureMethod::sorted);
+    } else {
+      throw std::invalid_argument("QubitVector::State: invalid sample measure method \'" +
+                                  sample_method + "\'.");
+    }
+  }
 }
 
 
@@ -559,49 +576,21 @@ void State<statevec_t>::snapshot_pauli_expval(const Operations::Op &op,
     throw std::invalid_argument("Invalid expval snapshot (Pauli components are empty).");
   }
 
-  // Cache the current quantum state
-  BaseState::qreg_.checkpoint();
-  bool first = true; // flag for first pass so we don't unnecessarily revert from checkpoint
-
-  // Compute expval components
+  // Compute all Pauli components in a single pass over the statevector
+  // qubits are stored as a list where position is qubit number:
+  // eq op.qubits = [a, b, c], a is qubit-0, b is qubit-1, c is qubit-2
+  // Pauli string labels are stored in little-endian ordering:
+  // eg label = "CBA", A is the Pauli for qubit-0, B for qubit-1, C for qubit-2
+  std::vector<std::string> paulis;
+  paulis.reserve(op.params_expval_pauli.size());
+  for (const auto &param : op.params_expval_pauli)
+    paulis.push_back(param.second);
+  const auto pauli_expvals = BaseState::qreg_.expval_pauli(op.qubits, paulis);
+
+  // Pauli expecation values should always be real for a valid state
   complex_t expval(0., 0.);
-  for (const auto &param : op.params_expval_pauli) {
-    // Revert the quantum state to cached checkpoint
-    if (first)
-      first = false;
-    else
-      BaseState::qreg_.revert(true);
-    // Apply each pauli operator as a gate to the corresponding qubit
-    // qubits are stored as a list where position is qubit number:
-    // eq op.qubits = [a, b, c], a is qubit-0, b is qubit-1, c is qubit-2
-    // Pauli string labels are stored in little-endian ordering:
-    // eg label = "CBA", A is the Pauli for qubit-0, B for qubit-1, C for qubit-2
-    const auto& coeff = param.first;
-    const auto& pauli = param.second;
-    for (uint_t pos=0; pos < op.qubits.size(); ++pos) {
-      switch (pauli[pauli.size() - 1 - pos]) {
-        case 'I':
-          break;
-        case 'X':
-          BaseState::qreg_.apply_mcx({op.qubits[pos]});
-          break;
-        case 'Y':
-          BaseState::qreg_.apply_mcy({op.qubits[pos]});
-          break;
-        case 'Z':
-          BaseState::qreg_.apply_mcphase({op.qubits[pos]}, -1);
-          break;
-        default: {
-          std::stringstream msg;
-          msg << "QubitVectorState::invalid Pauli string \'" << pauli[pos] << "\'.";
-          throw std::invalid_argument(msg.str());
-        }
-      }
-    }
-    // Pauli expecation values should always be real for a valid state
-    // so we truncate the imaginary part
-    expval += coeff * std::real(BaseState::qreg_.inner_product());
-  }
+  for (size_t i = 0; i < paulis.size(); ++i)
+    expval += op.params_expval_pauli[i].first * pauli_expvals[i];
   // add to snapshot
   Utils::chop_inplace(expval, json_chop_threshold_);
   switch (type) {
@@ -617,8 +606,6 @@ void State<statevec_t>::snapshot_pauli_expval(const Operations::Op &op,
       data.add_pershot_snapshot("expectation_values", op.string_params[0], expval);
       break;
   }
-  // Revert to original state
-  BaseState::qreg_.revert(false);
 }
 
 template <class statevec_t>
@@ -629,39 +616,32 @@ void State<statevec_t>::snapshot_matrix_expval(const Operations::Op &op,
   if (op.params_expval_matrix.empty()) {
     throw std::invalid_argument("Invalid matrix snapshot (components are empty).");
   }
-  reg_t qubits = op.qubits;
-  // Cache the current quantum state
-  BaseState::qreg_.checkpoint();
-  bool first = true; // flag for first pass so we don't unnecessarily revert from checkpoint
-
-  // Compute expval components
-  complex_t expval(0., 0.);
+  // Convert each component to a list of (qubits, vectorized matrix) pairs
+  // Diagonal matrices are stored as 1 x M row-matrices and projector vectors
+  // as M x 1 column-matrices
+  std::vector<std::vector<std::pair<reg_t, cvector_t>>> components;
+  components.reserve(op.params_expval_matrix.size());
   for (const auto &param : op.params_expval_matrix) {
-    complex_t coeff = param.first;
-    // Revert the quantum state to cached checkpoint
-    if (first)
-      first = false;
-    else
-      BaseState::qreg_.revert(true);
-    // Apply each matrix component
+    std::vector<std::pair<reg_t, cvector_t>> mats;
     for (const auto &pair: param.second) {
       reg_t sub_qubits;
       for (const auto pos : pair.first) {
-        sub_qubits.push_back(qubits[pos]);
+        sub_qubits.push_back(op.qubits[pos]);
       }
       const cmatrix_t &mat = pair.second;
       cvector_t vmat = (mat.GetColumns() == 1)
         ? Utils::vectorize_matrix(Utils::projector(Utils::vectorize_matrix(mat))) // projector case
         : Utils::vectorize_matrix(mat); // diagonal or square matrix case
-      if (vmat.size() == 1ULL << qubits.size()) {
-        BaseState::qreg_.apply_diagonal_matrix(sub_qubits, vmat);
-      } else {
-        BaseState::qreg_.apply_matrix(sub_qubits, vmat);
-      }
-
+      mats.emplace_back(sub_qubits, vmat);
     }
-    expval += coeff*BaseState::qreg_.inner_product();
+    components.push_back(mats);
   }
+
+  // Compute all components in a single pass over the statevector
+  const auto matrix_expvals = BaseState::qreg_.expval_matrix(components);
+  complex_t expval(0., 0.);
+  for (size_t i = 0; i < components.size(); ++i)
+    expval += op.params_expval_matrix[i].first * matrix_expvals[i];
   // add to snapshot
   Utils::chop_inplace(expval, json_chop_threshold_);
   switch (type) {
@@ -677,8 +657,6 @@ void State<statevec_t>::snapshot_matrix_expval(const Operations::Op &op,
       data.add_pershot_snapshot("expectation_values", op.string_params[0], expval);
       break;
   }
-  // Revert to original state
-  BaseState::qreg_.revert(false);
 }
 
 
@@ -834,15 +812,14 @@ std::vector<reg_t> State<statevec_t>::sample_measure(const reg_t &qubits,
 
   auto allbit_samples = BaseState::qreg_.sample_measure(rnds);
 
-  // Convert to reg_t format
+  // Convert packed outcomes to reg_t format for the measured qubits
   std::vector<reg_t> all_samples;
   all_samples.reserve(shots);
-  for (int_t val : allbit_samples) {
-    reg_t allbit_sample = Utils::int2reg(val, 2, BaseState::qreg_.num_qubits());
+  for (uint_t val : allbit_samples) {
     reg_t sample;
     sample.reserve(qubits.size());
     for (uint_t qubit : qubits) {
-      sample.push_back(allbit_sample[qubit]);
+      sample.push_back((val >> qubit) & 1ULL);
     }
     all_samples.push_back(sample);
   }
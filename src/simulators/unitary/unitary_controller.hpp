@@ -71,7 +71,8 @@ public:
 protected:
 
   size_t required_memory_mb(const Circuit& circ,
-                            const Noise::NoiseModel& noise) const override;
+                            const Noise::NoiseModel& noise,
+                            const json_t &config) const override;
 
 private:
 
@@ -124,7 +125,8 @@ void UnitaryController::clear_config() {
 }
 
 size_t UnitaryController::required_memory_mb(const Circuit& circ,
-                                             const Noise::NoiseModel& noise) const {
+                                             const Noise::NoiseModel& noise,
+                                             const json_t &config) const {
   QubitUnitary::State<> state;
   return state.required_memory_mb(circ.num_qubits, circ.ops);
 }
@@ -15,6 +15,7 @@
 #ifndef _aer_circuit_optimization_hpp_
 #define _aer_circuit_optimization_hpp_
 
+#include <algorithm>
 #include <chrono>
 #include <cstdint>
 #include <iostream>
@@ -45,6 +46,12 @@ public:
   virtual void set_config(const json_t &config);
 
 protected:
+  // Return the qubits of an operation followed by the other qubits of the
+  // circuit that its quantum errors act on
+  reg_t noise_support(const Operations::Op& op,
+                      const Circuit& circ,
+                      const Noise::NoiseModel& noise) const;
+
   json_t config_;
 };
 
@@ -52,6 +59,25 @@ void CircuitOptimization::set_config(const json_t& config) {
   config_ = config;
 }
 
+reg_t CircuitOptimization::noise_support(const Operations::Op& op,
+                                         const Circuit& circ,
+                                         const Noise::NoiseModel& noise) const {
+  reg_t qubits = op.qubits;
+  // Gates and matrices without a label have no errors
+  if (!noise.has_quantum_errors() ||
+      ((op.type == Operations::OpType::matrix ||
+        op.type == Operations::OpType::gate) && op.string_params.empty()))
+    return qubits;
+  for (const auto &error: noise.quantum_errors(op)) {
+    for (const auto qubit: error.second) {
+      if (qubit < circ.num_qubits &&
+          std::find(qubits.begin(), qubits.end(), qubit) == qubits.end())
+        qubits.push_back(qubit);
+    }
+  }
+  return qubits;
+}
+
 //-------------------------------------------------------------------------
 } // end namespace Transpile
 } // end namespace AER
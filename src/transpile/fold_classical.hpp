@@ -0,0 +1,260 @@
+/**
+ * This code is part of Qiskit.
+ *
+ * (C) Copyright IBM 2018, 2019.
+ *
+ * This code is licensed under the Apache License, Version 2.0. You may
+ * obtain a copy of this license in the LICENSE.txt file in the root directory
+ * of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+ *
+ * Any modifications or derivative works of this code must retain this
+ * copyright notice, and modified files need to carry a notice indicating
+ * that they have been altered from the originals.
+ */
+
+#ifndef _aer_transpile_fold_classical_hpp_
+#define _aer_transpile_fold_classical_hpp_
+
+#include "transpile/circuitopt.hpp"
+
+namespace AER {
+namespace Transpile {
+
+// Fold the classical operations of a circuit whose values are known before
+// the circuit is run. The classical bits are all 0 at the start of a shot,
+// and keep a known value until they are written by a measurement, a readout
+// error or a boolean function of unknown bits. Walking forward through the
+// circuit, conditional operations on a known register bit are either made
+// unconditional or removed, and boolean functions of known bits are
+// evaluated. Walking backward, boolean functions are removed if their
+// result does not change the value of their bits, or if it is never read.
+//
+// Removing these operations allows circuits with conditionals on
+// classical bits that are never measured to use measure sampling.
+class FoldClassical : public CircuitOptimization {
+public:
+
+  void set_config(const json_t &config) override;
+
+  void optimize_circuit(Circuit& circ,
+                        Noise::NoiseModel& noise,
+                        const Operations::OpSet &opset,
+                        ExperimentData &data) const override;
+
+private:
+  // Value of a classical bit
+  enum class Bit {zero, one, unknown};
+
+  // Evaluate a boolean function on the register bits and return its
+  // value, or Bit::unknown if it depends on unknown bits
+  Bit evaluate_bfunc(const Operations::Op& op,
+                     const std::vector<Bit>& registers) const;
+
+  // show debug info
+  bool verbose_ = false;
+
+  // disabled in config
+  bool active_ = true;
+
+  // the register bits are returned in the result
+  bool return_register_ = false;
+};
+
+void FoldClassical::set_config(const json_t &config) {
+
+  CircuitOptimization::set_config(config);
+
+  if (JSON::check_key("fold_classical_verbose", config)) {
+    JSON::get_value(verbose_, "fold_classical_verbose", config);
+  }
+  if (JSON::check_key("fold_classical_enable", config)) {
+    JSON::get_value(active_, "fold_classical_enable", config);
+  }
+  if (JSON::check_key("register", config)) {
+    JSON::get_value(return_register_, "register", config);
+  }
+}
+
+void FoldClassical::optimize_circuit(Circuit& circ,
+                                     Noise::NoiseModel& noise,
+                                     const Operations::OpSet &allowed_opset,
+                                     ExperimentData &data) const {
+  if (!active_)
+    return;
+
+  std::vector<Bit> memory(circ.num_memory, Bit::zero);
+  std::vector<Bit> registers(circ.num_registers, Bit::zero);
+  std::vector<bool> keep(circ.ops.size(), true);
+  size_t folded = 0;
+
+  auto get_bit = [](const std::vector<Bit>& bits, const uint_t pos) {
+    return (pos < bits.size()) ? bits[pos] : Bit::unknown;
+  };
+  auto set_bits = [](std::vector<Bit>& bits, const reg_t& pos, const Bit value) {
+    for (const auto bit: pos)
+      if (bit < bits.size())
+        bits[bit] = value;
+  };
+
+  // Propagate the known values of classical bits
+  for (size_t i = 0; i < circ.ops.size(); ++i) {
+    Operations::Op& op = circ.ops[i];
+    if (op.conditional) {
+      const Bit condition = get_bit(registers, op.conditional_reg);
+      if (condition == Bit::zero) {
+        keep[i] = false;
+        ++folded;
+        continue;
+      }
+      if (condition == Bit::one) {
+        op.conditional = false;
+        ++folded;
+      }
+    }
+    switch (op.type) {
+      case Operations::OpType::measure:
+      case Operations::OpType::roerror:
+        set_bits(memory, op.memory, Bit::unknown);
+        set_bits(registers, op.registers, Bit::unknown);
+        break;
+      case Operations::OpType::bfunc: {
+        const Bit value = evaluate_bfunc(op, registers);
+        // The function does not change its bits if they already
+        // have its value
+        bool unchanged = (value != Bit::unknown);
+        for (const auto bit: op.registers)
+          unchanged &= (get_bit(registers, bit) == value);
+        for (const auto bit: op.memory)
+          unchanged &= (get_bit(memory, bit) == value);
+        keep[i] = !unchanged;
+        set_bits(memory, op.memory, value);
+        set_bits(registers, op.registers, value);
+        break;
+      }
+      default:
+        // Other conditional operations do not write classical bits
+        break;
+    }
+  }
+
+  // Remove boolean functions whose register bits are never read.
+  // Memory bits are returned in the result, so they are always read.
+  std::vector<bool> live(circ.num_registers, return_register_);
+  for (size_t i = circ.ops.size(); i-- > 0;) {
+    if (!keep[i])
+      continue;
+    const Operations::Op& op = circ.ops[i];
+    switch (op.type) {
+      case Operations::OpType::bfunc: {
+        bool used = !op.memory.empty();
+        for (const auto bit: op.registers)
+          used |= (bit >= live.size() || live[bit]);
+        if (!used) {
+          keep[i] = false;
+          break;
+        }
+        for (const auto bit: op.registers)
+          if (bit < live.size())
+            live[bit] = false;
+        const auto mask = Utils::hex2bin(op.string_params[0], false);
+        for (size_t bit = 0; bit < mask.size() && bit < live.size(); ++bit)
+          if (mask[mask.size() - 1 - bit] == '1')
+            live[bit] = true;
+        break;
+      }
+      case Operations::OpType::measure:
+        if (!op.conditional && !op.old_conditional)
+          for (const auto bit: op.registers)
+            if (bit < live.size())
+              live[bit] = false;
+        break;
+      case Operations::OpType::snapshot:
+        // Register snapshots read all register bits
+        if (op.name == "register")
+          std::fill(live.begin(), live.end(), true);
+        break;
+      default:
+        break;
+    }
+    if (op.conditional && op.conditional_reg < live.size())
+      live[op.conditional_reg] = true;
+  }
+
+  size_t idx = 0;
+  for (size_t i = 0; i < circ.ops.size(); ++i) {
+    if (keep[i]) {
+      if (i != idx)
+        circ.ops[idx] = std::move(circ.ops[i]);
+      ++idx;
+    }
+  }
+  const size_t removed = circ.ops.size() - idx;
+  circ.ops.erase(circ.ops.begin() + idx, circ.ops.end());
+
+  if (verbose_) {
+    json_t fold_metadata;
+    fold_metadata["folded_conditionals"] = folded;
+    fold_metadata["removed_ops"] = removed;
+    data.add_metadata("fold_classical", fold_metadata);
+  }
+}
+
+FoldClassical::Bit
+FoldClassical::evaluate_bfunc(const Operations::Op& op,
+                              const std::vector<Bit>& registers) const {
+  // Larger registers are compared as hex strings by the classical register,
+  // so these are left to be evaluated at runtime
+  if (registers.size() > 64)
+    return Bit::unknown;
+
+  uint_t mask_int, target_int;
+  try {
+    mask_int = std::stoull(op.string_params[0], nullptr, 16);
+    target_int = std::stoull(op.string_params[1], nullptr, 16);
+  } catch (std::exception &e) {
+    return Bit::unknown;
+  }
+
+  uint_t reg_int = 0;
+  for (size_t bit = 0; bit < registers.size(); ++bit) {
+    if (!((mask_int >> bit) & 1ULL))
+      continue;
+    if (registers[bit] == Bit::unknown)
+      return Bit::unknown;
+    if (registers[bit] == Bit::one)
+      reg_int |= (1ULL << bit);
+  }
+
+  // Same comparison as ClassicalRegister::apply_bfunc
+  const int_t compared = (reg_int & mask_int) - target_int;
+  bool outcome;
+  switch (op.bfunc) {
+    case Operations::RegComparison::Equal:
+      outcome = (compared == 0);
+      break;
+    case Operations::RegComparison::NotEqual:
+      outcome = (compared != 0);
+      break;
+    case Operations::RegComparison::Less:
+      outcome = (compared < 0);
+      break;
+    case Operations::RegComparison::LessEqual:
+      outcome = (compared <= 0);
+      break;
+    case Operations::RegComparison::Greater:
+      outcome = (compared > 0);
+      break;
+    case Operations::RegComparison::GreaterEqual:
+      outcome = (compared >= 0);
+      break;
+    default:
+      return Bit::unknown;
+  }
+  return outcome ? Bit::one : Bit::zero;
+}
+
+//-------------------------------------------------------------------------
+} // end namespace Transpile
+} // end namespace AER
+//-------------------------------------------------------------------------
+#endif
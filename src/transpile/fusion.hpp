@@ -15,6 +15,10 @@
 #ifndef _aer_transpile_fusion_hpp_
 #define _aer_transpile_fusion_hpp_
 
+#include <numeric>
+#include <set>
+#include <unordered_map>
+
 #include "transpile/circuitopt.hpp"
 
 namespace AER {
@@ -27,6 +31,17 @@ using oplist_t = std::vector<op_t>;
 using opset_t = Operations::OpSet;
 using reg_t = std::vector<uint_t>;
 
+// Fused operations of the segments of the noise circuits sampled for the
+// shots of an experiment. A segment is a sequence of operations between
+// operations that cannot be fused or sampled errors, and is keyed by its
+// operations, so each segment of the ideal circuit is only fused once.
+struct FusionCache {
+  // Whether fusion was applied, and the fused operations of each segment
+  std::unordered_map<std::string, std::pair<bool, oplist_t>> segments;
+  uint_t hits = 0;
+  uint_t misses = 0;
+};
+
 class Fusion : public CircuitOptimization {
 public:
   // constructor
@@ -39,23 +54,70 @@ public:
    *   - fusion_max_qubit (int): maximum number of qubits for a operation (default: 5)
    *   - fusion_threshold (int): a threshold to activate fusion optimization when fusion_enable is true (default: 16)
    *   - fusion_cost_factor (double): a cost function to estimate an aggregate gate (default: 1.8)
+   *   - fusion_method (string): "dag" to fuse commuting or independent gates from anywhere
+   *        in a dependency graph of the gates, or "window" to fuse consecutive gates only
+   *        (default: "dag")
+   *   - fusion_cache_size (int): maximum number of fused segments stored in the
+   *        cache of the noise circuits of an experiment (default: 1024)
   */
   void set_config(const json_t &config) override;
 
+  // Set the measured costs of dense and diagonal matrices on 1 to max_qubit
+  // qubits relative to the cost of a dense single-qubit matrix, which are used
+  // instead of cost_factor to estimate the costs of operations. The costs are
+  // cleared by set_config.
+  void set_costs(const json_t &costs);
+
+  bool active() const {return active_;}
+
+  uint_t max_qubit() const {return max_qubit_;}
+
   void optimize_circuit(Circuit& circ,
                         Noise::NoiseModel& noise,
                         const opset_t &opset,
                         ExperimentData &data) const override;
 
+  // Optimize a circuit reusing the fused segments stored in a cache, and
+  // store the segments fused by this call
+  void optimize_circuit(Circuit& circ,
+                        Noise::NoiseModel& noise,
+                        const opset_t &opset,
+                        ExperimentData &data,
+                        FusionCache &cache) const;
+
 private:
+  // Fusion algorithms
+  enum class Method {window, dag};
+
+  // The basis in which an operation is diagonal on one of its qubits.
+  // Operations on a common qubit commute on it if they are diagonal in the
+  // same basis, or if one of them is the identity on it.
+  enum class Basis {identity, z, x, none};
+
   bool can_ignore(const op_t& op) const;
 
   bool can_apply_fusion(const op_t& op) const;
 
   double get_cost(const op_t& op) const;
 
+  // Estimated cost of a fused operation on num_qubits qubits
+  double fused_cost(const uint_t num_qubits, const bool diagonal) const;
+
+  void fuse_circuit(Circuit& circ, ExperimentData &data, FusionCache *cache) const;
+
+  bool aggregate_segment(oplist_t& ops, const int fusion_start, const int fusion_end,
+                         FusionCache *cache) const;
+
+  std::string segment_key(const oplist_t& ops, const int fusion_start, const int fusion_end) const;
+
   bool aggregate_operations(oplist_t& ops, const int fusion_start, const int fusion_end) const;
 
+  bool aggregate_operations_dag(oplist_t& ops, const int fusion_start, const int fusion_end) const;
+
+  Basis diagonal_basis(const op_t& op, const uint_t qubit) const;
+
+  static bool commute(const Basis basis1, const Basis basis2);
+
   op_t generate_fusion_operation(const std::vector<op_t>& fusioned_ops) const;
 
   void swap_cols_and_rows(const uint_t idx1,
@@ -93,6 +155,12 @@ private:
   uint_t max_qubit_;
   uint_t threshold_;
   double cost_factor_;
+  Method method_ = Method::dag;
+  uint_t cache_size_ = 1024;
+  // Measured costs of dense and diagonal matrices by number of qubits.
+  // These are empty if the costs are estimated with cost_factor_.
+  std::vector<double> dense_costs_;
+  std::vector<double> diagonal_costs_;
   bool verbose_ = false;
   bool active_ = false;
 };
@@ -145,8 +213,31 @@ void Fusion::set_config(const json_t &config) {
 
   if (JSON::check_key("fusion_cost_factor", config_))
     JSON::get_value(cost_factor_, "fusion_cost_factor", config_);
+
+  if (JSON::check_key("fusion_method", config_)) {
+    std::string method;
+    JSON::get_value(method, "fusion_method", config_);
+    if (method == "dag")
+      method_ = Method::dag;
+    else if (method == "window")
+      method_ = Method::window;
+    else
+      throw std::invalid_argument("Fusion::invalid fusion_method \'" + method + "\'.");
+  }
+
+  if (JSON::check_key("fusion_cache_size", config_))
+    JSON::get_value(cache_size_, "fusion_cache_size", config_);
+
+  dense_costs_.clear();
+  diagonal_costs_.clear();
 }
 
+void Fusion::set_costs(const json_t &costs) {
+  dense_costs_ = costs["dense"].get<std::vector<double>>();
+  diagonal_costs_ = costs["diagonal"].get<std::vector<double>>();
+  if (dense_costs_.empty() || dense_costs_.size() != diagonal_costs_.size())
+    throw std::invalid_argument("Fusion::invalid costs of dense and diagonal matrices.");
+}
 
 #ifdef DEBUG
 void Fusion::dump(const Circuit& circuit) const {
@@ -173,23 +264,37 @@ void Fusion::optimize_circuit(Circuit& circ,
                               Noise::NoiseModel& noise,
                               const opset_t &allowed_opset,
                               ExperimentData &data) const {
+  fuse_circuit(circ, data, nullptr);
+}
+
+void Fusion::optimize_circuit(Circuit& circ,
+                              Noise::NoiseModel& noise,
+                              const opset_t &allowed_opset,
+                              ExperimentData &data,
+                              FusionCache &cache) const {
+  fuse_circuit(circ, data, &cache);
+}
+
+void Fusion::fuse_circuit(Circuit& circ, ExperimentData &data, FusionCache *cache) const {
 
   if (circ.num_qubits < threshold_ || !active_)
     return;
 
   bool applied = false;
 
+  // With a cache, the sampled errors of a noise circuit are not fused, so
+  // that the segments of the ideal circuit between them can be reused
   uint_t fusion_start = 0;
   for (uint_t op_idx = 0; op_idx < circ.ops.size(); ++op_idx) {
     if (can_ignore(circ.ops[op_idx]))
       continue;
-    if (!can_apply_fusion(circ.ops[op_idx])) {
-      applied |= fusion_start != op_idx && aggregate_operations(circ.ops, fusion_start, op_idx);
+    if (!can_apply_fusion(circ.ops[op_idx]) || (cache != nullptr && circ.ops[op_idx].sampled_noise)) {
+      applied |= fusion_start != op_idx && aggregate_segment(circ.ops, fusion_start, op_idx, cache);
       fusion_start = op_idx + 1;
     }
   }
 
-  if (fusion_start < circ.ops.size() && aggregate_operations(circ.ops, fusion_start, circ.ops.size()))
+  if (fusion_start < circ.ops.size() && aggregate_segment(circ.ops, fusion_start, circ.ops.size(), cache))
       applied = true;
 
   if (applied) {
@@ -215,6 +320,77 @@ void Fusion::optimize_circuit(Circuit& circ,
 #endif
 }
 
+bool Fusion::aggregate_segment(oplist_t& ops,
+                               const int fusion_start,
+                               const int fusion_end,
+                               FusionCache *cache) const {
+  auto aggregate = [&]() {
+    if (method_ == Method::dag)
+      return aggregate_operations_dag(ops, fusion_start, fusion_end);
+    return aggregate_operations(ops, fusion_start, fusion_end);
+  };
+
+  if (cache == nullptr)
+    return aggregate();
+
+  const std::string key = segment_key(ops, fusion_start, fusion_end);
+  auto it = cache->segments.find(key);
+  if (it == cache->segments.end()) {
+    ++cache->misses;
+    const bool applied = aggregate();
+    if (cache->segments.size() < cache_size_) {
+      oplist_t fused_ops;
+      if (applied)
+        for (int i = fusion_start; i < fusion_end; ++i)
+          if (ops[i].name != "nop")
+            fused_ops.push_back(ops[i]);
+      cache->segments.emplace(key, std::make_pair(applied, std::move(fused_ops)));
+    }
+    return applied;
+  }
+
+  ++cache->hits;
+  const bool applied = it->second.first;
+  if (applied) {
+    const oplist_t& fused_ops = it->second.second;
+    for (uint_t i = 0; i < fusion_end - fusion_start; ++i) {
+      if (i < fused_ops.size())
+        ops[fusion_start + i] = fused_ops[i];
+      else
+        ops[fusion_start + i].name = "nop";
+    }
+  }
+  return applied;
+}
+
+std::string Fusion::segment_key(const oplist_t& ops,
+                                const int fusion_start,
+                                const int fusion_end) const {
+  // Fusable operations are defined by their type, name, qubits, parameters
+  // and matrices
+  std::string key;
+  auto append = [&key](const void* data, const size_t size) {
+    key.append(reinterpret_cast<const char*>(&size), sizeof(size));
+    key.append(reinterpret_cast<const char*>(data), size);
+  };
+  for (int i = fusion_start; i < fusion_end; ++i) {
+    const op_t& op = ops[i];
+    append(&op.type, sizeof(op.type));
+    append(op.name.data(), op.name.size());
+    append(op.qubits.data(), op.qubits.size() * sizeof(uint_t));
+    append(op.params.data(), op.params.size() * sizeof(complex_t));
+    for (const cmatrix_t& mat: op.mats) {
+      const size_t rows = mat.GetRows();
+      append(&rows, sizeof(rows));
+      for (size_t j = 0; j < mat.size(); ++j) {
+        const complex_t element = mat[j];
+        key.append(reinterpret_cast<const char*>(&element), sizeof(element));
+      }
+    }
+  }
+  return key;
+}
+
 bool Fusion::can_ignore(const op_t& op) const {
   switch (op.type) {
   case optype_t::barrier:
@@ -250,8 +426,23 @@ bool Fusion::can_apply_fusion(const op_t& op) const {
 double Fusion::get_cost(const op_t& op) const {
   if (can_ignore(op))
     return .0;
-  else
+  if (dense_costs_.empty())
     return cost_factor_;
+  // Without fusion an operation costs about as much as a matrix on its qubits
+  bool diagonal = true;
+  for (uint_t q = 0; q < op.qubits.size(); ++q) {
+    const Basis basis = diagonal_basis(op, q);
+    diagonal &= (basis == Basis::identity || basis == Basis::z);
+  }
+  const uint_t index = std::min<uint_t>(op.qubits.size(), dense_costs_.size()) - 1;
+  return diagonal ? diagonal_costs_[index] : dense_costs_[index];
+}
+
+double Fusion::fused_cost(const uint_t num_qubits, const bool diagonal) const {
+  if (dense_costs_.empty())
+    return diagonal ? cost_factor_ : pow(cost_factor_, (double) std::max<uint_t>(num_qubits - 1, 1));
+  const uint_t index = std::min<uint_t>(num_qubits, dense_costs_.size()) - 1;
+  return diagonal ? diagonal_costs_[index] : dense_costs_[index];
 }
 
 bool Fusion::aggregate_operations(oplist_t& ops, const int fusion_start, const int fusion_end) const {
@@ -320,6 +511,257 @@ bool Fusion::aggregate_operations(oplist_t& ops, const int fusion_start, const i
   return true;
 }
 
+//------------------------------------------------------------------------------
+// Fusion::aggregate_operations_dag - outline of the algorithm
+// 1. Build the dependency graph of the operations: an operation depends on
+//    the earlier operations on a common qubit that it does not commute with.
+//    Operations on disjoint qubits, diagonal operations, and operations that
+//    share only controls or only targets of cx gates commute.
+// 2. Repeatedly take the earliest operation whose dependencies have all been
+//    emitted, and grow a block from it by adding operations whose
+//    dependencies are emitted or in the block, preferring the operations
+//    that add the fewest new qubits, up to max_qubit qubits. Operations
+//    that keep the block diagonal are preferred while it is.
+// 3. Emit the prefix of the block with the lowest estimated cost of the
+//    fused operation relative to the costs of its operations, and return
+//    the other operations of the block to the ready operations.
+// The emitted operations are a topological order of the dependency graph,
+// so only commuting operations are reordered.
+//------------------------------------------------------------------------------
+bool Fusion::aggregate_operations_dag(oplist_t& ops, const int fusion_start, const int fusion_end) const {
+
+  const uint_t size = fusion_end - fusion_start;
+  if (size < 2)
+    return false;
+
+  // 1. Build the dependency graph. Walking back through the operations on
+  //    a qubit, an operation depends on the first group of consecutive
+  //    operations that are diagonal in the same basis and do not commute
+  //    with it. The earlier operations are ordered before this group.
+  uint_t max_qubit = 0;
+  for (uint_t i = 0; i < size; ++i)
+    for (const uint_t qubit: ops[fusion_start + i].qubits)
+      max_qubit = std::max(max_qubit, qubit);
+
+  std::vector<std::vector<uint_t>> qubit_ops(max_qubit + 1);
+  std::vector<std::vector<uint_t>> successors(size);
+  std::vector<uint_t> indegree(size, 0);
+  std::vector<std::vector<Basis>> bases(size);
+  std::vector<bool> diagonal(size, true);
+  for (uint_t i = 0; i < size; ++i) {
+    const op_t& op = ops[fusion_start + i];
+    for (uint_t q = 0; q < op.qubits.size(); ++q) {
+      bases[i].push_back(diagonal_basis(op, q));
+      if (bases[i][q] != Basis::identity && bases[i][q] != Basis::z)
+        diagonal[i] = false;
+    }
+  }
+
+  auto basis_on = [&](const uint_t i, const uint_t qubit) {
+    const reg_t& qubits = ops[fusion_start + i].qubits;
+    return bases[i][std::distance(qubits.begin(), std::find(qubits.begin(), qubits.end(), qubit))];
+  };
+
+  for (uint_t i = 0; i < size; ++i) {
+    std::vector<uint_t> predecessors;
+    const reg_t& qubits = ops[fusion_start + i].qubits;
+    for (uint_t q = 0; q < qubits.size(); ++q) {
+      const auto& prev_ops = qubit_ops[qubits[q]];
+      bool found = false;
+      Basis group = Basis::none;
+      for (auto it = prev_ops.rbegin(); it != prev_ops.rend(); ++it) {
+        const Basis basis = basis_on(*it, qubits[q]);
+        if (!found) {
+          if (commute(bases[i][q], basis))
+            continue;
+          found = true;
+          group = basis;
+        } else if (basis == Basis::identity) {
+          continue;
+        } else if (basis != group || group == Basis::none) {
+          break;
+        }
+        predecessors.push_back(*it);
+      }
+      qubit_ops[qubits[q]].push_back(i);
+    }
+    std::sort(predecessors.begin(), predecessors.end());
+    predecessors.erase(std::unique(predecessors.begin(), predecessors.end()), predecessors.end());
+    for (const uint_t pred: predecessors)
+      successors[pred].push_back(i);
+    indegree[i] = predecessors.size();
+  }
+
+  std::set<uint_t> ready;
+  for (uint_t i = 0; i < size; ++i)
+    if (indegree[i] == 0)
+      ready.insert(i);
+
+  auto release = [&](const uint_t i) {
+    for (const uint_t succ: successors[i])
+      if (--indegree[succ] == 0)
+        ready.insert(succ);
+  };
+  auto restore = [&](const uint_t i) {
+    for (const uint_t succ: successors[i])
+      if (indegree[succ]++ == 0)
+        ready.erase(succ);
+  };
+
+  oplist_t fused_ops;
+  bool applied = false;
+  while (!ready.empty()) {
+    const uint_t seed = *ready.begin();
+    ready.erase(ready.begin());
+    release(seed);
+    const op_t& seed_op = ops[fusion_start + seed];
+    if (!can_apply_fusion(seed_op)) {
+      fused_ops.push_back(seed_op);
+      continue;
+    }
+
+    // 2. Grow a block from the seed. While the block only contains
+    //    diagonal gates, "x" and "cx", its unitary is a diagonal matrix
+    //    times an affine permutation of basis states, which is tracked as
+    //    a parity mask for each block qubit. The block is diagonal if the
+    //    permutation is the identity (e.g. cx-u1-cx).
+    std::vector<uint_t> block = {seed};
+    reg_t block_qubits;
+    std::vector<uint_t> parities;
+    uint_t flips = 0;
+    bool block_phase = true;
+
+    auto is_phase_op = [&](const uint_t i) {
+      const std::string& name = ops[fusion_start + i].name;
+      return diagonal[i] || name == "x" || name == "cx" || name == "CX";
+    };
+    auto position = [&](const uint_t qubit) {
+      return std::distance(block_qubits.begin(),
+                           std::find(block_qubits.begin(), block_qubits.end(), qubit));
+    };
+    auto add_to_block = [&](const uint_t i) {
+      const op_t& op = ops[fusion_start + i];
+      add_fusion_qubits(block_qubits, op);
+      while (parities.size() < block_qubits.size())
+        parities.push_back(1ULL << parities.size());
+      if (!block_phase || diagonal[i])
+        return;
+      if (op.name == "x") {
+        flips ^= 1ULL << position(op.qubits[0]);
+      } else if (op.name == "cx" || op.name == "CX") {
+        const auto control = position(op.qubits[0]);
+        const auto target = position(op.qubits[1]);
+        parities[target] ^= parities[control];
+        flips ^= ((flips >> control) & 1ULL) << target;
+      } else {
+        block_phase = false;
+      }
+    };
+    auto block_diagonal = [&]() {
+      if (!block_phase || flips != 0)
+        return false;
+      for (uint_t p = 0; p < parities.size(); ++p)
+        if (parities[p] != (1ULL << p))
+          return false;
+      return true;
+    };
+
+    add_to_block(seed);
+    double ops_cost = get_cost(seed_op);
+    double best_ratio = 1.;
+    uint_t best_size = 1;
+    while (true) {
+      // Prefer operations adding the fewest qubits, and among them the ones
+      // that keep the block a candidate for a diagonal matrix.
+      uint_t best = size;
+      uint_t best_rank = 2 * (max_qubit_ + 1);
+      for (const uint_t i: ready) {
+        const op_t& op = ops[fusion_start + i];
+        if (!can_apply_fusion(op))
+          continue;
+        uint_t new_qubits = 0;
+        for (const uint_t qubit: op.qubits)
+          if (std::find(block_qubits.begin(), block_qubits.end(), qubit) == block_qubits.end())
+            ++new_qubits;
+        if (block_qubits.size() + new_qubits > max_qubit_)
+          continue;
+        const uint_t rank = 2 * new_qubits + ((block_phase && !is_phase_op(i)) ? 1 : 0);
+        if (rank < best_rank) {
+          best = i;
+          best_rank = rank;
+          if (rank == 0)
+            break;
+        }
+      }
+      if (best == size)
+        break;
+
+      ready.erase(best);
+      release(best);
+      block.push_back(best);
+      add_to_block(best);
+      ops_cost += get_cost(ops[fusion_start + best]);
+
+      // 3. Keep the prefix with the lowest cost per fused operation
+      const double block_cost = fused_cost(block_qubits.size(), block_diagonal());
+      if (block_cost / ops_cost <= best_ratio) {
+        best_ratio = block_cost / ops_cost;
+        best_size = block.size();
+      }
+    }
+
+    for (uint_t b = block.size(); b-- > best_size;) {
+      restore(block[b]);
+      ready.insert(block[b]);
+    }
+    block.resize(best_size);
+
+    if (block.size() == 1) {
+      fused_ops.push_back(seed_op);
+      continue;
+    }
+    std::sort(block.begin(), block.end());
+    std::vector<op_t> fusioned_ops;
+    for (const uint_t i: block)
+      fusioned_ops.push_back(ops[fusion_start + i]);
+    fused_ops.push_back(generate_fusion_operation(fusioned_ops));
+    applied = true;
+  }
+
+  if (!applied)
+    return false;
+
+  for (uint_t i = 0; i < size; ++i) {
+    if (i < fused_ops.size())
+      ops[fusion_start + i] = fused_ops[i];
+    else
+      ops[fusion_start + i].name = "nop";
+  }
+  return true;
+}
+
+Fusion::Basis Fusion::diagonal_basis(const op_t& op, const uint_t qubit) const {
+  if (op.type == optype_t::matrix)
+    return (op.mats.size() == 1 && Utils::is_diagonal(op.mats[0], 0.)) ? Basis::z : Basis::none;
+  if (op.type != optype_t::gate)
+    return Basis::none;
+  if (op.name == "id" || op.name == "u0")
+    return Basis::identity;
+  if (op.name == "z" || op.name == "s" || op.name == "sdg" || op.name == "t"
+      || op.name == "tdg" || op.name == "u1" || op.name == "cz" || op.name == "cu1")
+    return Basis::z;
+  if (op.name == "x")
+    return Basis::x;
+  if (op.name == "cx" || op.name == "CX")
+    return (qubit == 0) ? Basis::z : Basis::x;
+  return Basis::none;
+}
+
+bool Fusion::commute(const Basis basis1, const Basis basis2) {
+  return basis1 == Basis::identity || basis2 == Basis::identity
+      || (basis1 == basis2 && basis1 != Basis::none);
+}
+
 op_t Fusion::generate_fusion_operation(const std::vector<op_t>& fusioned_ops) const {
 
   std::vector<reg_t> regs;
@@ -538,13 +980,10 @@ bool Fusion::is_diagonal(const std::vector<op_t>& ops,
 double Fusion::estimate_cost(const std::vector<op_t>& ops,
                              const uint_t from,
                              const uint_t until) const {
-  if (is_diagonal(ops, from, until))
-    return cost_factor_;
-
   reg_t fusion_qubits;
   for (uint_t i = from; i <= until; ++i)
     add_fusion_qubits(fusion_qubits, ops[i]);
-  return pow(cost_factor_, (double) std::max(fusion_qubits.size() - 1, size_t(1)));
+  return fused_cost(fusion_qubits.size(), is_diagonal(ops, from, until));
 }
 
 void Fusion::add_fusion_qubits(reg_t& fusion_qubits, const op_t& op) const {
@@ -0,0 +1,447 @@
+/**
+ * This code is part of Qiskit.
+ *
+ * (C) Copyright IBM 2018, 2019.
+ *
+ * This code is licensed under the Apache License, Version 2.0. You may
+ * obtain a copy of this license in the LICENSE.txt file in the root directory
+ * of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+ *
+ * Any modifications or derivative works of this code must retain this
+ * copyright notice, and modified files need to carry a notice indicating
+ * that they have been altered from the originals.
+ */
+
+#ifndef _aer_transpile_gate_cancellation_hpp_
+#define _aer_transpile_gate_cancellation_hpp_
+
+#include <numeric>
+
+#include "transpile/circuitopt.hpp"
+
+namespace AER {
+namespace Transpile {
+
+// Simplify the gates of a circuit before it is simulated:
+//
+// 1. Runs of single-qubit gates on a qubit are multiplied into one matrix,
+//    which is applied as a u1 or u3 gate, or as a unitary matrix if the
+//    global phase of the run matters, and removed if it is the identity.
+// 2. Pairs of cx, cz, swap and ccx gates on the same qubits cancel, and
+//    pairs of cu1 gates add their angles.
+//
+// A gate is moved backward past the gates it commutes with to find the
+// gate it merges or cancels with. Two gates commute on a common qubit if
+// they are both diagonal, or both diagonal in the X basis, on that qubit.
+//
+// Gates with quantum errors in the noise model, and conditional gates,
+// are never changed or moved past, so that the errors sampled for a
+// noisy circuit are unchanged. Gates are only replaced by gates of the
+// allowed operation set.
+class GateCancellation : public CircuitOptimization {
+public:
+
+  void set_config(const json_t &config) override;
+
+  void optimize_circuit(Circuit& circ,
+                        Noise::NoiseModel& noise,
+                        const Operations::OpSet &opset,
+                        ExperimentData &data) const override;
+
+  // Optimize a circuit without changing the noise model
+  void optimize_circuit(Circuit& circ,
+                        const Noise::NoiseModel& noise,
+                        const Operations::OpSet &opset,
+                        ExperimentData &data) const;
+
+private:
+  // The basis in which an operation is diagonal on one of its qubits
+  enum class Basis {identity, z, x, none};
+
+  // A single-qubit run, cancellable gate, or other operation of the
+  // simplified circuit
+  struct Entry {
+    Operations::Op op;
+    bool run = false;                 // single-qubit run
+    bool fixed = false;               // cannot be merged, cancelled or moved
+    bool live = true;                 // not cancelled
+    std::vector<Operations::Op> gates; // gates of a single-qubit run
+    cmatrix_t mat;                    // matrix of a single-qubit run
+  };
+
+  // Return True if an operation is a single-qubit gate that can be merged
+  bool can_merge(const Operations::Op& op,
+                 const Noise::NoiseModel& noise) const;
+
+  // Return True if an operation is a gate that can cancel with its inverse
+  bool can_cancel(const Operations::Op& op,
+                  const Noise::NoiseModel& noise) const;
+
+  // Return True if two cancellable gates act on the same qubits
+  static bool same_gate(const Operations::Op& op1, const Operations::Op& op2);
+
+  // Return the basis of an entry on one of its qubits
+  Basis basis(const Entry& entry, const uint_t qubit) const;
+  Basis matrix_basis(const cmatrix_t& mat) const;
+  static bool commute(const Basis basis1, const Basis basis2);
+
+  // Return True if an entry commutes with an operation on their common qubits
+  bool commute(const Entry& entry, const Entry& other) const;
+
+  // Return the matrix of a single-qubit gate
+  static cmatrix_t matrix(const Operations::Op& op);
+
+  // Return True if a phase is zero within the threshold
+  bool is_zero_phase(const double phase) const;
+
+  // Append the operations that apply a single-qubit run
+  void emit_run(const Entry& entry,
+                const Noise::NoiseModel& noise,
+                const Operations::OpSet &opset,
+                const bool keep_phase,
+                std::vector<Operations::Op>& ops) const;
+
+  // Number of operations on a qubit that a gate is moved past
+  const static uint_t max_depth_ = 16;
+
+  const static stringset_t single_qubit_gates_;
+
+  // Threshold for a matrix to be the identity
+  double threshold_ = 1e-14;
+
+  // show debug info
+  bool verbose_ = false;
+
+  // disabled in config
+  bool active_ = true;
+};
+
+const stringset_t GateCancellation::single_qubit_gates_({
+  "id", "x", "y", "z", "h", "s", "sdg", "t", "tdg", "u0", "u1", "u2", "u3", "U"
+});
+
+void GateCancellation::set_config(const json_t &config) {
+
+  CircuitOptimization::set_config(config);
+
+  if (JSON::check_key("gate_cancellation_verbose", config)) {
+    JSON::get_value(verbose_, "gate_cancellation_verbose", config);
+  }
+  if (JSON::check_key("gate_cancellation_enable", config)) {
+    JSON::get_value(active_, "gate_cancellation_enable", config);
+  }
+  if (JSON::check_key("gate_cancellation_threshold", config)) {
+    JSON::get_value(threshold_, "gate_cancellation_threshold", config);
+  }
+}
+
+void GateCancellation::optimize_circuit(Circuit& circ,
+                                        Noise::NoiseModel& noise,
+                                        const Operations::OpSet &allowed_opset,
+                                        ExperimentData &data) const {
+  const Noise::NoiseModel& const_noise = noise;
+  optimize_circuit(circ, const_noise, allowed_opset, data);
+}
+
+void GateCancellation::optimize_circuit(Circuit& circ,
+                                        const Noise::NoiseModel& noise,
+                                        const Operations::OpSet &allowed_opset,
+                                        ExperimentData &data) const {
+  if (!active_)
+    return;
+
+  // The global phase of a run only matters for snapshots of the state
+  const stringset_t phase_free_snapshots({
+    "memory", "register", "density_matrix", "stabilizer",
+    "probabilities", "probabilities_with_variance",
+    "expectation_value_pauli", "expectation_value_pauli_with_variance",
+    "expectation_value_pauli_single_shot",
+    "expectation_value_matrix", "expectation_value_matrix_with_variance",
+    "expectation_value_matrix_single_shot"
+  });
+  bool keep_phase = false;
+  for (const auto &op: circ.ops)
+    if (op.type == Operations::OpType::snapshot
+        && phase_free_snapshots.find(op.name) == phase_free_snapshots.end())
+      keep_phase = true;
+
+  std::vector<Entry> entries;
+  entries.reserve(circ.ops.size());
+  // Positions in entries of the operations on each qubit
+  std::vector<std::vector<uint_t>> qubit_entries(circ.num_qubits);
+
+  auto push = [&](Entry&& entry, const reg_t& qubits) {
+    for (const auto qubit: qubits)
+      qubit_entries[qubit].push_back(entries.size());
+    entries.push_back(std::move(entry));
+  };
+
+  for (const auto &op: circ.ops) {
+    Entry entry;
+    entry.op = op;
+
+    if (can_merge(op, noise)) {
+      const uint_t qubit = op.qubits[0];
+      const cmatrix_t mat = matrix(op);
+      entry.run = true;
+      entry.gates.push_back(op);
+      entry.mat = mat;
+      // Merge with the last run on the qubit that the gate commutes to
+      const Basis gate_basis = matrix_basis(mat);
+      bool merged = false;
+      uint_t depth = 0;
+      const auto &positions = qubit_entries[qubit];
+      for (auto it = positions.rbegin(); it != positions.rend() && depth < max_depth_; ++it, ++depth) {
+        Entry& other = entries[*it];
+        if (!other.live)
+          continue;
+        if (other.run) {
+          other.gates.push_back(op);
+          other.mat = mat * other.mat;
+          const auto identity = Utils::is_identity_phase(other.mat, threshold_);
+          if (identity.first && (!keep_phase || is_zero_phase(identity.second)))
+            other.live = false;
+          merged = true;
+          break;
+        }
+        if (!commute(basis(other, qubit), gate_basis))
+          break;
+      }
+      if (merged)
+        continue;
+      const auto identity = Utils::is_identity_phase(mat, threshold_);
+      if (identity.first && (!keep_phase || is_zero_phase(identity.second)))
+        continue;
+      push(std::move(entry), op.qubits);
+      continue;
+    }
+
+    if (can_cancel(op, noise)) {
+      // Find the last gate on the first qubit that the gate commutes to
+      bool cancelled = false;
+      uint_t depth = 0;
+      const auto &positions = qubit_entries[op.qubits[0]];
+      for (auto it = positions.rbegin(); it != positions.rend() && depth < max_depth_; ++it, ++depth) {
+        Entry& other = entries[*it];
+        if (!other.live)
+          continue;
+        if (!other.run && !other.fixed && same_gate(other.op, op)) {
+          // The gate must also commute with the later operations on its
+          // other qubits
+          bool blocked = false;
+          for (size_t q = 1; q < op.qubits.size() && !blocked; ++q) {
+            const auto &later = qubit_entries[op.qubits[q]];
+            for (auto jt = later.rbegin(); jt != later.rend() && *jt > *it; ++jt) {
+              if (entries[*jt].live && !commute(entries[*jt], entry)) {
+                blocked = true;
+                break;
+              }
+            }
+          }
+          if (blocked)
+            break;
+          if (op.name == "cu1") {
+            other.op.params[0] += op.params[0];
+            if (is_zero_phase(std::real(other.op.params[0])))
+              other.live = false;
+          } else {
+            other.live = false;
+          }
+          cancelled = true;
+          break;
+        }
+        if (!commute(other, entry))
+          break;
+      }
+      if (!cancelled)
+        push(std::move(entry), op.qubits);
+      continue;
+    }
+
+    // Other operations are not changed, and snapshots and noise switches
+    // act on all qubits. Operations with nonlocal errors also act on the
+    // qubits of their errors, so gates are not moved across the errors.
+    entry.fixed = true;
+    if (op.type == Operations::OpType::snapshot ||
+        op.type == Operations::OpType::noise_switch) {
+      reg_t qubits(circ.num_qubits);
+      std::iota(qubits.begin(), qubits.end(), 0);
+      push(std::move(entry), qubits);
+    } else {
+      push(std::move(entry), noise_support(op, circ, noise));
+    }
+  }
+
+  const size_t num_ops = circ.ops.size();
+  circ.ops.clear();
+  for (const auto &entry: entries) {
+    if (!entry.live)
+      continue;
+    if (entry.run)
+      emit_run(entry, noise, allowed_opset, keep_phase, circ.ops);
+    else
+      circ.ops.push_back(entry.op);
+  }
+
+  if (verbose_) {
+    json_t cancellation_metadata;
+    cancellation_metadata["input_ops"] = num_ops;
+    cancellation_metadata["output_ops"] = circ.ops.size();
+    data.add_metadata("gate_cancellation", cancellation_metadata);
+  }
+}
+
+bool GateCancellation::can_merge(const Operations::Op& op,
+                                 const Noise::NoiseModel& noise) const {
+  if (op.conditional || op.qubits.size() != 1)
+    return false;
+  if (op.type == Operations::OpType::gate) {
+    if (single_qubit_gates_.find(op.name) == single_qubit_gates_.end())
+      return false;
+  } else if (op.type != Operations::OpType::matrix || op.mats.size() != 1) {
+    return false;
+  }
+  return !noise.has_quantum_errors(op);
+}
+
+bool GateCancellation::can_cancel(const Operations::Op& op,
+                                  const Noise::NoiseModel& noise) const {
+  if (op.conditional || op.type != Operations::OpType::gate)
+    return false;
+  if (op.name != "cx" && op.name != "CX" && op.name != "cz" && op.name != "swap"
+      && op.name != "ccx" && op.name != "cu1")
+    return false;
+  return !noise.has_quantum_errors(op);
+}
+
+bool GateCancellation::same_gate(const Operations::Op& op1,
+                                 const Operations::Op& op2) {
+  const bool cx1 = (op1.name == "cx" || op1.name == "CX");
+  const bool cx2 = (op2.name == "cx" || op2.name == "CX");
+  if (cx1 != cx2 || (!cx1 && op1.name != op2.name))
+    return false;
+  if (op1.qubits.size() != op2.qubits.size())
+    return false;
+  if (op1.name == "cz" || op1.name == "swap" || op1.name == "cu1") {
+    // Symmetric gates
+    reg_t qubits1 = op1.qubits, qubits2 = op2.qubits;
+    std::sort(qubits1.begin(), qubits1.end());
+    std::sort(qubits2.begin(), qubits2.end());
+    return qubits1 == qubits2;
+  }
+  if (op1.name == "ccx") {
+    // Controls are symmetric
+    return op1.qubits[2] == op2.qubits[2] &&
+           std::min(op1.qubits[0], op1.qubits[1]) == std::min(op2.qubits[0], op2.qubits[1]) &&
+           std::max(op1.qubits[0], op1.qubits[1]) == std::max(op2.qubits[0], op2.qubits[1]);
+  }
+  return op1.qubits == op2.qubits;
+}
+
+GateCancellation::Basis GateCancellation::basis(const Entry& entry,
+                                                const uint_t qubit) const {
+  if (entry.run)
+    return matrix_basis(entry.mat);
+  if (entry.fixed)
+    return Basis::none;
+  const auto &op = entry.op;
+  if (op.name == "cz" || op.name == "cu1")
+    return Basis::z;
+  if (op.name == "cx" || op.name == "CX" || op.name == "ccx")
+    return (qubit == op.qubits.back()) ? Basis::x : Basis::z;
+  return Basis::none;
+}
+
+GateCancellation::Basis GateCancellation::matrix_basis(const cmatrix_t& mat) const {
+  if (Utils::is_identity_phase(mat, threshold_).first)
+    return Basis::identity;
+  if (std::norm(mat(0, 1)) < threshold_ && std::norm(mat(1, 0)) < threshold_)
+    return Basis::z;
+  if (std::norm(mat(0, 0) - mat(1, 1)) < threshold_ &&
+      std::norm(mat(0, 1) - mat(1, 0)) < threshold_)
+    return Basis::x;
+  return Basis::none;
+}
+
+bool GateCancellation::commute(const Basis basis1, const Basis basis2) {
+  return basis1 == Basis::identity || basis2 == Basis::identity
+      || (basis1 == basis2 && basis1 != Basis::none);
+}
+
+bool GateCancellation::commute(const Entry& entry, const Entry& other) const {
+  if (entry.fixed || other.fixed)
+    return false;
+  for (const auto qubit: entry.op.qubits) {
+    if (std::find(other.op.qubits.begin(), other.op.qubits.end(), qubit) == other.op.qubits.end())
+      continue;
+    if (!commute(basis(entry, qubit), basis(other, qubit)))
+      return false;
+  }
+  return true;
+}
+
+cmatrix_t GateCancellation::matrix(const Operations::Op& op) {
+  if (op.type == Operations::OpType::matrix)
+    return op.mats[0];
+  if (op.name == "u0")
+    return Utils::Matrix::I;
+  if (op.name == "u1")
+    return Utils::Matrix::u1(op.params[0]);
+  if (op.name == "u2")
+    return Utils::Matrix::u2(op.params[0], op.params[1]);
+  if (op.name == "u3" || op.name == "U")
+    return Utils::Matrix::u3(op.params[0], op.params[1], op.params[2]);
+  return Utils::Matrix::from_name(op.name);
+}
+
+bool GateCancellation::is_zero_phase(const double phase) const {
+  return std::norm(std::exp(complex_t(0., phase)) - 1.) < threshold_;
+}
+
+void GateCancellation::emit_run(const Entry& entry,
+                                const Noise::NoiseModel& noise,
+                                const Operations::OpSet &allowed_opset,
+                                const bool keep_phase,
+                                std::vector<Operations::Op>& ops) const {
+  if (entry.gates.size() == 1) {
+    ops.push_back(entry.gates[0]);
+    return;
+  }
+  const uint_t qubit = entry.gates[0].qubits[0];
+  const cmatrix_t &mat = entry.mat;
+
+  // Write the matrix as exp(i * phase) * u3(theta, phi, lambda)
+  const double theta = 2. * std::atan2(std::abs(mat(1, 0)), std::abs(mat(0, 0)));
+  const bool diagonal = std::norm(mat(1, 0)) < threshold_;
+  const bool antidiagonal = std::norm(mat(0, 0)) < threshold_;
+  const double phase = antidiagonal ? std::arg(mat(1, 0)) : std::arg(mat(0, 0));
+  const double phi = diagonal ? 0. : std::arg(mat(1, 0)) - phase;
+  const double lambda = diagonal ? std::arg(mat(1, 1)) - phase
+                                 : std::arg(-mat(0, 1)) - phase;
+
+  std::vector<Operations::Op> candidates;
+  if (!keep_phase || is_zero_phase(phase)) {
+    if (diagonal)
+      candidates.push_back(Operations::make_u1(qubit, lambda));
+    candidates.push_back(Operations::make_u3(qubit, theta, phi, lambda));
+  }
+  candidates.push_back(Operations::make_unitary({qubit}, mat, "unitary"));
+
+  for (const auto &op: candidates) {
+    const bool allowed = (op.type == Operations::OpType::gate)
+      ? allowed_opset.gates.find(op.name) != allowed_opset.gates.end()
+      : allowed_opset.optypes.find(op.type) != allowed_opset.optypes.end();
+    if (allowed && !noise.has_quantum_errors(op)) {
+      ops.push_back(op);
+      return;
+    }
+  }
+  // Apply the gates of the run if they cannot be replaced
+  ops.insert(ops.end(), entry.gates.begin(), entry.gates.end());
+}
+
+//-------------------------------------------------------------------------
+} // end namespace Transpile
+} // end namespace AER
+//-------------------------------------------------------------------------
+#endif
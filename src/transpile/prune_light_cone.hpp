@@ -0,0 +1,197 @@
+/**
+ * This code is part of Qiskit.
+ *
+ * (C) Copyright IBM 2018, 2019.
+ *
+ * This code is licensed under the Apache License, Version 2.0. You may
+ * obtain a copy of this license in the LICENSE.txt file in the root directory
+ * of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+ *
+ * Any modifications or derivative works of this code must retain this
+ * copyright notice, and modified files need to carry a notice indicating
+ * that they have been altered from the originals.
+ */
+
+#ifndef _aer_transpile_prune_light_cone_hpp_
+#define _aer_transpile_prune_light_cone_hpp_
+
+#include <numeric>
+
+#include "transpile/circuitopt.hpp"
+
+namespace AER {
+namespace Transpile {
+
+// Remove the operations outside the backward light cone of the outputs of
+// a circuit. The outputs are measurements and snapshots, and a qubit is in
+// the light cone at a position of the circuit if its state there can change
+// an output. Walking backward through the circuit, an operation is kept if
+// it acts on a qubit in the light cone, or if the noise model applies an
+// error of the operation to such a qubit, and then all of its qubits are in
+// the light cone. Classical operations are always kept, and so are the
+// measurements that conditional operations depend on.
+//
+// This is only valid for circuits whose outputs are measurements and
+// snapshots, not the final state of the circuit.
+class PruneLightCone : public CircuitOptimization {
+public:
+
+  void set_config(const json_t &config) override;
+
+  void optimize_circuit(Circuit& circ,
+                        Noise::NoiseModel& noise,
+                        const Operations::OpSet &opset,
+                        ExperimentData &data) const override;
+
+private:
+  // Return the qubits an operation or its noise acts on
+  reg_t support(const Operations::Op& op,
+                const Circuit& circ,
+                const Noise::NoiseModel& noise) const;
+
+  // Return the qubits a snapshot reads, or all qubits for a snapshot of
+  // the full state
+  reg_t snapshot_qubits(const Operations::Op& op,
+                        const Circuit& circ) const;
+
+  // show debug info
+  bool verbose_ = false;
+
+  // disabled in config
+  bool active_ = true;
+};
+
+void PruneLightCone::set_config(const json_t &config) {
+
+  CircuitOptimization::set_config(config);
+
+  if (JSON::check_key("light_cone_verbose", config)) {
+    JSON::get_value(verbose_, "light_cone_verbose", config);
+  }
+  if (JSON::check_key("light_cone_enable", config)) {
+    JSON::get_value(active_, "light_cone_enable", config);
+  }
+}
+
+void PruneLightCone::optimize_circuit(Circuit& circ,
+                                      Noise::NoiseModel& noise,
+                                      const Operations::OpSet &allowed_opset,
+                                      ExperimentData &data) const {
+  if (!active_)
+    return;
+
+  std::vector<bool> live(circ.num_qubits, false);
+  std::vector<bool> keep(circ.ops.size(), true);
+  auto is_live = [&](const reg_t& qubits) {
+    for (const auto qubit: qubits)
+      if (qubit < live.size() && live[qubit])
+        return true;
+    return false;
+  };
+  auto set_live = [&](const reg_t& qubits, const bool value) {
+    for (const auto qubit: qubits)
+      if (qubit < live.size())
+        live[qubit] = value;
+  };
+
+  for (size_t i = circ.ops.size(); i-- > 0;) {
+    Operations::Op& op = circ.ops[i];
+    switch (op.type) {
+      case Operations::OpType::measure:
+        // Nonlocal errors of the measurement can change its outcome
+        set_live(support(op, circ, noise), true);
+        break;
+      case Operations::OpType::snapshot:
+        set_live(snapshot_qubits(op, circ), true);
+        break;
+      case Operations::OpType::bfunc:
+      case Operations::OpType::roerror:
+      case Operations::OpType::noise_switch:
+        break;
+      case Operations::OpType::barrier: {
+        // Only keep the qubits of the light cone in barriers
+        reg_t qubits;
+        for (const auto qubit: op.qubits)
+          if (is_live({qubit}))
+            qubits.push_back(qubit);
+        op.qubits = qubits;
+        keep[i] = !qubits.empty();
+        break;
+      }
+      case Operations::OpType::reset:
+      case Operations::OpType::initialize: {
+        // The state of the qubits before a reset cannot change an output
+        const reg_t qubits = support(op, circ, noise);
+        keep[i] = is_live(qubits);
+        if (keep[i]) {
+          set_live(qubits, true);
+          set_live(op.qubits, false);
+        }
+        break;
+      }
+      default: {
+        const reg_t qubits = support(op, circ, noise);
+        keep[i] = is_live(qubits);
+        if (keep[i])
+          set_live(qubits, true);
+        break;
+      }
+    }
+  }
+
+  size_t idx = 0;
+  for (size_t i = 0; i < circ.ops.size(); ++i) {
+    if (keep[i]) {
+      if (i != idx)
+        circ.ops[idx] = std::move(circ.ops[i]);
+      ++idx;
+    }
+  }
+  const size_t removed = circ.ops.size() - idx;
+  circ.ops.erase(circ.ops.begin() + idx, circ.ops.end());
+
+  if (verbose_) {
+    json_t light_cone_metadata;
+    light_cone_metadata["removed_ops"] = removed;
+    data.add_metadata("light_cone", light_cone_metadata);
+  }
+}
+
+reg_t PruneLightCone::support(const Operations::Op& op,
+                              const Circuit& circ,
+                              const Noise::NoiseModel& noise) const {
+  reg_t qubits = noise_support(op, circ, noise);
+  for (const reg_t &reg: op.regs)
+    qubits.insert(qubits.end(), reg.begin(), reg.end());
+  return qubits;
+}
+
+reg_t PruneLightCone::snapshot_qubits(const Operations::Op& op,
+                                      const Circuit& circ) const {
+  const stringset_t classical({"memory", "register"});
+  if (classical.find(op.name) != classical.end())
+    return reg_t();
+
+  const stringset_t partial({
+    "probabilities",
+    "probabilities_with_variance",
+    "expectation_value_pauli",
+    "expectation_value_pauli_with_variance",
+    "expectation_value_pauli_single_shot",
+    "expectation_value_matrix",
+    "expectation_value_matrix_with_variance",
+    "expectation_value_matrix_single_shot"
+  });
+  if (partial.find(op.name) != partial.end())
+    return op.qubits;
+
+  reg_t qubits(circ.num_qubits);
+  std::iota(qubits.begin(), qubits.end(), 0);
+  return qubits;
+}
+
+//-------------------------------------------------------------------------
+} // end namespace Transpile
+} // end namespace AER
+//-------------------------------------------------------------------------
+#endif
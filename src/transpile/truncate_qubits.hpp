@@ -22,6 +22,11 @@
 namespace AER {
 namespace Transpile {
 
+// Remove the qubits that are not used by a circuit, and remap the qubits of
+// the circuit and the noise model onto the used qubits. A qubit is used if an
+// operation of the circuit acts on it, or if a nonlocal error of the noise
+// model acts on it together with other used qubits. The errors of the noise
+// model on any unused qubits are removed.
 class TruncateQubits : public CircuitOptimization {
 public:
 
@@ -47,9 +52,7 @@ private:
                           const Noise::NoiseModel& noise) const;
 
   // generate a new mapping. a value of reg_t is original and its index is the new mapping
-  mapping_t generate_mapping(const reg_t& active_qubits,
-                             const Circuit& circ,
-                             const Noise::NoiseModel& noise) const;
+  mapping_t generate_mapping(const reg_t& active_qubits) const;
 
   // remap qubits in an operation
   void remap_qubits(reg_t &qubits,
@@ -95,7 +98,7 @@ void TruncateQubits::optimize_circuit(Circuit& circ,
     return;
 
   // Generate the qubit mapping {original_qubit: new_qubit}
-  mapping_t mapping = generate_mapping(active_qubits, circ, noise);
+  mapping_t mapping = generate_mapping(active_qubits);
 
   // Remap circuit operations
   for (Operations::Op& op: circ.ops) {
@@ -108,8 +111,8 @@ void TruncateQubits::optimize_circuit(Circuit& circ,
   // Update the number of qubits in the circuit 
   circ.num_qubits = active_qubits.size();
 
-  // Remap noise model
-  noise.remap_qubits(mapping);
+  // Remap noise model and remove errors on unused qubits
+  noise.restrict_qubits(mapping);
 
   if (verbose_) {
     json_t truncate_metadata;
@@ -122,65 +125,64 @@ void TruncateQubits::optimize_circuit(Circuit& circ,
 reg_t TruncateQubits::get_active_qubits(const Circuit& circ,
                                         const Noise::NoiseModel& noise) const {
 
-  size_t not_used = circ.num_qubits + 1;
-  reg_t active_qubits = reg_t(circ.num_qubits, not_used);
+  std::vector<bool> active(circ.num_qubits, false);
 
+  // The qubits of the nonlocal errors of each operation
+  std::vector<std::vector<reg_t>> noise_regs;
   for (const Operations::Op& op: circ.ops) {
     for (size_t qubit: op.qubits)
-      active_qubits[qubit] = qubit;
+      active[qubit] = true;
     for (const reg_t &reg: op.regs)
       for (size_t qubit: reg)
-        active_qubits[qubit] = qubit;
-    
-    // Add noise model qubits
-    // The label for checking noise is either stored in string_params
-    // or is the op name
-    std::string label = "";
-    if (op.string_params.size() == 1) {
-      label = op.string_params[0];
-    }
-    if (label == "")
-      label = op.name;
-    const auto noise_reg = noise.nonlocal_noise_qubits(label, op.qubits);
-    for (size_t qubit: noise_reg) {
-      // A noise model might have more qubits in it than are in
-      // the original circuit. In this case we only add qubits
-      // up to the number of qubits in the circuit
-      if (qubit < circ.num_qubits)
-        active_qubits[qubit] = qubit;
+        active[qubit] = true;
+
+    if (noise.nonlocal_noise_qubits(op).empty())
+      continue;
+    std::vector<reg_t> regs;
+    for (const auto &noise_error: noise.quantum_errors(op))
+      regs.push_back(noise_error.second);
+    noise_regs.push_back(regs);
+  }
+
+  // Add the qubits of nonlocal errors that act on an active qubit until
+  // no more qubits are added. Errors that only act on unused qubits
+  // cannot change the output of the circuit.
+  bool updated = !noise_regs.empty();
+  while (updated) {
+    updated = false;
+    for (const auto &regs: noise_regs) {
+      for (const auto &reg: regs) {
+        bool used = false;
+        for (size_t qubit: reg)
+          used |= (qubit < circ.num_qubits && active[qubit]);
+        if (!used)
+          continue;
+        // A noise model might have more qubits in it than are in
+        // the original circuit. In this case we only add qubits
+        // up to the number of qubits in the circuit
+        for (size_t qubit: reg) {
+          if (qubit < circ.num_qubits && !active[qubit]) {
+            active[qubit] = true;
+            updated = true;
+          }
+        }
+      }
     }
   }
 
-  // Erase unused qubits for the list
-  active_qubits.erase(std::remove(active_qubits.begin(), active_qubits.end(), not_used),
-                active_qubits.end());
+  reg_t active_qubits;
+  for (size_t qubit = 0; qubit < circ.num_qubits; ++qubit)
+    if (active[qubit])
+      active_qubits.push_back(qubit);
   return active_qubits;
 }
 
 TruncateQubits::mapping_t
-TruncateQubits::generate_mapping(const reg_t& active_qubits, 
-                                 const Circuit& circ,
-                                 const Noise::NoiseModel& noise) const {
+TruncateQubits::generate_mapping(const reg_t& active_qubits) const {
   // Convert to mapping
   mapping_t mapping;
-  for (const auto & qubit : active_qubits) {
-    size_t new_qubit = std::distance(active_qubits.begin(),
-                                     find(active_qubits.begin(),
-                                     active_qubits.end(), qubit));
-    mapping[qubit] = new_qubit;
-  }
-
-  // Now we need to complete the mapping by adding qubits not in the input space
-  // This is required for remapping the noise model.
-  if (!noise.is_ideal()) {
-    uint_t unused_qubit = active_qubits.size();
-    for (uint_t qubit=0; qubit<circ.num_qubits; qubit++) {
-      if (mapping.find(qubit) == mapping.end()) {
-        mapping[qubit] = unused_qubit;
-        unused_qubit++; // increment unused qubit position
-      }
-    }
-  }
+  for (size_t new_qubit = 0; new_qubit < active_qubits.size(); ++new_qubit)
+    mapping[active_qubits[new_qubit]] = new_qubit;
   return mapping;
 }
 
@@ -207,7 +209,11 @@ bool TruncateQubits::can_apply(const Operations::Op& op) const {
       "probabilities",
       "probabilities_with_variance",
       "expectation_value_pauli",
-      "expectation_value_pauli_with_variance"
+      "expectation_value_pauli_with_variance",
+      "expectation_value_pauli_single_shot",
+      "expectation_value_matrix",
+      "expectation_value_matrix_with_variance",
+      "expectation_value_matrix_single_shot"
     });
     return allowed.find(op.name) != allowed.end();
   }
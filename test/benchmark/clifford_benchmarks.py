@@ -0,0 +1,53 @@
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2018, 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Airspeed Velocity (ASV) benchmarks suite for the stabilizer simulation
+method on random Clifford circuits
+"""
+
+from qiskit import QiskitError
+from qiskit.compiler import assemble
+from qiskit.providers.aer import QasmSimulator
+from .tools import random_clifford_circuit
+
+
+class RandomCliffordTimeSuite:
+    """
+    Benchmark random Clifford circuits on large numbers of qubits with the
+    stabilizer simulation method, with and without a final measurement of
+    every qubit.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        self.depth = 10
+        num_qubits = [100, 500, 1000, 2000]
+        self.circuits = {}
+        for num_qubit in num_qubits:
+            for measure in [True, False]:
+                circuit = random_clifford_circuit(num_qubit, self.depth,
+                                                  measure=measure, seed=1)
+                self.circuits[(num_qubit, measure)] = assemble(
+                    circuit, self.backend, shots=1)
+        self.param_names = ["Number of Qubits", "Measure"]
+        self.params = (num_qubits, [True, False])
+
+    def time_random_clifford(self, num_qubit, measure):
+        """ Benchmark random Clifford circuits """
+        result = self.backend.run(
+            self.circuits[(num_qubit, measure)],
+            backend_options={'method': 'stabilizer'}
+        ).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
@@ -0,0 +1,70 @@
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2018, 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Airspeed Velocity (ASV) benchmarks suite for the extended stabilizer
+simulation method on random Clifford+T circuits
+"""
+
+from qiskit import QiskitError
+from qiskit.compiler import assemble
+from qiskit.providers.aer import QasmSimulator
+from .tools import random_clifford_t_circuit
+
+
+class RandomCliffordTTimeSuite:
+    """
+    Benchmark random Clifford+T circuits with the extended stabilizer
+    simulation method for increasing numbers of T gates, and track the
+    number of decomposition terms updated per gate per second.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        self.num_qubits = 20
+        self.depth = 20
+        t_counts = [20, 30, 40]
+        self.circuits = {}
+        self.num_gates = {}
+        for t_count in t_counts:
+            circuit = random_clifford_t_circuit(self.num_qubits, self.depth,
+                                                t_count, seed=1)
+            self.num_gates[t_count] = circuit.size()
+            self.circuits[t_count] = assemble(circuit, self.backend, shots=1)
+        self.backend_options = {
+            'method': 'extended_stabilizer',
+            'extended_stabilizer_measure_sampling': True,
+            'extended_stabilizer_mixing_time': 10
+        }
+        self.param_names = ["Number of T gates"]
+        self.params = (t_counts,)
+
+    def _run(self, t_count):
+        result = self.backend.run(
+            self.circuits[t_count],
+            backend_options=self.backend_options).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
+        return result
+
+    def time_random_clifford_t(self, t_count):
+        """ Benchmark random Clifford+T circuits """
+        self._run(t_count)
+
+    def track_terms_per_second(self, t_count):
+        """ Track the number of term updates per second """
+        result = self._run(t_count).results[0]
+        num_terms = result.metadata['extended_stabilizer_num_terms']
+        return num_terms * self.num_gates[t_count] / result.time_taken
+
+    track_terms_per_second.unit = "terms/s"
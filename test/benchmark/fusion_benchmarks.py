@@ -1,10 +1,11 @@
 import numpy as np
 import math
 from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit, QiskitError
-from qiskit.compiler import assemble
+from qiskit.compiler import transpile, assemble
 from qiskit.providers.aer import QasmSimulator
 from qiskit.quantum_info.random import random_unitary
 from qiskit.quantum_info.synthesis import two_qubit_cnot_decompose
+from .tools import quantum_volume_circuit, qaoa_circuit
 
 
 class QuantumFourierTransformFusionSuite:
@@ -108,3 +109,37 @@ class RandomFusionSuite:
         result = self.backend.run(qobj, backend_options={'fusion_enable': fusion_enable}).result()
         if result.status != 'COMPLETED':
             raise QiskitError("Simulation failed. Status: " + result.status)
+
+
+class FusionMethodSuite:
+    """
+    Benchmark the dag and window fusion methods on quantum Fourier
+    transform, quantum volume and QAOA circuits.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        circuits = {
+            'QFT 20': QuantumFourierTransformFusionSuite.qft_circuit(20, False),
+            'QFT 25': QuantumFourierTransformFusionSuite.qft_circuit(25, False),
+            'QV 20': quantum_volume_circuit(20, 20, seed=1),
+            'QAOA 20': qaoa_circuit(20, 2, seed=1),
+            'QAOA 25': qaoa_circuit(25, 2, seed=1),
+        }
+        self.qobjs = {}
+        for name, circuit in circuits.items():
+            circuit = transpile(circuit, basis_gates=['u1', 'u2', 'u3', 'cx'],
+                                optimization_level=0, seed_transpiler=1)
+            self.qobjs[name] = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Circuit", "Fusion method"]
+        self.params = (list(circuits.keys()), ['dag', 'window'])
+
+    def time_fusion_method(self, circuit, fusion_method):
+        """ Benchmark a circuit with the given fusion method """
+        result = self.backend.run(
+            self.qobjs[circuit],
+            backend_options={'fusion_enable': True,
+                             'fusion_method': fusion_method}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
@@ -0,0 +1,176 @@
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2018, 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Airspeed Velocity (ASV) benchmarks suite for the SVD algorithms, the
+expectation value snapshots, the parallel gate layers and the gates on
+non-adjacent qubits of the matrix product state simulation method
+"""
+
+from qiskit import QiskitError
+from qiskit.compiler import transpile, assemble
+from qiskit.providers.aer import QasmSimulator
+from .tools import quantum_volume_circuit, qaoa_circuit, brickwork_circuit
+from .tools import qft_circuit
+
+
+class MatrixProductStateSVDTimeSuite:
+    """
+    Benchmark the SVD algorithms of the matrix product state method on
+    quantum volume and QAOA circuits. The circuits are sized so that the
+    bond dimension reaches 16 to 128, which covers the SVDs of 32x32 to
+    256x256 matrices done by two-qubit gates.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        circuits = {
+            'QV 8': quantum_volume_circuit(8, 8, seed=1),
+            'QV 12': quantum_volume_circuit(12, 12, seed=1),
+            'QV 14': quantum_volume_circuit(14, 14, seed=1),
+            'QAOA 12': qaoa_circuit(12, 2, seed=1),
+            'QAOA 16': qaoa_circuit(16, 2, seed=1),
+        }
+        self.qobjs = {}
+        for name, circuit in circuits.items():
+            circuit = transpile(circuit, basis_gates=['u1', 'u2', 'u3', 'cx'],
+                                optimization_level=0, seed_transpiler=1)
+            self.qobjs[name] = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Circuit", "SVD method"]
+        self.params = (list(circuits.keys()),
+                       ['automatic', 'golub_kahan', 'gesvd', 'gesdd'])
+
+    def time_svd_method(self, circuit, svd_method):
+        """ Benchmark a circuit with the given SVD algorithm """
+        result = self.backend.run(
+            self.qobjs[circuit],
+            backend_options={'method': 'matrix_product_state',
+                             'mps_svd_method': svd_method}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
+
+
+class MatrixProductStateTruncatedSVDTimeSuite:
+    """
+    Benchmark the truncated SVD algorithms of the matrix product state
+    method on a quantum volume circuit with a limited bond dimension.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        circuit = quantum_volume_circuit(16, 16, seed=1)
+        circuit = transpile(circuit, basis_gates=['u1', 'u2', 'u3', 'cx'],
+                            optimization_level=0, seed_transpiler=1)
+        self.qobj = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Maximum bond dimension", "SVD method"]
+        self.params = ([8, 32, 64], ['automatic', 'gesdd', 'randomized'])
+
+    def time_truncated_svd_method(self, max_bond_dimension, svd_method):
+        """ Benchmark a circuit with a limited bond dimension """
+        result = self.backend.run(
+            self.qobj,
+            backend_options={'method': 'matrix_product_state',
+                             'mps_max_bond_dimension': max_bond_dimension,
+                             'mps_svd_method': svd_method}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
+
+
+class MatrixProductStateExpvalTimeSuite:
+    """
+    Benchmark Pauli expectation value snapshots of the matrix product state
+    method with the Hamiltonian of a Heisenberg chain, which has a Pauli
+    component for every pair of neighbouring qubits, on the state of a
+    circuit of nearest-neighbour gates.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        self.qobjs = {}
+        for num_qubits in [16, 32, 64]:
+            circuit = brickwork_circuit(num_qubits, 6, measure=False, seed=1)
+            hamiltonian = []
+            for qubit in range(num_qubits - 1):
+                for pauli in ['X', 'Y', 'Z']:
+                    label = ['I'] * num_qubits
+                    label[qubit] = label[qubit + 1] = pauli
+                    hamiltonian.append([1, ''.join(label)])
+            circuit.snapshot_expectation_value('H', hamiltonian,
+                                               range(num_qubits))
+            self.qobjs[num_qubits] = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Number of qubits"]
+        self.params = (list(self.qobjs.keys()),)
+
+    def time_expval_pauli(self, num_qubits):
+        """ Benchmark a Hamiltonian expectation value snapshot """
+        result = self.backend.run(
+            self.qobjs[num_qubits],
+            backend_options={'method': 'matrix_product_state'}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
+
+
+class MatrixProductStateLayersTimeSuite:
+    """
+    Benchmark the parallel application of the gates of a layer by the matrix
+    product state method on brickwork circuits, whose two-qubit gates are
+    applied to disjoint pairs of neighbouring qubits.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        self.qobjs = {}
+        for num_qubits in [50, 100, 200]:
+            circuit = brickwork_circuit(num_qubits, 12, seed=1)
+            self.qobjs[num_qubits] = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Number of qubits", "Number of threads"]
+        self.params = (list(self.qobjs.keys()), [1, 2, 4, 8])
+
+    def time_brickwork(self, num_qubits, num_threads):
+        """ Benchmark a brickwork circuit with the given number of threads """
+        result = self.backend.run(
+            self.qobjs[num_qubits],
+            backend_options={'method': 'matrix_product_state',
+                             'max_parallel_threads': num_threads}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
+
+
+class MatrixProductStateLongRangeTimeSuite:
+    """
+    Benchmark the gates on non-adjacent qubits of the matrix product state
+    method on QFT circuits, whose controlled phase gates act on every pair
+    of qubits.
+    """
+
+    def __init__(self):
+        self.timeout = 60 * 20
+        self.backend = QasmSimulator()
+        self.qobjs = {}
+        for num_qubits in [20, 40, 60]:
+            circuit = qft_circuit(num_qubits)
+            self.qobjs[num_qubits] = assemble(circuit, self.backend, shots=1)
+        self.param_names = ["Number of qubits", "Swap lookahead"]
+        self.params = (list(self.qobjs.keys()), [0, 20])
+
+    def time_qft(self, num_qubits, swap_lookahead):
+        """ Benchmark a QFT circuit with the given swap lookahead """
+        result = self.backend.run(
+            self.qobjs[num_qubits],
+            backend_options={'method': 'matrix_product_state',
+                             'mps_swap_lookahead': swap_lookahead}).result()
+        if result.status != 'COMPLETED':
+            raise QiskitError("Simulation failed. Status: " + result.status)
@@ -123,6 +123,144 @@ def quantum_volume_circuit(num_qubits, depth, measure=True, seed=None):
     return circuit
 
 
+def random_clifford_circuit(num_qubits, depth, measure=True, seed=None):
+    """Create a random Clifford circuit.
+
+    Each layer applies a random single-qubit Clifford gate to every qubit
+    followed by CX gates between the pairs of a random bipartition.
+
+    Args:
+        num_qubits (int): number of qubits
+        depth (int): number of layers
+        measure (bool): include measurement in circuit.
+        seed (int): the seed for the random number generator
+
+    Returns:
+        QuantumCircuit: A random Clifford circuit.
+    """
+    rng = random.RandomState(seed)
+    qr = QuantumRegister(num_qubits)
+    circuit = QuantumCircuit(qr)
+    gates = [circuit.x, circuit.y, circuit.z, circuit.h, circuit.s,
+             circuit.sdg]
+    for _ in repeat(None, depth):
+        for qubit in range(num_qubits):
+            gates[rng.randint(len(gates))](qr[qubit])
+        perm = rng.permutation(num_qubits)
+        for k in range(math.floor(num_qubits / 2)):
+            circuit.cx(qr[int(perm[2 * k])], qr[int(perm[2 * k + 1])])
+    if measure is True:
+        circuit = _add_measurements(circuit, qr)
+    return circuit
+
+
+def random_clifford_t_circuit(num_qubits, depth, t_count, measure=True,
+                              seed=None):
+    """Create a random Clifford circuit with T gates.
+
+    The circuit is a random Clifford circuit with ``t_count`` T gates on
+    random qubits inserted after random layers.
+
+    Args:
+        num_qubits (int): number of qubits
+        depth (int): number of layers
+        t_count (int): number of T gates
+        measure (bool): include measurement in circuit.
+        seed (int): the seed for the random number generator
+
+    Returns:
+        QuantumCircuit: A random Clifford+T circuit.
+    """
+    rng = random.RandomState(seed)
+    qr = QuantumRegister(num_qubits)
+    circuit = QuantumCircuit(qr)
+    gates = [circuit.x, circuit.y, circuit.z, circuit.h, circuit.s,
+             circuit.sdg]
+    t_layers = rng.randint(depth, size=t_count)
+    for layer in range(depth):
+        for qubit in range(num_qubits):
+            gates[rng.randint(len(gates))](qr[qubit])
+        perm = rng.permutation(num_qubits)
+        for k in range(math.floor(num_qubits / 2)):
+            circuit.cx(qr[int(perm[2 * k])], qr[int(perm[2 * k + 1])])
+        for _ in range(list(t_layers).count(layer)):
+            circuit.t(qr[rng.randint(num_qubits)])
+    if measure is True:
+        circuit = _add_measurements(circuit, qr)
+    return circuit
+
+
+def qaoa_circuit(num_qubits, depth, degree=3, measure=True, seed=None):
+    """Create a MaxCut QAOA circuit on a random graph.
+
+    Each of the ``depth`` layers applies a ZZ rotation to every edge of the
+    graph followed by an X rotation to every qubit, with random angles.
+
+    Args:
+        num_qubits (int): number of qubits
+        depth (int): number of QAOA layers
+        degree (int): average degree of the random graph
+        measure (bool): include measurement in circuit.
+        seed (int): the seed for the random number generator
+
+    Returns:
+        QuantumCircuit: A QAOA circuit.
+    """
+    rng = random.RandomState(seed)
+    # Random graph from a union of random perfect matchings
+    # A graph without multiple edges has at most n(n-1)/2 of them
+    num_edges = min(num_qubits * degree // 2,
+                    num_qubits * (num_qubits - 1) // 2)
+    edges = set()
+    while len(edges) < num_edges:
+        perm = rng.permutation(num_qubits)
+        for k in range(math.floor(num_qubits / 2)):
+            edge = tuple(sorted((int(perm[2 * k]), int(perm[2 * k + 1]))))
+            if len(edges) < num_edges:
+                edges.add(edge)
+    qr = QuantumRegister(num_qubits)
+    circuit = QuantumCircuit(qr)
+    circuit.h(qr)
+    for _ in repeat(None, depth):
+        gamma, beta = rng.uniform(0, math.pi, size=2)
+        for i, j in sorted(edges):
+            circuit.cx(qr[i], qr[j])
+            circuit.u1(2 * gamma, qr[j])
+            circuit.cx(qr[i], qr[j])
+        for qubit in range(num_qubits):
+            circuit.u3(2 * beta, -math.pi / 2, math.pi / 2, qr[qubit])
+    if measure is True:
+        circuit = _add_measurements(circuit, qr)
+    return circuit
+
+
+def brickwork_circuit(num_qubits, depth, measure=True, seed=None):
+    """Create a circuit of layers of random single-qubit gates, each followed
+    by CNOT gates on alternating pairs of neighbouring qubits.
+
+    Args:
+        num_qubits (int): number of qubits
+        depth (int): number of layers
+        measure (bool): include measurement in circuit.
+        seed (int): the seed for the random number generator
+
+    Returns:
+        QuantumCircuit: A brickwork circuit.
+    """
+    rng = random.RandomState(seed)
+    qr = QuantumRegister(num_qubits)
+    circuit = QuantumCircuit(qr)
+    for layer in range(depth):
+        for qubit in range(num_qubits):
+            theta, phi, lam = rng.uniform(0, 2 * math.pi, size=3)
+            circuit.u3(theta, phi, lam, qr[qubit])
+        for qubit in range(layer % 2, num_qubits - 1, 2):
+            circuit.cx(qr[qubit], qr[qubit + 1])
+    if measure is True:
+        circuit = _add_measurements(circuit, qr)
+    return circuit
+
+
 def qft_circuit(num_qubits, measure=True):
     """Create a qft circuit.
 
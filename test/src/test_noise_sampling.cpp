@@ -0,0 +1,194 @@
+#define CATCH_CONFIG_MAIN
+#include <catch.hpp>
+#include <algorithm>
+#include <cmath>
+#include "framework/creg.hpp"
+#include "framework/rng.hpp"
+#include "noise/noise_model.hpp"
+
+namespace AER{
+namespace Test{
+
+// X error with probability 0.3 after an x gate, and optionally a readout
+// error on the measurement of qubit 0
+Noise::NoiseModel noise_model(bool readout){
+    json_t js = R"({"errors": [{
+        "type": "qerror", "operations": ["x"],
+        "instructions": [[{"name": "x", "qubits": [0]}], [{"name": "id", "qubits": [0]}]],
+        "probabilities": [0.3, 0.7]}]})"_json;
+    if (readout)
+        js["errors"].push_back(R"({
+            "type": "roerror", "operations": ["measure"],
+            "probabilities": [[0.9, 0.1], [0.2, 0.8]]})"_json);
+    return Noise::NoiseModel(js);
+}
+
+Circuit noise_circuit(){
+    return Circuit(R"({"config": {"memory_slots": 1}, "instructions": [
+        {"name": "x", "qubits": [0]},
+        {"name": "x", "qubits": [0]},
+        {"name": "measure", "qubits": [0], "memory": [0]}]})"_json);
+}
+
+// Number of sampled quantum errors in a noisy circuit
+uint_t num_sampled_errors(const Circuit &circ){
+    return std::count_if(circ.ops.begin(), circ.ops.end(),
+                         [](const Operations::Op &op) {
+                             return op.sampled_noise && op.type != Operations::OpType::roerror;
+                         });
+}
+
+TEST_CASE( "Alias table", "[noise]" ) {
+    // Unnormalized probabilities with zero entries
+    const std::vector<double> weights = {1., 0., 2., 0., 1.};
+    const std::vector<double> probs = {0.25, 0., 0.5, 0., 0.25};
+    AliasTable table(weights);
+    REQUIRE(table.size() == weights.size());
+
+    SECTION( "The outcomes of uniformly spaced random numbers have the probabilities of the table" ) {
+        const uint_t samples = 100000;
+        std::vector<uint_t> counts(weights.size(), 0);
+        for (uint_t i = 0; i < samples; ++i)
+            counts[table.sample((i + 0.5) / samples)]++;
+        for (uint_t k = 0; k < probs.size(); ++k)
+            REQUIRE(static_cast<double>(counts[k]) / samples ==
+                    Approx(probs[k]).margin(1e-4));
+        REQUIRE(counts[1] == 0);
+        REQUIRE(counts[3] == 0);
+    }
+
+    SECTION( "Random samples have the probabilities of the table" ) {
+        RngEngine rng;
+        rng.set_seed(1);
+        const uint_t samples = 100000;
+        std::vector<uint_t> counts(weights.size(), 0);
+        for (uint_t i = 0; i < samples; ++i)
+            counts[table.sample(rng)]++;
+        for (uint_t k = 0; k < probs.size(); ++k)
+            REQUIRE(static_cast<double>(counts[k]) / samples ==
+                    Approx(probs[k]).margin(0.01));
+        REQUIRE(counts[1] == 0);
+        REQUIRE(counts[3] == 0);
+    }
+
+    SECTION( "A table with a single non-zero probability always returns it" ) {
+        AliasTable certain({0., 0., 1.});
+        for (const double rnd : {0., 0.3, 0.5, 0.9999})
+            REQUIRE(certain.sample(rnd) == 2);
+    }
+}
+
+TEST_CASE( "Batched noise sampling", "[noise]" ) {
+    const Circuit circ = noise_circuit();
+    const uint_t shots = 20000;
+
+    SECTION( "A batch draws the same choices as one shot at a time" ) {
+        const auto noise = noise_model(true);
+        const auto errors = noise.compile_errors(circ);
+        REQUIRE(errors.num_choices() == 2 + 2);
+        RngEngine rng_batch, rng_single;
+        rng_batch.set_seed(1);
+        rng_single.set_seed(1);
+        const reg_t batch = noise.sample_errors(errors, 100, rng_batch);
+        reg_t single;
+        for (uint_t shot = 0; shot < 100; ++shot) {
+            const reg_t choices = noise.sample_errors(errors, 1, rng_single);
+            single.insert(single.end(), choices.begin(), choices.end());
+        }
+        REQUIRE(batch == single);
+    }
+
+    SECTION( "Without readout errors a shot of a batch is the single-shot sample" ) {
+        const auto noise = noise_model(false);
+        const auto errors = noise.compile_errors(circ);
+        for (uint_t seed = 0; seed < 20; ++seed) {
+            RngEngine rng_batch, rng_single;
+            rng_batch.set_seed(seed);
+            rng_single.set_seed(seed);
+            const reg_t choices = noise.sample_errors(errors, 1, rng_batch);
+            const Circuit batch_circ = noise.sample_noise(circ, errors, choices.cbegin());
+            const Circuit single_circ = noise.sample_noise(circ, errors, rng_single);
+            REQUIRE(batch_circ.ops.size() == single_circ.ops.size());
+            for (uint_t i = 0; i < batch_circ.ops.size(); ++i)
+                REQUIRE(batch_circ.ops[i].name == single_circ.ops[i].name);
+        }
+    }
+
+    SECTION( "Batched and single-shot errors have the error probabilities" ) {
+        const auto noise = noise_model(true);
+        const auto errors = noise.compile_errors(circ);
+        RngEngine rng;
+        rng.set_seed(1);
+        const reg_t choices = noise.sample_errors(errors, shots, rng);
+        uint_t batch_errors = 0, single_errors = 0;
+        for (uint_t shot = 0; shot < shots; ++shot) {
+            const auto it = choices.cbegin() + shot * errors.num_choices();
+            batch_errors += num_sampled_errors(noise.sample_noise(circ, errors, it));
+            single_errors += num_sampled_errors(noise.sample_noise(circ, rng));
+        }
+        // Each of the two x gates has an error with probability 0.3
+        REQUIRE(static_cast<double>(batch_errors) / (2 * shots) == Approx(0.3).margin(0.01));
+        REQUIRE(static_cast<double>(single_errors) / (2 * shots) == Approx(0.3).margin(0.01));
+    }
+}
+
+TEST_CASE( "Pre-drawn readout errors", "[noise]" ) {
+    const Circuit circ = noise_circuit();
+    const auto noise = noise_model(true);
+    const auto errors = noise.compile_errors(circ);
+    const uint_t shots = 20000;
+
+    SECTION( "Sampled readout errors assign the drawn outcome of each measured value" ) {
+        RngEngine rng;
+        rng.set_seed(1);
+        const reg_t choices = noise.sample_errors(errors, shots, rng);
+        // Number of flipped outcomes for measured values 0 and 1
+        std::vector<uint_t> flips(2, 0);
+        for (uint_t shot = 0; shot < shots; ++shot) {
+            const auto it = choices.cbegin() + shot * errors.num_choices();
+            const Circuit noisy_circ = noise.sample_noise(circ, errors, it);
+            const auto roerror = std::find_if(
+                noisy_circ.ops.begin(), noisy_circ.ops.end(),
+                [](const Operations::Op &op) { return op.type == Operations::OpType::roerror; });
+            REQUIRE(roerror != noisy_circ.ops.end());
+            REQUIRE(roerror->probs.size() == 2);
+            for (uint_t value = 0; value < 2; ++value) {
+                // The readout choices follow the quantum error choices
+                const uint_t outcome = *(it + errors.quantum_draws.size() + value);
+                rvector_t row(2, 0.);
+                row[outcome] = 1.;
+                REQUIRE(roerror->probs[value] == row);
+                flips[value] += (outcome != value);
+            }
+        }
+        REQUIRE(static_cast<double>(flips[0]) / shots == Approx(0.1).margin(0.01));
+        REQUIRE(static_cast<double>(flips[1]) / shots == Approx(0.2).margin(0.01));
+    }
+
+    SECTION( "The classical register applies a pre-drawn row without random numbers" ) {
+        Operations::Op op;
+        op.type = Operations::OpType::roerror;
+        op.name = "roerror";
+        op.memory = {0};
+        op.registers = {0};
+        op.probs = {{0., 1.}, {1., 0.}};
+        for (const uint_t value : {0, 1}) {
+            ClassicalRegister creg;
+            creg.initialize(1, 1);
+            creg.store_measure({value}, {0}, {0});
+            RngEngine rng, rng_unused;
+            rng.set_seed(1);
+            rng_unused.set_seed(1);
+            creg.apply_roerror(op, rng);
+            REQUIRE(creg.creg_memory() == std::to_string(1 - value));
+            REQUIRE(creg.creg_register() == std::to_string(1 - value));
+            REQUIRE(rng.rand() == rng_unused.rand());
+        }
+    }
+}
+
+//------------------------------------------------------------------------------
+} // end namespace Test
+//------------------------------------------------------------------------------
+} // end namespace AER
+//------------------------------------------------------------------------------
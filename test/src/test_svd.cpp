@@ -0,0 +1,123 @@
+#define CATCH_CONFIG_MAIN
+#include <catch.hpp>
+#include <chrono>
+#include <iostream>
+#include <random>
+#include <string>
+#include "simulators/matrix_product_state/matrix_product_state_tensor.hpp"
+
+namespace AER{
+namespace Test{
+
+const std::vector<std::pair<std::string, SVD_Method>> svd_methods = {
+    {"golub_kahan", SVD_Method::golub_kahan},
+    {"gesvd", SVD_Method::gesvd},
+    {"gesdd", SVD_Method::gesdd},
+    {"randomized", SVD_Method::randomized}};
+
+double norm(const cmatrix_t &mat){
+    double sum = 0.;
+    for (uint_t i = 0; i < mat.size(); ++i)
+        sum += std::norm(mat[i]);
+    return sum;
+}
+
+// Random complex matrix of the given rank with unit norm, as the SVDs of
+// the MPS tensors of random circuits
+cmatrix_t random_matrix(uint_t dim, uint_t rank, uint_t seed){
+    std::mt19937_64 rng(seed);
+    std::normal_distribution<double> normal;
+    cmatrix_t left(dim, rank), right(rank, dim);
+    for (uint_t i = 0; i < dim; ++i)
+        for (uint_t j = 0; j < rank; ++j) {
+            left(i, j) = complex_t(normal(rng), normal(rng));
+            right(j, i) = complex_t(normal(rng), normal(rng));
+        }
+    cmatrix_t mat = left * right;
+    const double scale = 1. / std::sqrt(norm(mat));
+    for (uint_t i = 0; i < mat.size(); ++i)
+        mat[i] *= scale;
+    return mat;
+}
+
+// U * diag(S) * V^dagger
+cmatrix_t reconstruct(const cmatrix_t &U, const rvector_t &S, const cmatrix_t &V){
+    cmatrix_t US = U;
+    for (uint_t i = 0; i < US.GetRows(); ++i)
+        for (uint_t j = 0; j < S.size(); ++j)
+            US(i, j) *= S[j];
+    return US * AER::Utils::dagger(V);
+}
+
+TEST_CASE( "Matrix product state SVD", "[svd]" ) {
+    const uint_t rank = 8;
+    for (const uint_t dim : {16, 64}) {
+        const cmatrix_t mat = random_matrix(dim, rank, dim);
+        for (const auto &method : svd_methods) {
+            SECTION( method.first + " SVD of a " + std::to_string(dim) + "x" +
+                     std::to_string(dim) + " matrix of rank " + std::to_string(rank) ) {
+                // The randomized SVD needs a bond dimension limit
+                const uint_t max_bond_dimension =
+                    (method.second == SVD_Method::randomized) ? rank : 0;
+                cmatrix_t C = mat, U, V;
+                rvector_t S;
+                const double discarded_weight = svd_decompose(
+                    C, U, S, V, method.second, max_bond_dimension, 0.);
+                // Zero singular values are dropped
+                REQUIRE(S.size() == rank);
+                REQUIRE(discarded_weight == Approx(0.).margin(1e-10));
+                REQUIRE(norm(reconstruct(U, S, V) - mat) ==
+                        Approx(0.).margin(1e-10));
+            }
+            SECTION( method.first + " truncated SVD of a " + std::to_string(dim) + "x" +
+                     std::to_string(dim) + " matrix of rank " + std::to_string(rank) ) {
+                cmatrix_t C = mat, U, V;
+                rvector_t S;
+                const double discarded_weight = svd_decompose(
+                    C, U, S, V, method.second, rank / 2, 0.);
+                REQUIRE(S.size() == rank / 2);
+                REQUIRE(discarded_weight > 0.);
+                REQUIRE(discarded_weight < 1.);
+                // The kept singular values are renormalized to the unit norm
+                // of the matrix
+                double kept_weight = 0.;
+                for (const auto &s : S)
+                    kept_weight += s * s;
+                REQUIRE(kept_weight == Approx(1.).epsilon(1e-8));
+            }
+        }
+    }
+}
+
+// Timings of the SVD methods, which only run when selected with the tag:
+// test_svd "[svd_timing]"
+// The two-qubit gates of a state with bond dimension chi decompose 2chi x 2chi
+// matrices, so these sizes cover bond dimensions 8 to 128.
+TEST_CASE( "Matrix product state SVD timing", "[.][svd_timing]" ) {
+    const uint_t repeats = 5;
+    for (const uint_t dim : {16, 64, 256}) {
+        const cmatrix_t mat = random_matrix(dim, dim, dim);
+        for (const auto &method : svd_methods) {
+            const uint_t max_bond_dimension =
+                (method.second == SVD_Method::randomized) ? dim / 8 : 0;
+            cmatrix_t U, V;
+            rvector_t S;
+            const auto start = std::chrono::steady_clock::now();
+            for (uint_t i = 0; i < repeats; ++i) {
+                cmatrix_t C = mat;
+                svd_decompose(C, U, S, V, method.second, max_bond_dimension, 0.);
+            }
+            const std::chrono::duration<double, std::milli> time =
+                std::chrono::steady_clock::now() - start;
+            std::cout << method.first << " " << dim << "x" << dim << ": "
+                      << time.count() / repeats << " ms" << std::endl;
+            REQUIRE(S.size() == (max_bond_dimension > 0 ? max_bond_dimension : dim));
+        }
+    }
+}
+
+//------------------------------------------------------------------------------
+} // end namespace Test
+//------------------------------------------------------------------------------
+} // end namespace AER
+//------------------------------------------------------------------------------
@@ -17,6 +17,7 @@ operation).
 """
 
 from test.terra.reference import ref_measure
+from qiskit import QuantumCircuit
 from qiskit.compiler import assemble
 from qiskit.providers.aer import QasmSimulator
 
@@ -80,3 +81,20 @@ class QasmMatrixProductStateMeasureTests:
             self.assertIn("measure_sampling", res.metadata)
             self.assertEqual(res.metadata["measure_sampling"], True)
 
+
+    def test_measure_sampling_large_ghz(self):
+        """Test QasmSimulator measure sampling of a subset of a large GHZ state"""
+        shots = 2000
+        num_qubits = 100
+        circuit = QuantumCircuit(num_qubits, 3)
+        circuit.h(0)
+        for qubit in range(num_qubits - 1):
+            circuit.cx(qubit, qubit + 1)
+        circuit.measure([0, 50, num_qubits - 1], [0, 1, 2])
+        targets = [{'0x0': shots / 2, '0x7': shots / 2}]
+        qobj = assemble([circuit], self.SIMULATOR, shots=shots)
+        result = self.SIMULATOR.run(
+            qobj, backend_options=self.BACKEND_OPTS).result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.compare_counts(result, [circuit], targets, delta=0.05 * shots)
+        self.assertEqual(result.results[0].metadata["measure_sampling"], True)
@@ -18,6 +18,7 @@ with the exception of those with the multiplexer gate which is not supported yet
 import unittest
 import logging
 import pprint
+import numpy as np
 
 from test.terra import common
 from test.terra.reference import ref_1q_clifford, ref_2q_clifford
@@ -69,3 +70,134 @@ class QasmMatrixProductStateMethodTests:
                 self.assertTrue(getattr(result, 'success', False))
                 self.compare_counts(result, circuits, targets, delta = delta*shots)
 
+
+    def test_method_bond_dimension_truncation(self):
+        """Test matrix product state method with a truncated bond dimension"""
+        qr = QuantumRegister(4)
+        cr = ClassicalRegister(4)
+        circuit = QuantumCircuit(qr, cr)
+        circuit.h(qr[0])
+        for i in range(3):
+            circuit.cx(qr[i], qr[i + 1])
+        circuit.measure(qr, cr)
+        shots = 100
+
+        job = execute(circuit, QasmSimulator(), backend_options=self.BACKEND_OPTS, shots=shots)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertAlmostEqual(result.results[0].metadata['mps_discarded_weight'], 0)
+
+        # Keeping a single singular value discards one of the two branches
+        # of the GHZ state
+        backend_opts = self.BACKEND_OPTS.copy()
+        backend_opts["mps_max_bond_dimension"] = 1
+        job = execute(circuit, QasmSimulator(), backend_options=backend_opts, shots=shots)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertAlmostEqual(result.results[0].metadata['mps_discarded_weight'], 0.5)
+        counts = result.get_counts(circuit)
+        self.assertEqual(len(counts), 1)
+        self.assertIn(list(counts.keys())[0], ['0000', '1111'])
+
+    def test_method_bond_dimension_memory(self):
+        """Test matrix product state memory estimate with a truncated bond dimension"""
+        num_qubits = 60
+        qr = QuantumRegister(num_qubits)
+        cr = ClassicalRegister(num_qubits)
+        circuit = QuantumCircuit(qr, cr)
+        # Long-range gates whose untruncated bond dimensions need too much memory
+        for _ in range(40):
+            circuit.h(qr)
+            for i in range(0, num_qubits - 1, 2):
+                circuit.cx(qr[i], qr[num_qubits - 1 - i])
+        circuit.measure(qr, cr)
+
+        backend_opts = self.BACKEND_OPTS.copy()
+        backend_opts["mps_max_bond_dimension"] = 8
+        job = execute(circuit, QasmSimulator(), backend_options=backend_opts, shots=10)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+
+    def test_method_three_qubit_gate_truncation(self):
+        """Test matrix product state method truncation of three-qubit gates"""
+        qr = QuantumRegister(3)
+        cr = ClassicalRegister(3)
+        circuit = QuantumCircuit(qr, cr)
+        circuit.h(qr[0])
+        circuit.h(qr[1])
+        circuit.ccx(qr[0], qr[1], qr[2])
+        circuit.measure(qr, cr)
+        shots = 100
+
+        job = execute(circuit, QasmSimulator(), backend_options=self.BACKEND_OPTS, shots=shots)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertAlmostEqual(result.results[0].metadata['mps_discarded_weight'], 0)
+        counts = result.get_counts(circuit)
+        self.assertEqual(set(counts.keys()), {'000', '001', '010', '111'})
+
+        # The Toffoli gate entangles the qubits, so a single singular value
+        # per bond discards some of the weight of the state
+        backend_opts = self.BACKEND_OPTS.copy()
+        backend_opts["mps_max_bond_dimension"] = 1
+        job = execute(circuit, QasmSimulator(), backend_options=backend_opts, shots=shots)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertGreater(result.results[0].metadata['mps_discarded_weight'], 0)
+
+    def test_method_expval_snapshots(self):
+        """Test matrix product state method expectation value snapshots"""
+        num_qubits = 5
+        qr = QuantumRegister(num_qubits)
+        circuit = QuantumCircuit(qr)
+        circuit.h(qr[0])
+        for i in range(num_qubits - 1):
+            circuit.cx(qr[i], qr[i + 1])
+        # Sum of local terms and a global term of a GHZ state
+        pauli_op = [[1, 'I' * (num_qubits - i - 2) + 'ZZ' + 'I' * i]
+                    for i in range(num_qubits - 1)]
+        pauli_op += [[1, 'X' * num_qubits], [1, 'IIIIZ'], [0.5, 'YYXXX']]
+        circuit.snapshot_expectation_value('pauli', pauli_op, range(num_qubits))
+        # The qubits of the matrix operator are not sorted
+        zz_op = np.kron(np.diag([1, -1]), np.diag([1, -1]))
+        circuit.snapshot_expectation_value('matrix', zz_op, [4, 1])
+        targets = {'pauli': num_qubits - 1 + 1 + 0 - 0.5, 'matrix': 1}
+
+        job = execute(circuit, QasmSimulator(), backend_options=self.BACKEND_OPTS, shots=1)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        snapshots = result.data(circuit)['snapshots']['expectation_value']
+        for label, target in targets.items():
+            value = snapshots[label][0]
+            if isinstance(value, (list, tuple)):
+                value = complex(*value)
+            self.assertAlmostEqual(value, target)
+
+    def test_method_non_adjacent_gates(self):
+        """Test matrix product state method with gates on non-adjacent qubits"""
+        num_qubits = 6
+        qr = QuantumRegister(num_qubits)
+        cr = ClassicalRegister(num_qubits)
+        circuit = QuantumCircuit(qr, cr)
+        circuit.h(qr[0])
+        circuit.cx(qr[0], qr[5])
+        circuit.cx(qr[5], qr[2])
+        circuit.swap(qr[2], qr[4])
+        circuit.cx(qr[0], qr[3])
+        circuit.ccx(qr[5], qr[3], qr[1])
+        circuit.snapshot_statevector('final')
+        circuit.measure(qr, cr)
+        # The qubits 0, 1, 3, 4 and 5 are in a GHZ state
+        target = np.zeros(2 ** num_qubits)
+        target[0] = target[0b111011] = 1 / np.sqrt(2)
+
+        backend_opts = self.BACKEND_OPTS.copy()
+        for swap_lookahead in [0, 20]:
+            backend_opts["mps_swap_lookahead"] = swap_lookahead
+            job = execute(circuit, QasmSimulator(), backend_options=backend_opts, shots=100)
+            result = job.result()
+            self.assertTrue(getattr(result, 'success', False))
+            statevector = result.data(circuit)['snapshots']['statevector']['final'][0]
+            self.assertAlmostEqual(abs(np.vdot(statevector, target)), 1)
+            counts = result.get_counts(circuit)
+            self.assertEqual(set(counts.keys()), {'000000', '111011'})
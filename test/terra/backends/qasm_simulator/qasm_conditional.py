@@ -14,6 +14,7 @@ QasmSimulator Integration Tests
 """
 
 from test.terra.reference import ref_conditionals
+from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 from qiskit.compiler import assemble
 from qiskit.providers.aer import QasmSimulator
 
@@ -152,3 +153,73 @@ class QasmConditionalSuperOpTests:
             qobj, backend_options=self.BACKEND_OPTS).result()
         self.assertTrue(getattr(result, 'success', False))
         self.compare_counts(result, circuits, targets, delta=0)
+
+
+class QasmConditionalFoldingTests:
+    """QasmSimulator classical folding of conditionals tests."""
+
+    SIMULATOR = QasmSimulator()
+    BACKEND_OPTS = {}
+
+    def conditional_circuit(self, condition_on_measured):
+        """Test circuit with a conditional gate after a measurement"""
+        qr = QuantumRegister(2)
+        cr_a = ClassicalRegister(1, 'a')
+        cr_b = ClassicalRegister(1, 'b')
+        circuit = QuantumCircuit(qr, cr_a, cr_b)
+        circuit.h(qr[0])
+        circuit.measure(qr[0], cr_a[0])
+        if condition_on_measured:
+            circuit.x(qr[1]).c_if(cr_a, 1)
+        else:
+            circuit.x(qr[1]).c_if(cr_b, 0)
+        circuit.measure(qr[1], cr_b[0])
+        return circuit
+
+    def test_fold_conditional_unmeasured_register(self):
+        """Test conditionals on unmeasured registers are folded"""
+        shots = 1000
+        circuit = self.conditional_circuit(condition_on_measured=False)
+        qobj = assemble([circuit], self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['fold_classical_verbose'] = True
+        # Measurements are delayed after the unconditional gate for
+        # measure sampling
+        backend_options['optimize_ideal_threshold'] = 1
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['fold_classical']['folded_conditionals'], 1)
+        self.assertTrue(metadata.get('measure_sampling', False))
+        targets = [{'1 0': shots / 2, '1 1': shots / 2}]
+        self.compare_counts(result, [circuit], targets, hex_counts=False,
+                            delta=0.05 * shots)
+
+        backend_options['fold_classical_enable'] = False
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertNotIn('fold_classical', result.results[0].metadata)
+        self.compare_counts(result, [circuit], targets, hex_counts=False,
+                            delta=0.05 * shots)
+
+    def test_fold_conditional_measured_register(self):
+        """Test conditionals on measured registers are not folded"""
+        shots = 1000
+        circuit = self.conditional_circuit(condition_on_measured=True)
+        qobj = assemble([circuit], self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['fold_classical_verbose'] = True
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['fold_classical']['folded_conditionals'], 0)
+        self.assertEqual(metadata['fold_classical']['removed_ops'], 0)
+        self.assertFalse(metadata.get('measure_sampling', False))
+        targets = [{'0 0': shots / 2, '1 1': shots / 2}]
+        self.compare_counts(result, [circuit], targets, hex_counts=False,
+                            delta=0.05 * shots)
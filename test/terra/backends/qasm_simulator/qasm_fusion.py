@@ -13,6 +13,10 @@
 """
 QasmSimulator Integration Tests
 """
+import json
+import os
+import tempfile
+
 from test.terra.reference import ref_2q_clifford
 from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit
 from qiskit.compiler import assemble, transpile
@@ -121,6 +125,46 @@ class QasmFusionTests:
             'fusion_verbose' in result.to_dict()['results'][0]['metadata'],
             msg="verbose must work with noise")
 
+    def test_noise_fusion_cache(self):
+        """Test Fusion reuses fused segments across noisy shots"""
+        shots = 100
+        noise_model = self.noise_model()
+        circuit = transpile([quantum_volume_circuit(10, 1, measure=True, seed=0)],
+                            backend=self.SIMULATOR,
+                            basis_gates=noise_model.basis_gates)
+        qobj = assemble(circuit, self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['fusion_enable'] = True
+        backend_options['fusion_threshold'] = 1
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result_fusion = self.SIMULATOR.run(
+            qobj,
+            noise_model=noise_model,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result_fusion, 'success', False))
+
+        metadata = result_fusion.to_dict()['results'][0]['metadata']
+        self.assertIn('fusion_cache', metadata)
+        self.assertGreater(metadata['fusion_cache']['hits'], 0)
+        self.assertGreaterEqual(metadata['fusion_cache']['hit_rate'], 0)
+        self.assertLessEqual(metadata['fusion_cache']['hit_rate'], 1)
+
+        backend_options['fusion_enable'] = False
+        result_nonfusion = self.SIMULATOR.run(
+            qobj,
+            noise_model=noise_model,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result_nonfusion, 'success', False))
+
+        self.assertDictAlmostEqual(
+            result_fusion.get_counts(0),
+            result_nonfusion.get_counts(0),
+            delta=0.0,
+            msg="fusion with noise was failed")
+
     def test_fusion_verbose(self):
         """Test Fusion with verbose option"""
         circuit = self.create_statevector_circuit()
@@ -420,4 +464,89 @@ class QasmFusionTests:
             result_fusion.get_counts(circuit),
             result_nonfusion.get_counts(circuit),
             delta=0.0,
-            msg="fusion for qft was failed")
\ No newline at end of file
+            msg="fusion for qft was failed")
+
+    def test_fusion_method(self):
+        """Test Fusion with dag and window fusion methods"""
+        shots = 100
+
+        circuits = [quantum_volume_circuit(10, 1, measure=True, seed=0),
+                    qft_circuit(10, measure=True)]
+        qobj = assemble(circuits, self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['fusion_enable'] = False
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result_nonfusion = self.SIMULATOR.run(
+            qobj,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result_nonfusion, 'success', 'False'))
+
+        for method in ['dag', 'window']:
+            backend_options = self.BACKEND_OPTS.copy()
+            backend_options['fusion_enable'] = True
+            backend_options['fusion_verbose'] = True
+            backend_options['fusion_threshold'] = 1
+            backend_options['fusion_method'] = method
+            backend_options['optimize_ideal_threshold'] = 1
+            backend_options['optimize_noise_threshold'] = 1
+
+            result_fusion = self.SIMULATOR.run(
+                qobj,
+                backend_options=backend_options).result()
+            self.assertTrue(getattr(result_fusion, 'success', 'False'))
+
+            for circuit in circuits:
+                self.assertDictAlmostEqual(
+                    result_fusion.get_counts(circuit),
+                    result_nonfusion.get_counts(circuit),
+                    delta=0.0,
+                    msg="fusion with {} method was failed".format(method))
+
+    def test_fusion_calibration(self):
+        """Test Fusion with costs measured on this host"""
+        shots = 100
+
+        circuit = qft_circuit(10, measure=True)
+        qobj = assemble([circuit], self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['fusion_enable'] = False
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result_nonfusion = self.SIMULATOR.run(
+            qobj,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result_nonfusion, 'success', 'False'))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cost_file = os.path.join(tmpdir, 'fusion_costs.json')
+            backend_options = self.BACKEND_OPTS.copy()
+            backend_options['fusion_enable'] = True
+            backend_options['fusion_threshold'] = 1
+            backend_options['fusion_max_qubit'] = 3
+            backend_options['fusion_calibrate'] = True
+            backend_options['fusion_cost_file'] = cost_file
+            backend_options['max_parallel_threads'] = 1
+            backend_options['optimize_ideal_threshold'] = 1
+            backend_options['optimize_noise_threshold'] = 1
+
+            result_fusion = self.SIMULATOR.run(
+                qobj,
+                backend_options=backend_options).result()
+            self.assertTrue(getattr(result_fusion, 'success', 'False'))
+
+            with open(cost_file) as file:
+                costs = json.load(file)
+            self.assertEqual(len(costs['double']['1']['dense']), 3)
+            self.assertEqual(len(costs['double']['1']['diagonal']), 3)
+            self.assertAlmostEqual(costs['double']['1']['dense'][0], 1.0)
+
+        self.assertDictAlmostEqual(
+            result_fusion.get_counts(circuit),
+            result_nonfusion.get_counts(circuit),
+            delta=0.0,
+            msg="fusion with calibrated costs was failed")
@@ -0,0 +1,233 @@
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2018, 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+QasmSimulator Integration Tests
+"""
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit import Instruction
+from qiskit.compiler import assemble
+from qiskit.providers.aer import QasmSimulator
+from qiskit.providers.aer.noise import NoiseModel
+from qiskit.providers.aer.noise.errors import depolarizing_error
+from qiskit.providers.aer.noise.errors import pauli_error
+
+
+class QasmGateCancellationTests:
+    """QasmSimulator gate cancellation optimization tests."""
+
+    SIMULATOR = QasmSimulator()
+    BACKEND_OPTS = {}
+
+    def gate_cancellation_circuit(self, measure=True):
+        """Test circuit with inverse pairs and runs of single-qubit gates"""
+        circuit = QuantumCircuit(3, 3)
+        circuit.h(0)
+        circuit.h(1)
+        circuit.cx(0, 1)
+        circuit.t(0)
+        circuit.cx(0, 1)
+        circuit.u3(0.1, 0.2, 0.3, 2)
+        circuit.s(2)
+        circuit.h(2)
+        circuit.cz(1, 2)
+        circuit.x(0)
+        circuit.x(0)
+        circuit.cz(2, 1)
+        circuit.cx(1, 2)
+        if measure:
+            circuit.measure([0, 1, 2], [0, 1, 2])
+        return circuit
+
+    def test_gate_cancellation_ideal(self):
+        """Test gate cancellation does not change ideal counts"""
+        circuit = self.gate_cancellation_circuit()
+        qobj = assemble([circuit], self.SIMULATOR, shots=1000, seed_simulator=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['gate_cancellation_verbose'] = True
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        metadata = result.results[0].metadata
+        self.assertIn('gate_cancellation', metadata)
+        self.assertLess(metadata['gate_cancellation']['output_ops'],
+                        metadata['gate_cancellation']['input_ops'])
+
+        backend_options['gate_cancellation_enable'] = False
+        result_disabled = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result_disabled, 'success', False))
+        self.assertNotIn('gate_cancellation', result_disabled.results[0].metadata)
+        self.assertDictAlmostEqual(result.get_counts(0),
+                                   result_disabled.get_counts(0),
+                                   delta=0.05 * 1000)
+
+    def test_gate_cancellation_statevector_snapshot(self):
+        """Test gate cancellation keeps the global phase of snapshots"""
+        circuit = self.gate_cancellation_circuit(measure=False)
+        circuit.snapshot('final')
+        qobj = assemble([circuit], self.SIMULATOR, shots=1)
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['method'] = 'statevector'
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+
+        backend_options['gate_cancellation_enable'] = False
+        result_disabled = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result_disabled, 'success', False))
+
+        value = np.array(result.data(0)['snapshots']['statevector']['final'][0])
+        target = np.array(result_disabled.data(0)['snapshots']['statevector']['final'][0])
+        self.assertTrue(np.allclose(value, target))
+
+    def test_gate_cancellation_diagonal_unitary(self):
+        """Test gate cancellation of runs merged into diag(+-i, 1) unitaries"""
+        circuits = []
+        for sign in [1, -1]:
+            circuit = QuantumCircuit(1, 1)
+            circuit.h(0)
+            circuit.barrier(0)
+            circuit.x(0)
+            if sign == 1:
+                circuit.s(0)
+            else:
+                circuit.sdg(0)
+            circuit.x(0)
+            circuit.barrier(0)
+            if sign == 1:
+                circuit.s(0)
+            else:
+                circuit.sdg(0)
+            circuit.h(0)
+            circuits.append(circuit)
+        shots = 100
+
+        # Errors on u1 and u3 make the pass emit the runs as unitaries
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_quantum_error(
+            pauli_error([('X', 0.01), ('I', 0.99)]), ['u1', 'u2', 'u3'])
+        measured = []
+        for circuit in circuits:
+            circuit = circuit.copy()
+            circuit.measure(0, 0)
+            measured.append(circuit)
+        qobj = assemble(measured, self.SIMULATOR, shots=shots, seed_simulator=1)
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['method'] = 'statevector'
+        result = self.SIMULATOR.run(
+            qobj, noise_model=noise_model,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        for i in range(len(measured)):
+            self.assertEqual(result.get_counts(i), {'0': shots})
+
+        # Statevector snapshots keep the phase, which also needs unitaries
+        for circuit in circuits:
+            circuit.snapshot('final')
+        qobj = assemble(circuits, self.SIMULATOR, shots=1)
+        result = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        backend_options['gate_cancellation_enable'] = False
+        result_disabled = self.SIMULATOR.run(
+            qobj, backend_options=backend_options).result()
+        self.assertTrue(getattr(result_disabled, 'success', False))
+        for i in range(len(circuits)):
+            value = np.array(result.data(i)['snapshots']['statevector']['final'][0])
+            target = np.array(result_disabled.data(i)['snapshots']['statevector']['final'][0])
+            self.assertTrue(np.allclose(value, target))
+
+    def test_gate_cancellation_noise(self):
+        """Test gate cancellation keeps gates with errors"""
+        circuit = QuantumCircuit(2, 2)
+        circuit.x(0)
+        circuit.x(0)
+        circuit.cx(0, 1)
+        circuit.cx(0, 1)
+        circuit.measure([0, 1], [0, 1])
+        qobj = assemble([circuit], self.SIMULATOR, shots=100, seed_simulator=1)
+
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_quantum_error(depolarizing_error(0.1, 1), ['x'])
+
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options['gate_cancellation_verbose'] = True
+        result = self.SIMULATOR.run(
+            qobj, noise_model=noise_model,
+            backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        metadata = result.results[0].metadata
+        # Only the ideal cx gates cancel
+        self.assertEqual(metadata['gate_cancellation']['input_ops'], 6)
+        self.assertEqual(metadata['gate_cancellation']['output_ops'], 4)
+
+    def test_gate_cancellation_nonlocal_noise(self):
+        """Test gate cancellation does not move gates across nonlocal errors"""
+        shots = 100
+        noise_model = NoiseModel()
+        noise_model.add_nonlocal_quantum_error(
+            pauli_error([('X', 1)]), ['x'], [1], [0])
+        noise_model.add_nonlocal_quantum_error(
+            pauli_error([('Z', 1)]), ['x'], [2], [1])
+
+        # The X error on qubit 0 is between the h gates
+        circuit = QuantumCircuit(2, 2)
+        circuit.h(0)
+        circuit.x(1)
+        circuit.h(0)
+        circuit.measure([0, 1], [0, 1])
+        # The Z error on qubit 1 is between the cx gates
+        circuit_cx = QuantumCircuit(3, 3)
+        circuit_cx.x(0)
+        circuit_cx.h(1)
+        circuit_cx.cx(0, 1)
+        circuit_cx.x(2)
+        circuit_cx.cx(0, 1)
+        circuit_cx.h(1)
+        circuit_cx.measure([0, 1, 2], [0, 1, 2])
+        qobj = assemble([circuit, circuit_cx], self.SIMULATOR,
+                        shots=shots, seed_simulator=1)
+
+        result = self.SIMULATOR.run(
+            qobj, noise_model=noise_model,
+            backend_options=self.BACKEND_OPTS).result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertEqual(result.get_counts(0), {'10': shots})
+        self.assertEqual(result.get_counts(1), {'111': shots})
+
+    def test_gate_cancellation_nonlocal_multi_qubit_measure_noise(self):
+        """Test gate cancellation does not move gates across the nonlocal
+        errors of a single qubit of a multi-qubit measure"""
+        shots = 100
+        noise_model = NoiseModel()
+        noise_model.add_nonlocal_quantum_error(
+            pauli_error([('Z', 1)]), ['measure'], [0], [2])
+
+        # The Z error on qubit 2 is between the h gates
+        circuit = QuantumCircuit(3, 3)
+        circuit.h(2)
+        circuit.append(Instruction("measure", 2, 2, []), [0, 1], [0, 1])
+        circuit.h(2)
+        circuit.measure(2, 2)
+        qobj = assemble([circuit], self.SIMULATOR, shots=shots, seed_simulator=1)
+
+        result = self.SIMULATOR.run(
+            qobj, noise_model=noise_model,
+            backend_options=self.BACKEND_OPTS).result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertEqual(result.get_counts(0), {'100': shots})
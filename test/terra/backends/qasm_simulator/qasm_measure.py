@@ -14,10 +14,13 @@ QasmSimulator Integration Tests
 """
 
 from test.terra.reference import ref_measure
+from qiskit import QuantumCircuit
+from qiskit.circuit import Instruction
 from qiskit.compiler import assemble
 from qiskit.providers.aer import QasmSimulator
 from qiskit.providers.aer.noise import NoiseModel
 from qiskit.providers.aer.noise.errors import ReadoutError, depolarizing_error
+from qiskit.providers.aer.noise.errors import pauli_error
 
 
 class QasmMeasureTests:
@@ -88,6 +91,22 @@ class QasmMeasureTests:
         self.compare_counts(result, circuits, targets, delta=0.05 * shots)
         self.compare_result_metadata(result, circuits, "measure_sampling", False)
 
+    def test_measure_nondeterministic_sampling_methods(self):
+        """Test QasmSimulator measure sampling with each sampling algorithm"""
+        shots = 2000
+        circuits = ref_measure.measure_circuits_nondeterministic(
+            allow_sampling=True)
+        targets = ref_measure.measure_counts_nondeterministic(shots)
+        qobj = assemble(circuits, self.SIMULATOR, shots=shots)
+        for sample_method in ['index', 'alias', 'sorted']:
+            backend_opts = self.BACKEND_OPTS.copy()
+            backend_opts['statevector_sample_measure_method'] = sample_method
+            result = self.SIMULATOR.run(
+                qobj, backend_options=backend_opts).result()
+            self.assertTrue(getattr(result, 'success', False))
+            self.compare_counts(result, circuits, targets, delta=0.05 * shots)
+            self.compare_result_metadata(result, circuits, "measure_sampling", True)
+
     def test_measure_sampling_with_readouterror(self):
         """Test QasmSimulator measure with deterministic counts with sampling and readout-error"""
         readout_error = [0.01, 0.1]
@@ -195,3 +214,42 @@ class QasmMultiQubitMeasureTests:
         self.assertTrue(getattr(result, 'success', False))
         self.compare_counts(result, circuits, targets, delta=0.05 * shots)
         self.compare_result_metadata(result, circuits, "measure_sampling", False)
+
+    def test_measure_multi_qubit_readout_noise(self):
+        """Test multi-qubit measure with a readout error on a single qubit"""
+        shots = 100
+        circuit = QuantumCircuit(2, 2)
+        circuit.x(1)
+        circuit.append(Instruction("measure", 2, 2, []), [0, 1], [0, 1])
+        qobj = assemble(circuit, self.SIMULATOR, shots=shots)
+
+        # The readout error of qubit 0 flips its outcome
+        noise_model = NoiseModel()
+        noise_model.add_readout_error(ReadoutError([[0, 1], [1, 0]]), [0])
+        result = self.SIMULATOR.run(
+            qobj, backend_options=self.BACKEND_OPTS,
+            noise_model=noise_model).result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.assertEqual(result.get_counts(0), {'11': shots})
+
+    def test_measure_multi_qubit_nonlocal_noise(self):
+        """Test multi-qubit measure with a nonlocal error on a single qubit"""
+        shots = 100
+        circuit = QuantumCircuit(3, 4)
+        circuit.append(Instruction("measure", 2, 2, []), [0, 1], [0, 1])
+        circuit.append(Instruction("measure", 2, 2, []), [0, 1], [2, 3])
+        qobj = assemble(circuit, self.SIMULATOR, shots=shots)
+
+        # The error of a measure of qubit 0 flips qubits 2 and 0 before
+        # each measure, and qubit 2 is only acted on by the error
+        noise_model = NoiseModel()
+        noise_model.add_nonlocal_quantum_error(
+            pauli_error([('XX', 1)]), ['measure'], [0], [2, 0])
+        for truncate in [True, False]:
+            backend_options = self.BACKEND_OPTS.copy()
+            backend_options['truncate_enable'] = truncate
+            result = self.SIMULATOR.run(
+                qobj, backend_options=backend_options,
+                noise_model=noise_model).result()
+            self.assertTrue(getattr(result, 'success', False))
+            self.assertEqual(result.get_counts(0), {'0001': shots})
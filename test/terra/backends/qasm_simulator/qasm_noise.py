@@ -152,3 +152,52 @@ class QasmKrausNoiseTests:
                 noise_model=noise_model).result()
             self.assertTrue(getattr(result, 'success', False))
             self.compare_counts(result, [circuit], [target], delta=0.05 * shots)
+
+
+class QasmPauliFrameNoiseTests:
+    """QasmSimulator stabilizer Pauli frame noise sampling tests."""
+
+    SIMULATOR = QasmSimulator()
+    BACKEND_OPTS = {}
+
+    def test_pauli_frame_gate_noise(self):
+        """Test Pauli frame sampling with Pauli gate error noise model."""
+        shots = 2000
+        circuits = ref_pauli_noise.pauli_gate_error_circuits()
+        noise_models = ref_pauli_noise.pauli_gate_error_noise_models()
+        targets = ref_pauli_noise.pauli_gate_error_counts(shots)
+
+        for circuit, noise_model, target in zip(circuits, noise_models,
+                                                targets):
+            qobj = assemble(circuit, self.SIMULATOR, shots=shots)
+            for frames in [True, False]:
+                backend_options = self.BACKEND_OPTS.copy()
+                backend_options['stabilizer_pauli_frame_sampling'] = frames
+                result = self.SIMULATOR.run(
+                    qobj,
+                    backend_options=backend_options,
+                    noise_model=noise_model).result()
+                self.assertTrue(getattr(result, 'success', False))
+                metadata = result.results[0].metadata
+                self.assertEqual(
+                    metadata.get('pauli_frame_sampling', False), frames)
+                self.compare_counts(result, [circuit], [target],
+                                    delta=0.05 * shots)
+
+    def test_pauli_frame_measure_noise(self):
+        """Test Pauli frame sampling with Pauli measure error noise model."""
+        shots = 2000
+        circuits = ref_pauli_noise.pauli_measure_error_circuits()
+        noise_models = ref_pauli_noise.pauli_measure_error_noise_models()
+        targets = ref_pauli_noise.pauli_measure_error_counts(shots)
+
+        for circuit, noise_model, target in zip(circuits, noise_models,
+                                                targets):
+            qobj = assemble(circuit, self.SIMULATOR, shots=shots)
+            result = self.SIMULATOR.run(
+                qobj,
+                backend_options=self.BACKEND_OPTS,
+                noise_model=noise_model).result()
+            self.assertTrue(getattr(result, 'success', False))
+            self.assertTrue(result.results[0].metadata.get('pauli_frame_sampling'))
+            self.compare_counts(result, [circuit], [target], delta=0.05 * shots)
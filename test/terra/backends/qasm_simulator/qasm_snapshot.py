@@ -673,7 +673,7 @@ class QasmSnapshotExpValMatrixTests:
 
     SIMULATOR = QasmSimulator()
     SUPPORTED_QASM_METHODS = [
-        'automatic', 'statevector', 'matrix_product_state'
+        'automatic', 'statevector', 'density_matrix', 'matrix_product_state'
     ]
     BACKEND_OPTS = {}
 
@@ -9,12 +9,17 @@
 QasmSimulator Integration Tests
 """
 import json
+import numpy as np
 from test.benchmark.tools import quantum_volume_circuit
 from qiskit import execute, QuantumRegister, ClassicalRegister, QuantumCircuit, Aer
+from qiskit.circuit import Instruction
 from qiskit.providers.aer import QasmSimulator
 from qiskit.providers.aer import noise
 from qiskit.providers.aer.noise import NoiseModel
 from qiskit.providers.aer.noise.errors import ReadoutError, depolarizing_error
+from qiskit.providers.aer.noise.errors import coherent_unitary_error
+from qiskit.providers.aer.extensions import snapshot_density_matrix
+from qiskit.providers.aer.extensions import snapshot_expectation_value
 from qiskit.providers.models import BackendProperties
 from qiskit.providers.aer.noise.device import basic_device_noise_model
 
@@ -174,9 +179,10 @@ class QasmQubitsTruncateTests:
         """Test qubit truncation with non-local noise."""
         
         # Circuit that uses just 2-qubits
-        circuit = QuantumCircuit(10, 1)
+        circuit = QuantumCircuit(10, 2)
         circuit.x(5)
         circuit.measure(5, 0)
+        circuit.measure(4, 1)
 
         # Add non-local 2-qubit depolarizing error
         # that acts on qubits [4, 6] when X applied to qubit 5
@@ -202,6 +208,81 @@ class QasmQubitsTruncateTests:
         active_remapped = sorted([i[1] for i in mapping if i[0] in active_qubits])
         self.assertEqual(active_qubits, [4, 5, 6])
         self.assertEqual(active_remapped, [0, 1, 2])
+        self.assertEqual(metadata['num_qubits'], 3)
+
+    def test_truncate_nonlocal_noise_unused_qubits(self):
+        """Test qubit truncation removes non-local noise on unused qubits."""
+
+        # Circuit that uses just 1-qubit
+        circuit = QuantumCircuit(10, 1)
+        circuit.x(5)
+        circuit.measure(5, 0)
+
+        # Add non-local 2-qubit depolarizing error
+        # that only acts on unused qubits [4, 6] when X applied to qubit 5
+        noise_model = NoiseModel()
+        error = depolarizing_error(0.1, 2)
+        noise_model.add_nonlocal_quantum_error(error, ['x'], [5], [4, 6])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["truncate_verbose"] = True
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=100,
+                         noise_model=noise_model,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertTrue('truncate_qubits' in metadata, msg="truncate_qubits must work.")
+        active_qubits = sorted(metadata['truncate_qubits'].get('active_qubits', []))
+        self.assertEqual(active_qubits, [5])
+        self.assertEqual(metadata['num_qubits'], 1)
+        # The circuit is ideal once the errors on unused qubits are removed
+        self.assertEqual(result.get_counts(0), {'1': 100})
+
+    def test_truncate_device_noise(self):
+        """Test qubit truncation with errors on all qubits of a device."""
+        num_device_qubits = 30
+        qubits = [3, 7, 8, 15, 22]
+
+        circuit = QuantumCircuit(num_device_qubits, len(qubits))
+        circuit.h(qubits[0])
+        for control, target in zip(qubits[:-1], qubits[1:]):
+            circuit.cx(control, target)
+        circuit.measure(qubits, range(len(qubits)))
+
+        # Add local gate and readout errors on every qubit of the device
+        noise_model = NoiseModel()
+        readout_error = ReadoutError([[0.9, 0.1], [0.1, 0.9]])
+        for qubit in range(num_device_qubits):
+            noise_model.add_quantum_error(
+                depolarizing_error(0.01, 1), ['h', 'u3'], [qubit])
+            noise_model.add_readout_error(readout_error, [qubit])
+        for qubit in range(num_device_qubits - 1):
+            noise_model.add_quantum_error(
+                depolarizing_error(0.02, 2), ['cx'], [qubit, qubit + 1])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["truncate_verbose"] = True
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=100,
+                         noise_model=noise_model,
+                         backend_options=backend_options).result()
+        self.assertTrue(getattr(result, 'success', False))
+        metadata = result.results[0].metadata
+        active_qubits = sorted(metadata['truncate_qubits'].get('active_qubits', []))
+        self.assertEqual(active_qubits, qubits)
+        self.assertEqual(metadata['num_qubits'], len(qubits))
+        # Readout errors make all outcomes possible
+        self.assertGreater(len(result.get_counts(0)), 2)
 
     def test_truncate(self):
         """Test truncation with noise model option"""
@@ -229,6 +310,8 @@ class QasmQubitsTruncateTests:
         qasm_sim = Aer.get_backend('qasm_simulator')
         backend_options = self.BACKEND_OPTS.copy()
         backend_options["truncate_verbose"] = True
+        # The light cone would remove the gates on unmeasured qubits
+        backend_options["light_cone_enable"] = False
         backend_options['optimize_ideal_threshold'] = 1
         backend_options['optimize_noise_threshold'] = 1
 
@@ -261,4 +344,171 @@ class QasmQubitsTruncateTests:
                             backend_options=backend_options).result()
                             
         self.assertFalse('truncate_qubits' in result.to_dict()['results'][0]['metadata'], msg="truncate_qubits must not work.")
-     
\ No newline at end of file
+
+    def test_light_cone_ideal(self):
+        """Test light cone pruning removes gates on unmeasured qubits."""
+        circuit = QuantumCircuit(10, 2)
+        circuit.h(range(10))
+        for qubit in range(9):
+            circuit.cx(qubit, qubit + 1)
+        circuit.barrier()
+        circuit.measure(0, 0)
+        circuit.x(1).c_if(circuit.cregs[0], 1)
+        circuit.measure(1, 1)
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["truncate_verbose"] = True
+        backend_options["light_cone_verbose"] = True
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=2000,
+                         seed_simulator=1,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertIn('light_cone', metadata)
+        self.assertEqual(metadata['light_cone']['removed_ops'], 14)
+        active_qubits = sorted(metadata['truncate_qubits'].get('active_qubits', []))
+        self.assertEqual(active_qubits, [0, 1, 2])
+
+        backend_options["light_cone_enable"] = False
+        result_full = execute(circuit,
+                              qasm_sim,
+                              shots=2000,
+                              seed_simulator=1,
+                              backend_options=backend_options).result()
+        self.assertNotIn('light_cone', result_full.results[0].metadata)
+        self.compare_counts(result, [circuit], [result_full.get_counts(0)],
+                            hex_counts=False, delta=0.05 * 2000)
+
+    def test_light_cone_nonlocal_noise(self):
+        """Test light cone pruning keeps gates with non-local noise."""
+        circuit = QuantumCircuit(10, 1)
+        circuit.x(2)
+        circuit.x(5)
+        circuit.x(8)
+        circuit.measure(4, 0)
+
+        # Add non-local error that acts on qubit 4 when X applied to qubit 5
+        noise_model = NoiseModel()
+        error = depolarizing_error(0.1, 1)
+        noise_model.add_nonlocal_quantum_error(error, ['x'], [5], [4])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["light_cone_verbose"] = True
+        backend_options['optimize_ideal_threshold'] = 1
+        backend_options['optimize_noise_threshold'] = 1
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=100,
+                         noise_model=noise_model,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['light_cone']['removed_ops'], 2)
+
+    def test_light_cone_nonlocal_measure_noise(self):
+        """Test light cone pruning keeps gates on qubits of measure noise."""
+        circuit = QuantumCircuit(2, 1)
+        circuit.x(1)
+        circuit.measure(0, 0)
+
+        # Add non-local CX error from qubit 1 to qubit 0 on measure of qubit 0
+        cx_matrix = [[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]]
+        noise_model = NoiseModel()
+        noise_model.add_nonlocal_quantum_error(
+            coherent_unitary_error(cx_matrix), ['measure'], [0], [1, 0])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["light_cone_verbose"] = True
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=100,
+                         noise_model=noise_model,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['light_cone']['removed_ops'], 0)
+        self.assertEqual(result.get_counts(0), {'1': 100})
+
+    def test_light_cone_nonlocal_multi_qubit_measure_noise(self):
+        """Test light cone pruning keeps gates on qubits of the noise of a
+        single qubit of a multi-qubit measure."""
+        circuit = QuantumCircuit(3, 2)
+        circuit.x(2)
+        circuit.append(Instruction("measure", 2, 2, []), [0, 1], [0, 1])
+
+        # Add non-local CX error from qubit 2 to qubit 0 on measure of qubit 0
+        cx_matrix = [[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]]
+        noise_model = NoiseModel()
+        noise_model.add_nonlocal_quantum_error(
+            coherent_unitary_error(cx_matrix), ['measure'], [0], [2, 0])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["light_cone_verbose"] = True
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=100,
+                         noise_model=noise_model,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['light_cone']['removed_ops'], 0)
+        self.assertEqual(result.get_counts(0), {'01': 100})
+
+    def test_light_cone_density_matrix_snapshot(self):
+        """Test light cone pruning keeps gates of full density matrix snapshots."""
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        circuit.x(1)
+        circuit.snapshot_density_matrix('dm', [0])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["method"] = "density_matrix"
+        backend_options["light_cone_verbose"] = True
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=1,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['light_cone']['removed_ops'], 0)
+
+        backend_options["light_cone_enable"] = False
+        result_full = execute(circuit,
+                              qasm_sim,
+                              shots=1,
+                              backend_options=backend_options).result()
+        value = result.data(0)['snapshots']['density_matrix']['dm'][0]['value']
+        target = result_full.data(0)['snapshots']['density_matrix']['dm'][0]['value']
+        self.assertTrue(np.allclose(value, target))
+
+    def test_light_cone_matrix_expval_snapshot(self):
+        """Test light cone pruning of matrix expectation value snapshots."""
+        circuit = QuantumCircuit(3)
+        circuit.x(0)
+        circuit.x(1)
+        circuit.x(2)
+        # Component qubits are positions in the snapshot qubits
+        circuit.snapshot_expectation_value(
+            'expval', np.array([[1, 0], [0, -1]], dtype=complex), [2])
+
+        qasm_sim = Aer.get_backend('qasm_simulator')
+        backend_options = self.BACKEND_OPTS.copy()
+        backend_options["light_cone_verbose"] = True
+
+        result = execute(circuit,
+                         qasm_sim,
+                         shots=1,
+                         backend_options=backend_options).result()
+        metadata = result.results[0].metadata
+        self.assertEqual(metadata['light_cone']['removed_ops'], 2)
+        value = result.data(0)['snapshots']['expectation_value']['expval'][0]['value']
+        self.assertAlmostEqual(value, -1)
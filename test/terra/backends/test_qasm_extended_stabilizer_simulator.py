@@ -439,6 +439,21 @@ class TestQasmExtendedStabilizerSimulator(common.QiskitAerTestCase):
         self.assertTrue(getattr(result, 'success', False))
         self.compare_counts(result, circuits, targets, delta=0.1 * shots)
 
+    def test_t_gate_nondeterministic_without_decomposition_cache(self):
+        """Test t-gate circuits sampling a new decomposition for each shot."""
+        shots = 500
+        circuits = ref_non_clifford.t_gate_circuits_nondeterministic(
+            final_measure=True)
+        qobj = assemble(circuits, QasmSimulator(), shots=shots)
+        targets = ref_non_clifford.t_gate_counts_nondeterministic(shots)
+        opts = self.BACKEND_OPTS.copy()
+        opts["extended_stabilizer_mixing_time"] = 50
+        opts["extended_stabilizer_cache_decomposition"] = False
+        job = QasmSimulator().run(qobj, backend_options=opts)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.compare_counts(result, circuits, targets, delta=0.1 * shots)
+
     # ---------------------------------------------------------------------
     # Test tdg-gate
     # ---------------------------------------------------------------------
@@ -500,6 +515,34 @@ class TestQasmExtendedStabilizerSimulator(common.QiskitAerTestCase):
         self.assertTrue(getattr(result, 'success', False))
         self.compare_counts(result, circuits, targets, delta=0.10 * shots)
 
+    def test_t_gate_nondeterministic_metropolis_chains(self):
+        """Test T-gate circuits sampled with several metropolis chains."""
+        shots = 2000
+        circuits = ref_non_clifford.t_gate_circuits_nondeterministic(
+            final_measure=True)
+        qobj = assemble(circuits, QasmSimulator(), shots=shots)
+        targets = ref_non_clifford.t_gate_counts_nondeterministic(shots)
+        opts = self.BACKEND_OPTS_SAMPLING.copy()
+        opts["extended_stabilizer_mixing_time"] = 100
+        opts["extended_stabilizer_metropolis_chains"] = 4
+        job = QasmSimulator().run(qobj, backend_options=opts)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        self.compare_counts(result, circuits, targets, delta=0.05 * shots)
+        # The diagnostics are only computed when requested
+        for experiment in result.results:
+            self.assertNotIn('metropolis_diagnostics', experiment.metadata)
+
+        opts["extended_stabilizer_metropolis_diagnostics"] = True
+        job = QasmSimulator().run(qobj, backend_options=opts)
+        result = job.result()
+        self.assertTrue(getattr(result, 'success', False))
+        for experiment in result.results:
+            diagnostics = experiment.metadata['metropolis_diagnostics']
+            self.assertEqual(diagnostics['chains'], 4)
+            self.assertLess(diagnostics['rhat'], 1.1)
+            self.assertGreater(diagnostics['effective_sample_size'], 0)
+
     # # ---------------------------------------------------------------------
     # # Test algorithms
     # # ---------------------------------------------------------------------
@@ -33,6 +33,7 @@ from test.terra.backends.qasm_simulator.qasm_initialize import QasmInitializeTes
 from test.terra.backends.qasm_simulator.qasm_conditional import QasmConditionalGateTests
 from test.terra.backends.qasm_simulator.qasm_conditional import QasmConditionalUnitaryTests
 from test.terra.backends.qasm_simulator.qasm_conditional import QasmConditionalKrausTests
+from test.terra.backends.qasm_simulator.qasm_conditional import QasmConditionalFoldingTests
 # Algorithm circuit tests
 from test.terra.backends.qasm_simulator.qasm_algorithms import QasmAlgorithmTests
 from test.terra.backends.qasm_simulator.qasm_algorithms import QasmAlgorithmTestsWaltzBasis
@@ -52,6 +53,7 @@ from test.terra.backends.qasm_simulator.qasm_method import QasmMethodTests
 from test.terra.backends.qasm_simulator.qasm_thread_management import QasmThreadManagementTests
 from test.terra.backends.qasm_simulator.qasm_fusion import QasmFusionTests
 from test.terra.backends.qasm_simulator.qasm_delay_measure import QasmDelayMeasureTests
+from test.terra.backends.qasm_simulator.qasm_gate_cancellation import QasmGateCancellationTests
 from test.terra.backends.qasm_simulator.qasm_truncate import QasmQubitsTruncateTests
 from test.terra.backends.qasm_simulator.qasm_basics import QasmBasicsTests
 from test.terra.backends.qasm_simulator.qasm_noise import QasmResetNoiseTests
@@ -67,6 +69,7 @@ class TestQasmSimulator(common.QiskitAerTestCase,
                         QasmConditionalGateTests,
                         QasmConditionalUnitaryTests,
                         QasmConditionalKrausTests,
+                        QasmConditionalFoldingTests,
                         QasmCliffordTests,
                         QasmCliffordTestsWaltzBasis,
                         QasmCliffordTestsMinimalBasis,
@@ -82,6 +85,7 @@ class TestQasmSimulator(common.QiskitAerTestCase,
                         QasmThreadManagementTests,
                         QasmFusionTests,
                         QasmDelayMeasureTests,
+                        QasmGateCancellationTests,
                         QasmQubitsTruncateTests,
                         QasmResetNoiseTests,
                         QasmKrausNoiseTests,
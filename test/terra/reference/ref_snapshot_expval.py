@@ -24,7 +24,8 @@ def snapshot_expval_labels():
     return [
         "<H[0]>", "<H[1]>", "<X[0]>", "<X[1]>", "<Z[0]>", "<Z[1]>",
         "<H[0], I[1]>", "<I[0], H[1]>", "<X[0], I[1]>", "<I[0], X[1]>",
-        "<Z[0], I[1]>", "<I[0], Z[1]>", "<X[0], X[1]>", "<Z[0], Z[1]>"
+        "<Z[0], I[1]>", "<I[0], Z[1]>", "<X[0], X[1]>", "<Z[0], Z[1]>",
+        "<Y[0], Y[1]>", "<X[0], Y[1]>"
     ]
 
 
@@ -39,8 +40,11 @@ def snapshot_expval_params(pauli=False):
         IH_wpo = [[1 / np.sqrt(2), 'IX'], [1 / np.sqrt(2), 'IZ']]
         XX_wpo = [[1, 'XX']]
         ZZ_wpo = [[1, 'ZZ']]
+        YY_wpo = [[1, 'YY']]
+        YX_wpo = [[1, 'YX']]
     else:
         X_wpo = np.array([[0, 1], [1, 0]], dtype=complex)
+        Y_wpo = np.array([[0, -1j], [1j, 0]], dtype=complex)
         Z_wpo = np.array([[1, 0], [0, -1]], dtype=complex)
         H_wpo = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
         IX_wpo = np.kron(np.eye(2), X_wpo)
@@ -48,6 +52,8 @@ def snapshot_expval_params(pauli=False):
         IH_wpo = np.kron(np.eye(2), H_wpo)
         XX_wpo = np.kron(X_wpo, X_wpo)
         ZZ_wpo = np.kron(Z_wpo, Z_wpo)
+        YY_wpo = np.kron(Y_wpo, Y_wpo)
+        YX_wpo = np.kron(Y_wpo, X_wpo)
     return {
         "<H[0]>": (H_wpo, [0]),
         "<H[1]>": (H_wpo, [1]),
@@ -63,6 +69,8 @@ def snapshot_expval_params(pauli=False):
         "<I[0], Z[1]>": (IZ_wpo, [1, 0]),
         "<X[0], X[1]>": (XX_wpo, [0, 1]),
         "<Z[0], Z[1]>": (ZZ_wpo, [0, 1]),
+        "<Y[0], Y[1]>": (YY_wpo, [0, 1]),
+        "<X[0], Y[1]>": (YX_wpo, [0, 1]),
     }
 
 